@@ -5,10 +5,13 @@ Create/update DynamoDB tables for Admin Panel features
 import boto3
 import json
 
+ADMIN_TABLES = ['sync-hub-group-members', 'sync-hub-audit', 'sync-hub-settings']
+
 def create_admin_tables():
-    """Create or update DynamoDB tables for admin features"""
+    """Create or update DynamoDB tables for admin features; raises RuntimeError if any table could not be set up"""
     
     dynamodb = boto3.client('dynamodb', region_name='us-east-1')
+    failures = []
     
     print("🗄️ Creating/updating DynamoDB tables for Admin Panel...")
     
@@ -59,6 +62,7 @@ def create_admin_tables():
         print("✅ sync-hub-group-members table already exists")
     except Exception as e:
         print(f"❌ Error creating group_members table: {e}")
+        failures.append(f"sync-hub-group-members: {e}")
     
     # 2. Audit Table
     print("\n2️⃣ Creating audit table...")
@@ -95,6 +99,7 @@ def create_admin_tables():
         print("✅ sync-hub-audit table already exists")
     except Exception as e:
         print(f"❌ Error creating audit table: {e}")
+        failures.append(f"sync-hub-audit: {e}")
     
     # 3. Check existing settings table
     print("\n3️⃣ Checking settings table...")
@@ -134,7 +139,13 @@ def create_admin_tables():
             print("✅ Created sync-hub-settings table")
         except Exception as e:
             print(f"❌ Error creating settings table: {e}")
+            failures.append(f"sync-hub-settings: {e}")
+    except Exception as e:
+        print(f"❌ Error checking settings table: {e}")
+        failures.append(f"sync-hub-settings: {e}")
     
+    if failures:
+        raise RuntimeError("DynamoDB table setup failed: " + "; ".join(failures))
     print("\n✅ DynamoDB tables setup completed!")
     
     # Print table schema summary
@@ -0,0 +1 @@
+# Performance Benchmarks
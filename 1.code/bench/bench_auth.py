@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Per-request JWT verification cost: naive (fetch JWKS + RSA verify every time) vs shared.tokens
+
+Runs against the local JWKS stand-in (tools.local_jwks), so the "fetch" is a
+file read; a real Cognito JWKS fetch adds a network round trip on top of the
+naive numbers.
+
+- naive: new JWKS cache and verifier per request, as a handler without caching would
+- cold: cached JWKS, but every token is new (RSA verify on each request)
+- warm: the same token again (decoded-token LRU hit)
+
+Usage:
+    python -m bench.bench_auth [--number 500] [--json results.json]
+"""
+import argparse
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.harness import measure, print_table, write_json
+from shared import tokens
+from tools.local_jwks import LocalIssuer
+
+
+def run(number: int) -> List[Dict[str, Any]]:
+    issuer = LocalIssuer()
+    url = issuer.write_jwks(tempfile.mkdtemp(prefix="jwks-"))
+    minted = [issuer.token(f"tenant-{i}") for i in range(number * 6 + 1)]
+
+    def naive():
+        verifier = tokens.Verifier(tokens.JWKSCache(url), issuer.issuer, cache_size=0)
+        verifier.verify(minted[0])
+
+    shared_jwks = tokens.JWKSCache(url)
+    cold_verifier = tokens.Verifier(shared_jwks, issuer.issuer, cache_size=len(minted))
+    fresh = iter(minted)
+
+    def cold():
+        cold_verifier.verify(next(fresh))
+
+    warm_verifier = tokens.Verifier(shared_jwks, issuer.issuer)
+
+    def warm():
+        warm_verifier.verify(minted[0])
+
+    rows = []
+    baseline = None
+    for name, fn in (("naive (fetch + verify)", naive), ("cold (cached JWKS)", cold), ("warm (LRU hit)", warm)):
+        result = measure(fn, number=number)
+        baseline = baseline or result["median_us"]
+        rows.append({
+            "case": name,
+            "median_us": result["median_us"],
+            "best_us": result["best_us"],
+            "speedup": baseline / result["median_us"] if result["median_us"] else None,
+        })
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="JWT verification cost per request")
+    parser.add_argument("--number", type=int, default=500)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    rows = run(args.number)
+    print_table(rows, ["case", "median_us", "best_us", "speedup"])
+    write_json(args.json, "auth", rows, number=args.number)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
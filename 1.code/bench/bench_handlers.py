@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Offline per-route benchmark of the sync-hub API, admin and tags Lambda handlers
+
+main.handler (sync-hub/services/api), lambda/admin_handler.lambda_handler and
+lambda/tags_handler.lambda_handler are called in-process with synthetic API
+Gateway events (HTTP API v2 for sync-hub, REST proxy v1 for the Lambdas) against
+bench.ddbfake, seeded with one tenant holding N items in each collection
+(settings, bookmarks, groups, group members, admin settings/members). Cognito
+ListUsers is answered by a stub and bearer tokens are minted by tools.local_jwks,
+so nothing leaves the process. Metrics, capacity accounting and hot-key tracking
+are on, as they are in Lambda. EMF records go to a local file sink
+(shared.metrics METRICS_SINK_FILE) instead of stdout, and each route's timed
+run is checked against them: one record per request, under the route's name.
+
+Per route and tenant size:
+- p50/p95/p99 latency over --number requests, or fewer once a route has used its
+  --budget seconds (event building and seeding are not timed)
+- DynamoDB calls and consumed RCU/WCU per request, as counted by the fake
+- peak_kb: peak traced allocation during one request, retained_b: what it left
+  behind (tracemalloc, in a separate pass so tracing does not skew the latencies)
+- errors: responses with a 4xx/5xx status
+- resp_b: median ResponseBytes from the EMF records (decoded size for gzip/br bodies)
+
+The fake answers in microseconds, so latencies are the handler's own CPU cost
+plus botocore; DynamoDB's network time comes on top in AWS. Scans and unpaginated
+queries stop at 1 MB pages here as they do in DynamoDB.
+
+Usage:
+    python -m bench.bench_handlers [--sizes 10 1000 100000] [--number 200] [--budget 10]
+                                   [--route /settings] [--json results.json]
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(1, os.path.join(ROOT, "sync-hub", "services", "api"))
+sys.path.insert(2, os.path.join(ROOT, "lambda"))
+
+from bench.ddbfake import FakeDynamoDB, install_shared
+from bench.harness import print_table, write_json
+
+TENANT = "bench-tenant"
+USER_ID = "bench-user"
+SIZES = [10, 1000, 100000]
+MIN_REQUESTS = 20
+
+# sync-hub reads its tables from the environment; the admin and tags Lambdas hard-code theirs
+SYNC_HUB_TABLES = {
+    "SETTINGS_TABLE": ("bench-synchub-settings", "tenant_id", "setting_id", {}),
+    "GROUPS_TABLE": ("bench-synchub-groups", "tenant_id", "group_id", {}),
+    "GROUP_MEMBERS_TABLE": ("bench-synchub-group-members", "tenant_id", "group_id#user_id", {}),
+    "BOOKMARKS_TABLE": ("bench-synchub-bookmarks", "tenant_id", "bookmark_id", {}),
+    "SESSIONS_TABLE": ("bench-synchub-sessions", "tenant_id", "session_id", {}),
+}
+LAMBDA_TABLES = [
+    ("sync-hub-settings", "id", None, {"TenantCreatedIndex": ("tenant_id", "created_at")}),
+    ("sync-hub-group-members", "pk", "sk", {"GSI1": ("gsi1_pk", "gsi1_sk"), "GSI2": ("gsi2_pk", "gsi2_sk")}),
+    ("sync-hub-audit", "id", None, {"TenantTimestampIndex": ("tenant_id", "timestamp")}),
+]
+
+
+def configure_environment() -> None:
+    for name, (table, _, _, _) in SYNC_HUB_TABLES.items():
+        os.environ[name] = table
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+
+
+def seed(fake: FakeDynamoDB, size: int) -> None:
+    """Fresh tables holding one tenant with `size` items per collection"""
+    for table, hash_key, range_key, indexes in list(SYNC_HUB_TABLES.values()) + LAMBDA_TABLES:
+        fake.create_table(table, hash_key, range_key, indexes=indexes)
+    seed_sync_hub(fake, size, TENANT)
+    now = int(time.time())
+    fake.load("sync-hub-settings", ({
+        "id": f"s-{i:06d}", "tenant_id": TENANT, "user_id": USER_ID, "tags": ["alpha", "beta"],
+        "visibility": "public" if i % 10 == 0 else "private",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now - i * 60)),
+    } for i in range(size)))
+    fake.load("sync-hub-group-members", ({
+        "pk": f"TENANT#{TENANT}#GROUP#g-000000", "sk": f"USER#u-{i:06d}", "tenant_id": TENANT,
+        "group_id": "g-000000", "user_id": f"u-{i:06d}", "email": f"u{i}@example.com", "role": "member",
+        "status": "active" if i % 5 else "inactive", "gsi1_pk": f"u{i}@example.com", "gsi1_sk": f"TENANT#{TENANT}",
+        "gsi2_pk": f"TENANT#{TENANT}", "gsi2_sk": "GROUP#g-000000",
+    } for i in range(size)))
+
+
+def seed_sync_hub(fake: FakeDynamoDB, size: int, tenant: str) -> None:
+    """`size` settings, groups, members of g-000000 and bookmarks for one tenant in the sync-hub tables"""
+    now = int(time.time())
+    env = {name: spec[0] for name, spec in SYNC_HUB_TABLES.items()}
+    fake.load(env["SETTINGS_TABLE"], ({
+        "tenant_id": tenant, "setting_id": f"s-{i:06d}", "name": f"setting {i}", "value": f"value-{i}",
+        "is_public": i % 10 == 0, "version": 1, "created_at": now - i, "updated_at": now - i,
+    } for i in range(size)))
+    fake.load(env["GROUPS_TABLE"], ({
+        "tenant_id": tenant, "group_id": f"g-{i:06d}", "name": f"group {i}", "description": "",
+        "owner_id": tenant, "created_at": now - i, "updated_at": now - i,
+    } for i in range(size)))
+    fake.load(env["GROUP_MEMBERS_TABLE"], ({
+        "tenant_id": tenant, "group_id#user_id": f"g-000000#u-{i:06d}", "group_id": "g-000000",
+        "user_id": f"u-{i:06d}", "role": "member", "joined_at": now - i,
+    } for i in range(size)))
+    fake.load(env["BOOKMARKS_TABLE"], ({
+        "tenant_id": tenant, "bookmark_id": f"b-{i:06d}", "title": f"bookmark {i}",
+        "url": f"https://example.com/{i}", "tags": ["bench"], "created_at": now - i, "updated_at": now - i,
+    } for i in range(size)))
+
+
+def install_cognito_stub() -> None:
+    """ListUsers answers for the admin routes (one matching user)"""
+    from botocore.awsrequest import AWSResponse
+    from shared import aws
+
+    body = json.dumps({"Users": [{
+        "Username": "u-000001", "UserStatus": "CONFIRMED", "Enabled": True, "UserCreateDate": 1700000000,
+        "Attributes": [{"Name": "email", "Value": "u1@example.com"}, {"Name": "email_verified", "Value": "true"}],
+    }]}).encode()
+
+    class Raw:
+        def stream(self, **kwargs):
+            yield body
+
+    def send(request, **kwargs):
+        return AWSResponse(request.url, 200, {"Content-Type": "application/x-amz-json-1.1"}, Raw())
+
+    aws.client("cognito-idp").meta.events.register("before-send.cognito-identity-provider", send,
+                                                   unique_id="bench-cognito")
+
+
+# -- events ----------------------------------------------------------------
+
+def http_event(method: str, path: str, body: Optional[Dict[str, Any]] = None, admin: bool = False) -> Dict[str, Any]:
+    """API Gateway HTTP API (v2) event with JWT authorizer claims, as sync-hub receives it"""
+    event = {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "headers": {"accept-encoding": "gzip, deflate, br", "content-type": "application/json"},
+        "requestContext": {
+            "http": {"method": method, "path": path},
+            "authorizer": {"jwt": {"claims": {"tenant_id": TENANT, "sub": USER_ID, "email": "bench@example.com",
+                                              "is_admin": "true" if admin else "false"}}},
+        },
+    }
+    if body is not None:
+        event["body"] = json.dumps(body)
+    return event
+
+
+def rest_event(method: str, path: str, resource: str, token: str, path_parameters: Optional[Dict[str, str]] = None,
+               query: Optional[Dict[str, str]] = None, body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """API Gateway REST (v1 proxy) event with a bearer token, as the admin and tags Lambdas receive it"""
+    return {
+        "httpMethod": method,
+        "path": path,
+        "resource": resource,
+        "headers": {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip", "Content-Type": "application/json"},
+        "pathParameters": path_parameters,
+        "queryStringParameters": query,
+        "body": json.dumps(body) if body is not None else None,
+    }
+
+
+class Route:
+    def __init__(self, service: str, name: str, handler: Callable[[Dict[str, Any], Any], Dict[str, Any]],
+                 event: Callable[[int], Dict[str, Any]]):
+        self.service = service
+        self.name = name
+        self.handler = handler
+        self.event = event  # i -> event; may seed what the request needs (untimed)
+
+
+def routes(fake: FakeDynamoDB, size: int, admin_token: str, user_token: str) -> List[Route]:
+    import admin_handler
+    import main
+    import tags_handler
+
+    sync, admin, tags = main.handler, admin_handler.lambda_handler, tags_handler.lambda_handler
+    existing = max(size, 1)
+    settings_table = SYNC_HUB_TABLES["SETTINGS_TABLE"][0]
+
+    def pick(prefix: str, i: int) -> str:
+        return f"{prefix}-{i % existing:06d}"
+
+    def delete_setting(i: int) -> Dict[str, Any]:
+        fake.load(settings_table, [{"tenant_id": TENANT, "setting_id": f"del-{i}", "name": "doomed"}])
+        return http_event("DELETE", f"/settings/del-{i}")
+
+    def tags_event(method: str, i: int, body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        setting_id = pick("s", i)
+        return rest_event(method, f"/settings/{setting_id}/tags", "/settings/{id}/tags", user_token,
+                          {"id": setting_id}, body=body)
+
+    def admin_event(method: str, path: str, resource: str, params: Optional[Dict[str, str]] = None,
+                    query: Optional[Dict[str, str]] = None, body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return rest_event(method, path, resource, admin_token, params, query, body)
+
+    return [
+        Route("sync-hub", "GET /_health", sync, lambda i: http_event("GET", "/_health")),
+        Route("sync-hub", "GET /settings", sync, lambda i: http_event("GET", "/settings")),
+        Route("sync-hub", "GET /settings/public", sync, lambda i: http_event("GET", "/settings/public")),
+        Route("sync-hub", "GET /settings/{setting_id}", sync,
+              lambda i: http_event("GET", f"/settings/{pick('s', i)}")),
+        Route("sync-hub", "POST /settings", sync,
+              lambda i: http_event("POST", "/settings", {"name": f"new {i}", "value": "v", "is_public": False})),
+        Route("sync-hub", "PUT /settings/{setting_id}", sync,
+              lambda i: http_event("PUT", f"/settings/{pick('s', i)}", {"name": f"renamed {i}", "value": "v2"})),
+        Route("sync-hub", "PUT /settings/{setting_id}/visibility", sync,
+              lambda i: http_event("PUT", f"/settings/{pick('s', i)}/visibility", {"is_public": bool(i % 2)})),
+        Route("sync-hub", "DELETE /settings/{setting_id}", sync, delete_setting),
+        Route("sync-hub", "GET /groups", sync, lambda i: http_event("GET", "/groups")),
+        Route("sync-hub", "GET /groups/{group_id}", sync, lambda i: http_event("GET", f"/groups/{pick('g', i)}")),
+        Route("sync-hub", "PUT /groups/{group_id}", sync,
+              lambda i: http_event("PUT", f"/groups/{pick('g', i)}", {"name": f"group {i}", "description": "d"})),
+        Route("sync-hub", "GET /groups/{group_id}/members", sync,
+              lambda i: http_event("GET", "/groups/g-000000/members")),
+        Route("sync-hub", "GET /bookmarks", sync, lambda i: http_event("GET", "/bookmarks")),
+        Route("sync-hub", "GET /bookmarks/{bookmark_id}", sync,
+              lambda i: http_event("GET", f"/bookmarks/{pick('b', i)}")),
+        Route("sync-hub", "POST /bookmarks", sync,
+              lambda i: http_event("POST", "/bookmarks", {"title": f"b {i}", "url": "https://example.com",
+                                                          "tags": ["bench"]})),
+        Route("sync-hub", "PUT /bookmarks/{bookmark_id}", sync,
+              lambda i: http_event("PUT", f"/bookmarks/{pick('b', i)}", {"title": "t", "url": "https://example.org"})),
+        Route("sync-hub", "POST /sessions/{session_id}/emoji", sync,
+              lambda i: http_event("POST", f"/sessions/sess-{i % 100}/emoji", {"emoji": "👍"})),
+        Route("admin-api", "GET /admin/users", admin,
+              lambda i: admin_event("GET", "/admin/users", "/admin/users", query={"limit": "20"})),
+        Route("admin-api", "POST /admin/groups/{gid}/members", admin,
+              lambda i: admin_event("POST", "/admin/groups/g-000000/members", "/admin/groups/{gid}/members",
+                                    {"gid": "g-000000"}, body={"email": "u1@example.com", "role": "member"})),
+        Route("admin-api", "PATCH /admin/groups/{gid}/members/{uid}", admin,
+              lambda i: admin_event("PATCH", f"/admin/groups/g-000000/members/{pick('u', i)}",
+                                    "/admin/groups/{gid}/members/{uid}", {"gid": "g-000000", "uid": pick("u", i)},
+                                    body={"role": "admin", "status": "active"})),
+        Route("admin-api", "GET /admin/analytics", admin,
+              lambda i: admin_event("GET", "/admin/analytics", "/admin/analytics", query={"range": "30d"})),
+        Route("admin-api", "GET /admin/analytics/timeseries", admin,
+              lambda i: admin_event("GET", "/admin/analytics/timeseries", "/admin/analytics/timeseries",
+                                    query={"range": "30d"})),
+        Route("tags-api", "GET /settings/{id}/tags", tags, lambda i: tags_event("GET", i)),
+        Route("tags-api", "POST /settings/{id}/tags", tags, lambda i: tags_event("POST", i, {"items": ["gamma"]})),
+        Route("tags-api", "DELETE /settings/{id}/tags", tags, lambda i: tags_event("DELETE", i, {"items": ["gamma"]})),
+    ]
+
+
+# -- measurement -------------------------------------------------------------
+
+def percentile(ordered: List[float], p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def measure_route(route: Route, fake: FakeDynamoDB, number: int, alloc_samples: int,
+                  budget_seconds: float, sink: str) -> Dict[str, Any]:
+    from shared import metrics
+
+    context = types.SimpleNamespace(aws_request_id="bench", function_name=route.service)
+    route.handler(route.event(-1), context)  # warm up lazy handlers, clients and caches
+    open(sink, "w").close()
+
+    latencies: List[float] = []
+    errors = 0
+    fake.reset_counters()
+    spent = 0.0
+    for i in range(number):
+        if spent > budget_seconds and len(latencies) >= MIN_REQUESTS:
+            break  # 1 MB list pages at 100k items take long enough; keep the whole run bounded
+        event = route.event(i)  # seeding goes through fake.load, which the counters do not see
+        started = time.perf_counter()
+        response = route.handler(event, context)
+        elapsed = time.perf_counter() - started
+        latencies.append(elapsed * 1000)
+        spent += elapsed
+        if response.get("statusCode", 500) >= 400:
+            errors += 1
+    count = len(latencies)
+    ddb_calls = sum(fake.calls.values()) / count
+    # Request records only; capacity and hot-key records share the sink
+    records = [record for record in metrics.read_records(sink) if "Route" in record]
+    assert len(records) == count, f"{route.name}: {len(records)} EMF records for {count} requests"
+    assert {record["Route"] for record in records} == {route.name}, f"{route.name}: EMF routes {records[0]['Route']}"
+    response_bytes = sorted(record["ResponseBytes"] for record in records)
+    rcu, wcu = fake.consumed["read"] / count, fake.consumed["write"] / count
+
+    peaks: List[int] = []
+    retained: List[int] = []
+    tracemalloc.start()
+    try:
+        for i in range(number, number + alloc_samples):
+            event = route.event(i)
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            route.handler(event, context)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    peaks.sort()
+    retained.sort()
+    return {
+        "service": route.service,
+        "route": route.name,
+        "requests": count,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "ddb_calls": ddb_calls,
+        "rcu": rcu,
+        "wcu": wcu,
+        "resp_b": percentile(response_bytes, 50),
+        "peak_kb": percentile(peaks, 50) / 1024 if peaks else None,
+        "retained_b": percentile(retained, 50) if retained else None,
+    }
+
+
+def run(sizes: List[int], number: int, alloc_samples: int, budget_seconds: float,
+        route_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+    configure_environment()
+    os.environ["RATE_LIMIT_ENABLED"] = "false"  # a benchmark loop is exactly what the limiter is for
+    from shared import aws, metrics, tokens
+    from tools.local_jwks import LocalIssuer
+
+    issuer = LocalIssuer()
+    os.environ["JWKS_URL"] = issuer.write_jwks(tempfile.mkdtemp(prefix="bench-jwks-"))
+    os.environ["JWT_ISSUER"] = issuer.issuer
+    os.environ["COGNITO_CLIENT_IDS"] = issuer.client_id
+    tokens.reset()
+    admin_token = issuer.token(TENANT, ttl=24 * 3600, groups=["admin"], sub=USER_ID)
+    user_token = issuer.token(TENANT, ttl=24 * 3600, sub=USER_ID)
+
+    aws.reset()
+    fake = install_shared(FakeDynamoDB())
+    install_cognito_stub()
+    sink = os.path.join(tempfile.mkdtemp(prefix="bench-metrics-"), "emf.ndjson")
+    metrics.configure(enabled=True, sink_path=sink, stdout=False)
+
+    rows = []
+    with open(os.devnull, "w") as devnull:
+        for size in sizes:
+            started = time.perf_counter()
+            seed(fake, size)
+            print(f"🌱 Seeded {size:,} items per collection in {time.perf_counter() - started:.1f}s", flush=True)
+            for route in routes(fake, size, admin_token, user_token):
+                if route_filter and route_filter not in route.name:
+                    continue
+                with contextlib.redirect_stdout(devnull):
+                    result = measure_route(route, fake, number, alloc_samples, budget_seconds, sink)
+                rows.append({"size": size, **result})
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline per-route benchmark of the API handlers")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Items per tenant collection")
+    parser.add_argument("--number", type=int, default=200, help="Timed requests per route and size")
+    parser.add_argument("--alloc-samples", type=int, default=20, help="Requests traced for allocations")
+    parser.add_argument("--budget", type=float, default=10.0,
+                        help="Stop timing a route after this many seconds (at least %d requests)" % MIN_REQUESTS)
+    parser.add_argument("--route", help="Only routes whose name contains this text")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.number, args.alloc_samples, args.budget, args.route)
+    for size in args.sizes:
+        print(f"\n📊 Tenant size {size:,}")
+        print_table([row for row in rows if row["size"] == size],
+                    ["route", "requests", "errors", "p50_ms", "p95_ms", "p99_ms", "ddb_calls", "rcu", "wcu",
+                     "resp_b", "peak_kb", "retained_b"])
+    write_json(args.json, "handlers", rows, sizes=args.sizes, number=args.number, alloc_samples=args.alloc_samples,
+               budget_seconds=args.budget)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
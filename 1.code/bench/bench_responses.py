@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Encode-time benchmark for the shared response layer on large settings listings
+
+Compares the legacy per-handler `json.dumps(..., cls=DecimalEncoder)` path with
+shared.responses (stdlib fallback and orjson fast path) and gzip compression.
+
+Usage:
+    python -m bench.bench_responses [--sizes 100,1000,10000] [--json results.json]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+from decimal import Decimal
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.harness import measure, print_table, write_json
+from shared import responses
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class LegacyDecimalEncoder(json.JSONEncoder):
+    """The encoder every handler used to carry its own copy of"""
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super().default(obj)
+
+
+def make_listing(size: int, seed: int = 7) -> Dict[str, Any]:
+    """A `GET /settings` payload as boto3 returns it (numbers are Decimal)"""
+    rng = random.Random(seed)
+    settings = []
+    for i in range(size):
+        settings.append({
+            "tenant_id": "tenant-bench",
+            "setting_id": f"setting-{i:06d}",
+            "name": f"workspace-{i % 37}",
+            "value": {
+                "editor.fontSize": Decimal(rng.randint(10, 20)),
+                "editor.tabSize": Decimal(rng.choice([2, 4])),
+                "workbench.colorTheme": rng.choice(["Default Dark+", "Solarized Light", "Monokai"]),
+                "files.exclude": {f"**/{name}": True for name in ("node_modules", ".git", "__pycache__")},
+                "mcp.servers": [{"name": f"server-{j}", "port": Decimal(3000 + j)} for j in range(rng.randint(0, 4))],
+            },
+            "is_public": rng.random() < 0.2,
+            "version": Decimal(rng.randint(1, 40)),
+            "created_at": Decimal(1757000000 + i),
+            "updated_at": Decimal(1757100000 + i),
+        })
+    return {"settings": settings}
+
+
+def run(sizes: List[int]) -> List[Dict[str, Any]]:
+    stdlib_encoder = json.JSONEncoder(default=responses._default, separators=(",", ":"), ensure_ascii=False)
+    event = {"headers": {"accept-encoding": "gzip, deflate, br"}}
+    rows = []
+    for size in sizes:
+        payload = make_listing(size)
+        number = max(1, 20000 // size)
+        cases = {
+            "legacy json.dumps(DecimalEncoder)": lambda: json.dumps(payload, cls=LegacyDecimalEncoder),
+            "shared stdlib encoder": lambda: stdlib_encoder.encode(payload),
+        }
+        if orjson is not None:
+            cases["shared orjson encoder"] = lambda: orjson.dumps(payload, default=responses._default).decode("utf-8")
+        cases["json_response + gzip"] = lambda: responses.compress(event, responses.json_response(200, payload))
+
+        body = responses.encode(payload)
+        for case, fn in cases.items():
+            stats = measure(fn, number=number)
+            rows.append({
+                "items": size,
+                "case": case,
+                "median_us": stats["median_us"],
+                "best_us": stats["best_us"],
+                "body_bytes": len(body.encode("utf-8")),
+                "gzip_bytes": len(gzip.compress(body.encode("utf-8"), responses.GZIP_LEVEL)),
+            })
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark response encoding on large listings")
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated listing sizes")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(f"⏱️  Response encoding benchmark (orjson {'available' if orjson else 'not installed'})\n")
+    rows = run(sizes)
+    print_table(rows, ["items", "case", "median_us", "best_us", "body_bytes", "gzip_bytes"])
+    write_json(args.json, "responses", rows, orjson=orjson is not None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Dispatch-time benchmark: legacy startswith/split chains vs shared.routing.Router
+
+The legacy chain is a faithful copy of the pre-router dispatch in
+sync-hub/services/api (main.py -> handler.handle()), resolving to a route name
+instead of calling the handler so only routing cost is measured.
+
+The chains return a bare name, while Router.match also builds the params dict
+and a RouteMatch. Static routes (including the deep /admin/analytics ones)
+come out ahead. Parameterised routes cost roughly twice as much, about 1us
+more per request, and the 11-request mix is about 0.7x. The router's gain is
+in correctness (ids taken from the right segment, 405 vs 404) and route
+metadata, not in raw dispatch speed.
+
+Usage:
+    python -m bench.bench_router [--number 20000] [--json results.json]
+"""
+import argparse
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.harness import measure, print_table, write_json
+from shared.routing import Router
+
+# (method, path) pairs in rough production proportion, plus the misses
+REQUESTS: List[Tuple[str, str]] = [
+    ("GET", "/_health"),
+    ("GET", "/settings"),
+    ("GET", "/settings/public"),
+    ("GET", "/settings/7c1e6a52-1f0e-4c47-9a0e-3f1d2b9a0c11"),
+    ("PUT", "/settings/7c1e6a52-1f0e-4c47-9a0e-3f1d2b9a0c11/visibility"),
+    ("DELETE", "/settings/7c1e6a52-1f0e-4c47-9a0e-3f1d2b9a0c11"),
+    ("GET", "/groups/g-42/members"),
+    ("PUT", "/groups/g-42"),
+    ("GET", "/admin/analytics/timeseries"),
+    ("PATCH", "/admin/groups/g-42/members/u-7"),
+    ("GET", "/nope"),
+]
+
+
+def legacy_dispatch(method: str, path: str) -> Optional[str]:
+    if path == "/_health":
+        return "health"
+    if path.startswith("/settings"):
+        if path == "/settings" and method == "GET":
+            return "list_settings"
+        elif path == "/settings" and method == "POST":
+            return "create_setting"
+        elif path == "/settings/public" and method == "GET":
+            return "list_public_settings"
+        elif path.startswith("/settings/") and method == "GET":
+            path.split("/")[-1]
+            return "get_setting"
+        elif path.startswith("/settings/") and method == "PUT":
+            path.split("/")[-1]
+            if path.endswith("/visibility"):
+                return "update_visibility"
+            return "update_setting"
+        elif path.startswith("/settings/") and method == "DELETE":
+            path.split("/")[-1]
+            return "delete_setting"
+        return None
+    elif path.startswith("/groups"):
+        if path == "/groups" and method == "GET":
+            return "list_groups"
+        elif path == "/groups" and method == "POST":
+            return "create_group"
+        elif path.startswith("/groups/") and method == "GET":
+            path.split("/")[-1]
+            if path.endswith("/members"):
+                return "list_group_members"
+            return "get_group"
+        elif path.startswith("/groups/") and method == "PUT":
+            path.split("/")[-1]
+            return "update_group"
+        elif path.startswith("/groups/") and method == "DELETE":
+            path.split("/")[-1]
+            return "delete_group"
+        return None
+    elif path.startswith("/admin/"):
+        if path == "/admin/users" and method == "GET":
+            return "admin_users"
+        elif path == "/admin/users/lookup" and method == "POST":
+            return "admin_lookup"
+        elif path.startswith("/admin/groups/") and path.endswith("/members") and method == "POST":
+            return "admin_add_member"
+        elif path.startswith("/admin/groups/") and "/members/" in path and method in ("PATCH", "DELETE"):
+            path.split("/")
+            return "admin_member"
+        elif path == "/admin/analytics" and method == "GET":
+            return "admin_analytics"
+        elif path == "/admin/analytics/timeseries" and method == "GET":
+            return "admin_timeseries"
+        return None
+    return None
+
+
+def build_router() -> Router:
+    """Same table as sync-hub/services/api/main.py, with names as targets"""
+    router = Router()
+    for method, pattern, name in [
+        ("GET", "/_health", "health"),
+        ("GET", "/settings", "list_settings"),
+        ("POST", "/settings", "create_setting"),
+        ("GET", "/settings/public", "list_public_settings"),
+        ("GET", "/settings/{setting_id}", "get_setting"),
+        ("PUT", "/settings/{setting_id}", "update_setting"),
+        ("DELETE", "/settings/{setting_id}", "delete_setting"),
+        ("PUT", "/settings/{setting_id}/visibility", "update_visibility"),
+        ("GET", "/groups", "list_groups"),
+        ("POST", "/groups", "create_group"),
+        ("GET", "/groups/{group_id}", "get_group"),
+        ("PUT", "/groups/{group_id}", "update_group"),
+        ("DELETE", "/groups/{group_id}", "delete_group"),
+        ("GET", "/groups/{group_id}/members", "list_group_members"),
+        ("GET", "/admin/users", "admin_users"),
+        ("POST", "/admin/users/lookup", "admin_lookup"),
+        ("POST", "/admin/groups/{group_id}/members", "admin_add_member"),
+        ("PATCH", "/admin/groups/{group_id}/members/{user_id}", "admin_member"),
+        ("DELETE", "/admin/groups/{group_id}/members/{user_id}", "admin_member"),
+        ("GET", "/admin/analytics", "admin_analytics"),
+        ("GET", "/admin/analytics/timeseries", "admin_timeseries"),
+    ]:
+        router.add(method, pattern, name)
+    return router
+
+
+def run(number: int) -> List[Dict[str, Any]]:
+    router = build_router()
+    rows = []
+    for method, path in REQUESTS:
+        legacy = measure(lambda: legacy_dispatch(method, path), number=number)
+        compiled = measure(lambda: router.match(method, path), number=number)
+        rows.append({
+            "request": f"{method} {path[:40]}",
+            "legacy_us": legacy["median_us"],
+            "router_us": compiled["median_us"],
+            "speedup": legacy["median_us"] / compiled["median_us"] if compiled["median_us"] else None,
+        })
+
+    def legacy_mix():
+        for method, path in REQUESTS:
+            legacy_dispatch(method, path)
+
+    def router_mix():
+        for method, path in REQUESTS:
+            router.match(method, path)
+
+    legacy = measure(legacy_mix, number=max(1, number // len(REQUESTS)))
+    compiled = measure(router_mix, number=max(1, number // len(REQUESTS)))
+    rows.append({
+        "request": f"mix of {len(REQUESTS)}",
+        "legacy_us": legacy["median_us"],
+        "router_us": compiled["median_us"],
+        "speedup": legacy["median_us"] / compiled["median_us"] if compiled["median_us"] else None,
+    })
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark request dispatch")
+    parser.add_argument("--number", type=int, default=20000, help="Calls per timing round")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    print("⏱️  Router dispatch benchmark\n")
+    rows = run(args.number)
+    print_table(rows, ["request", "legacy_us", "router_us", "speedup"])
+    write_json(args.json, "router", rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
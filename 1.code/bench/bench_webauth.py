@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Load test for services/webauth against stub upstreams: per-request httpx clients vs lifespan pools
+
+A stub Cognito/API Gateway (uvicorn on a loopback port) answers /oauth2/userInfo
+and /settings/public after UPSTREAM_DELAY_MS. The webauth app is driven
+in-process over ASGI by concurrent workers hitting /me and /settings/public:
+
+- per-request: the old behaviour, a new httpx.AsyncClient (SSL context, connection
+  setup, teardown) for every upstream call, injected through dependency_overrides
+- pooled: the app's lifespan-scoped keep-alive clients
+- pooled, cached /me: every worker presents the same access token, so /me is
+  served from the userInfo cache (the other rows use a fresh token per request)
+
+Loopback has no TLS handshake or WAN round trip, so real upstreams widen the gap.
+
+Usage:
+    python -m bench.bench_webauth [--duration 5] [--concurrency 20] [--json results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.harness import print_table, write_json
+
+UPSTREAM_DELAY_MS = float(os.getenv("UPSTREAM_DELAY_MS", "2"))
+
+
+async def stub_upstream(scope, receive, send):
+    """Minimal Cognito userInfo + API Gateway stand-in"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    await asyncio.sleep(UPSTREAM_DELAY_MS / 1000)
+    if scope["path"] == "/oauth2/userInfo":
+        body = {"sub": "u-1", "email": "user@example.com", "email_verified": "true"}
+    else:
+        body = {"settings": [{"setting_id": f"s-{i}", "name": f"public {i}"} for i in range(10)]}
+    payload = json.dumps(body).encode()
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]})
+    await send({"type": "http.response.body", "body": payload})
+
+
+def start_upstream():
+    import uvicorn
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(stub_upstream, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+async def drive(app, duration: float, concurrency: int, shared_token: bool) -> Dict[str, Any]:
+    import httpx
+    latencies: List[float] = []
+    errors = 0
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+            transport=transport, base_url="http://webauth") as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker(n: int) -> None:
+            nonlocal errors
+            paths = ("/me", "/settings/public")
+            i = n
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                token = "bench-token" if shared_token else f"bench-token-{n}-{i}"
+                response = await client.get(paths[i % 2], headers={"Cookie": f"access_token={token}"})
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+                i += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def run(duration: float, concurrency: int) -> List[Dict[str, Any]]:
+    server, upstream = start_upstream()
+    os.environ["COGNITO_DOMAIN"] = upstream
+    os.environ["API_BASE"] = upstream
+    import httpx
+    from services.webauth import main as webauth
+
+    async def per_request_client():
+        async with httpx.AsyncClient(base_url=upstream) as client:
+            yield client
+
+    rows = []
+    try:
+        per_request = {webauth.cognito_client: per_request_client, webauth.api_client: per_request_client}
+        for name, overrides, shared_token in (("per-request", per_request, False),
+                                              ("pooled", {}, False),
+                                              ("pooled, cached /me", {}, True)):
+            webauth.app.dependency_overrides = overrides
+            result = asyncio.run(drive(webauth.app, duration, concurrency, shared_token))
+            rows.append({"clients": name, **result})
+    finally:
+        webauth.app.dependency_overrides = {}
+        server.should_exit = True
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="webauth upstream client load test")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per variant")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    rows = run(args.duration, args.concurrency)
+    print_table(rows, ["clients", "requests", "errors", "rps", "p50_ms", "p99_ms"])
+    if rows[0]["rps"]:
+        print(f"\n🚀 pooled: {rows[1]['rps'] / rows[0]['rps']:.1f}x req/s, "
+              f"p99 {rows[0]['p99_ms']:.1f} -> {rows[1]['p99_ms']:.1f} ms")
+    write_json(args.json, "webauth", rows, duration=args.duration, concurrency=args.concurrency,
+               upstream_delay_ms=UPSTREAM_DELAY_MS)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1024 @@
+"""
+In-process DynamoDB stand-in for offline benchmarks and local runs
+
+    fake = FakeDynamoDB()
+    fake.create_table("settings", "tenant_id", "setting_id")
+    fake.create_table("members", "pk", "sk", indexes={"GSI2": ("gsi2_pk", "gsi2_sk")})
+    fake.load("settings", [{"tenant_id": "t-1", "setting_id": "s-1", "name": "theme"}])
+    fake.install(aws.client("dynamodb"))    # or install_shared(fake) for every shared.aws client
+
+Requests still go through botocore (parameter validation, serialization, event
+hooks, response parsing); only the HTTP send is answered from memory through the
+client's before-send event, so shared.metrics / shared.capacity / shared.hotkeys
+instrumentation runs as it does against AWS. Moto does the same job but is far
+too slow to seed and query 100k-item tenants in a benchmark loop.
+
+Supported: GetItem, PutItem, UpdateItem, DeleteItem, Query (table and GSI,
+sort-key ranges served by bisect), Scan (segments), BatchGetItem,
+BatchWriteItem, TransactWriteItems, CreateTable, DeleteTable, DescribeTable,
+ListTables. Condition, filter, key-condition, update and projection expressions
+are evaluated with DynamoDB semantics for the common cases; Query and Scan pages
+stop at Limit or 1 MB, and ConsumedCapacity is returned when asked for (RCU per
+4 KB read, WCU per 1 KB written). `calls` and `consumed` count every request.
+"""
+import base64
+import bisect
+import copy
+import json
+import math
+import re
+import zlib
+from collections import Counter
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+PAGE_BYTES = 1024 * 1024
+ERROR_PREFIX = "com.amazonaws.dynamodb.v20120810#"
+
+_TOKEN = re.compile(r"\s*(?:(<>|<=|>=|=|<|>|\(|\)|,|\.|\[|\]|\+|-)|([#:]?[A-Za-z0-9_]+))")
+_COMPARATORS = {"=", "<>", "<", "<=", ">", ">="}
+_FUNCTIONS = {"attribute_exists", "attribute_not_exists", "attribute_type", "begins_with", "contains"}
+
+Item = Dict[str, Dict[str, Any]]
+
+
+class DynamoError(Exception):
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def _validation(message: str) -> DynamoError:
+    return DynamoError("ValidationException", message)
+
+
+# -- attribute values ------------------------------------------------------
+
+def _scalar(value: Optional[Dict[str, Any]]) -> Any:
+    """Python value that sorts like DynamoDB sorts a key attribute"""
+    if value is None:
+        return None
+    (kind, raw), = value.items()
+    if kind == "N":
+        return Decimal(raw)
+    if kind == "B":
+        return base64.b64decode(raw)
+    return raw
+
+
+def _equal(a: Optional[Dict[str, Any]], b: Optional[Dict[str, Any]]) -> bool:
+    if a is None or b is None:
+        return False
+    (ta, xa), = a.items()
+    (tb, xb), = b.items()
+    if ta != tb:
+        return False
+    if ta == "N":
+        return Decimal(xa) == Decimal(xb)
+    if ta in ("SS", "BS"):
+        return set(xa) == set(xb)
+    if ta == "NS":
+        return {Decimal(x) for x in xa} == {Decimal(x) for x in xb}
+    return xa == xb
+
+
+def _ordered(a: Optional[Dict[str, Any]], b: Optional[Dict[str, Any]]) -> Optional[Tuple[Any, Any]]:
+    if a is None or b is None:
+        return None
+    (ta, _), = a.items()
+    (tb, _), = b.items()
+    if ta != tb or ta not in ("S", "N", "B"):
+        return None
+    return _scalar(a), _scalar(b)
+
+
+def _size(value: Optional[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+    if value is None:
+        return None
+    (kind, raw), = value.items()
+    if kind == "S":
+        return {"N": str(len(raw.encode()))}
+    if kind == "B":
+        return {"N": str(len(base64.b64decode(raw)))}
+    if kind in ("SS", "NS", "BS", "L", "M"):
+        return {"N": str(len(raw))}
+    return None
+
+
+def wire(value: Any) -> Dict[str, Any]:
+    """AttributeValue for a plain Python value (what boto3's TypeSerializer produces, minus its checks)"""
+    if isinstance(value, str):
+        return {"S": value}
+    if isinstance(value, bool):
+        return {"BOOL": value}
+    if isinstance(value, (int, float, Decimal)):
+        return {"N": str(value)}
+    if value is None:
+        return {"NULL": True}
+    if isinstance(value, dict):
+        return {"M": {k: wire(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {"L": [wire(v) for v in value]}
+    if isinstance(value, (bytes, bytearray)):
+        return {"B": base64.b64encode(value).decode()}
+    if isinstance(value, (set, frozenset)) and value:
+        sample = next(iter(value))
+        if isinstance(sample, str):
+            return {"SS": sorted(value)}
+        if isinstance(sample, (bytes, bytearray)):
+            return {"BS": [base64.b64encode(v).decode() for v in value]}
+        return {"NS": [str(v) for v in value]}
+    raise TypeError(f"Unsupported type for DynamoDB: {type(value).__name__}")
+
+
+def item_size(item: Item) -> int:
+    """Close enough to DynamoDB's item size for capacity and page accounting"""
+    return len(json.dumps(item, separators=(",", ":")))
+
+
+def _get_path(item: Item, path: List[Any]) -> Optional[Dict[str, Any]]:
+    value: Any = item.get(path[0])
+    for step in path[1:]:
+        if value is None:
+            return None
+        if isinstance(step, int):
+            items = value.get("L")
+            value = items[step] if items is not None and step < len(items) else None
+        else:
+            value = (value.get("M") or {}).get(step) if "M" in value else None
+    return value
+
+
+def _parent(item: Item, path: List[Any]) -> Any:
+    container: Any = item
+    for step in path[:-1]:
+        if isinstance(container, list):
+            child = container[step] if isinstance(step, int) and step < len(container) else None
+        else:
+            child = container.get(step) if isinstance(step, str) else None
+        if child is None or ("M" not in child and "L" not in child):
+            raise _validation("The document path provided in the update expression is invalid for update")
+        container = child["M"] if "M" in child else child["L"]
+    return container
+
+
+def _set_path(item: Item, path: List[Any], value: Dict[str, Any]) -> None:
+    container = _parent(item, path)
+    last = path[-1]
+    if isinstance(container, list):
+        if last < len(container):
+            container[last] = value
+        else:
+            container.append(value)
+    else:
+        container[last] = value
+
+
+def _remove_path(item: Item, path: List[Any]) -> None:
+    try:
+        container = _parent(item, path)
+    except DynamoError:
+        return
+    last = path[-1]
+    if isinstance(container, list):
+        if last < len(container):
+            del container[last]
+    else:
+        container.pop(last, None)
+
+
+def _add_numbers(a: str, b: str, sign: int = 1) -> str:
+    result = Decimal(a) + sign * Decimal(b)
+    return str(int(result)) if result == result.to_integral_value() else str(result.normalize())
+
+
+# -- expressions -----------------------------------------------------------
+
+class _Parser:
+    """Recursive-descent parser compiling an expression into closures over an item"""
+
+    def __init__(self, text: str, names: Optional[Dict[str, str]], values: Optional[Dict[str, Any]]):
+        self.tokens = self._tokenize(text)
+        self.pos = 0
+        self.names = names or {}
+        self.values = values or {}
+        self.key_terms: List[Tuple[str, str, Any]] = []  # (attribute, op, value) seen by Query
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        tokens, pos, text = [], 0, text.strip()
+        while pos < len(text):
+            match = _TOKEN.match(text, pos)
+            if not match or match.end() == pos:
+                raise _validation(f"Invalid expression: unexpected character at {pos} in {text!r}")
+            tokens.append(match.group(1) or match.group(2))
+            pos = match.end()
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+        return tokens
+
+    def peek(self, offset: int = 0) -> Optional[str]:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def take(self, expected: Optional[str] = None) -> str:
+        token = self.peek()
+        if token is None or (expected is not None and token.upper() != expected):
+            raise _validation(f"Invalid expression: expected {expected or 'a token'}, got {token!r}")
+        self.pos += 1
+        return token
+
+    def keyword(self, word: str) -> bool:
+        token = self.peek()
+        if token is not None and token.upper() == word:
+            self.pos += 1
+            return True
+        return False
+
+    def done(self) -> None:
+        if self.peek() is not None:
+            raise _validation(f"Invalid expression: unexpected token {self.peek()!r}")
+
+    def name(self) -> str:
+        token = self.take()
+        if token.startswith("#"):
+            if token not in self.names:
+                raise _validation(f"An expression attribute name used in the document path is not defined: {token}")
+            return self.names[token]
+        if token.startswith(":"):
+            raise _validation(f"Invalid expression: expected an attribute name, got {token}")
+        return token
+
+    def path(self) -> List[Any]:
+        path: List[Any] = [self.name()]
+        while self.peek() in (".", "["):
+            if self.take() == ".":
+                path.append(self.name())
+            else:
+                path.append(int(self.take()))
+                self.take("]")
+        return path
+
+    def value(self) -> Dict[str, Any]:
+        token = self.take()
+        if token not in self.values:
+            raise _validation(f"An expression attribute value used in expression is not defined: {token}")
+        return self.values[token]
+
+    def operand(self) -> Tuple[Callable[[Item], Any], Any]:
+        """(evaluate, source) where source is a path list, a value dict or None"""
+        token = self.peek() or ""
+        function = token.lower() if self.peek(1) == "(" else None
+        if token.startswith(":"):
+            value = self.value()
+            return (lambda item: value), value
+        if function == "size":
+            self.take()
+            self.take("(")
+            path = self.path()
+            self.take(")")
+            return (lambda item: _size(_get_path(item, path))), None
+        if function == "if_not_exists":
+            self.take()
+            self.take("(")
+            path = self.path()
+            self.take(",")
+            fallback, _ = self.operand()
+            self.take(")")
+            return (lambda item: _get_path(item, path) or fallback(item)), None
+        if function == "list_append":
+            self.take()
+            self.take("(")
+            first, _ = self.operand()
+            self.take(",")
+            second, _ = self.operand()
+            self.take(")")
+
+            def append(item: Item) -> Dict[str, Any]:
+                a, b = first(item), second(item)
+                if not a or not b or "L" not in a or "L" not in b:
+                    raise _validation("Incorrect operand type for operator or function; operator or function: list_append")
+                return {"L": a["L"] + b["L"]}
+            return append, None
+        path = self.path()
+        return (lambda item: _get_path(item, path)), path
+
+    # condition := conjunction (OR conjunction)*
+    def condition(self) -> Callable[[Item], bool]:
+        left = self.conjunction()
+        while self.keyword("OR"):
+            right = self.conjunction()
+            left = (lambda a, b: lambda item: a(item) or b(item))(left, right)
+        return left
+
+    def conjunction(self) -> Callable[[Item], bool]:
+        left = self.negation()
+        while self.keyword("AND"):
+            right = self.negation()
+            left = (lambda a, b: lambda item: a(item) and b(item))(left, right)
+        return left
+
+    def negation(self) -> Callable[[Item], bool]:
+        if self.keyword("NOT"):
+            inner = self.negation()
+            return lambda item: not inner(item)
+        return self.comparison()
+
+    def comparison(self) -> Callable[[Item], bool]:
+        if self.peek() == "(":
+            self.take()
+            inner = self.condition()
+            self.take(")")
+            return inner
+        token = (self.peek() or "").lower()
+        if token in _FUNCTIONS and self.peek(1) == "(":
+            return self.function(token)
+        left, left_source = self.operand()
+        if self.keyword("BETWEEN"):
+            low, low_source = self.operand()
+            self.take("AND")
+            high, high_source = self.operand()
+            self._key_term(left_source, "between", (low_source, high_source))
+
+            def between(item: Item) -> bool:
+                value = left(item)
+                lo, hi = _ordered(value, low(item)), _ordered(value, high(item))
+                return lo is not None and hi is not None and lo[1] <= lo[0] <= hi[1]
+            return between
+        if self.keyword("IN"):
+            self.take("(")
+            options = [self.operand()[0]]
+            while self.peek() == ",":
+                self.take()
+                options.append(self.operand()[0])
+            self.take(")")
+            return lambda item: any(_equal(left(item), option(item)) for option in options)
+        op = self.take()
+        if op not in _COMPARATORS:
+            raise _validation(f"Invalid expression: unexpected token {op!r}")
+        right, right_source = self.operand()
+        self._key_term(left_source, op, right_source)
+        if op == "=":
+            return lambda item: _equal(left(item), right(item))
+        if op == "<>":
+            return lambda item: not _equal(left(item), right(item))
+        check = {"<": lambda a, b: a < b, "<=": lambda a, b: a <= b,
+                 ">": lambda a, b: a > b, ">=": lambda a, b: a >= b}[op]
+
+        def compare(item: Item) -> bool:
+            pair = _ordered(left(item), right(item))
+            return pair is not None and check(*pair)
+        return compare
+
+    def function(self, name: str) -> Callable[[Item], bool]:
+        self.take()
+        self.take("(")
+        if name in ("attribute_exists", "attribute_not_exists"):
+            path = self.path()
+            self.take(")")
+            exists = name == "attribute_exists"
+            return lambda item: (_get_path(item, path) is not None) == exists
+        if name == "attribute_type":
+            path = self.path()
+            self.take(",")
+            kind = self.value().get("S")
+            self.take(")")
+            return lambda item: kind in (_get_path(item, path) or {})
+        subject, subject_source = self.operand()
+        self.take(",")
+        operand, operand_source = self.operand()
+        self.take(")")
+        if name == "begins_with":
+            self._key_term(subject_source, "begins_with", operand_source)
+
+            def begins_with(item: Item) -> bool:
+                value, prefix = subject(item), operand(item)
+                if not value or not prefix:
+                    return False
+                for kind in ("S", "B"):
+                    if kind in value and kind in prefix:
+                        return value[kind].startswith(prefix[kind]) if kind == "S" else \
+                            base64.b64decode(value[kind]).startswith(base64.b64decode(prefix[kind]))
+                return False
+            return begins_with
+
+        def contains(item: Item) -> bool:
+            value, needle = subject(item), operand(item)
+            if not value or not needle:
+                return False
+            if "S" in value and "S" in needle:
+                return needle["S"] in value["S"]
+            if "L" in value:
+                return any(_equal(element, needle) for element in value["L"])
+            for kind in ("SS", "NS", "BS"):
+                if kind in value and kind[0] in needle:
+                    return any(_equal({kind[0]: member}, needle) for member in value[kind])
+            return False
+        return contains
+
+    def _key_term(self, left: Any, op: str, right: Any) -> None:
+        if isinstance(left, list) and len(left) == 1 and right is not None and not isinstance(right, list):
+            self.key_terms.append((left[0], op, right))
+
+    # update := (SET action, ... | REMOVE path, ... | ADD path value, ... | DELETE path value, ...)+
+    def update(self) -> List[Tuple[str, List[Any], Optional[Callable[[Item], Any]]]]:
+        actions = []
+        while self.peek() is not None:
+            clause = self.take().upper()
+            if clause not in ("SET", "REMOVE", "ADD", "DELETE"):
+                raise _validation(f"Invalid UpdateExpression: unexpected token {clause!r}")
+            while True:
+                path = self.path()
+                if clause == "SET":
+                    self.take("=")
+                    actions.append((clause, path, self.set_value()))
+                elif clause == "REMOVE":
+                    actions.append((clause, path, None))
+                else:
+                    actions.append((clause, path, self.operand()[0]))
+                if self.peek() != ",":
+                    break
+                self.take()
+        if not actions:
+            raise _validation("Invalid UpdateExpression: the expression is empty")
+        return actions
+
+    def set_value(self) -> Callable[[Item], Any]:
+        left, _ = self.operand()
+        if self.peek() not in ("+", "-"):
+            return left
+        sign = 1 if self.take() == "+" else -1
+        right, _ = self.operand()
+
+        def arithmetic(item: Item) -> Dict[str, str]:
+            a, b = left(item), right(item)
+            if not a or not b or "N" not in a or "N" not in b:
+                raise _validation("An operand in the update expression has an incorrect data type")
+            return {"N": _add_numbers(a["N"], b["N"], sign)}
+        return arithmetic
+
+
+def compile_condition(text: Optional[str], names: Optional[Dict[str, str]],
+                      values: Optional[Dict[str, Any]]) -> Optional[Callable[[Item], bool]]:
+    if not text:
+        return None
+    parser = _Parser(text, names, values)
+    condition = parser.condition()
+    parser.done()
+    return condition
+
+
+# -- storage ---------------------------------------------------------------
+
+class _Partition:
+    """Items under one partition key, with their sort keys kept in order"""
+    __slots__ = ("keys", "entries")
+
+    def __init__(self):
+        self.keys: List[Any] = []
+        self.entries: Dict[Any, Tuple[Item, int]] = {}
+
+    def put(self, key: Any, entry: Tuple[Item, int]) -> None:
+        if key not in self.entries:
+            if not self.keys or key > self.keys[-1]:
+                self.keys.append(key)  # seeding in key order stays O(1)
+            else:
+                bisect.insort(self.keys, key)
+        self.entries[key] = entry
+
+    def remove(self, key: Any) -> None:
+        if self.entries.pop(key, None) is not None:
+            del self.keys[bisect.bisect_left(self.keys, key)]
+
+    def ordered(self) -> List[Any]:
+        return self.keys
+
+
+class Table:
+    def __init__(self, name: str, hash_key: str, range_key: Optional[str] = None,
+                 indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None,
+                 attribute_types: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.indexes = dict(indexes or {})
+        self.attribute_types = dict(attribute_types or {})
+        self.partitions: Dict[Any, _Partition] = {}
+        self.index_partitions: Dict[str, Dict[Any, _Partition]] = {index: {} for index in self.indexes}
+        self.count = 0
+
+    def key_of(self, item: Item) -> Tuple[Any, Any]:
+        if self.hash_key not in item or (self.range_key and self.range_key not in item):
+            raise _validation("One of the required keys was not given a value")
+        return _scalar(item[self.hash_key]), _scalar(item.get(self.range_key)) if self.range_key else None
+
+    def key_attributes(self, index: Optional[str] = None) -> List[str]:
+        names = [self.hash_key] + ([self.range_key] if self.range_key else [])
+        if index:
+            names = [key for key in self.indexes[index] if key] + names
+        return list(dict.fromkeys(names))
+
+    def get(self, key: Tuple[Any, Any]) -> Optional[Tuple[Item, int]]:
+        partition = self.partitions.get(key[0])
+        return partition.entries.get(key[1]) if partition else None
+
+    def put(self, item: Item) -> Optional[Item]:
+        key = self.key_of(item)
+        previous = self.get(key)
+        if previous is not None:
+            self._unindex(key, previous[0])
+        else:
+            self.count += 1
+        self.partitions.setdefault(key[0], _Partition()).put(key[1], (item, item_size(item)))
+        self._index(key, item)
+        return previous[0] if previous else None
+
+    def delete(self, key: Tuple[Any, Any]) -> Optional[Item]:
+        previous = self.get(key)
+        if previous is None:
+            return None
+        partition = self.partitions[key[0]]
+        partition.remove(key[1])
+        if not partition.entries:
+            del self.partitions[key[0]]
+        self._unindex(key, previous[0])
+        self.count -= 1
+        return previous[0]
+
+    def _index(self, key: Tuple[Any, Any], item: Item) -> None:
+        for index, (hash_key, range_key) in self.indexes.items():
+            if hash_key in item and (not range_key or range_key in item):
+                partitions = self.index_partitions[index]
+                entry = self.get(key)
+                partitions.setdefault(_scalar(item[hash_key]), _Partition()).put(
+                    (_scalar(item.get(range_key)) if range_key else None, key), entry)
+
+    def _unindex(self, key: Tuple[Any, Any], item: Item) -> None:
+        for index, (hash_key, range_key) in self.indexes.items():
+            if hash_key in item and (not range_key or range_key in item):
+                partitions = self.index_partitions[index]
+                hash_value = _scalar(item[hash_key])
+                partition = partitions.get(hash_value)
+                if partition is not None:
+                    partition.remove((_scalar(item.get(range_key)) if range_key else None, key))
+                    if not partition.entries:
+                        del partitions[hash_value]
+
+    def describe(self) -> Dict[str, Any]:
+        def schema(hash_key: str, range_key: Optional[str]) -> List[Dict[str, str]]:
+            return [{"AttributeName": hash_key, "KeyType": "HASH"}] + (
+                [{"AttributeName": range_key, "KeyType": "RANGE"}] if range_key else [])
+
+        attributes = self.key_attributes()
+        for hash_key, range_key in self.indexes.values():
+            attributes += [hash_key] + ([range_key] if range_key else [])
+        description = {
+            "TableName": self.name,
+            "TableStatus": "ACTIVE",
+            "KeySchema": schema(self.hash_key, self.range_key),
+            "AttributeDefinitions": [{"AttributeName": name, "AttributeType": self.attribute_types.get(name, "S")}
+                                     for name in dict.fromkeys(attributes)],
+            "ItemCount": self.count,
+            "BillingModeSummary": {"BillingMode": "PAY_PER_REQUEST"},
+        }
+        if self.indexes:
+            description["GlobalSecondaryIndexes"] = [
+                {"IndexName": index, "KeySchema": schema(*keys), "Projection": {"ProjectionType": "ALL"},
+                 "IndexStatus": "ACTIVE"} for index, keys in self.indexes.items()]
+        return description
+
+
+def _read_units(size: int, consistent: bool) -> float:
+    return max(1, math.ceil(size / 4096)) * (1.0 if consistent else 0.5)
+
+
+def _write_units(*sizes: int) -> float:
+    return float(max(1, math.ceil(max(sizes) / 1024)))
+
+
+def _project(item: Item, projection: Optional[str], names: Optional[Dict[str, str]]) -> Item:
+    """Top-level attributes named by a ProjectionExpression (nested paths keep their whole top-level attribute)"""
+    if not projection:
+        return item
+    parser = _Parser(projection, names, None)
+    wanted = [parser.path()[0]]
+    while parser.peek() == ",":
+        parser.take()
+        wanted.append(parser.path()[0])
+    parser.done()
+    return {name: item[name] for name in wanted if name in item}
+
+
+class FakeDynamoDB:
+    def __init__(self):
+        self.tables: Dict[str, Table] = {}
+        self.calls: Counter = Counter()
+        self.consumed = {"read": 0.0, "write": 0.0}
+
+    # -- Python API (seeding without the SDK round trip) --------------------
+
+    def create_table(self, name: str, hash_key: str, range_key: Optional[str] = None,
+                     indexes: Optional[Dict[str, Tuple[str, Optional[str]]]] = None,
+                     attribute_types: Optional[Dict[str, str]] = None) -> Table:
+        table = self.tables[name] = Table(name, hash_key, range_key, indexes, attribute_types)
+        return table
+
+    def load(self, name: str, items: Iterable[Dict[str, Any]]) -> int:
+        """Put plain Python items (boto3 resource types) straight into a table"""
+        table = self._table(name)
+        loaded = 0
+        for item in items:
+            table.put({k: wire(v) for k, v in item.items()})
+            loaded += 1
+        return loaded
+
+    def reset_counters(self) -> None:
+        self.calls.clear()
+        self.consumed = {"read": 0.0, "write": 0.0}
+
+    # -- botocore hook ---------------------------------------------------------
+
+    def install(self, client: Any) -> Any:
+        """Answer every request of this botocore DynamoDB client from memory"""
+        client.meta.events.register("before-send.dynamodb", self._before_send, unique_id=f"ddbfake-{id(self)}")
+        return client
+
+    def _before_send(self, request: Any, **kwargs: Any) -> Any:
+        from botocore.awsrequest import AWSResponse
+        target = request.headers.get("X-Amz-Target")
+        operation = (target.decode() if isinstance(target, bytes) else target or "").rsplit(".", 1)[-1]
+        body = request.body
+        params = json.loads(body.decode() if isinstance(body, bytes) else body or "{}")
+        try:
+            status, payload = 200, self.handle(operation, params)
+        except DynamoError as e:
+            status, payload = 400, {"__type": ERROR_PREFIX + e.code, "message": str(e)}
+        raw = json.dumps(payload).encode()
+        headers = {"Content-Type": "application/x-amz-json-1.0", "Content-Length": str(len(raw)),
+                   "x-amzn-RequestId": "ddbfake"}
+        return AWSResponse(request.url, status, headers, _RawBody(raw))
+
+    def handle(self, operation: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        method = getattr(self, "_op_" + operation, None)
+        if method is None:
+            raise DynamoError("UnknownOperationException", f"{operation} is not supported by the fake")
+        self.calls[operation] += 1
+        return method(params)
+
+    # -- operations ------------------------------------------------------------
+
+    def _table(self, name: str) -> Table:
+        table = self.tables.get(name)
+        if table is None:
+            raise DynamoError("ResourceNotFoundException", f"Requested resource not found: Table: {name} not found")
+        return table
+
+    def _capacity(self, params: Dict[str, Any], table: str, units: float, kind: str) -> Dict[str, Any]:
+        self.consumed[kind] += units
+        mode = params.get("ReturnConsumedCapacity", "NONE")
+        if mode == "NONE":
+            return {}
+        consumed: Dict[str, Any] = {"TableName": table, "CapacityUnits": units}
+        consumed["ReadCapacityUnits" if kind == "read" else "WriteCapacityUnits"] = units
+        if mode == "INDEXES":
+            consumed["Table"] = {"CapacityUnits": units}
+        return {"ConsumedCapacity": consumed}
+
+    @staticmethod
+    def _check(params: Dict[str, Any], existing: Optional[Item]) -> None:
+        condition = compile_condition(params.get("ConditionExpression"), params.get("ExpressionAttributeNames"),
+                                      params.get("ExpressionAttributeValues"))
+        if condition is not None and not condition(existing or {}):
+            raise DynamoError("ConditionalCheckFailedException", "The conditional request failed")
+
+    def _op_CreateTable(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if params["TableName"] in self.tables:
+            raise DynamoError("ResourceInUseException", f"Table already exists: {params['TableName']}")
+
+        def keys(schema: List[Dict[str, str]]) -> Tuple[str, Optional[str]]:
+            by_type = {key["KeyType"]: key["AttributeName"] for key in schema}
+            return by_type["HASH"], by_type.get("RANGE")
+
+        indexes = {index["IndexName"]: keys(index["KeySchema"])
+                   for index in params.get("GlobalSecondaryIndexes", []) + params.get("LocalSecondaryIndexes", [])}
+        types = {a["AttributeName"]: a["AttributeType"] for a in params.get("AttributeDefinitions", [])}
+        table = self.create_table(params["TableName"], *keys(params["KeySchema"]), indexes=indexes,
+                                  attribute_types=types)
+        return {"TableDescription": table.describe()}
+
+    def _op_DeleteTable(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        table = self._table(params["TableName"])
+        del self.tables[table.name]
+        return {"TableDescription": {**table.describe(), "TableStatus": "DELETING"}}
+
+    def _op_DescribeTable(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"Table": self._table(params["TableName"]).describe()}
+
+    def _op_ListTables(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"TableNames": sorted(self.tables)}
+
+    def _op_GetItem(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        table = self._table(params["TableName"])
+        entry = table.get(table.key_of(params["Key"]))
+        response = self._capacity(params, table.name, _read_units(entry[1] if entry else 0,
+                                                                  params.get("ConsistentRead", False)), "read")
+        if entry is not None:
+            response["Item"] = _project(entry[0], params.get("ProjectionExpression"),
+                                        params.get("ExpressionAttributeNames"))
+        return response
+
+    def _op_PutItem(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        table = self._table(params["TableName"])
+        item = params["Item"]
+        existing = table.get(table.key_of(item))
+        self._check(params, existing[0] if existing else None)
+        previous = table.put(item)
+        response = self._capacity(params, table.name, _write_units(item_size(item), existing[1] if existing else 0),
+                                  "write")
+        if params.get("ReturnValues") == "ALL_OLD" and previous:
+            response["Attributes"] = previous
+        return response
+
+    def _op_DeleteItem(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        table = self._table(params["TableName"])
+        key = table.key_of(params["Key"])
+        existing = table.get(key)
+        self._check(params, existing[0] if existing else None)
+        previous = table.delete(key)
+        response = self._capacity(params, table.name, _write_units(existing[1] if existing else 0), "write")
+        if params.get("ReturnValues") == "ALL_OLD" and previous:
+            response["Attributes"] = previous
+        return response
+
+    def _op_UpdateItem(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        table = self._table(params["TableName"])
+        key = table.key_of(params["Key"])
+        existing = table.get(key)
+        old = existing[0] if existing else None
+        self._check(params, old)
+        if "ExpressionAttributeNames" in params and params["ExpressionAttributeNames"] is not None:
+            unused = set(params["ExpressionAttributeNames"]) - set(
+                re.findall(r"#[A-Za-z0-9_]+", " ".join(str(params.get(p) or "") for p in (
+                    "UpdateExpression", "ConditionExpression"))))
+            if unused:
+                raise _validation(f"Value provided in ExpressionAttributeNames unused in expressions: "
+                                  f"keys: {{{', '.join(sorted(unused))}}}")
+        parser = _Parser(params.get("UpdateExpression", ""), params.get("ExpressionAttributeNames"),
+                         params.get("ExpressionAttributeValues"))
+        actions = parser.update()
+        parser.done()
+
+        source = old or dict(params["Key"])
+        new = copy.deepcopy(source)
+        computed = [(action, path, value(source) if value else None) for action, path, value in actions]
+        for action, path, value in computed:
+            if action == "SET":
+                _set_path(new, path, value)
+            elif action == "REMOVE":
+                _remove_path(new, path)
+            elif action == "ADD":
+                current = _get_path(new, path)
+                if current is None:
+                    _set_path(new, path, value)
+                elif "N" in current and "N" in value:
+                    _set_path(new, path, {"N": _add_numbers(current["N"], value["N"])})
+                else:
+                    (kind, members), = value.items()
+                    _set_path(new, path, {kind: list(dict.fromkeys(current.get(kind, []) + members))})
+            elif action == "DELETE":
+                current = _get_path(new, path)
+                if current is not None:
+                    (kind, members), = value.items()
+                    remaining = [m for m in current.get(kind, []) if m not in members]
+                    if remaining:
+                        _set_path(new, path, {kind: remaining})
+                    else:
+                        _remove_path(new, path)
+        table.put(new)
+        response = self._capacity(params, table.name, _write_units(item_size(new), existing[1] if existing else 0),
+                                  "write")
+        returns = params.get("ReturnValues", "NONE")
+        updated = {path[0] for _, path, _ in actions}
+        if returns == "ALL_NEW":
+            response["Attributes"] = new
+        elif returns == "ALL_OLD" and old:
+            response["Attributes"] = old
+        elif returns == "UPDATED_NEW":
+            response["Attributes"] = {k: v for k, v in new.items() if k in updated}
+        elif returns == "UPDATED_OLD" and old:
+            response["Attributes"] = {k: v for k, v in old.items() if k in updated}
+        return response
+
+    def _op_Query(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        table = self._table(params["TableName"])
+        index = params.get("IndexName")
+        if index and index not in table.indexes:
+            raise _validation(f"The table does not have the specified index: {index}")
+        hash_key, range_key = table.indexes[index] if index else (table.hash_key, table.range_key)
+        names, values = params.get("ExpressionAttributeNames"), params.get("ExpressionAttributeValues")
+        parser = _Parser(params.get("KeyConditionExpression", ""), names, values)
+        key_condition = parser.condition()
+        parser.done()
+        hash_terms = [value for name, op, value in parser.key_terms if name == hash_key and op == "="]
+        if not hash_terms:
+            raise _validation("Query condition missed key schema element: " + hash_key)
+        partitions = table.index_partitions[index] if index else table.partitions
+        partition = partitions.get(_scalar(hash_terms[0]))
+        keys = partition.ordered() if partition else []
+
+        lo, hi = 0, len(keys)
+        for name, op, value in parser.key_terms:
+            if name == range_key and keys:
+                lo, hi = _narrow(keys, op, value, lo, hi, wrap=bool(index))
+        forward = params.get("ScanIndexForward", True)
+        start = params.get("ExclusiveStartKey")
+        if start:
+            start_key = table.key_of(start)
+            position = (_scalar(start.get(range_key)) if range_key else None, start_key) if index else start_key[1]
+            if forward:
+                lo = max(lo, bisect.bisect_right(keys, position))
+            else:
+                hi = min(hi, bisect.bisect_left(keys, position))
+        candidates = keys[lo:hi] if forward else keys[lo:hi][::-1]
+        entries = partition.entries if partition else {}
+        return self._page(params, table, index, (entries[k] for k in candidates), key_condition)
+
+    def _op_Scan(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        table = self._table(params["TableName"])
+        index = params.get("IndexName")
+        partitions = table.index_partitions[index] if index else table.partitions
+        segment, total = params.get("Segment"), params.get("TotalSegments")
+        start = params.get("ExclusiveStartKey")
+        start_key = table.key_of(start) if start else None
+
+        def entries():
+            started = start_key is None
+            for hash_value, partition in list(partitions.items()):
+                if total and zlib.crc32(repr(hash_value).encode()) % total != segment:
+                    continue
+                keys = partition.ordered()
+                begin = 0
+                if not started:
+                    if index:
+                        found = [i for i, k in enumerate(keys) if k[1] == start_key]
+                        if not found:
+                            continue
+                        begin = found[0] + 1
+                    else:
+                        if hash_value != start_key[0]:
+                            continue
+                        begin = bisect.bisect_right(keys, start_key[1])
+                    started = True
+                for key in keys[begin:]:
+                    yield partition.entries[key]
+        return self._page(params, table, index, entries(), None)
+
+    def _page(self, params: Dict[str, Any], table: Table, index: Optional[str],
+              entries: Iterable[Tuple[Item, int]], key_condition: Optional[Callable[[Item], bool]]) -> Dict[str, Any]:
+        names, values = params.get("ExpressionAttributeNames"), params.get("ExpressionAttributeValues")
+        condition = compile_condition(params.get("FilterExpression"), names, values)
+        limit = params.get("Limit")
+        projection = params.get("ProjectionExpression")
+        items: List[Item] = []
+        scanned = size = 0
+        last: Optional[Item] = None
+        iterator = iter(entries)
+        for item, item_bytes in iterator:
+            if key_condition is not None and not key_condition(item):
+                continue
+            scanned += 1
+            size += item_bytes
+            if condition is None or condition(item):
+                items.append(item)
+            if (limit and scanned >= limit) or size >= PAGE_BYTES:
+                last = item
+                break
+        response: Dict[str, Any] = {"Count": len(items), "ScannedCount": scanned}
+        if params.get("Select") != "COUNT":
+            response["Items"] = [_project(item, projection, names) for item in items]
+        if last is not None and next(iterator, None) is not None:
+            response["LastEvaluatedKey"] = {name: last[name] for name in table.key_attributes(index) if name in last}
+        response.update(self._capacity(params, table.name, _read_units(size, params.get("ConsistentRead", False)),
+                                       "read"))
+        return response
+
+    def _op_BatchGetItem(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        responses: Dict[str, List[Item]] = {}
+        consumed = []
+        for name, request in params["RequestItems"].items():
+            table = self._table(name)
+            size = 0
+            found = responses.setdefault(name, [])
+            for key in request["Keys"]:
+                entry = table.get(table.key_of(key))
+                if entry is not None:
+                    size += entry[1]
+                    found.append(_project(entry[0], request.get("ProjectionExpression"),
+                                          request.get("ExpressionAttributeNames")))
+            consumed.append(self._capacity(params, name, _read_units(size, request.get("ConsistentRead", False)),
+                                           "read").get("ConsumedCapacity"))
+        response: Dict[str, Any] = {"Responses": responses, "UnprocessedKeys": {}}
+        if params.get("ReturnConsumedCapacity", "NONE") != "NONE":
+            response["ConsumedCapacity"] = consumed
+        return response
+
+    def _op_BatchWriteItem(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        consumed = []
+        for name, requests in params["RequestItems"].items():
+            table = self._table(name)
+            units = 0.0
+            for request in requests:
+                if "PutRequest" in request:
+                    item = request["PutRequest"]["Item"]
+                    previous = table.get(table.key_of(item))
+                    table.put(item)
+                    units += _write_units(item_size(item), previous[1] if previous else 0)
+                else:
+                    key = table.key_of(request["DeleteRequest"]["Key"])
+                    previous = table.get(key)
+                    table.delete(key)
+                    units += _write_units(previous[1] if previous else 0)
+            consumed.append(self._capacity(params, name, units, "write").get("ConsumedCapacity"))
+        response: Dict[str, Any] = {"UnprocessedItems": {}}
+        if params.get("ReturnConsumedCapacity", "NONE") != "NONE":
+            response["ConsumedCapacity"] = consumed
+        return response
+
+    def _op_TransactWriteItems(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        operations = {"Put": "PutItem", "Update": "UpdateItem", "Delete": "DeleteItem"}
+        reasons = []
+        for entry in params["TransactItems"]:
+            (kind, request), = entry.items()
+            table = self._table(request["TableName"])
+            existing = table.get(table.key_of(request.get("Item") or request["Key"]))
+            try:
+                self._check(request, existing[0] if existing else None)
+                reasons.append({"Code": "None"})
+            except DynamoError as e:
+                reasons.append({"Code": "ConditionalCheckFailed", "Message": str(e)})
+        if any(reason["Code"] != "None" for reason in reasons):
+            codes = ", ".join(reason["Code"] for reason in reasons)
+            raise DynamoError("TransactionCanceledException", f"Transaction cancelled, please refer cancellation "
+                                                              f"reasons for specific reasons [{codes}]")
+        for entry in params["TransactItems"]:
+            (kind, request), = entry.items()
+            if kind in operations:
+                request = {k: v for k, v in request.items() if k != "ConditionExpression"}
+                getattr(self, "_op_" + operations[kind])(request)
+        return {}
+
+
+def _narrow(keys: List[Any], op: str, value: Any, lo: int, hi: int, wrap: bool) -> Tuple[int, int]:
+    """Tighten [lo, hi) of sorted sort keys for one key-condition term on the sort key
+
+    Index partitions hold (sort key, primary key) tuples, hence `wrap`.
+    """
+    def left(v: Any) -> int:
+        return bisect.bisect_left(keys, (v,) if wrap else v, lo, hi)
+
+    def right(v: Any) -> int:
+        return bisect.bisect_left(keys, (v, _Top()), lo, hi) if wrap else bisect.bisect_right(keys, v, lo, hi)
+
+    if op == "between":
+        return left(_scalar(value[0])), right(_scalar(value[1]))
+    scalar = _scalar(value)
+    if op == "=":
+        return left(scalar), right(scalar)
+    if op == "<":
+        return lo, left(scalar)
+    if op == "<=":
+        return lo, right(scalar)
+    if op == ">":
+        return right(scalar), hi
+    if op == ">=":
+        return left(scalar), hi
+    if op == "begins_with" and isinstance(scalar, str):
+        return left(scalar), right(scalar + "\U0010ffff")
+    return lo, hi
+
+
+class _Top:
+    """Sorts after every primary-key tuple (upper bound for index sort-key ranges)"""
+
+    def __lt__(self, other: Any) -> bool:
+        return False
+
+    def __gt__(self, other: Any) -> bool:
+        return True
+
+
+class _RawBody:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def stream(self, **kwargs: Any):
+        yield self.data
+
+
+def install_shared(fake: FakeDynamoDB) -> FakeDynamoDB:
+    """Serve the shared.aws DynamoDB resource (and so every aws.table) and clients from the fake"""
+    from shared import aws
+    fake.install(aws.resource("dynamodb").meta.client)
+    fake.install(aws.client("dynamodb"))
+    fake.install(aws.client("dynamodb", instrumented=False))
+    return fake
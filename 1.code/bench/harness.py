@@ -0,0 +1,138 @@
+"""
+Small timing helpers shared by the benchmark scripts
+"""
+import json
+import math
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+def measure(fn: Callable[[], Any], number: int = 100, repeat: int = 5) -> Dict[str, float]:
+    """Time `fn` over `repeat` rounds of `number` calls; per-call microseconds"""
+    fn()  # warm up caches and lazy imports
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - started) / number * 1e6)
+    return {
+        "best_us": min(rounds),
+        "median_us": statistics.median(rounds),
+        "calls": number * repeat,
+    }
+
+
+def print_table(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    """Print benchmark rows as an aligned text table"""
+    widths = {col: max(len(col), *(len(_fmt(row.get(col))) for row in rows)) for col in columns}
+    print("  ".join(col.ljust(widths[col]) for col in columns))
+    print("  ".join("-" * widths[col] for col in columns))
+    for row in rows:
+        print("  ".join(_fmt(row.get(col)).ljust(widths[col]) for col in columns))
+
+
+def write_json(path: Optional[str], name: str, rows: List[Dict[str, Any]], **meta: Any) -> None:
+    """Write results as JSON so runs can be compared"""
+    if not path:
+        return
+    with open(path, "w") as f:
+        json.dump({"benchmark": name, "generated_at": time.time(), **meta, "results": rows}, f, indent=2)
+    print(f"\n📄 Results written to {path}")
+
+
+class Histogram:
+    """Log-linear latency histogram in the spirit of HdrHistogram: ~1% relative error, sparse buckets
+
+    Values are recorded in microseconds. Each power of two is split into 64
+    linear sub-buckets, so memory stays small at any range and histograms from
+    several workers or runs can be merged exactly.
+    """
+    SUB_BITS = 7
+    HALF = 1 << (SUB_BITS - 1)
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max = 0.0
+
+    @classmethod
+    def _index(cls, value: int) -> int:
+        if value < (1 << cls.SUB_BITS):
+            return value
+        shift = value.bit_length() - cls.SUB_BITS
+        return (shift << (cls.SUB_BITS - 1)) + (value >> shift)
+
+    @classmethod
+    def _bounds(cls, index: int) -> tuple:
+        if index < (1 << cls.SUB_BITS):
+            return index, index
+        shift = (index >> (cls.SUB_BITS - 1)) - 1
+        lower = (index - shift * cls.HALF) << shift
+        return lower, lower + (1 << shift) - 1
+
+    def record(self, value_us: float, count: int = 1) -> None:
+        index = self._index(max(0, int(value_us)))
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value_us * count
+        self.min = value_us if self.min is None else min(self.min, value_us)
+        self.max = max(self.max, value_us)
+
+    def percentile(self, p: float) -> float:
+        """Highest value equivalent to the p-th percentile (capped at the recorded max)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(float(self._bounds(index)[1]), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def summary_ms(self) -> Dict[str, float]:
+        return {
+            "p50_ms": self.percentile(50) / 1000,
+            "p90_ms": self.percentile(90) / 1000,
+            "p99_ms": self.percentile(99) / 1000,
+            "p999_ms": self.percentile(99.9) / 1000,
+            "max_ms": self.max / 1000,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form: [lowest value in bucket (us), count] pairs"""
+        return {"unit": "us", "count": self.count, "min": self.min, "max": self.max, "mean": self.mean(),
+                "buckets": [[self._bounds(index)[0], self.counts[index]] for index in sorted(self.counts)]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Histogram":
+        histogram = cls()
+        for lower, count in data.get("buckets", []):
+            histogram.counts[cls._index(lower)] = count
+        histogram.count = data.get("count", sum(histogram.counts.values()))
+        histogram.total = data.get("mean", 0.0) * histogram.count
+        histogram.min, histogram.max = data.get("min"), data.get("max", 0.0)
+        return histogram
+
+
+def _fmt(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:,.1f}"
+    return "" if value is None else str(value)
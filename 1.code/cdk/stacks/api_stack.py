@@ -8,18 +8,35 @@ from aws_cdk import (
 )
 from constructs import Construct
 
+from tools import lambda_artifacts
+
+def api_artifact():
+    """The api zip and layer from `python -m tools.lambda_artifacts build api`; synth fails if missing or stale"""
+    # No fallback to Code.from_asset("services/api"): that directory lacks shared/ and the dependencies
+    return lambda_artifacts.current_entry("api")
+
 class ApiStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, auth_stack, data_stack, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
         
         stage = self.node.try_get_context("stage") or "dev"
         
-        # Lambda Function
+        # Lambda Function: prebuilt zips keep the asset hash stable, so unchanged code is not re-uploaded
+        artifact = api_artifact()
+        layers = []
+        if artifact.get("layer"):
+            layers.append(_lambda.LayerVersion(
+                self, "ApiDependencies",
+                code=_lambda.Code.from_asset(artifact["layer"]),
+                compatible_runtimes=[_lambda.Runtime.PYTHON_3_11]
+            ))
+        
         self.api_lambda = _lambda.Function(
             self, "ApiLambda",
             runtime=_lambda.Runtime.PYTHON_3_11,
             handler="main.handler",
-            code=_lambda.Code.from_asset("services/api"),
+            code=_lambda.Code.from_asset(artifact["zip"]),
+            layers=layers,
             timeout=Duration.seconds(30),
             environment={
                 "TENANTS_TABLE": data_stack.tenants_table.table_name,
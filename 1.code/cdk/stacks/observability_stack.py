@@ -3,7 +3,8 @@ from aws_cdk import (
     aws_cloudwatch as cloudwatch,
     aws_cloudwatch_actions as cw_actions,
     aws_sns as sns,
-    CfnOutput
+    CfnOutput,
+    Duration
 )
 from constructs import Construct
 
@@ -64,6 +65,42 @@ class ObservabilityStack(Stack):
             )
         )
         
+        # Per-route metrics (EMF records from shared/metrics, namespace SyncHub)
+        def route_search(metric_name: str, statistic: str, label: str) -> cloudwatch.MathExpression:
+            return cloudwatch.MathExpression(
+                expression=f"SEARCH('{{SyncHub,Service,Route}} MetricName=\"{metric_name}\"', '{statistic}', 300)",
+                label=label,
+                using_metrics={},
+                period=Duration.minutes(5)
+            )
+        
+        dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title="Latency by Route (p99)",
+                left=[route_search("Latency", "p99", "p99")],
+                width=12
+            ),
+            cloudwatch.GraphWidget(
+                title="DynamoDB Time by Route (p99)",
+                left=[route_search("DynamoDBTime", "p99", "p99")],
+                width=12
+            )
+        )
+        
+        dashboard.add_widgets(
+            cloudwatch.GraphWidget(
+                title="Consumed Capacity by Route",
+                left=[route_search("ConsumedRCU", "Sum", "RCU")],
+                right=[route_search("ConsumedWCU", "Sum", "WCU")],
+                width=12
+            ),
+            cloudwatch.GraphWidget(
+                title="Response Bytes by Route (p90)",
+                left=[route_search("ResponseBytes", "p90", "p90")],
+                width=12
+            )
+        )
+        
         # Alarms
         cloudwatch.Alarm(
             self, "ApiErrorAlarm",
@@ -1,32 +1,37 @@
 #!/usr/bin/env python3
 """
 Deploy Sync Hub Admin Panel with CDK
+
+Steps run as a dependency graph (tools/dag.py): configuration, table creation,
+the static site publish and the CDK pipeline proceed concurrently, and smoke
+tests start once both the stacks and the site are up. Rerun with --resume to
+continue after a failed step.
 """
-import subprocess
-import os
 import json
+import os
+import shutil
+import sys
+
 import boto3
-import time
 
-def run_command(cmd, description, cwd=None):
-    """Run a command and handle errors"""
-    print(f"\n🔧 {description}")
-    print(f"Running: {cmd}")
-    
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True, cwd=cwd)
-    
-    if result.returncode == 0:
-        print("✅ Success")
-        if result.stdout:
-            print(result.stdout)
-        return True, result.stdout
-    else:
-        print("❌ Failed")
-        if result.stderr:
-            print(result.stderr)
-        if result.stdout:
-            print(result.stdout)
-        return False, result.stderr
+from admin_dynamodb_tables import ADMIN_TABLES, create_admin_tables
+from tools import dag
+from tools.build_assets import assets_for, build, write
+from tools.publish import publish, report
+
+CDK_DIR = 'sync-hub'
+CDK_ENVIRONMENT = 'aws://851725240440/us-east-1'
+BUCKET_NAME = 'sync-hub-web-1757132517'
+DISTRIBUTION_ID = 'EPUT16LI6OAAI'
+WEB_BUILD_DIR = os.path.join('.artifacts', 'web')
+STACK_NAMES = [
+    'SyncHubAuthStack',
+    'SyncHubDataStack',
+    'SyncHubApiStack',
+    'SyncHubWebStack',
+    'SyncHubObservabilityStack'
+]
+BOOTSTRAP_STACK = 'CDKToolkit'
 
 def store_sensitive_values():
     """Store sensitive configuration in AWS Systems Manager"""
@@ -65,44 +70,33 @@ def store_sensitive_values():
     
     print("✅ Configuration values stored in SSM Parameter Store")
 
-def check_cdk_environment():
+def check_cdk_environment(outputs=None):
     """Check if CDK is properly configured"""
     print("\n🔍 Checking CDK environment...")
     
     # Check if CDK is installed
-    success, output = run_command("cdk --version", "Checking CDK version")
-    if not success:
-        print("❌ CDK not found. Please install AWS CDK:")
-        print("npm install -g aws-cdk")
-        return False
+    try:
+        version = dag.command(["cdk", "--version"])(outputs)
+    except (OSError, dag.StepFailed) as e:
+        raise dag.StepFailed(f"CDK not found ({e}). Please install AWS CDK: npm install -g aws-cdk")
     
     # Check if we're in a CDK project
-    if not os.path.exists('sync-hub/cdk.json'):
-        print("❌ CDK project not found. Looking for sync-hub directory...")
-        if os.path.exists('sync-hub'):
-            os.chdir('sync-hub')
-            print("✅ Changed to sync-hub directory")
-        else:
-            print("❌ sync-hub CDK project not found")
-            return False
-    else:
-        os.chdir('sync-hub')
-        print("✅ Found CDK project")
-    
-    return True
+    if not os.path.exists(CDK_DIR):
+        raise dag.StepFailed(f"{CDK_DIR} CDK project not found")
+    print(f"✅ Found CDK project ({version.strip()})")
+    return version.strip()
 
-def update_cdk_stacks():
+def update_cdk_stacks(outputs=None):
     """Update CDK stacks with admin panel resources"""
     print("\n📝 Updating CDK stacks with admin panel resources...")
     
     # Create admin Lambda handler if it doesn't exist
-    admin_handler_path = "services/api/handlers/admin.py"
+    admin_handler_path = os.path.join(CDK_DIR, "services/api/handlers/admin.py")
     if not os.path.exists(admin_handler_path):
         print(f"📁 Creating {admin_handler_path}...")
         
         # Copy our admin handler
-        import shutil
-        source_path = "../lambda/admin_handler.py"
+        source_path = "lambda/admin_handler.py"
         if os.path.exists(source_path):
             os.makedirs(os.path.dirname(admin_handler_path), exist_ok=True)
             shutil.copy2(source_path, admin_handler_path)
@@ -110,8 +104,15 @@ def update_cdk_stacks():
         else:
             print(f"⚠️ Source admin handler not found at {source_path}")
     
+    # Bundle the shared modules (responses, ...) the handlers import
+    shared_path = os.path.join(CDK_DIR, "services/api/shared")
+    if os.path.exists("shared"):
+        shutil.rmtree(shared_path, ignore_errors=True)
+        shutil.copytree("shared", shared_path, ignore=shutil.ignore_patterns("__pycache__"))
+        print(f"✅ Copied shared modules to {shared_path}")
+    
     # Update API stack to include admin routes
-    api_stack_path = "infra/api_stack.py"
+    api_stack_path = os.path.join(CDK_DIR, "infra/api_stack.py")
     if os.path.exists(api_stack_path):
         print(f"📝 Admin routes should be added to {api_stack_path}")
         print("   - /admin/users")
@@ -121,52 +122,93 @@ def update_cdk_stacks():
         print("   - /admin/analytics/timeseries")
     
     print("✅ CDK stacks updated")
+    return shared_path
 
-def deploy_admin_panel():
-    """Deploy the admin panel using CDK"""
-    print("\n🚀 Deploying Sync Hub Admin Panel with CDK...")
-    
-    # Store sensitive values first
-    store_sensitive_values()
-    
-    # Check CDK environment
-    if not check_cdk_environment():
-        return False
-    
-    # Update CDK stacks
-    update_cdk_stacks()
-    
-    # Bootstrap CDK if needed
-    print("\n1️⃣ Bootstrapping CDK (if needed)...")
-    success, output = run_command(
-        "cdk bootstrap aws://851725240440/us-east-1",
-        "Bootstrapping CDK environment"
-    )
-    
-    # Synthesize templates
-    print("\n2️⃣ Synthesizing CDK templates...")
-    success, output = run_command("cdk synth", "Synthesizing CDK templates")
-    if not success:
-        print("❌ CDK synthesis failed")
-        return False
-    
-    # Show diff
-    print("\n3️⃣ Showing deployment diff...")
-    success, output = run_command("cdk diff", "Showing CDK diff")
-    
-    # Deploy all stacks
-    print("\n4️⃣ Deploying all stacks...")
-    success, output = run_command(
-        "cdk deploy --all --require-approval never",
-        "Deploying all CDK stacks"
-    )
-    
-    if not success:
-        print("❌ CDK deployment failed")
-        return False
-    
-    print("✅ CDK deployment completed successfully!")
-    return True
+def build_web(outputs=None):
+    """Fingerprinted, precompressed build of the web console, admin SPA and docs"""
+    write(build(), WEB_BUILD_DIR)
+    return WEB_BUILD_DIR
+
+def publish_web(outputs):
+    result = publish(assets_for(outputs["build_web"]), BUCKET_NAME, DISTRIBUTION_ID)
+    report(result, BUCKET_NAME)
+    return {"uploaded": result.uploaded, "invalidation_id": result.invalidation_id}
+
+def stacks_state(stack_names):
+    """Each stack's status and last update time; None for a stack that does not exist"""
+    cf = boto3.client('cloudformation', region_name='us-east-1')
+    described = {}
+    for stack_name in stack_names:
+        try:
+            stack = cf.describe_stacks(StackName=stack_name)['Stacks'][0]
+        except cf.exceptions.ClientError as e:
+            if 'does not exist' not in str(e):
+                raise
+            described[stack_name] = None
+            continue
+        described[stack_name] = {
+            'status': stack['StackStatus'],
+            'updated': str(stack.get('LastUpdatedTime') or stack.get('CreationTime')),
+        }
+    return json.dumps(described, sort_keys=True)
+
+def synthesized_templates(outputs):
+    """Cache key for cdk deploy: the synthesized templates (asset hashes included) and the deployed stacks' state,
+    so a stack that was rolled back, deleted or changed outside this script is deployed again"""
+    return dag.files_key([os.path.join(CDK_DIR, "cdk.out")], extra=stacks_state(STACK_NAMES))
+
+def bootstrap_key(outputs):
+    """Cache key for cdk bootstrap: the environment and the state of its toolkit stack"""
+    return CDK_ENVIRONMENT + stacks_state([BOOTSTRAP_STACK])
+
+def admin_tables_key(outputs):
+    """Cache key for the table step: each table's identity and key schema, so a missing or recreated table reruns it"""
+    dynamodb = boto3.client('dynamodb', region_name='us-east-1')
+    described = {}
+    for name in ADMIN_TABLES:
+        try:
+            table = dynamodb.describe_table(TableName=name)['Table']
+        except dynamodb.exceptions.ResourceNotFoundException:
+            described[name] = None
+            continue
+        described[name] = {
+            'id': table.get('TableId'),
+            'keys': table['KeySchema'],
+            'indexes': sorted((index['IndexName'], json.dumps(index['KeySchema'], sort_keys=True))
+                              for index in table.get('GlobalSecondaryIndexes', [])),
+        }
+    return dag.files_key(['admin_dynamodb_tables.py'], extra=json.dumps(described, sort_keys=True))
+
+def deployment_steps():
+    """The admin panel deploy as a dependency graph"""
+    cdk = lambda *argv, **kwargs: dag.command(["cdk", *argv], cwd=CDK_DIR, **kwargs)
+    return [
+        dag.Step("store_config", lambda outputs: store_sensitive_values(),
+                 description="Store configuration in SSM"),
+        dag.Step("admin_tables", lambda outputs: create_admin_tables(),
+                 cache_key=admin_tables_key, description="Create admin DynamoDB tables"),
+        dag.Step("build_web", build_web, cache_key=lambda outputs: dag.files_key(
+                 ["admin_spa.html", "web", "docs", "tools/build_assets.py"], extra=str(os.path.isdir(WEB_BUILD_DIR))),
+                 description="Build static assets"),
+        dag.Step("publish_web", publish_web, deps=["build_web"], description="Publish changed static assets"),
+        dag.Step("check_cdk", check_cdk_environment, description="Check CDK environment"),
+        dag.Step("bundle_handlers", update_cdk_stacks, deps=["check_cdk"],
+                 description="Bundle admin handler and shared modules"),
+        dag.Step("cdk_bootstrap", cdk("bootstrap", CDK_ENVIRONMENT), deps=["check_cdk"],
+                 cache_key=bootstrap_key, description="Bootstrap CDK environment"),
+        dag.Step("cdk_synth", cdk("synth"), deps=["bundle_handlers", "cdk_bootstrap"],
+                 description="Synthesize CDK templates"),
+        dag.Step("cdk_diff", cdk("diff", echo=True), deps=["cdk_synth"], allow_failure=True,
+                 description="Show CDK diff"),
+        dag.Step("cdk_deploy", cdk("deploy", "--all", "--require-approval", "never"),
+                 deps=["cdk_synth", "store_config", "admin_tables"], cache_key=synthesized_templates,
+                 description="Deploy all CDK stacks"),
+        dag.Step("stack_outputs", lambda outputs: get_deployment_outputs(), deps=["cdk_deploy"],
+                 description="Collect stack outputs"),
+        dag.Step("smoke_tests", dag.command([sys.executable, "test_admin_endpoints.py"], echo=True),
+                 deps=["cdk_deploy", "publish_web"], allow_failure=True,
+                 description="Run admin endpoints smoke tests"),
+    ]
 
 def get_deployment_outputs():
     """Get deployment outputs from CloudFormation"""
@@ -174,18 +216,9 @@ def get_deployment_outputs():
     
     cf = boto3.client('cloudformation', region_name='us-east-1')
     
-    # Get stack outputs
-    stack_names = [
-        'SyncHubAuthStack',
-        'SyncHubDataStack', 
-        'SyncHubApiStack',
-        'SyncHubWebStack',
-        'SyncHubObservabilityStack'
-    ]
-    
     outputs = {}
     
-    for stack_name in stack_names:
+    for stack_name in STACK_NAMES:
         try:
             response = cf.describe_stacks(StackName=stack_name)
             stack_outputs = response['Stacks'][0].get('Outputs', [])
@@ -200,33 +233,23 @@ def get_deployment_outputs():
     
     return outputs
 
-def run_smoke_tests():
-    """Run smoke tests against deployed endpoints"""
-    print("\n🧪 Running smoke tests...")
-    
-    # Change back to project root
-    os.chdir('..')
-    
-    # Run the smoke tests
-    success, output = run_command(
-        "python3 test_admin_endpoints.py",
-        "Running admin endpoints smoke tests"
-    )
-    
-    return success
-
-def main():
+def main(argv=None):
     """Main deployment workflow"""
+    args = dag.parser("Deploy the Sync Hub admin panel").parse_args(argv)
     print("🚀 SYNC HUB ADMIN PANEL DEPLOYMENT")
     print("=" * 50)
     
     # Deploy admin panel
-    if not deploy_admin_panel():
+    steps = deployment_steps()
+    if dag.run_cli(steps, "admin-panel", args) != 0:
         print("❌ Deployment failed")
         return False
+    if args.plan:
+        return True
     
-    # Get deployment outputs
-    outputs = get_deployment_outputs()
+    # Step results (stack outputs, smoke tests) from the run state
+    state = dag.load_state(dag.state_path("admin-panel", args))
+    smoke_success = state.get("smoke_tests", {}).get("status") == "ok"
     
     # Display results
     print("\n" + "=" * 50)
@@ -263,10 +286,8 @@ def main():
     print(f"   - SSM Parameter Store: /synchub/* parameters")
     print(f"   - Secrets Manager: synchub/google/client_secret")
     
-    # Run smoke tests
+    # Smoke tests ran as the last step of the graph
     print(f"\n🧪 Smoke Test Summary:")
-    smoke_success = run_smoke_tests()
-    
     if smoke_success:
         print("✅ All smoke tests passed!")
     else:
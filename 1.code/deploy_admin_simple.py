@@ -4,9 +4,11 @@ Simplified Admin Panel deployment for Sync Hub
 """
 import boto3
 import json
-import time
 import requests
 
+from tools.build_assets import build_site
+from tools.publish import publish, report
+
 def deploy_admin_resources():
     """Deploy admin panel resources directly"""
     print("🚀 SYNC HUB ADMIN PANEL DEPLOYMENT")
@@ -39,44 +41,16 @@ def deploy_admin_resources():
         except Exception as e:
             print(f"⚠️ Failed to store {param_name}: {e}")
     
-    # Upload admin SPA to S3
-    print("\n📤 Uploading admin SPA to S3...")
-    s3 = boto3.client('s3', region_name='us-east-1')
+    # Publish the fingerprinted build (admin SPA included); only changed pages are invalidated
+    print("\n📤 Publishing admin SPA to S3 + CloudFront...")
     bucket_name = 'sync-hub-web-1757132517'
-    
-    try:
-        # Upload admin SPA
-        s3.upload_file(
-            'admin_spa.html', bucket_name, 'admin/index.html',
-            ExtraArgs={
-                'ContentType': 'text/html',
-                'CacheControl': 'max-age=300'
-            }
-        )
-        print("✅ Uploaded admin SPA to /admin/index.html")
-    except Exception as e:
-        print(f"⚠️ Failed to upload admin SPA: {e}")
-    
-    # Create CloudFront invalidation
-    print("\n🔄 Creating CloudFront invalidation...")
-    cloudfront = boto3.client('cloudfront', region_name='us-east-1')
     distribution_id = 'EPUT16LI6OAAI'
     
     try:
-        invalidation = cloudfront.create_invalidation(
-            DistributionId=distribution_id,
-            InvalidationBatch={
-                'Paths': {
-                    'Quantity': 1,
-                    'Items': ['/admin/*']
-                },
-                'CallerReference': str(int(time.time()))
-            }
-        )
-        invalidation_id = invalidation['Invalidation']['Id']
-        print(f"✅ Created invalidation: {invalidation_id}")
+        result = publish(build_site(), bucket_name, distribution_id)
+        report(result, bucket_name)
     except Exception as e:
-        print(f"⚠️ Failed to create invalidation: {e}")
+        print(f"⚠️ Failed to publish admin SPA: {e}")
     
     # Test endpoints
     print("\n🧪 Testing existing infrastructure...")
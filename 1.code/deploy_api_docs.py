@@ -3,10 +3,13 @@ import boto3
 import json
 import yaml
 import os
-import time
 import requests
 from urllib.parse import quote
 
+from tools.build_assets import build_site
+from tools.lambda_artifacts import write_zip
+from tools.publish import publish, report
+
 # Configuration
 REGION = "us-east-1"
 BUCKET_NAME = "sync-hub-web-1757132517"
@@ -240,27 +243,12 @@ For API support, contact: support@synchub.dev
     
     print("✅ Created API.md documentation")
     
-    # 4. Upload docs to S3
+    # 4. Upload changed docs to S3
     print("\n4️⃣ Uploading documentation to S3...")
     
-    docs_files = [
-        ('docs/openapi.yaml', 'application/x-yaml'),
-        ('docs/openapi.json', 'application/json'),
-        ('docs/index.html', 'text/html'),
-        ('docs/API.md', 'text/markdown')
-    ]
-    
-    for file_path, content_type in docs_files:
-        s3_key = file_path
-        s3.upload_file(
-            file_path, BUCKET_NAME, s3_key,
-            ExtraArgs={
-                'ContentType': content_type,
-                'CacheControl': 'max-age=300'  # 5 minutes cache
-            }
-        )
-    
-    print(f"✅ Uploaded {len(docs_files)} documentation files")
+    # Fingerprinted, precompressed build; the stable docs URLs keep their 5 minute cache
+    result = publish(build_site(), BUCKET_NAME, DISTRIBUTION_ID, s3, cloudfront)
+    report(result, BUCKET_NAME)
     
     # 5. Create Lambda for API route
     print("\n5️⃣ Creating Lambda for /docs/openapi.json route...")
@@ -295,36 +283,18 @@ def lambda_handler(event, context):
     }
 '''
     
-    # Create deployment package
-    import zipfile
-    with zipfile.ZipFile('/tmp/docs_lambda.zip', 'w') as z:
-        z.writestr('lambda_function.py', lambda_code)
+    # Create deployment package (reproducible: same code, same zip bytes)
+    write_zip('/tmp/docs_lambda.zip', {'lambda_function.py': lambda_code.encode('utf-8')})
     
     # Deploy Lambda (this would need proper IAM role setup)
     print("⚠️  Lambda deployment requires additional IAM setup")
     print("   Manual step: Create Lambda function 'sync-hub-docs' with the generated code")
     
-    # 6. Create CloudFront invalidation
-    print("\n6️⃣ Creating CloudFront invalidation...")
-    
-    invalidation = cloudfront.create_invalidation(
-        DistributionId=DISTRIBUTION_ID,
-        InvalidationBatch={
-            'Paths': {
-                'Quantity': 1,
-                'Items': ['/docs/*']
-            },
-            'CallerReference': str(int(time.time()))
-        }
-    )
-    
-    invalidation_id = invalidation['Invalidation']['Id']
-    print(f"✅ Created invalidation: {invalidation_id}")
+    # 6. CloudFront invalidation of the changed docs was created (and awaited) by publish()
+    invalidation_id = result.invalidation_id or "none (no changes)"
     
-    # 7. Wait and test
+    # 7. Test
     print("\n7️⃣ Testing documentation deployment...")
-    print("⏳ Waiting 30 seconds for invalidation...")
-    time.sleep(30)
     
     # Test CloudFront docs
     try:
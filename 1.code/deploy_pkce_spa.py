@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 import boto3
 import json
-import time
 import os
 import hashlib
 import base64
@@ -9,6 +8,9 @@ import secrets
 import requests
 from urllib.parse import quote
 
+from tools.build_assets import build_site
+from tools.publish import publish, report
+
 # Configuration
 REGION = "us-east-1"
 USER_POOL_ID = "us-east-1_ARkd0dYPj"
@@ -350,24 +352,11 @@ def main():
     
     print("✅ Created PKCE-enabled SPA with token handling")
     
-    # 3. Upload to S3
+    # 3. Upload changed files to S3
     print("\n3️⃣ Uploading SPA to S3...")
     
-    file_count = 0
-    for root, dirs, files in os.walk('web'):
-        for file in files:
-            local_path = os.path.join(root, file)
-            s3_key = os.path.relpath(local_path, 'web')
-            
-            content_type = 'text/html' if file.endswith('.html') else 'text/plain'
-            
-            s3.upload_file(
-                local_path, BUCKET_NAME, s3_key,
-                ExtraArgs={'ContentType': content_type}
-            )
-            file_count += 1
-    
-    print(f"✅ Uploaded {file_count} files to S3")
+    assets = build_site()
+    file_count = len(assets)
     
     # 4. Verify CloudFront config
     print("\n4️⃣ Verifying CloudFront configuration...")
@@ -382,22 +371,12 @@ def main():
     for err in error_responses:
         print(f"   {err['ErrorCode']} → {err['ResponseCode']} → {err['ResponsePagePath']}")
     
-    # 5. Create invalidation
-    print("\n5️⃣ Creating CloudFront invalidation...")
-    
-    invalidation = cloudfront.create_invalidation(
-        DistributionId=DISTRIBUTION_ID,
-        InvalidationBatch={
-            'Paths': {
-                'Quantity': 1,
-                'Items': ['/*']
-            },
-            'CallerReference': str(int(time.time()))
-        }
-    )
+    # 5. Publish only what changed; one invalidation for the changed paths, polled until complete
+    print("\n5️⃣ Publishing and invalidating changed paths...")
     
-    invalidation_id = invalidation['Invalidation']['Id']
-    print(f"✅ Created invalidation: {invalidation_id}")
+    result = publish(assets, BUCKET_NAME, DISTRIBUTION_ID, s3, cloudfront)
+    report(result, BUCKET_NAME)
+    invalidation_id = result.invalidation_id or "none (no changes)"
     
     # 6. Generate sample PKCE challenge for testing
     sample_verifier = base64.b64encode(secrets.token_bytes(32)).decode('utf-8').rstrip('=').replace('+', '-').replace('/', '_')
@@ -414,10 +393,8 @@ def main():
         f"&code_challenge_method=S256"
     )
     
-    # 7. Wait and test
+    # 7. Test
     print("\n6️⃣ Testing deployment...")
-    print("⏳ Waiting 30 seconds for invalidation...")
-    time.sleep(30)
     
     try:
         response = requests.get(f"https://{CLOUDFRONT_DOMAIN}/", timeout=15)
@@ -3,9 +3,11 @@ import boto3
 import json
 import yaml
 import os
-import time
 import requests
 
+from tools.build_assets import build_site
+from tools.publish import publish, report
+
 # Configuration
 REGION = "us-east-1"
 BUCKET_NAME = "sync-hub-web-1757132517"
@@ -510,51 +512,22 @@ def main():
     
     print("✅ Saved documentation files locally")
     
-    # 4. Upload to S3
-    print("\n4️⃣ Uploading to S3...")
+    # 4. Upload changed files to S3 and invalidate their paths
+    print("\n4️⃣ Publishing to S3 + CloudFront...")
     
     s3 = boto3.client('s3', region_name=REGION)
-    
-    files_to_upload = [
-        ('docs/index.html', 'text/html'),
-        ('docs/openapi.json', 'application/json'),
-        ('docs/openapi.yaml', 'application/x-yaml')
-    ]
-    
-    for file_path, content_type in files_to_upload:
-        s3.upload_file(
-            file_path, BUCKET_NAME, file_path,
-            ExtraArgs={
-                'ContentType': content_type,
-                'CacheControl': 'max-age=300'
-            }
-        )
-    
-    print(f"✅ Uploaded {len(files_to_upload)} files to S3")
-    
-    # 5. Create CloudFront invalidation
-    print("\n5️⃣ Creating CloudFront invalidation...")
-    
     cloudfront = boto3.client('cloudfront', region_name=REGION)
     
-    invalidation = cloudfront.create_invalidation(
-        DistributionId=DISTRIBUTION_ID,
-        InvalidationBatch={
-            'Paths': {
-                'Quantity': 1,
-                'Items': ['/*']
-            },
-            'CallerReference': str(int(time.time()))
-        }
-    )
+    # Fingerprinted, precompressed build of the pages and docs
+    assets = build_site()
     
-    invalidation_id = invalidation['Invalidation']['Id']
-    print(f"✅ Created invalidation: {invalidation_id}")
+    # 5. Only changed paths are invalidated; publish() waits for the invalidation to complete
+    result = publish(assets, BUCKET_NAME, DISTRIBUTION_ID, s3, cloudfront)
+    report(result, BUCKET_NAME)
+    invalidation_id = result.invalidation_id or "none (no changes)"
     
-    # 6. Wait and run smoke tests
+    # 6. Run smoke tests
     print("\n6️⃣ Running smoke tests...")
-    print("⏳ Waiting 30 seconds for invalidation...")
-    time.sleep(30)
     
     test_results = {}
     
@@ -6,6 +6,9 @@ import os
 import subprocess
 from urllib.parse import quote
 
+from tools.build_assets import build_site
+from tools.publish import publish, report
+
 # Configuration
 REGION = "us-east-1"
 API_BASE_URL = "https://l7ycatge3j.execute-api.us-east-1.amazonaws.com"
@@ -230,29 +233,10 @@ def main():
     with open('web/index.html', 'w') as f:
         f.write(index_html)
     
-    # Upload to S3
-    for root, dirs, files in os.walk('web'):
-        for file in files:
-            local_path = os.path.join(root, file)
-            s3_key = os.path.relpath(local_path, 'web')
-            
-            content_type = 'text/html' if file.endswith('.html') else 'text/plain'
-            
-            s3.upload_file(
-                local_path, web_bucket_name, s3_key,
-                ExtraArgs={'ContentType': content_type}
-            )
-    
-    # Create CloudFront invalidation
-    invalidation = cloudfront.create_invalidation(
-        DistributionId=distribution_id,
-        InvalidationBatch={
-            'Paths': {'Quantity': 1, 'Items': ['/*']},
-            'CallerReference': str(int(time.time()))
-        }
-    )
-    invalidation_id = invalidation['Invalidation']['Id']
-    print(f"✅ Created invalidation: {invalidation_id}")
+    # Upload changed files to S3 and invalidate only their paths
+    result = publish(build_site(), web_bucket_name, distribution_id, s3, cloudfront)
+    report(result, web_bucket_name)
+    invalidation_id = result.invalidation_id or "none (no changes)"
     
     # 3. Update Cognito App Client
     print("\n3️⃣ Updating Cognito App Client...")
@@ -1,11 +1,14 @@
 
 import json
-import boto3
 import re
 from datetime import datetime
 
-dynamodb = boto3.resource('dynamodb')
-settings_table = dynamodb.Table('sync-hub-settings')
+from shared import aws, capacity, metrics, profiling, tokens
+from shared.responses import error_response, json_response, make_headers
+
+SETTINGS_TABLE = 'sync-hub-settings'
+USER_POOL_ID = 'us-east-1_ARkd0dYPj'
+SERVICE = 'tags-api'
 
 def validate_tags(items):
     """Validate tag items"""
@@ -31,39 +34,50 @@ def validate_tags(items):
     return True, None
 
 def get_user_from_jwt(event):
-    """Extract user info from JWT token"""
-    # This would normally decode the JWT token
-    # For demo, return mock user
+    """Extract user info from the verified bearer token (raises tokens.TokenError)"""
+    claims = tokens.verify(tokens.bearer_token(event), USER_POOL_ID)
     return {
-        'user_id': 'user_123',
-        'tenant_id': 'tenant_456',
-        'email': 'user@example.com'
+        'user_id': claims.get('sub', ''),
+        'tenant_id': claims.get('custom:tenant_id') or claims.get('tenant_id', ''),
+        'email': claims.get('email', '')
     }
 
-def cors_headers():
-    return {
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Authorization, Content-Type',
-        'Access-Control-Allow-Methods': 'GET, POST, DELETE, OPTIONS'
-    }
+CORS_HEADERS = make_headers(
+    allow_headers='Authorization, Content-Type',
+    allow_methods='GET, POST, DELETE, OPTIONS'
+)
+
+def route_name(event):
+    return f"{event.get('httpMethod')} {event.get('resource', '/settings/{id}/tags')}"
 
+@profiling.profiled(SERVICE, route_of=route_name)
+@capacity.accounted(SERVICE)
 def lambda_handler(event, context):
+    request = metrics.begin(SERVICE, context)
+    return metrics.end(request, dispatch(event))
+
+def dispatch(event):
     method = event['httpMethod']
     path = event['path']
+    route = route_name(event)
+    metrics.set_route(route)
+    capacity.set_route(route)
     
     # Handle CORS preflight
     if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': cors_headers(),
-            'body': ''
-        }
+        return json_response(200, headers=CORS_HEADERS)
     
     # Extract setting ID from path
     setting_id = event['pathParameters']['id']
     
     # Get user info
-    user = get_user_from_jwt(event)
+    try:
+        user = get_user_from_jwt(event)
+    except tokens.TokenError as e:
+        return error_response(401, str(e), CORS_HEADERS)
+    except Exception as e:  # verifier unavailable (e.g. cryptography not packaged): a 500, not an unhandled 502
+        return error_response(500, 'Internal server error', CORS_HEADERS, detail=str(e))
+    capacity.set_tenant(user['tenant_id'])
     
     try:
         if method == 'GET':
@@ -75,94 +89,54 @@ def lambda_handler(event, context):
             body = json.loads(event['body'])
             return handle_delete_tags(setting_id, user, body)
         else:
-            return {
-                'statusCode': 405,
-                'headers': cors_headers(),
-                'body': json.dumps({'error': 'Method not allowed'})
-            }
+            return error_response(405, 'Method not allowed', CORS_HEADERS)
     
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Internal server error', 'detail': str(e)})
-        }
+        return error_response(500, 'Internal server error', CORS_HEADERS, detail=str(e))
 
 def handle_get_tags(setting_id, user):
     """Get tags for a setting"""
     try:
-        response = settings_table.get_item(Key={'id': setting_id})
+        response = aws.table(SETTINGS_TABLE).get_item(Key={'id': setting_id})
         
         if 'Item' not in response:
-            return {
-                'statusCode': 404,
-                'headers': cors_headers(),
-                'body': json.dumps({'error': 'Setting not found'})
-            }
+            return error_response(404, 'Setting not found', CORS_HEADERS)
         
         setting = response['Item']
         
         # Check access (owner or admin)
         if setting.get('user_id') != user['user_id'] and not user.get('is_admin'):
-            return {
-                'statusCode': 403,
-                'headers': cors_headers(),
-                'body': json.dumps({'error': 'Access denied'})
-            }
+            return error_response(403, 'Access denied', CORS_HEADERS)
         
         tags = setting.get('tags', [])
         
-        return {
-            'statusCode': 200,
-            'headers': cors_headers(),
-            'body': json.dumps({'items': tags})
-        }
+        return json_response(200, {'items': tags}, CORS_HEADERS)
     
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Failed to get tags', 'detail': str(e)})
-        }
+        return error_response(500, 'Failed to get tags', CORS_HEADERS, detail=str(e))
 
 def handle_post_tags(setting_id, user, body):
     """Add/update tags for a setting"""
     # Validate input
     if 'items' not in body:
-        return {
-            'statusCode': 400,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'items field required'})
-        }
+        return error_response(400, 'items field required', CORS_HEADERS)
     
     valid, error = validate_tags(body['items'])
     if not valid:
-        return {
-            'statusCode': 400,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': error})
-        }
+        return json_response(400, {'error': error}, CORS_HEADERS)
     
     try:
         # Get existing setting
-        response = settings_table.get_item(Key={'id': setting_id})
+        response = aws.table(SETTINGS_TABLE).get_item(Key={'id': setting_id})
         
         if 'Item' not in response:
-            return {
-                'statusCode': 404,
-                'headers': cors_headers(),
-                'body': json.dumps({'error': 'Setting not found'})
-            }
+            return error_response(404, 'Setting not found', CORS_HEADERS)
         
         setting = response['Item']
         
         # Check access
         if setting.get('user_id') != user['user_id'] and not user.get('is_admin'):
-            return {
-                'statusCode': 403,
-                'headers': cors_headers(),
-                'body': json.dumps({'error': 'Access denied'})
-            }
+            return error_response(403, 'Access denied', CORS_HEADERS)
         
         # Merge tags (deduplicate)
         existing_tags = set(setting.get('tags', []))
@@ -170,7 +144,7 @@ def handle_post_tags(setting_id, user, body):
         all_tags = sorted(list(existing_tags.union(new_tags)))
         
         # Update setting
-        settings_table.update_item(
+        aws.table(SETTINGS_TABLE).update_item(
             Key={'id': setting_id},
             UpdateExpression='SET tags = :tags, updated_at = :updated_at',
             ExpressionAttributeValues={
@@ -179,57 +153,33 @@ def handle_post_tags(setting_id, user, body):
             }
         )
         
-        return {
-            'statusCode': 200,
-            'headers': cors_headers(),
-            'body': json.dumps({'id': setting_id, 'items': all_tags})
-        }
+        return json_response(200, {'id': setting_id, 'items': all_tags}, CORS_HEADERS)
     
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Failed to update tags', 'detail': str(e)})
-        }
+        return error_response(500, 'Failed to update tags', CORS_HEADERS, detail=str(e))
 
 def handle_delete_tags(setting_id, user, body):
     """Remove specific tags from a setting"""
     # Validate input
     if 'items' not in body:
-        return {
-            'statusCode': 400,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'items field required'})
-        }
+        return error_response(400, 'items field required', CORS_HEADERS)
     
     valid, error = validate_tags(body['items'])
     if not valid:
-        return {
-            'statusCode': 400,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': error})
-        }
+        return json_response(400, {'error': error}, CORS_HEADERS)
     
     try:
         # Get existing setting
-        response = settings_table.get_item(Key={'id': setting_id})
+        response = aws.table(SETTINGS_TABLE).get_item(Key={'id': setting_id})
         
         if 'Item' not in response:
-            return {
-                'statusCode': 404,
-                'headers': cors_headers(),
-                'body': json.dumps({'error': 'Setting not found'})
-            }
+            return error_response(404, 'Setting not found', CORS_HEADERS)
         
         setting = response['Item']
         
         # Check access
         if setting.get('user_id') != user['user_id'] and not user.get('is_admin'):
-            return {
-                'statusCode': 403,
-                'headers': cors_headers(),
-                'body': json.dumps({'error': 'Access denied'})
-            }
+            return error_response(403, 'Access denied', CORS_HEADERS)
         
         # Remove specified tags
         existing_tags = set(setting.get('tags', []))
@@ -237,7 +187,7 @@ def handle_delete_tags(setting_id, user, body):
         remaining_tags = sorted(list(existing_tags - tags_to_remove))
         
         # Update setting
-        settings_table.update_item(
+        aws.table(SETTINGS_TABLE).update_item(
             Key={'id': setting_id},
             UpdateExpression='SET tags = :tags, updated_at = :updated_at',
             ExpressionAttributeValues={
@@ -246,15 +196,7 @@ def handle_delete_tags(setting_id, user, body):
             }
         )
         
-        return {
-            'statusCode': 200,
-            'headers': cors_headers(),
-            'body': json.dumps({'id': setting_id, 'items': remaining_tags})
-        }
+        return json_response(200, {'id': setting_id, 'items': remaining_tags}, CORS_HEADERS)
     
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Failed to delete tags', 'detail': str(e)})
-        }
+        return error_response(500, 'Failed to delete tags', CORS_HEADERS, detail=str(e))
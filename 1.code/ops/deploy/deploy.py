@@ -1,32 +1,65 @@
 #!/usr/bin/env python3
-import subprocess
-import sys
+"""
+Deploy the CDK app: the Lambda artifacts, the static site and the stacks run as a
+dependency graph (tools/dag.py), with smoke tests last. Unchanged dependencies
+and templates are skipped; --resume continues after a failed step.
+
+Usage:
+    python ops/deploy/deploy.py [stage] [--resume] [--plan]
+"""
 import os
+import sys
 
-def run_command(cmd, description):
-    print(f"\n{description}...")
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"Error: {result.stderr}")
-        sys.exit(1)
-    print(result.stdout)
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
 
-def main():
-    stage = sys.argv[1] if len(sys.argv) > 1 else "dev"
-    
-    print(f"Deploying to {stage} environment...")
-    
-    # Install dependencies
-    run_command("pip install -r requirements.txt", "Installing dependencies")
-    
-    # Copy shared modules to services
-    run_command("cp -r shared services/api/", "Copying shared modules to API")
-    
-    # Deploy CDK stacks
-    run_command(f"cdk deploy --all --require-approval never -c stage={stage}", f"Deploying CDK stacks to {stage}")
+from tools import dag  # noqa: E402
+
+BUCKET_NAME = "sync-hub-web-1757132517"
+DISTRIBUTION_ID = "EPUT16LI6OAAI"
+
+
+def publish_web(outputs):
+    from tools.build_assets import build_site
+    from tools.publish import publish, report
+    result = publish(build_site(), BUCKET_NAME, DISTRIBUTION_ID)
+    report(result, BUCKET_NAME)
+    return {"uploaded": result.uploaded, "invalidation_id": result.invalidation_id}
+
+
+def steps(stage):
+    return [
+        # Install dependencies
+        dag.Step("install", dag.command([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], cwd=ROOT),
+                 cache_key=dag.files_key([os.path.join(ROOT, "requirements.txt")], extra=sys.executable),
+                 description="Installing dependencies"),
+        # Build the API zip (with shared/) and its dependency layer; unchanged inputs reuse the cached artifacts
+        dag.Step("build_api", dag.command([sys.executable, "-m", "tools.lambda_artifacts", "build", "api"], cwd=ROOT),
+                 deps=["install"], description="Building Lambda artifacts"),
+        dag.Step("publish_web", publish_web, description="Publishing static assets"),
+        # Deploy CDK stacks
+        dag.Step("cdk_deploy", dag.command(["cdk", "deploy", "--all", "--require-approval", "never",
+                                            "-c", f"stage={stage}"], cwd=ROOT),
+                 deps=["install", "build_api"], description=f"Deploying CDK stacks to {stage}"),
+        # A few rounds of the synthetic probes after a discarded warm-up round (the new functions' cold starts):
+        # fails on an SLO breach, warns on a tail regression vs earlier deploys
+        dag.Step("smoke", dag.command([sys.executable, "-m", "tools.probes", "--stage", stage, "--warmup", "1",
+                                       "--rounds", "5", "--interval", "1"], cwd=ROOT, echo=True),
+                 deps=["cdk_deploy", "publish_web"], description="Running smoke tests"),
+    ]
+
+
+def main(argv=None):
+    parser = dag.parser("Deploy the CDK app")
+    parser.add_argument("stage", nargs="?", default="dev")
+    args = parser.parse_args(argv)
     
-    print(f"\n✓ Deployment to {stage} completed!")
-    print(f"Run smoke tests: python ops/smoke/test_health.py")
+    print(f"Deploying to {args.stage} environment...")
+    code = dag.run_cli(steps(args.stage), f"cdk-{args.stage}", args, root=ROOT)
+    if code == 0 and not args.plan:
+        print(f"\n✓ Deployment to {args.stage} completed!")
+    return code
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
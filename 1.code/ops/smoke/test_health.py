@@ -1,55 +1,27 @@
 #!/usr/bin/env python3
-import requests
-import boto3
-import sys
+"""
+One round of the synthetic probes (tools/probes.py) against every service of STAGE
+
+A discarded warm-up round goes first so cold starts after a deploy do not fail
+the SLO, and no --state file is read or written: a one-off smoke run neither
+compares against nor updates the latency baseline of the scheduled probes.
+
+Extra arguments are passed through, e.g. --rounds 0 --interval 60 to keep probing
+(or --state PATH to use a baseline anyway).
+"""
 import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+
+from tools import probes  # noqa: E402
 
-def get_endpoints():
-    ssm = boto3.client('ssm', region_name='us-east-1')
-    stage = os.environ.get('STAGE', 'dev')
-    
-    try:
-        api_url = ssm.get_parameter(Name=f'/saas/{stage}/api/url')['Parameter']['Value']
-        user_url = ssm.get_parameter(Name=f'/saas/{stage}/web/user-url')['Parameter']['Value']
-        admin_url = ssm.get_parameter(Name=f'/saas/{stage}/web/admin-url')['Parameter']['Value']
-        return api_url, user_url, admin_url
-    except Exception as e:
-        print(f"Error getting endpoints: {e}")
-        return None, None, None
-
-def test_health_endpoint(url, name):
-    try:
-        response = requests.get(f"{url}/_health", timeout=10)
-        if response.status_code == 200:
-            print(f"✓ {name} health check passed")
-            return True
-        else:
-            print(f"✗ {name} health check failed: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"✗ {name} health check failed: {e}")
-        return False
 
 def main():
     print("Running smoke tests...")
-    
-    api_url, user_url, admin_url = get_endpoints()
-    
-    if not all([api_url, user_url, admin_url]):
-        print("Could not retrieve all endpoints")
-        sys.exit(1)
-    
-    results = []
-    results.append(test_health_endpoint(api_url, "API"))
-    results.append(test_health_endpoint(user_url, "User Web"))
-    results.append(test_health_endpoint(admin_url, "Admin Web"))
-    
-    if all(results):
-        print("\n✓ All smoke tests passed!")
-        sys.exit(0)
-    else:
-        print("\n✗ Some smoke tests failed!")
-        sys.exit(1)
+    sys.exit(probes.main(["--rounds", "1", "--warmup", "1", "--state", "", *sys.argv[1:]]))
+
 
 if __name__ == "__main__":
     main()
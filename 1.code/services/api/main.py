@@ -1,5 +1,6 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request
 from mangum import Mangum
+from starlette.routing import Match
 import os
 import sys
 sys.path.append('/opt/python')
@@ -8,6 +9,7 @@ sys.path.append('../../shared')
 from shared.auth import get_current_user, require_role
 from shared.utils import TenantRepository, UserRepository, ItemRepository
 from shared.models import Tenant, User, Item
+from shared import capacity
 
 app = FastAPI(title="SaaS API")
 
@@ -16,6 +18,15 @@ tenant_repo = TenantRepository(os.environ['TENANTS_TABLE'])
 user_repo = UserRepository(os.environ['USERS_TABLE'])
 item_repo = ItemRepository(os.environ['ITEMS_TABLE'])
 
+@app.middleware("http")
+async def capacity_route(request: Request, call_next):
+    """Attribute DynamoDB capacity to the matched route template"""
+    for route in app.router.routes:
+        if route.matches(request.scope)[0] == Match.FULL:
+            capacity.set_route(f"{request.method} {route.path}")
+            break
+    return await call_next(request)
+
 @app.get("/_health")
 def health_check():
     return {"status": "healthy"}
@@ -58,4 +69,4 @@ def delete_item(item_id: str, current_user: dict = Depends(get_current_user)):
     item_repo.delete(current_user["tenant_id"], item_id)
     return {"message": "Item deleted"}
 
-handler = Mangum(app)
+handler = capacity.accounted("saas-api")(Mangum(app))
@@ -1,64 +1,68 @@
 from fastapi import FastAPI, Request, Form, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-import requests
+from contextlib import asynccontextmanager
+import asyncio
 import os
-import boto3
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
 
-app = FastAPI()
-templates = Jinja2Templates(directory="templates")
+from shared.apiclient import ApiClient
+from shared.config import ParameterStore
 
-ssm = boto3.client('ssm')
 stage = os.environ.get('STAGE', 'dev')
+DEFAULT_API_URL = "http://localhost:8000"
 
-def get_api_url():
+# All /saas/{stage}/... parameters in one call, refreshed in the background
+config = ParameterStore(f'/saas/{stage}')
+api = ApiClient(lambda: config.get('api/url', DEFAULT_API_URL))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(config.load)
+    config.start_refresh()
     try:
-        response = ssm.get_parameter(Name=f'/saas/{stage}/api/url')
-        return response['Parameter']['Value']
-    except:
-        return "http://localhost:8000"
+        yield
+    finally:
+        config.stop_refresh()
+        await api.aclose()
+
+app = FastAPI(lifespan=lifespan)
+templates = Jinja2Templates(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates"))
 
-API_URL = get_api_url()
+def bearer_token(request: Request) -> str:
+    return request.headers.get("Authorization", "").replace("Bearer ", "")
 
 @app.get("/", response_class=HTMLResponse)
-def home(request: Request):
+async def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 @app.get("/tenants", response_class=HTMLResponse)
-def tenants_page(request: Request):
+async def tenants_page(request: Request):
     return templates.TemplateResponse("tenants.html", {"request": request})
 
 @app.post("/tenants")
-def create_tenant(name: str = Form(...), request: Request = None):
-    token = request.headers.get("Authorization", "").replace("Bearer ", "")
+async def create_tenant(name: str = Form(...), request: Request = None):
+    token = bearer_token(request)
     if token:
-        try:
-            requests.post(f"{API_URL}/tenants", 
-                         params={"name": name},
-                         headers={"Authorization": f"Bearer {token}"})
-        except:
-            pass
+        await api.post("/tenants", token, params={"name": name})
     return RedirectResponse("/tenants")
 
 @app.get("/users", response_class=HTMLResponse)
-def users_page(request: Request):
-    token = request.headers.get("Authorization", "").replace("Bearer ", "")
+async def users_page(request: Request):
+    token = bearer_token(request)
     users = []
     if token:
-        try:
-            response = requests.get(f"{API_URL}/users", headers={"Authorization": f"Bearer {token}"})
-            users = response.json() if response.status_code == 200 else []
-        except:
-            pass
+        users = await api.get_json("/users", token, default=[])
     
     return templates.TemplateResponse("users.html", {"request": request, "users": users})
 
 @app.get("/metrics", response_class=HTMLResponse)
-def metrics_page(request: Request):
+async def metrics_page(request: Request):
     return templates.TemplateResponse("metrics.html", {"request": request})
 
 @app.get("/_health")
-def health():
+async def health():
     return {"status": "healthy"}
 
 if __name__ == "__main__":
@@ -1,65 +1,69 @@
 from fastapi import FastAPI, Request, Form, Depends, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-import requests
+from contextlib import asynccontextmanager
+import asyncio
 import os
-import boto3
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
 
-app = FastAPI()
-templates = Jinja2Templates(directory="templates")
+from shared.apiclient import ApiClient
+from shared.config import ParameterStore
 
-ssm = boto3.client('ssm')
 stage = os.environ.get('STAGE', 'dev')
+DEFAULT_API_URL = "http://localhost:8000"
 
-def get_api_url():
+# All /saas/{stage}/... parameters in one call, refreshed in the background
+config = ParameterStore(f'/saas/{stage}')
+api = ApiClient(lambda: config.get('api/url', DEFAULT_API_URL))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(config.load)
+    config.start_refresh()
     try:
-        response = ssm.get_parameter(Name=f'/saas/{stage}/api/url')
-        return response['Parameter']['Value']
-    except:
-        return "http://localhost:8000"
+        yield
+    finally:
+        config.stop_refresh()
+        await api.aclose()
+
+app = FastAPI(lifespan=lifespan)
+templates = Jinja2Templates(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates"))
 
-API_URL = get_api_url()
+def bearer_token(request: Request) -> str:
+    return request.headers.get("Authorization", "").replace("Bearer ", "")
 
 @app.get("/", response_class=HTMLResponse)
-def home(request: Request):
+async def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 @app.get("/login", response_class=HTMLResponse)
-def login_page(request: Request):
+async def login_page(request: Request):
     return templates.TemplateResponse("login.html", {"request": request})
 
 @app.get("/items", response_class=HTMLResponse)
-def items_page(request: Request):
+async def items_page(request: Request):
     # In real app, get token from session/cookie
-    token = request.headers.get("Authorization", "").replace("Bearer ", "")
+    token = bearer_token(request)
     if not token:
         return RedirectResponse("/login")
     
-    try:
-        response = requests.get(f"{API_URL}/items", headers={"Authorization": f"Bearer {token}"})
-        items = response.json() if response.status_code == 200 else []
-    except:
-        items = []
+    items = await api.get_json("/items", token, default=[])
     
     return templates.TemplateResponse("items.html", {"request": request, "items": items})
 
 @app.post("/items")
-def create_item(name: str = Form(...), description: str = Form(""), request: Request = None):
-    token = request.headers.get("Authorization", "").replace("Bearer ", "")
+async def create_item(name: str = Form(...), description: str = Form(""), request: Request = None):
+    token = bearer_token(request)
     if not token:
         return RedirectResponse("/login")
     
-    try:
-        requests.post(f"{API_URL}/items", 
-                     params={"name": name, "description": description},
-                     headers={"Authorization": f"Bearer {token}"})
-    except:
-        pass
+    await api.post("/items", token, params={"name": name, "description": description})
     
     return RedirectResponse("/items")
 
 @app.get("/_health")
-def health():
+async def health():
     return {"status": "healthy"}
 
 if __name__ == "__main__":
@@ -2,8 +2,13 @@ import os
 import secrets
 import hashlib
 import base64
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from urllib.parse import urlencode, quote
-from typing import Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
 
 import httpx
 from fastapi import FastAPI, Request, Response, HTTPException, Depends
@@ -14,8 +19,6 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="Sync Hub Local Dev", version="1.0.0")
-
 # Configuration
 COGNITO_DOMAIN = os.getenv("COGNITO_DOMAIN")
 COGNITO_CLIENT_ID = os.getenv("COGNITO_CLIENT_ID")
@@ -23,6 +26,58 @@ REDIRECT_URI = os.getenv("REDIRECT_URI")
 LOGOUT_URI = os.getenv("LOGOUT_URI")
 API_BASE = os.getenv("API_BASE")
 
+# Upstream HTTP clients: one pool per upstream for the app's lifetime
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+
+# /me profile cache
+USERINFO_CACHE_TTL = float(os.getenv("USERINFO_CACHE_TTL", "300"))
+USERINFO_CACHE_SIZE = int(os.getenv("USERINFO_CACHE_SIZE", "1000"))
+USERINFO_FROM_ID_TOKEN = os.getenv("USERINFO_FROM_ID_TOKEN", "false").lower() in ("1", "true", "yes", "on")
+
+def http2_available() -> bool:
+    """httpx only speaks HTTP/2 when the optional h2 package is installed"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def make_client(base_url: Optional[str]) -> httpx.AsyncClient:
+    """Pooled keep-alive client for one upstream"""
+    return httpx.AsyncClient(
+        base_url=base_url or "",
+        http2=http2_available(),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT, pool=HTTP_CONNECT_TIMEOUT),
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Open the upstream pools at startup and close them at shutdown"""
+    app.state.cognito = make_client(COGNITO_DOMAIN)
+    app.state.api = make_client(API_BASE)
+    try:
+        yield
+    finally:
+        await app.state.cognito.aclose()
+        await app.state.api.aclose()
+
+def cognito_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.cognito
+
+def api_client(request: Request) -> httpx.AsyncClient:
+    return request.app.state.api
+
+app = FastAPI(title="Sync Hub Local Dev", version="1.0.0", lifespan=lifespan)
+
 class TokenResponse(BaseModel):
     access_token: str
     id_token: str
@@ -36,6 +91,94 @@ class UserInfo(BaseModel):
     given_name: Optional[str] = None
     family_name: Optional[str] = None
 
+def token_expiry(token: str) -> Optional[float]:
+    """The JWT's `exp` (read without verifying: it only bounds how long we cache)"""
+    try:
+        payload = token.split(".")[1]
+        return float(json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+class UserInfoCache:
+    """Bounded TTL cache of profiles keyed by a hash of the access token, with single-flight fetches"""
+
+    def __init__(self, ttl: float = USERINFO_CACHE_TTL, max_entries: int = USERINFO_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[bytes, "asyncio.Future[Dict[str, Any]]"] = {}
+
+    async def get(self, token: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self._entries.move_to_end(key)
+                return entry[1]
+            del self._entries[key]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            # Concurrent loads share the first request's upstream call
+            return await asyncio.shield(pending)
+
+        pending = self._inflight[key] = asyncio.ensure_future(fetch())
+        try:
+            profile = await asyncio.shield(pending)
+        finally:
+            self._inflight.pop(key, None)
+
+        expires_at = time.time() + self.ttl
+        exp = token_expiry(token)
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        if expires_at > time.time():
+            self._entries[key] = (expires_at, profile)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return profile
+
+userinfo_cache = UserInfoCache()
+
+_id_token_verifier = None
+
+def profile_from_id_token(id_token: Optional[str], access_token: str) -> Optional[Dict[str, Any]]:
+    """The /me profile from a verified id_token of the same session as access_token, or None
+
+    Blocking (the first verification and every JWKS refresh fetch the key set): run it off the event loop.
+    """
+    global _id_token_verifier
+    if not id_token:
+        return None
+    from shared import tokens
+    try:
+        if _id_token_verifier is None:
+            pool = os.getenv("COGNITO_USER_POOL_ID") or os.getenv("USER_POOL_ID") or "local_pool"
+            client_ids = [COGNITO_CLIENT_ID] if COGNITO_CLIENT_ID else []
+            _id_token_verifier = tokens.Verifier.for_user_pool(pool, os.getenv("AWS_REGION"), client_ids,
+                                                               token_use=("id", "access"))
+        claims = _id_token_verifier.verify(id_token)
+        session = _id_token_verifier.verify(access_token)
+    except tokens.TokenError as e:
+        print(f"id_token not usable for /me: {e}")
+        return None
+    if claims.get("token_use") != "id" or session.get("token_use") != "access":
+        print("id_token not usable for /me: wrong token_use")
+        return None
+    if claims.get("sub") != session.get("sub") or claims.get("aud") != session.get("client_id"):
+        print("id_token not usable for /me: not from the access token's session")
+        return None
+    profile = {
+        "sub": claims.get("sub"),
+        "email": claims.get("email"),
+        "email_verified": str(claims.get("email_verified", False)).lower(),
+        "username": claims.get("cognito:username"),
+    }
+    for name in ("given_name", "family_name", "name", "picture"):
+        if name in claims:
+            profile[name] = claims[name]
+    return profile
+
 def generate_pkce_pair() -> tuple[str, str]:
     """Generate PKCE code verifier and challenge"""
     code_verifier = base64.urlsafe_b64encode(secrets.token_bytes(32)).decode('utf-8').rstrip('=')
@@ -135,7 +278,8 @@ async def login_start(response: Response):
     return RedirectResponse(url=auth_url)
 
 @app.get("/callback")
-async def callback(request: Request, response: Response, code: str):
+async def callback(request: Request, response: Response, code: str,
+                   client: httpx.AsyncClient = Depends(cognito_client)):
     """Handle OAuth callback and exchange code for tokens"""
     code_verifier = request.cookies.get("code_verifier")
     if not code_verifier:
@@ -150,12 +294,11 @@ async def callback(request: Request, response: Response, code: str):
         "code_verifier": code_verifier
     }
     
-    async with httpx.AsyncClient() as client:
-        token_response = await client.post(
-            f"{COGNITO_DOMAIN}/oauth2/token",
-            data=token_data,
-            headers={"Content-Type": "application/x-www-form-urlencoded"}
-        )
+    token_response = await client.post(
+        "/oauth2/token",
+        data=token_data,
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    )
     
     if token_response.status_code != 200:
         raise HTTPException(
@@ -188,28 +331,33 @@ async def callback(request: Request, response: Response, code: str):
     return RedirectResponse(url="/", status_code=302)
 
 @app.get("/me")
-async def get_user_info(request: Request):
-    """Get user information from Cognito"""
+async def get_user_info(request: Request, client: httpx.AsyncClient = Depends(cognito_client)):
+    """Get user information from Cognito (cached per access token)"""
     access_token = get_access_token(request)
     if not access_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    async with httpx.AsyncClient() as client:
+    if USERINFO_FROM_ID_TOKEN:
+        profile = await asyncio.to_thread(profile_from_id_token, request.cookies.get("id_token"), access_token)
+        if profile is not None:
+            return profile
+
+    async def fetch_user_info() -> Dict[str, Any]:
         user_response = await client.get(
-            f"{COGNITO_DOMAIN}/oauth2/userInfo",
+            "/oauth2/userInfo",
             headers={"Authorization": f"Bearer {access_token}"}
         )
-    
-    if user_response.status_code != 200:
-        raise HTTPException(
-            status_code=401, 
-            detail="Failed to get user info"
-        )
-    
-    return user_response.json()
+        if user_response.status_code != 200:
+            raise HTTPException(
+                status_code=401,
+                detail="Failed to get user info"
+            )
+        return user_response.json()
+
+    return await userinfo_cache.get(access_token, fetch_user_info)
 
 @app.get("/settings/public")
-async def get_public_settings(request: Request):
+async def get_public_settings(request: Request, client: httpx.AsyncClient = Depends(api_client)):
     """Proxy to API Gateway /settings/public endpoint"""
     access_token = get_access_token(request)
     
@@ -217,11 +365,7 @@ async def get_public_settings(request: Request):
     if access_token:
         headers["Authorization"] = f"Bearer {access_token}"
     
-    async with httpx.AsyncClient() as client:
-        api_response = await client.get(
-            f"{API_BASE}/settings/public",
-            headers=headers
-        )
+    api_response = await client.get("/settings/public", headers=headers)
     
     if api_response.status_code != 200:
         raise HTTPException(
@@ -0,0 +1,60 @@
+"""
+Async, pooled client for the SaaS API used by the web apps
+
+    api = ApiClient(lambda: config.get("api/url", DEFAULT_API_URL))
+    items = await api.get_json("/items", token, default=[])
+    await api.post("/items", token, params={"name": name})
+    await api.aclose()                 # app shutdown
+
+One httpx.AsyncClient (keep-alive pool, bounded timeouts) is shared by every
+request. The base URL is resolved per call, so a refreshed API URL takes effect
+without a restart. Calls from page handlers behave like the old `requests`
+calls did: a failed upstream yields the default instead of an error page.
+"""
+import os
+from typing import Any, Callable, Dict, Optional, Union
+
+import httpx
+
+MAX_CONNECTIONS = int(os.getenv("API_MAX_CONNECTIONS", "50"))
+MAX_KEEPALIVE = int(os.getenv("API_MAX_KEEPALIVE", "20"))
+CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "10"))
+
+
+class ApiClient:
+    def __init__(self, base_url: Union[str, Callable[[], str]], transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._base_url = base_url if callable(base_url) else (lambda: base_url)
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE,
+                                keepalive_expiry=30),
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT, pool=CONNECT_TIMEOUT),
+        )
+
+    def url(self, path: str) -> str:
+        return self._base_url().rstrip("/") + path
+
+    @staticmethod
+    def _headers(token: Optional[str]) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    async def get_json(self, path: str, token: Optional[str] = None, default: Any = None, **kwargs: Any) -> Any:
+        """Decoded JSON of a 200 response, otherwise default"""
+        try:
+            response = await self.client.get(self.url(path), headers=self._headers(token), **kwargs)
+            return response.json() if response.status_code == 200 else default
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"API GET {path} failed: {e}")
+            return default
+
+    async def post(self, path: str, token: Optional[str] = None, **kwargs: Any) -> Optional[httpx.Response]:
+        """The response, or None when the API could not be reached"""
+        try:
+            return await self.client.post(self.url(path), headers=self._headers(token), **kwargs)
+        except httpx.HTTPError as e:
+            print(f"API POST {path} failed: {e}")
+            return None
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
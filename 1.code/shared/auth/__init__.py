@@ -1,17 +1,20 @@
-import jwt
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Dict, List
 import os
 
+from shared import capacity, tokens
+
 security = HTTPBearer()
 
 def decode_jwt(token: str) -> Dict:
+    """Verified claims (shared.tokens caches the JWKS and recently verified tokens)"""
     try:
-        payload = jwt.decode(token, options={"verify_signature": False})
-        return payload
-    except jwt.InvalidTokenError:
+        return tokens.verify(token)
+    except tokens.TokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    except tokens.VerifierUnavailable as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict:
     payload = decode_jwt(credentials.credentials)
@@ -20,6 +23,7 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     
     if not tenant_id:
         raise HTTPException(status_code=401, detail="No tenant_id in token")
+    capacity.set_tenant(tenant_id)
     
     return {
         "user_id": payload.get("sub"),
@@ -0,0 +1,113 @@
+"""
+Process-wide, lazily created boto3 clients, resources and DynamoDB tables
+
+Nothing here imports boto3 until the first call, so modules can keep their table
+and client lookups at hand without paying the SDK import and the service-model
+loads during Lambda init. Every handler shares one DynamoDB resource (and so one
+client and connection pool) instead of building its own. DynamoDB clients are
+instrumented for shared.metrics (call latency and consumed capacity),
+shared.timing (Server-Timing entries), shared.capacity (per-tenant RCU/WCU) and
+shared.hotkeys (hot partition keys).
+
+    from shared import aws
+    aws.table(os.environ["SETTINGS_TABLE"]).query(...)
+    aws.client("cognito-idp").list_users(...)
+"""
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from shared import capacity, hotkeys, metrics, timing
+
+_lock = threading.RLock()
+_clients: Dict[Tuple[str, Any], Any] = {}
+_resources: Dict[Tuple[str, Any], Any] = {}
+_tables: Dict[str, Any] = {}
+_session = None
+
+
+def _request_capacity(params: Dict[str, Any], model: Any, **kwargs: Any) -> None:
+    """Ask for ReturnConsumedCapacity=TOTAL while metrics or capacity accounting is collecting
+
+    One hook for both readers: each reads ConsumedCapacity from the response in its own after-call hook.
+    before-parameter-build, because provide-client-params handlers may swap the dict (botocore copies
+    DynamoDB params).
+    """
+    if "ReturnConsumedCapacity" in params or (metrics.current() is None and capacity.current() is None):
+        return
+    if "ReturnConsumedCapacity" in model.input_shape.members:
+        params["ReturnConsumedCapacity"] = "TOTAL"
+
+
+def _instrument_dynamodb(dynamodb_client) -> None:
+    dynamodb_client.meta.events.register("before-parameter-build.dynamodb", _request_capacity,
+                                         unique_id="shared-aws-capacity")
+    metrics.instrument_dynamodb(dynamodb_client)
+    timing.instrument_dynamodb(dynamodb_client)
+    capacity.instrument_dynamodb(dynamodb_client)
+    hotkeys.instrument_dynamodb(dynamodb_client)
+
+
+def session():
+    """The shared boto3 Session (boto3 is imported on first use)"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                import boto3
+                _session = boto3.session.Session()
+    return _session
+
+
+def client(service: str, region_name: Optional[str] = None, instrumented: bool = True):
+    """Memoized low-level client; boto3 clients are thread-safe and meant to be reused
+
+    instrumented=False gives a separate DynamoDB client without the hooks, for the
+    instrumentation's own housekeeping calls (they are not the tenant's traffic)
+    """
+    key = (service, region_name) if instrumented else (service, region_name, "plain")
+    cached = _clients.get(key)
+    if cached is None:
+        with _lock:
+            cached = _clients.get(key)
+            if cached is None:
+                cached = session().client(service, region_name=region_name)
+                if service == "dynamodb" and instrumented:
+                    _instrument_dynamodb(cached)
+                _clients[key] = cached
+    return cached
+
+
+def resource(service: str, region_name: Optional[str] = None):
+    """Memoized resource; only used from the request thread, like the handlers always did"""
+    key = (service, region_name)
+    cached = _resources.get(key)
+    if cached is None:
+        with _lock:
+            cached = _resources.get(key)
+            if cached is None:
+                cached = session().resource(service, region_name=region_name)
+                if service == "dynamodb":
+                    _instrument_dynamodb(cached.meta.client)
+                _resources[key] = cached
+    return cached
+
+
+def table(name: str):
+    """Memoized DynamoDB Table on the shared resource"""
+    cached = _tables.get(name)
+    if cached is None:
+        with _lock:
+            cached = _tables.get(name)
+            if cached is None:
+                cached = _tables[name] = resource("dynamodb").Table(name)
+    return cached
+
+
+def reset() -> None:
+    """Drop every cached object (tests that switch credentials or mock AWS)"""
+    global _session
+    with _lock:
+        _clients.clear()
+        _resources.clear()
+        _tables.clear()
+        _session = None
@@ -0,0 +1,144 @@
+"""
+Per-tenant DynamoDB consumed-capacity accounting
+
+Every DynamoDB call made through shared.aws while an invocation is being
+accounted is sent with ReturnConsumedCapacity=TOTAL, and the returned RCU/WCU
+are added to a ledger keyed by (tenant, route, table). The ledger is flushed
+once at the end of the invocation as `tenant_capacity` records:
+
+    {"type": "tenant_capacity", "service": "sync-hub-api", "tenant_id": "t-1",
+     "route": "GET /settings", "table": "sync-hub-settings", "rcu": 1.5, "wcu": 0.0, "calls": 2, ...}
+
+Records go to the same sinks as shared.metrics (stdout in Lambda, METRICS_SINK_FILE
+locally) and are aggregated offline by tools/capacity_report.
+
+    @capacity.accounted("sync-hub-api")
+    def handler(event, context):
+        capacity.set_tenant(tenant_id)
+        capacity.set_route("GET /settings")
+
+CAPACITY_ACCOUNTING=true/false overrides the default (on wherever metrics are on).
+"""
+import contextvars
+import functools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from shared import metrics
+
+UNKNOWN_TENANT = "-"
+READ_OPERATIONS = metrics.READ_OPERATIONS
+
+
+class Ledger:
+    """Capacity consumed during one invocation; tenant/route are the current attribution"""
+
+    def __init__(self, service: str):
+        self.service = service
+        self.tenant_id = UNKNOWN_TENANT
+        self.route = metrics.UNMATCHED_ROUTE
+        self.entries: Dict[Tuple[str, str, str], List[float]] = {}
+        self.lock = threading.Lock()
+
+    def add(self, operation: str, consumed: Any) -> None:
+        is_read = operation in READ_OPERATIONS
+        entries = consumed if isinstance(consumed, list) else [consumed]
+        with self.lock:
+            for entry in entries:
+                units = float(entry.get("CapacityUnits", 0))
+                key = (self.tenant_id, self.route, entry.get("TableName", "unknown"))
+                totals = self.entries.setdefault(key, [0.0, 0.0, 0])
+                totals[0] += float(entry.get("ReadCapacityUnits", units if is_read else 0))
+                totals[1] += float(entry.get("WriteCapacityUnits", 0 if is_read else units))
+                totals[2] += 1
+
+    def records(self) -> List[Dict[str, Any]]:
+        timestamp = int(time.time() * 1000)
+        return [
+            {
+                "type": "tenant_capacity",
+                "timestamp": timestamp,
+                "service": self.service,
+                "tenant_id": tenant_id,
+                "route": route,
+                "table": table,
+                "rcu": rcu,
+                "wcu": wcu,
+                "calls": calls,
+            }
+            for (tenant_id, route, table), (rcu, wcu, calls) in self.entries.items()
+        ]
+
+
+_current: contextvars.ContextVar[Optional[Ledger]] = contextvars.ContextVar("capacity_ledger", default=None)
+
+
+def enabled() -> bool:
+    flag = os.getenv("CAPACITY_ACCOUNTING")
+    if flag is not None:
+        return flag.lower() in ("1", "true", "yes", "on")
+    return metrics.enabled()
+
+
+def begin(service: str) -> Optional[Ledger]:
+    if not enabled():
+        return None
+    ledger = Ledger(service)
+    _current.set(ledger)
+    return ledger
+
+
+def flush(ledger: Optional[Ledger]) -> None:
+    """Emit the invocation's records and stop accounting"""
+    if ledger is None:
+        return
+    _current.set(None)
+    for record in ledger.records():
+        metrics.emit(record)
+
+
+def current() -> Optional[Ledger]:
+    return _current.get()
+
+
+def set_tenant(tenant_id: Optional[str]) -> None:
+    ledger = _current.get()
+    if ledger is not None:
+        ledger.tenant_id = tenant_id or UNKNOWN_TENANT
+
+
+def set_route(name: str) -> None:
+    ledger = _current.get()
+    if ledger is not None:
+        ledger.route = name
+
+
+def accounted(service: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator for Lambda handlers: one ledger per invocation, flushed when it returns"""
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            ledger = begin(service)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                flush(ledger)
+        return wrapper
+    return decorate
+
+
+# DynamoDB hooks
+
+def _after_call(parsed: Dict[str, Any], model: Any, **kwargs: Any) -> None:
+    ledger = _current.get()
+    if ledger is not None and parsed.get("ConsumedCapacity"):
+        ledger.add(model.name, parsed["ConsumedCapacity"])
+
+
+def instrument_dynamodb(client: Any) -> Any:
+    """Read consumed capacity after each call; shared.aws asks for it while a ledger is open"""
+    events = client.meta.events
+    events.register("after-call.dynamodb", _after_call, unique_id="shared-capacity-after")
+    return client
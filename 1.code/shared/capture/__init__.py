@@ -0,0 +1,251 @@
+"""
+Opt-in, sampled capture of API Gateway events for offline replay
+
+    @capture.captured("sync-hub-api", route_of=route_name)
+    def handler(event, context): ...
+
+A CAPTURE_SAMPLE_RATE fraction of invocations (default 0: off) is recorded with
+the response status, size and handler duration. Events are sanitized before they
+are kept (see sanitize_event):
+- only the headers replay needs survive; Authorization, cookies, API keys and
+  client addresses are dropped, as are token-like query parameters
+- tenant ids and subjects are replaced by salted hashes (CAPTURE_SALT), other
+  claims except is_admin and tier are dropped; user ids in the path (the
+  members/{uid} segment, the uid path parameter and any segment equal to a
+  hashed claim) are hashed the same way, in rawPath, http.path and
+  pathParameters alike
+- bodies keep their JSON structure and sizes with every string blanked
+  (CAPTURE_BODIES=shape, default), are kept verbatim (full) or dropped (none)
+
+Records are buffered per container and written as gzipped NDJSON batches under
+CAPTURE_OUTPUT (a local directory, default /tmp/captures, or s3://bucket/prefix)
+as <service>/<date>/<timestamp>-<pid>-<seq>.ndjson.gz, once CAPTURE_BATCH records
+are buffered or the oldest is CAPTURE_FLUSH_SECONDS old. A batch still buffered
+when Lambda reclaims the container is lost, which is fine for a sample.
+tools/replay.py reads the files back (read_records) and replays them.
+
+With the rate at 0 the decorator returns the handler unchanged; otherwise a
+missed sample costs one random() call. CAPTURE_SALT is required: tenant ids are
+guessable (email prefixes), so an unsalted hash would not hide them, and without
+a salt capture stays off whatever the rate.
+"""
+import atexit
+import base64
+import functools
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+SAMPLE_RATE = float(os.getenv("CAPTURE_SAMPLE_RATE", "0"))
+OUTPUT = os.getenv("CAPTURE_OUTPUT", "/tmp/captures")
+SALT = os.getenv("CAPTURE_SALT", "")
+BODIES = os.getenv("CAPTURE_BODIES", "shape")
+BATCH = int(os.getenv("CAPTURE_BATCH", "100"))
+FLUSH_SECONDS = float(os.getenv("CAPTURE_FLUSH_SECONDS", "60"))
+
+KEPT_HEADERS = {"accept", "accept-encoding", "content-type", "content-length", "if-match", "if-none-match"}
+DROPPED_QUERY = {"token", "access_token", "id_token", "refresh_token", "code", "api_key", "apikey", "key",
+                 "signature", "x-amz-security-token"}
+HASHED_CLAIMS = ("tenant_id", "custom:tenant_id", "sub")
+HASHED_PATH_PARAMETERS = ("uid",)
+USER_ID_SEGMENT_RE = re.compile(r"(/members/)([^/]+)")
+KEPT_CLAIMS = ("is_admin", "tier", "custom:tier")
+
+
+def hash_id(value: str, salt: str = SALT) -> str:
+    """Stable pseudonym for a tenant or user id; the same id hashes alike across containers"""
+    return "h-" + hashlib.sha256(f"{salt}:{value}".encode("utf-8")).hexdigest()[:16]
+
+
+def _shape(value: Any) -> Any:
+    if isinstance(value, str):
+        return "x" * len(value)
+    if isinstance(value, dict):
+        return {k: _shape(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_shape(v) for v in value]
+    return value
+
+
+def sanitize_body(body: Optional[str], is_base64: bool, mode: str = BODIES) -> Optional[str]:
+    if body is None or mode == "full":
+        return body
+    if mode == "none":
+        return None
+    if not is_base64:
+        try:
+            return json.dumps(_shape(json.loads(body)), separators=(",", ":"))
+        except ValueError:
+            pass
+    return "x" * len(body)
+
+
+def sanitize_path(path: Optional[str], salt: str, raw_ids: Any = ()) -> Optional[str]:
+    """The path with the members/{uid} segment and any segment in raw_ids replaced by its hash"""
+    if not path:
+        return path
+    path = USER_ID_SEGMENT_RE.sub(lambda match: match.group(1) + hash_id(match.group(2), salt), path)
+    return "/".join(hash_id(segment, salt) if segment in raw_ids else segment for segment in path.split("/"))
+
+
+def sanitize_event(event: Dict[str, Any], salt: str = SALT, bodies: str = BODIES) -> Dict[str, Any]:
+    """Copy of an HTTP API (v2) event with credentials, personal data and tenant ids removed"""
+    context = event.get("requestContext") or {}
+    http = context.get("http") or {}
+    claims = ((context.get("authorizer") or {}).get("jwt") or {}).get("claims") or {}
+    kept_claims = {name: hash_id(str(claims[name]), salt) for name in HASHED_CLAIMS if name in claims}
+    kept_claims.update({name: claims[name] for name in KEPT_CLAIMS if name in claims})
+    query = {k: v for k, v in (event.get("queryStringParameters") or {}).items() if k.lower() not in DROPPED_QUERY}
+    raw_ids = {str(claims[name]) for name in HASHED_CLAIMS if claims.get(name)}
+
+    sanitized = {
+        "version": event.get("version", "2.0"),
+        "routeKey": event.get("routeKey", "$default"),
+        "rawPath": sanitize_path(event.get("rawPath", http.get("path")), salt, raw_ids),
+        "rawQueryString": "&".join(f"{k}={v}" for k, v in query.items()),
+        "headers": {k: v for k, v in (event.get("headers") or {}).items() if k.lower() in KEPT_HEADERS},
+        "requestContext": {
+            "http": {"method": http.get("method"), "path": sanitize_path(http.get("path"), salt, raw_ids),
+                     "protocol": http.get("protocol")},
+            "routeKey": context.get("routeKey", "$default"),
+            "stage": context.get("stage", "$default"),
+            "timeEpoch": context.get("timeEpoch"),
+            "authorizer": {"jwt": {"claims": kept_claims}},
+        },
+        "isBase64Encoded": bool(event.get("isBase64Encoded")),
+    }
+    if query:
+        sanitized["queryStringParameters"] = query
+    if event.get("pathParameters"):
+        sanitized["pathParameters"] = {
+            name: hash_id(str(value), salt) if name in HASHED_PATH_PARAMETERS or str(value) in raw_ids else value
+            for name, value in event["pathParameters"].items()
+        }
+    body = sanitize_body(event.get("body"), sanitized["isBase64Encoded"], bodies)
+    if body is not None:
+        sanitized["body"] = body
+    return sanitized
+
+
+def _write(key: str, data: bytes, output: str) -> str:
+    if output.startswith("s3://"):
+        from shared import aws
+        bucket, _, prefix = output[len("s3://"):].partition("/")
+        full_key = f"{prefix.rstrip('/')}/{key}" if prefix else key
+        aws.client("s3").put_object(Bucket=bucket, Key=full_key, Body=data, ContentEncoding="gzip",
+                                    ContentType="application/x-ndjson")
+        return f"s3://{bucket}/{full_key}"
+    path = os.path.join(output, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+class Recorder:
+    """Per-container buffer of captured records, written out in gzipped NDJSON batches"""
+
+    def __init__(self, service: str, output: str = OUTPUT, batch: int = BATCH, flush_seconds: float = FLUSH_SECONDS):
+        self.service = service
+        self.output = output
+        self.batch = batch
+        self.flush_seconds = flush_seconds
+        self.records: List[str] = []
+        self.oldest = 0.0
+        self.sequence = 0
+        self._lock = threading.Lock()
+
+    def add(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":"), default=str)
+        with self._lock:
+            if not self.records:
+                self.oldest = time.monotonic()
+            self.records.append(line)
+            due = len(self.records) >= self.batch or time.monotonic() - self.oldest >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def flush(self) -> Optional[str]:
+        with self._lock:
+            records, self.records = self.records, []
+            self.sequence += 1
+            sequence = self.sequence
+        if not records:
+            return None
+        now = datetime.utcnow()
+        key = f"{self.service}/{now:%Y-%m-%d}/{now:%Y%m%dT%H%M%S}-{os.getpid()}-{sequence:04d}.ndjson.gz"
+        try:
+            return _write(key, gzip.compress(("\n".join(records) + "\n").encode("utf-8")), self.output)
+        except Exception as e:
+            print(f"Failed to write capture batch: {e}")
+            return None
+
+
+def captured(service: str, route_of: Optional[Callable[[Any], str]] = None, sample_rate: Optional[float] = None,
+             output: Optional[str] = None, salt: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator for `handler(event, context)`; route_of(event) names the route in each record"""
+    rate = SAMPLE_RATE if sample_rate is None else sample_rate
+    salt = SALT if salt is None else salt
+    resolve = route_of or (lambda event: "all")
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if rate <= 0:
+            return fn
+        if not salt:
+            print(f"Event capture for {service} stays off: CAPTURE_SALT is not set")
+            return fn
+        recorder = Recorder(service, output or OUTPUT)
+        atexit.register(recorder.flush)
+
+        @functools.wraps(fn)
+        def wrapper(event: Dict[str, Any], context: Any) -> Any:
+            if random.random() >= rate:
+                return fn(event, context)
+            received = time.time()
+            started = time.perf_counter()
+            response = fn(event, context)
+            duration_ms = (time.perf_counter() - started) * 1000
+            try:
+                body = response.get("body") or ""
+                recorder.add({
+                    "ts": received,
+                    "service": service,
+                    "route": resolve(event),
+                    "sample_rate": rate,
+                    "event": sanitize_event(event, salt),
+                    "status": response.get("statusCode"),
+                    "response_bytes": len(base64.b64decode(body)) if response.get("isBase64Encoded") else len(body),
+                    "duration_ms": round(duration_ms, 3),
+                })
+            except Exception as e:
+                print(f"Failed to capture event: {e}")
+            return response
+
+        wrapper.recorder = recorder
+        return wrapper
+
+    return decorate
+
+
+def read_records(paths: List[str]) -> Iterator[Dict[str, Any]]:
+    """Records from capture files (.ndjson.gz or plain .ndjson) and directories of them, in file order"""
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                files.extend(os.path.join(directory, name) for name in names if ".ndjson" in name)
+        else:
+            files.append(path)
+    for path in sorted(files):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -0,0 +1,116 @@
+"""
+SSM Parameter Store configuration loaded by path and cached in process
+
+    config = ParameterStore(f"/saas/{stage}")
+    config.load()                      # one GetParametersByPath walk (paginated)
+    config.start_refresh()             # background thread, every CONFIG_REFRESH_SECONDS
+    api_url = config.get("api/url", "http://localhost:8000")
+
+Names are relative to the path. Reads never call AWS: they see the last
+successful load. A failed refresh keeps the previous values. The plain String
+values are also written to a small JSON file (mode 0600, in CONFIG_CACHE_DIR or
+a per-user 0700 directory under the temp dir), so a restart while SSM is
+unreachable starts from the last known config instead of the defaults.
+SecureString values are never written to disk: after such a restart they read
+as their defaults until a load succeeds.
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+REFRESH_SECONDS = float(os.getenv("CONFIG_REFRESH_SECONDS", "300"))
+CACHE_DIR = os.getenv("CONFIG_CACHE_DIR") or os.path.join(tempfile.gettempdir(), f"saas-config-{os.getuid()}")
+
+
+class Secret(str):
+    """A decrypted SecureString value: used like any str, but never persisted"""
+
+
+def fetch_parameters(path: str) -> Dict[str, str]:
+    """Every parameter under path (recursive, SecureStrings decrypted as Secret), keyed by relative name"""
+    from shared import aws
+    paginator = aws.client("ssm").get_paginator("get_parameters_by_path")
+    prefix = path.rstrip("/") + "/"
+    values = {}
+    for page in paginator.paginate(Path=path, Recursive=True, WithDecryption=True):
+        for parameter in page["Parameters"]:
+            name = parameter["Name"]
+            value = parameter["Value"]
+            if parameter.get("Type") == "SecureString":
+                value = Secret(value)
+            values[name[len(prefix):] if name.startswith(prefix) else name] = value
+    return values
+
+
+class ParameterStore:
+    def __init__(self, path: str, refresh_seconds: float = REFRESH_SECONDS,
+                 fetch: Callable[[str], Dict[str, str]] = fetch_parameters, cache_dir: Optional[str] = CACHE_DIR):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.fetch = fetch
+        self.cache_file = (os.path.join(cache_dir, "config-" + re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-") + ".json")
+                           if cache_dir else None)
+        self.values: Dict[str, str] = {}
+        self.loaded_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self) -> bool:
+        """Refresh from SSM; on failure keep (or restore) the last known values"""
+        try:
+            values = self.fetch(self.path)
+        except Exception as e:
+            print(f"Config load from {self.path} failed, keeping last known values: {e}")
+            if self.loaded_at is None:
+                self._restore()
+            return False
+        self.values = values  # swapped whole, so readers never see a partial update
+        self.loaded_at = time.time()
+        self._persist()
+        return True
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.values.get(name, default)
+
+    def start_refresh(self) -> None:
+        if self._thread is None and self.refresh_seconds > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="config-refresh", daemon=True)
+            self._thread.start()
+
+    def stop_refresh(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_seconds):
+            self.load()
+
+    def _persist(self) -> None:
+        if not self.cache_file:
+            return
+        values = {name: value for name, value in self.values.items() if not isinstance(value, Secret)}
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), mode=0o700, exist_ok=True)
+            tmp = self.cache_file + ".tmp"
+            with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+                json.dump({"path": self.path, "loaded_at": self.loaded_at, "values": values}, f)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            print(f"Could not write config cache: {e}")
+
+    def _restore(self) -> None:
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                self.values = json.load(f)["values"]
+            print(f"Using last known config for {self.path} from {self.cache_file}")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not read config cache: {e}")
@@ -0,0 +1,344 @@
+"""
+Hot partition-key detection with a streaming heavy-hitters sketch
+
+Every DynamoDB call made through shared.aws feeds its (table, partition key)
+pairs into a per-container Count-Min Sketch plus a small top-K candidate set.
+Memory stays fixed (width x depth counters) however many distinct keys are seen.
+Once per window (HOTKEY_WINDOW_SECONDS, default 60) the container emits one
+`hotkey_sketch` record to the shared.metrics sinks and starts a new window:
+
+    {"type": "hotkey_sketch", "service": "sync-hub", "window_start": ..., "total": 5120,
+     "tables": {"sync-hub-settings": 4800, ...}, "sketch": {"width": 2048, "depth": 4, "counts": "<zlib+b64>"},
+     "top": [["sync-hub-settings", "tenant-42", 3100], ...]}
+
+Hashing is deterministic (blake2b), so sketches from every container merge by
+adding counters; tools/hotkey_report merges them and flags keys whose share of
+their table's traffic is above a threshold. The window being accumulated when a
+container is recycled is lost, which is fine for a sampling signal.
+
+The partition key is the attribute named for the table in HOTKEY_PARTITION_KEYS
+("table=attr,table2=attr"), otherwise the table's HASH key from DescribeTable,
+looked up once per table and container on an uninstrumented client. A table
+that cannot be described (no dynamodb:DescribeTable permission) is not tracked.
+HOTKEY_TRACKING=true/false overrides the default (on wherever metrics are on).
+"""
+import base64
+import os
+import re
+import threading
+import time
+import zlib
+from array import array
+from hashlib import blake2b
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from shared import metrics
+
+WIDTH = int(os.getenv("HOTKEY_WIDTH", "2048"))
+DEPTH = int(os.getenv("HOTKEY_DEPTH", "4"))
+TOP_K = int(os.getenv("HOTKEY_TOP_K", "32"))
+WINDOW_SECONDS = float(os.getenv("HOTKEY_WINDOW_SECONDS", "60"))
+SEPARATOR = "\x1f"
+
+
+class CountMinSketch:
+    """Approximate counts: estimates never undercount, and overcount by ~e/width of the total"""
+
+    def __init__(self, width: int = WIDTH, depth: int = DEPTH, counts: Optional[array] = None):
+        if not 1 <= depth <= 16:
+            raise ValueError("depth must be between 1 and 16")
+        self.width = width
+        self.depth = depth
+        self.counts = counts if counts is not None else array("Q", bytes(8 * width * depth))
+
+    def _cells(self, key: str) -> List[int]:
+        digest = blake2b(key.encode("utf-8"), digest_size=4 * self.depth).digest()
+        width = self.width
+        return [row * width + int.from_bytes(digest[4 * row:4 * row + 4], "little") % width
+                for row in range(self.depth)]
+
+    def add(self, key: str, count: int = 1) -> int:
+        """Count key and return its new estimate"""
+        counts = self.counts
+        estimate = None
+        for cell in self._cells(key):
+            counts[cell] += count
+            if estimate is None or counts[cell] < estimate:
+                estimate = counts[cell]
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        counts = self.counts
+        return min(counts[cell] for cell in self._cells(key))
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("cannot merge sketches of different dimensions")
+        counts = self.counts
+        for i, value in enumerate(other.counts):
+            if value:
+                counts[i] += value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "width": self.width,
+            "depth": self.depth,
+            "counts": base64.b64encode(zlib.compress(self.counts.tobytes())).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CountMinSketch":
+        counts = array("Q")
+        counts.frombytes(zlib.decompress(base64.b64decode(data["counts"])))
+        return cls(data["width"], data["depth"], counts)
+
+
+class HeavyHitters:
+    """Count-Min Sketch plus the k keys with the highest estimates seen so far"""
+
+    def __init__(self, k: int = TOP_K, width: int = WIDTH, depth: int = DEPTH):
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        self.candidates: Dict[str, int] = {}
+        self.total = 0
+
+    def add(self, key: str, count: int = 1) -> None:
+        self.total += count
+        estimate = self.sketch.add(key, count)
+        candidates = self.candidates
+        if key in candidates or len(candidates) < self.k:
+            candidates[key] = estimate
+            return
+        smallest = min(candidates, key=candidates.__getitem__)
+        if estimate > candidates[smallest]:
+            del candidates[smallest]
+            candidates[key] = estimate
+
+    def merge(self, other: "HeavyHitters") -> None:
+        """Fold another tracker in; candidates are re-estimated against the merged sketch"""
+        self.sketch.merge(other.sketch)
+        self.total += other.total
+        keys = set(self.candidates) | set(other.candidates)
+        ranked = sorted(((self.sketch.estimate(key), key) for key in keys), reverse=True)
+        self.candidates = {key: estimate for estimate, key in ranked[:self.k]}
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        ranked = sorted(self.candidates.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:n] if n else ranked
+
+
+def split_key(key: str) -> Tuple[str, str]:
+    table, _, value = key.partition(SEPARATOR)
+    return table, value
+
+
+class Tracker:
+    """One container's window of (table, partition key) accesses"""
+
+    def __init__(self, service: str, k: int = TOP_K, width: int = WIDTH, depth: int = DEPTH,
+                 window_seconds: float = WINDOW_SECONDS):
+        self.service = service
+        self.window_seconds = window_seconds
+        self._dims = (k, width, depth)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.hitters = HeavyHitters(*self._dims)
+        self.tables: Dict[str, int] = {}
+        self.window_start = time.time()
+
+    def record(self, table: str, partition_key: str) -> None:
+        with self._lock:
+            self.hitters.add(table + SEPARATOR + partition_key)
+            self.tables[table] = self.tables.get(table, 0) + 1
+            due = time.time() - self.window_start >= self.window_seconds
+        if due:
+            self.flush()
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """Emit the current window (if anything was seen) and start a new one"""
+        with self._lock:
+            if not self.hitters.total:
+                return None
+            record = to_record(self.service, self.hitters, self.tables, self.window_start, time.time())
+            self._reset()
+        metrics.emit(record)
+        return record
+
+
+def to_record(service: str, hitters: HeavyHitters, tables: Dict[str, int],
+              window_start: float, window_end: float) -> Dict[str, Any]:
+    return {
+        "type": "hotkey_sketch",
+        "timestamp": int(window_end * 1000),
+        "service": service,
+        "window_start": int(window_start * 1000),
+        "total": hitters.total,
+        "tables": dict(tables),
+        "k": hitters.k,
+        "sketch": hitters.sketch.to_dict(),
+        "top": [[*split_key(key), estimate] for key, estimate in hitters.top()],
+    }
+
+
+def from_record(record: Dict[str, Any]) -> Tuple[HeavyHitters, Dict[str, int]]:
+    sketch = CountMinSketch.from_dict(record["sketch"])
+    hitters = HeavyHitters(record.get("k", TOP_K), sketch.width, sketch.depth)
+    hitters.sketch = sketch
+    hitters.total = record["total"]
+    hitters.candidates = {table + SEPARATOR + key: estimate for table, key, estimate in record["top"]}
+    return hitters, dict(record.get("tables", {}))
+
+
+def merge_records(records: Iterable[Dict[str, Any]]) -> Tuple[Optional[HeavyHitters], Dict[str, int]]:
+    """Merge hotkey_sketch records from any number of containers and windows"""
+    merged: Optional[HeavyHitters] = None
+    tables: Dict[str, int] = {}
+    for record in records:
+        hitters, record_tables = from_record(record)
+        if merged is None:
+            merged = hitters
+        else:
+            merged.k = max(merged.k, hitters.k)
+            merged.merge(hitters)
+        for table, count in record_tables.items():
+            tables[table] = tables.get(table, 0) + count
+    return merged, tables
+
+
+def hot_keys(hitters: HeavyHitters, tables: Dict[str, int], threshold: float) -> List[Dict[str, Any]]:
+    """Candidates whose estimated share of their table's traffic is at least threshold"""
+    flagged = []
+    for key, estimate in hitters.top():
+        table, partition_key = split_key(key)
+        table_total = tables.get(table) or hitters.total
+        share = estimate / table_total if table_total else 0.0
+        if share >= threshold:
+            flagged.append({"table": table, "partition_key": partition_key, "estimate": estimate,
+                            "table_total": table_total, "share": share})
+    return flagged
+
+
+# Process-wide tracker fed by the DynamoDB hooks
+
+_tracker: Optional[Tracker] = None
+_tracker_lock = threading.Lock()
+_configured_keys = dict(
+    pair.split("=", 1) for pair in os.getenv("HOTKEY_PARTITION_KEYS", "").split(",") if "=" in pair
+)
+_described_keys: Dict[str, Optional[str]] = {}  # None: could not be described, not tracked
+_AND = re.compile(r"\s+AND\s+", re.IGNORECASE)
+_EQUALS = re.compile(r"^\s*\(?\s*([#\w.]+)\s*=\s*(:\w+)\s*\)?\s*$")
+
+
+def enabled() -> bool:
+    flag = os.getenv("HOTKEY_TRACKING")
+    if flag is not None:
+        return flag.lower() in ("1", "true", "yes", "on")
+    return metrics.enabled()
+
+
+def tracker() -> Tracker:
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                service = os.getenv("HOTKEY_SERVICE") or os.getenv("AWS_LAMBDA_FUNCTION_NAME") or "local"
+                _tracker = Tracker(service)
+    return _tracker
+
+
+def flush() -> Optional[Dict[str, Any]]:
+    return tracker().flush() if _tracker is not None else None
+
+
+def _plain(value: Any) -> str:
+    # Low-level calls (and boto3's resource layer by this point) send typed values: {"S": "x"}
+    if isinstance(value, dict) and len(value) == 1:
+        value = next(iter(value.values()))
+    return str(value)
+
+
+def partition_key_name(table: str) -> Optional[str]:
+    """HOTKEY_PARTITION_KEYS, else the HASH attribute of the table's KeySchema (cached)"""
+    name = _configured_keys.get(table)
+    if name is not None:
+        return name
+    if table in _described_keys:
+        return _described_keys[table]
+    from shared import aws  # shared.aws imports this module
+    try:
+        schema = aws.client("dynamodb", instrumented=False).describe_table(TableName=table)["Table"]["KeySchema"]
+        name = next(key["AttributeName"] for key in schema if key["KeyType"] == "HASH")
+    except Exception as e:
+        print(f"Hot-key tracking off for {table}: {e}")
+    _described_keys[table] = name
+    return name
+
+
+def _from_item(table: str, item: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    if not item:
+        return None
+    name = partition_key_name(table)
+    if name is None or name not in item:
+        return None
+    return table, _plain(item[name])
+
+
+def _from_query(table: str, params: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    expression = params.get("KeyConditionExpression")
+    if not isinstance(expression, str):
+        return None
+    names = params.get("ExpressionAttributeNames") or {}
+    values = params.get("ExpressionAttributeValues") or {}
+    wanted = partition_key_name(table)
+    if wanted is None:
+        return None
+    for clause in _AND.split(expression):
+        match = _EQUALS.match(clause)
+        if match is None:
+            continue
+        name, placeholder = names.get(match.group(1), match.group(1)), match.group(2)
+        if placeholder in values and name == wanted:
+            return table, _plain(values[placeholder])
+    return None
+
+
+def partition_keys(operation: str, params: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(table, partition key) pairs a DynamoDB request touches"""
+    table = params.get("TableName")
+    found: List[Optional[Tuple[str, str]]] = []
+    if operation in ("GetItem", "UpdateItem", "DeleteItem"):
+        found.append(_from_item(table, params.get("Key") or {}))
+    elif operation == "PutItem":
+        found.append(_from_item(table, params.get("Item") or {}))
+    elif operation == "Query":
+        found.append(_from_query(table, params))
+    elif operation == "BatchGetItem":
+        for name, request in (params.get("RequestItems") or {}).items():
+            found.extend(_from_item(name, key) for key in request.get("Keys", []))
+    elif operation == "BatchWriteItem":
+        for name, requests in (params.get("RequestItems") or {}).items():
+            for request in requests:
+                if "PutRequest" in request:
+                    found.append(_from_item(name, request["PutRequest"].get("Item") or {}))
+                elif "DeleteRequest" in request:
+                    found.append(_from_item(name, request["DeleteRequest"].get("Key") or {}))
+    return [pair for pair in found if pair is not None and pair[0]]
+
+
+def _before_parameter_build(params: Dict[str, Any], model: Any, **kwargs: Any) -> None:
+    if not enabled():
+        return
+    pairs = partition_keys(model.name, params)
+    if pairs:
+        current = tracker()
+        for table, partition_key in pairs:
+            current.record(table, partition_key)
+
+
+def instrument_dynamodb(client: Any) -> Any:
+    client.meta.events.register("before-parameter-build.dynamodb", _before_parameter_build,
+                                unique_id="shared-hotkeys-params")
+    return client
@@ -0,0 +1,226 @@
+"""
+Per-request metrics in CloudWatch Embedded Metric Format (EMF)
+
+One EMF record is written per request with the route, status, total latency,
+time spent in DynamoDB calls, consumed RCU/WCU (shared.aws adds
+ReturnConsumedCapacity to every DynamoDB call made through its clients while a
+request is measured) and response bytes.
+
+    request = metrics.begin("sync-hub-api", context)
+    metrics.set_route("GET /settings/{setting_id}")
+    ...
+    return metrics.end(request, response)
+
+Sinks:
+- stdout, which CloudWatch Logs turns into metrics; on by default inside Lambda
+- a local NDJSON file (METRICS_SINK_FILE), so benchmarks can assert on the same
+  records without CloudWatch
+METRICS_ENABLED=true/false overrides the default, METRICS_NAMESPACE sets the namespace.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+NAMESPACE = os.getenv("METRICS_NAMESPACE", "SyncHub")
+DIMENSIONS = [["Service", "Route"], ["Service"]]
+METRICS = [
+    ("Latency", "Milliseconds"),
+    ("DynamoDBTime", "Milliseconds"),
+    ("DynamoDBCalls", "Count"),
+    ("ConsumedRCU", "Count"),
+    ("ConsumedWCU", "Count"),
+    ("ResponseBytes", "Bytes"),
+]
+UNMATCHED_ROUTE = "UNMATCHED"
+
+READ_OPERATIONS = {"GetItem", "BatchGetItem", "Query", "Scan", "TransactGetItems"}
+
+_config = {
+    "enabled": None,
+    "sink_path": os.getenv("METRICS_SINK_FILE") or None,
+    "stdout": None,
+}
+_sink_lock = threading.Lock()
+_current: contextvars.ContextVar[Optional["RequestMetrics"]] = contextvars.ContextVar("request_metrics", default=None)
+
+
+def _env_flag(name: str) -> Optional[bool]:
+    value = os.getenv(name)
+    return None if value is None else value.lower() in ("1", "true", "yes", "on")
+
+
+def configure(enabled: Optional[bool] = None, sink_path: Optional[str] = None,
+              stdout: Optional[bool] = None) -> None:
+    """Override the environment (benchmarks point sink_path at a temp file)"""
+    if enabled is not None:
+        _config["enabled"] = enabled
+    if sink_path is not None:
+        _config["sink_path"] = sink_path or None
+    if stdout is not None:
+        _config["stdout"] = stdout
+
+
+def enabled() -> bool:
+    if _config["enabled"] is not None:
+        return _config["enabled"]
+    flag = _env_flag("METRICS_ENABLED")
+    if flag is not None:
+        return flag
+    return bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME") or _config["sink_path"])
+
+
+class RequestMetrics:
+    __slots__ = ("service", "route", "status", "started", "ddb_ms", "ddb_calls", "rcu", "wcu",
+                 "tables", "response_bytes", "properties")
+
+    def __init__(self, service: str, request_id: Optional[str] = None):
+        self.service = service
+        self.route = UNMATCHED_ROUTE
+        self.status = 0
+        self.started = time.perf_counter()
+        self.ddb_ms = 0.0
+        self.ddb_calls = 0
+        self.rcu = 0.0
+        self.wcu = 0.0
+        self.tables: Dict[str, Dict[str, float]] = {}
+        self.response_bytes = 0
+        self.properties: Dict[str, Any] = {"requestId": request_id} if request_id else {}
+
+    def add_dynamodb_call(self, operation: str, elapsed_ms: float, consumed: Any) -> None:
+        self.ddb_calls += 1
+        self.ddb_ms += elapsed_ms
+        if not consumed:
+            return
+        is_read = operation in READ_OPERATIONS
+        for entry in consumed if isinstance(consumed, list) else [consumed]:
+            units = float(entry.get("CapacityUnits", 0))
+            read = float(entry.get("ReadCapacityUnits", units if is_read else 0))
+            write = float(entry.get("WriteCapacityUnits", 0 if is_read else units))
+            self.rcu += read
+            self.wcu += write
+            table = self.tables.setdefault(entry.get("TableName", "unknown"), {"rcu": 0.0, "wcu": 0.0})
+            table["rcu"] += read
+            table["wcu"] += write
+
+    def to_emf(self, latency_ms: float) -> Dict[str, Any]:
+        record = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": NAMESPACE,
+                    "Dimensions": DIMENSIONS,
+                    "Metrics": [{"Name": name, "Unit": unit} for name, unit in METRICS],
+                }],
+            },
+            "Service": self.service,
+            "Route": self.route,
+            "StatusCode": self.status,
+            "Latency": round(latency_ms, 3),
+            "DynamoDBTime": round(self.ddb_ms, 3),
+            "DynamoDBCalls": self.ddb_calls,
+            "ConsumedRCU": self.rcu,
+            "ConsumedWCU": self.wcu,
+            "ResponseBytes": self.response_bytes,
+        }
+        if self.tables:
+            record["DynamoDBTables"] = self.tables
+        record.update(self.properties)
+        return record
+
+
+def current() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def begin(service: str, context: Any = None) -> Optional[RequestMetrics]:
+    """Start collecting for this request (None when metrics are disabled)"""
+    if not enabled():
+        return None
+    request = RequestMetrics(service, getattr(context, "aws_request_id", None))
+    _current.set(request)
+    return request
+
+
+def set_route(name: str) -> None:
+    request = _current.get()
+    if request is not None:
+        request.route = name
+
+
+def set_property(name: str, value: Any) -> None:
+    """Attach a non-dimension field (searchable in Logs Insights, not a metric)"""
+    request = _current.get()
+    if request is not None:
+        request.properties[name] = value
+
+
+def end(request: Optional[RequestMetrics], response: Dict[str, Any]) -> Dict[str, Any]:
+    """Finish the request, emit its record and hand the response back unchanged"""
+    if request is None:
+        return response
+    _current.set(None)
+    request.status = response.get("statusCode", 0)
+    request.response_bytes = body_bytes(response)
+    emit(request.to_emf((time.perf_counter() - request.started) * 1000))
+    return response
+
+
+def body_bytes(response: Dict[str, Any]) -> int:
+    """Bytes on the wire: a base64 body (gzip/br responses) is counted decoded, without decoding it"""
+    body = response.get("body") or ""
+    if not response.get("isBase64Encoded"):
+        return len(body)
+    return len(body) * 3 // 4 - body[-2:].count("=")
+
+
+def emit(record: Dict[str, Any]) -> None:
+    line = json.dumps(record, separators=(",", ":"), default=str)
+    stdout = _config["stdout"]
+    if stdout is None:
+        stdout = bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME")) or not _config["sink_path"]
+    if stdout:
+        print(line)
+    if _config["sink_path"]:
+        with _sink_lock, open(_config["sink_path"], "a") as f:
+            f.write(line + "\n")
+
+
+def read_records(path: str) -> List[Dict[str, Any]]:
+    """Load the records a file sink collected"""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# DynamoDB instrumentation (botocore event hooks)
+
+_call_started: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("ddb_call_started", default=None)
+
+
+def _before_call(**kwargs: Any) -> None:
+    if _current.get() is not None:
+        _call_started.set(time.perf_counter())
+
+
+def _after_call(parsed: Dict[str, Any], model: Any, **kwargs: Any) -> None:
+    request = _current.get()
+    started = _call_started.get()
+    if request is None or started is None:
+        return
+    _call_started.set(None)
+    request.add_dynamodb_call(model.name, (time.perf_counter() - started) * 1000, parsed.get("ConsumedCapacity"))
+
+
+def instrument_dynamodb(client: Any) -> Any:
+    """Register the latency/capacity hooks on a DynamoDB client (no-op outside a request)
+
+    ReturnConsumedCapacity itself is requested by shared.aws, once for both metrics and capacity
+    """
+    events = client.meta.events
+    events.register("before-call.dynamodb", _before_call, unique_id="shared-metrics-before")
+    events.register("after-call.dynamodb", _after_call, unique_id="shared-metrics-after")
+    return client
@@ -0,0 +1,179 @@
+"""
+Opt-in, sampled profiling of Lambda handlers
+
+    @profiling.profiled("sync-hub-api", route_of=route_name)
+    def handler(event, context): ...
+
+A PROFILE_SAMPLE_RATE fraction of invocations (default 0: off) is profiled with
+tracemalloc tracking allocations alongside. Each profile is written under
+PROFILE_OUTPUT (a local directory, default /tmp/profiles, or s3://bucket/prefix)
+as <service>/<route>/<timestamp>-<request id>.*:
+- sampler mode (default): `.folded` collapsed stacks, ready for flamegraph.pl,
+  speedscope or inferno
+- cprofile mode: `.prof` pstats data (snakeviz, flameprof, pstats)
+- always: `.json` with duration, memory peak and the top allocation sites
+
+With the rate at 0 the decorator returns the handler unchanged; otherwise a
+missed sample costs one random() call.
+"""
+import functools
+import json
+import marshal
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+MODE = os.getenv("PROFILE_MODE", "sampler")
+OUTPUT = os.getenv("PROFILE_OUTPUT", "/tmp/profiles")
+SAMPLER_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "2")) / 1000
+TRACEMALLOC = os.getenv("PROFILE_TRACEMALLOC", "true").lower() in ("1", "true", "yes", "on")
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer and folds identical stacks"""
+
+    def __init__(self, interval: float = SAMPLER_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _slug(route: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "unknown"
+
+
+def _write(key: str, data: bytes, output: str) -> str:
+    if output.startswith("s3://"):
+        from shared import aws
+        bucket, _, prefix = output[len("s3://"):].partition("/")
+        full_key = f"{prefix.rstrip('/')}/{key}" if prefix else key
+        aws.client("s3").put_object(Bucket=bucket, Key=full_key, Body=data)
+        return f"s3://{bucket}/{full_key}"
+    path = os.path.join(output, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def profile_call(fn: Callable[..., Any], args: tuple, service: str, route_of: Callable[[Any], str],
+                 sample_rate: float = 1.0, mode: str = MODE, output: str = OUTPUT) -> Any:
+    """Run fn(*args) under the profiler and write the results; returns fn's result"""
+    if TRACEMALLOC and not tracemalloc.is_tracing():
+        tracemalloc.start(1)
+        own_tracemalloc = True
+    else:
+        own_tracemalloc = False
+    if mode == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+    else:
+        profiler = StackSampler()
+
+    started = time.perf_counter()
+    if mode == "cprofile":
+        profiler.enable()
+    else:
+        profiler.start()
+    try:
+        return fn(*args)
+    finally:
+        if mode == "cprofile":
+            profiler.disable()
+        else:
+            profiler.stop()
+        duration_ms = (time.perf_counter() - started) * 1000
+        try:
+            _save(profiler, mode, output, service, route_of, args, duration_ms, sample_rate, own_tracemalloc)
+        except Exception as e:
+            print(f"Failed to write profile: {e}")
+        if own_tracemalloc:
+            tracemalloc.stop()
+
+
+def _save(profiler: Any, mode: str, output: str, service: str, route_of: Callable[[Any], str],
+          args: tuple, duration_ms: float, sample_rate: float, own_tracemalloc: bool) -> None:
+    event = args[0] if args else {}
+    context = args[1] if len(args) > 1 else None
+    route = route_of(event)
+    request_id = getattr(context, "aws_request_id", None) or f"{random.getrandbits(32):08x}"
+    base = f"{service}/{_slug(route)}/{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{request_id}"
+
+    meta: Dict[str, Any] = {
+        "service": service,
+        "route": route,
+        "mode": mode,
+        "duration_ms": round(duration_ms, 3),
+        "sample_rate": sample_rate,
+    }
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        meta["tracemalloc_peak_bytes"] = peak
+        meta["tracemalloc_current_bytes"] = current
+        if own_tracemalloc:
+            meta["top_allocations"] = [
+                {"site": str(stat.traceback[0]), "bytes": stat.size, "count": stat.count}
+                for stat in tracemalloc.take_snapshot().statistics("lineno")[:10]
+            ]
+
+    if mode == "cprofile":
+        profiler.create_stats()  # same bytes Profile.dump_stats() writes
+        meta["profile"] = _write(base + ".prof", marshal.dumps(profiler.stats), output)
+    else:
+        meta["samples"] = sum(profiler.stacks.values())
+        meta["profile"] = _write(base + ".folded", profiler.collapsed().encode("utf-8"), output)
+    _write(base + ".json", json.dumps(meta, indent=2).encode("utf-8"), output)
+
+
+def profiled(service: str, route_of: Optional[Callable[[Any], str]] = None,
+             sample_rate: Optional[float] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator for `handler(event, context)`; route_of(event) names the route for the output key"""
+    rate = SAMPLE_RATE if sample_rate is None else sample_rate
+    resolve = route_of or (lambda event: "all")
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if rate <= 0:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any) -> Any:
+            if random.random() >= rate:
+                return fn(*args)
+            return profile_call(fn, args, service, resolve, rate)
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,225 @@
+"""
+Per-tenant token-bucket admission control
+
+Each (tenant, route class) pair gets a token bucket sized by the tenant's tier:
+
+    decision = ratelimit.admit(tenant_id, tier, "write")
+    if not decision.allowed:
+        return ratelimit.too_many_requests(decision)   # 429 + Retry-After
+
+Two layers:
+- a local bucket per container, refilled continuously; it answers every request
+  in memory
+- a coarse global budget per tenant, class and minute, kept in DynamoDB
+  (RATE_LIMIT_TABLE). Containers add up what they admitted and reconcile it with
+  one UpdateItem ADD every RATE_LIMIT_SYNC_SECONDS. A tenant over its
+  per-minute budget across all containers is refused until the minute ends.
+  Counts not yet synced when the minute ends are dropped rather than charged
+  to the next minute. Without the table, or when the update fails, only the
+  local buckets apply.
+
+Both maps are bounded by RATE_LIMIT_MAX_BUCKETS: buckets are simply cleared
+(idle tenants start full again); budgets with nothing pending and no block in
+force are dropped first, then those left over from an earlier minute.
+
+Limits are (tokens per second, burst) per tier and class. RATE_LIMITS (JSON)
+overrides DEFAULT_LIMITS, e.g. {"standard": {"write": [5, 20]}}; the tier comes
+from the caller's claims unless RATE_LIMIT_TENANT_TIERS (JSON, tenant -> tier)
+pins it. RATE_LIMIT_ENABLED=false turns admission control off.
+"""
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from shared.responses import error_response
+
+DEFAULT_TIER = "standard"
+DEFAULT_LIMITS: Dict[str, Dict[str, Tuple[float, float]]] = {
+    "free": {"read": (5, 20), "write": (1, 5), "admin": (1, 5)},
+    "standard": {"read": (50, 200), "write": (10, 40), "admin": (5, 20)},
+    "premium": {"read": (200, 800), "write": (50, 200), "admin": (20, 80)},
+}
+SYNC_SECONDS = float(os.getenv("RATE_LIMIT_SYNC_SECONDS", "5"))
+WINDOW_SECONDS = 60
+MAX_BUCKETS = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "10000"))
+
+
+def _load_limits() -> Dict[str, Dict[str, Tuple[float, float]]]:
+    limits = {tier: dict(classes) for tier, classes in DEFAULT_LIMITS.items()}
+    overrides = os.getenv("RATE_LIMITS")
+    if overrides:
+        for tier, classes in json.loads(overrides).items():
+            limits.setdefault(tier, dict(limits[DEFAULT_TIER]))
+            for route_class, (rate, burst) in classes.items():
+                limits[tier][route_class] = (float(rate), float(burst))
+    return limits
+
+
+LIMITS = _load_limits()
+TENANT_TIERS: Dict[str, str] = json.loads(os.getenv("RATE_LIMIT_TENANT_TIERS") or "{}")
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    retry_after: float = 0.0
+    limit: float = 0.0
+    remaining: float = 0.0
+    scope: str = "local"
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float, cost: float = 1.0) -> float:
+        """Take cost tokens; returns 0 on success, otherwise seconds until they are available"""
+        tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if tokens >= cost:
+            self.tokens = tokens - cost
+            return 0.0
+        self.tokens = tokens
+        return (cost - tokens) / self.rate if self.rate > 0 else float(WINDOW_SECONDS)
+
+
+class _GlobalBudget:
+    """Admitted-request counts per (tenant, class) waiting to be added to the shared minute window"""
+    __slots__ = ("pending", "window", "blocked_until", "next_sync")
+
+    def __init__(self, now: float):
+        self.pending = 0.0
+        self.window = int(now // WINDOW_SECONDS)
+        self.blocked_until = 0.0
+        self.next_sync = now + SYNC_SECONDS
+
+
+class Limiter:
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Tuple[float, float]]]] = None,
+                 table_name: Optional[str] = None, clock=time.time):
+        self.limits = limits or LIMITS
+        self.table_name = table_name
+        self.clock = clock
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._budgets: Dict[Tuple[str, str], _GlobalBudget] = {}
+        self._lock = threading.Lock()
+
+    def limit_for(self, tier: Optional[str], route_class: str) -> Tuple[float, float]:
+        classes = self.limits.get(tier or DEFAULT_TIER) or self.limits[DEFAULT_TIER]
+        return classes.get(route_class) or self.limits[DEFAULT_TIER].get(route_class) or classes["read"]
+
+    def admit(self, tenant_id: str, tier: Optional[str], route_class: str, cost: float = 1.0) -> Decision:
+        rate, burst = self.limit_for(tier, route_class)
+        key = (tenant_id, route_class)
+        now = self.clock()
+        with self._lock:
+            budget = self._budgets.get(key)
+            if budget is not None and budget.blocked_until > now:
+                return Decision(False, budget.blocked_until - now, rate, 0.0, "global")
+            bucket = self._buckets.get(key)
+            if bucket is None or (bucket.rate, bucket.burst) != (rate, burst):
+                if len(self._buckets) >= MAX_BUCKETS:
+                    self._buckets.clear()  # idle tenants just start with a full bucket again
+                bucket = self._buckets[key] = TokenBucket(rate, burst, now)
+            wait = bucket.take(now, cost)
+            if wait:
+                return Decision(False, wait, rate, bucket.tokens, "local")
+            remaining = bucket.tokens
+            due = None
+            if self.table_name:
+                window = int(now // WINDOW_SECONDS)
+                if budget is None:
+                    if len(self._budgets) >= MAX_BUCKETS:
+                        self._prune_budgets(now, window)
+                    budget = self._budgets[key] = _GlobalBudget(now)
+                elif budget.window != window:
+                    budget.pending, budget.window = 0.0, window  # that minute is over; don't charge this one
+                budget.pending += cost
+                if now >= budget.next_sync:
+                    due, budget.pending = budget.pending, 0
+                    budget.next_sync = now + SYNC_SECONDS
+        if due:
+            self._reconcile(key, budget, due, rate * WINDOW_SECONDS + burst, window)
+        return Decision(True, 0.0, rate, remaining)
+
+    def _prune_budgets(self, now: float, window: int) -> None:
+        """Make room in _budgets (caller holds the lock)"""
+        for key, budget in list(self._budgets.items()):
+            if not budget.pending and budget.blocked_until <= now:
+                del self._budgets[key]
+        if len(self._budgets) >= MAX_BUCKETS:
+            for key, budget in list(self._budgets.items()):
+                if budget.window != window and budget.blocked_until <= now:
+                    del self._budgets[key]
+
+    def _reconcile(self, key: Tuple[str, str], budget: _GlobalBudget, admitted: float,
+                   allowance: float, window: int) -> None:
+        from shared import aws
+        try:
+            # Uninstrumented: the limiter's own write is not tenant traffic for metrics, capacity or hot keys
+            response = aws.client("dynamodb", instrumented=False).update_item(
+                TableName=self.table_name,
+                Key={"pk": {"S": f"{key[0]}#{key[1]}#{window}"}},
+                UpdateExpression="ADD admitted :n SET expires_at = if_not_exists(expires_at, :ttl)",
+                ExpressionAttributeValues={
+                    ":n": {"N": str(int(admitted)) if admitted == int(admitted) else str(admitted)},
+                    ":ttl": {"N": str((window + 2) * WINDOW_SECONDS)},
+                },
+                ReturnValues="UPDATED_NEW",
+            )
+        except Exception as e:  # fail open: the local bucket still applies
+            print(f"Rate limit sync failed: {e}")
+            return
+        total = float(response["Attributes"]["admitted"]["N"])
+        if total > allowance:
+            with self._lock:
+                budget.blocked_until = (window + 1) * WINDOW_SECONDS
+
+
+def enabled() -> bool:
+    return os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+
+
+_limiter: Optional[Limiter] = None
+_limiter_lock = threading.Lock()
+
+
+def limiter() -> Limiter:
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = Limiter(table_name=os.getenv("RATE_LIMIT_TABLE") or None)
+    return _limiter
+
+
+def route_class(method: str, route: Any) -> str:
+    """A route's limit class: its `rate_class` metadata, else admin/read/write"""
+    explicit = route.meta.get("rate_class") if route.meta else None
+    if explicit:
+        return explicit
+    if route.auth == "admin":
+        return "admin"
+    return "read" if method in ("GET", "HEAD", "OPTIONS") else "write"
+
+
+def admit(tenant_id: str, tier: Optional[str], route_class: str, cost: float = 1.0) -> Decision:
+    if not enabled():
+        return Decision(True)
+    return limiter().admit(tenant_id, TENANT_TIERS.get(tenant_id) or tier, route_class, cost)
+
+
+def too_many_requests(decision: Decision) -> Dict[str, Any]:
+    response = error_response(429, "Too many requests")
+    headers = response["headers"]
+    headers["Retry-After"] = str(max(1, math.ceil(decision.retry_after)))
+    headers["RateLimit-Limit"] = f"{decision.limit:g}"
+    headers["RateLimit-Remaining"] = str(int(decision.remaining))
+    return response
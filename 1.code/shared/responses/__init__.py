@@ -0,0 +1,125 @@
+"""
+API Gateway proxy responses shared by the sync-hub handlers and the admin/tags Lambdas
+
+- header maps are built once at import and copied per response
+- bodies are encoded with orjson when it is installed (stdlib json otherwise);
+  Decimal, datetime, set and bytes values are handled natively
+- compress() gzips large bodies when the client sent Accept-Encoding: gzip
+- both report serialize/compress phases to shared.timing when it is on
+"""
+import base64
+import gzip
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from shared import timing
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is not bundled
+    orjson = None
+
+GZIP_MIN_BYTES = int(os.getenv("RESPONSE_GZIP_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "5"))
+INT_MIN, INT_MAX = -2 ** 63, 2 ** 64 - 1  # what orjson encodes as an integer
+
+
+def make_headers(content_type: Optional[str] = "application/json", allow_origin: Optional[str] = "*",
+                 allow_headers: Optional[str] = None, allow_methods: Optional[str] = None) -> Dict[str, str]:
+    """Build a header map once (at import time) for reuse in every response"""
+    headers = {}
+    if content_type:
+        headers["Content-Type"] = content_type
+    if allow_origin:
+        headers["Access-Control-Allow-Origin"] = allow_origin
+    if allow_headers:
+        headers["Access-Control-Allow-Headers"] = allow_headers
+    if allow_methods:
+        headers["Access-Control-Allow-Methods"] = allow_methods
+    return headers
+
+
+JSON_HEADERS = make_headers(allow_origin=None)
+CORS_JSON_HEADERS = make_headers()
+
+
+def _default(obj: Any) -> Any:
+    """Types DynamoDB and boto3 hand back that JSON has no native form for"""
+    if isinstance(obj, Decimal):
+        if obj == obj.to_integral_value() and INT_MIN <= obj <= INT_MAX:
+            return int(obj)
+        return float(obj)  # orjson rejects integers outside 64 bits; DynamoDB numbers go up to 38 digits
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=str)
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(obj).decode("ascii")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def encode(payload: Any) -> str:
+        """Serialize a payload to a JSON string (orjson fast path)"""
+        return orjson.dumps(payload, default=_default).decode("utf-8")
+else:
+    _encoder = json.JSONEncoder(default=_default, separators=(",", ":"), ensure_ascii=False)
+
+    def encode(payload: Any) -> str:
+        """Serialize a payload to a JSON string (stdlib fallback)"""
+        return _encoder.encode(payload)
+
+
+def json_response(status_code: int, payload: Any = None, headers: Dict[str, str] = CORS_JSON_HEADERS) -> Dict[str, Any]:
+    """Lambda proxy response with a JSON body (empty body when payload is None)"""
+    with timing.current().phase("serialize"):
+        body = "" if payload is None else encode(payload)
+    return {
+        "statusCode": status_code,
+        "headers": dict(headers),
+        "body": body
+    }
+
+
+def error_response(status_code: int, message: str, headers: Dict[str, str] = CORS_JSON_HEADERS,
+                   **extra: Any) -> Dict[str, Any]:
+    """Lambda proxy response with an {"error": message} body"""
+    return json_response(status_code, {"error": message, **extra}, headers)
+
+
+def _header(event: Dict[str, Any], name: str) -> str:
+    """Case-insensitive request header lookup (v2 events are lowercased, v1 are not)"""
+    headers = event.get("headers") or {}
+    value = headers.get(name)
+    if value is None:
+        for key, candidate in headers.items():
+            if key.lower() == name:
+                return candidate or ""
+        return ""
+    return value
+
+
+def accepts_gzip(event: Dict[str, Any]) -> bool:
+    for coding in _header(event, "accept-encoding").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def compress(event: Dict[str, Any], response: Dict[str, Any], min_bytes: int = GZIP_MIN_BYTES) -> Dict[str, Any]:
+    """Gzip a response body in place when the client accepts it and it is big enough"""
+    body = response.get("body")
+    if not body or response.get("isBase64Encoded") or len(body) < min_bytes or not accepts_gzip(event):
+        return response
+    with timing.current().phase("compress"):
+        compressed = gzip.compress(body.encode("utf-8"), compresslevel=GZIP_LEVEL)
+    response["body"] = base64.b64encode(compressed).decode("ascii")
+    response["isBase64Encoded"] = True
+    headers = response.setdefault("headers", {})
+    headers["Content-Encoding"] = "gzip"
+    headers["Vary"] = "Accept-Encoding"
+    return response
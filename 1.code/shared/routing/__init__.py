@@ -0,0 +1,217 @@
+"""
+Table-driven request router compiled into a method + path-segment trie
+
+Routes are declared once at import time:
+
+    router = Router()
+    router.add("GET", "/settings/{setting_id}", get_setting, auth="user")
+    router.add("GET", "/items/{n:int}", get_item, cacheable=True)
+
+match() walks the trie one segment at a time. Static segments win over
+parameters, fully static routes are answered from a dict of prebuilt matches, and a path that exists
+under another method yields the allowed methods so callers can answer 405
+instead of 404. Route metadata (auth level, cacheability, free-form extras) is
+kept on the Route for other layers to read.
+
+Targets can be lazy("handlers.settings:SettingsHandler", "get_setting"): the
+module is imported and the class instantiated on the first request that needs
+it, so a cold start only pays for the handlers it actually serves.
+"""
+import importlib
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "str": str,
+    "int": int,
+}
+
+
+class Route:
+    __slots__ = ("method", "pattern", "target", "name", "auth", "cacheable", "meta")
+
+    def __init__(self, method: str, pattern: str, target: Any, name: Optional[str] = None,
+                 auth: str = "user", cacheable: bool = False, **meta: Any):
+        self.method = method
+        self.pattern = pattern
+        self.target = target
+        self.name = name or f"{method} {pattern}"
+        self.auth = auth
+        self.cacheable = cacheable
+        self.meta = meta
+
+    def __repr__(self) -> str:
+        return f"Route({self.name!r}, auth={self.auth!r}, cacheable={self.cacheable})"
+
+
+class RouteMatch(NamedTuple):
+    route: Optional[Route]
+    params: Dict[str, Any]
+    allowed: Tuple[str, ...] = ()
+
+
+class _Node:
+    __slots__ = ("static", "param_name", "param_convert", "param_child", "methods")
+
+    def __init__(self):
+        self.static: Dict[str, "_Node"] = {}
+        self.param_name: Optional[str] = None
+        self.param_convert: Callable[[str], Any] = str
+        self.param_child: Optional["_Node"] = None
+        self.methods: Dict[str, Route] = {}
+
+
+_NO_PARAMS: Dict[str, Any] = {}
+_NOT_FOUND = RouteMatch(None, _NO_PARAMS)
+_new_match = tuple.__new__  # skips the generated NamedTuple.__new__ on the hot path
+
+
+def _split(path: str) -> List[str]:
+    return [segment for segment in path.split("/") if segment]
+
+
+_instances: Dict[str, Any] = {}
+_instances_lock = threading.Lock()
+
+
+def _instance(spec: str) -> Any:
+    """Import `module:Class` and build it once per process"""
+    instance = _instances.get(spec)
+    if instance is None:
+        with _instances_lock:
+            instance = _instances.get(spec)
+            if instance is None:
+                module_name, _, class_name = spec.partition(":")
+                instance = _instances[spec] = getattr(importlib.import_module(module_name), class_name)()
+    return instance
+
+
+class LazyTarget:
+    """Route target that resolves `module:Class` + method on first call"""
+    __slots__ = ("spec", "method", "_bound")
+
+    def __init__(self, spec: str, method: str):
+        self.spec = spec
+        self.method = method
+        self._bound: Optional[Callable[..., Any]] = None
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        bound = self._bound
+        if bound is None:
+            bound = self._bound = getattr(_instance(self.spec), self.method)
+        return bound(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"lazy({self.spec!r}, {self.method!r})"
+
+
+def lazy(spec: str, method: str) -> LazyTarget:
+    return LazyTarget(spec, method)
+
+
+class Router:
+    def __init__(self):
+        self.routes: List[Route] = []
+        self._root = _Node()
+        self._static: Dict[str, Dict[str, RouteMatch]] = {}
+
+    def add(self, method: str, pattern: str, target: Any, **meta: Any) -> Route:
+        """Register a route; `{name}` or `{name:type}` segments capture path parameters"""
+        route = Route(method.upper(), pattern, target, **meta)
+        node = self._root
+        is_static = True
+        for segment in _split(pattern):
+            if segment.startswith("{") and segment.endswith("}"):
+                is_static = False
+                name, _, type_name = segment[1:-1].partition(":")
+                if type_name and type_name not in CONVERTERS:
+                    raise ValueError(f"Unknown path parameter type '{type_name}' in {pattern}")
+                if node.param_child is None:
+                    node.param_child = _Node()
+                    node.param_name = name
+                    node.param_convert = CONVERTERS[type_name or "str"]
+                elif node.param_name != name:
+                    raise ValueError(f"Conflicting parameter names at {pattern}: {node.param_name} vs {name}")
+                node = node.param_child
+            else:
+                node = node.static.setdefault(segment, _Node())
+
+        if route.method in node.methods:
+            raise ValueError(f"Duplicate route {route.name}")
+        node.methods[route.method] = route
+        if is_static:
+            self._static.setdefault("/" + "/".join(_split(pattern)), {})[route.method] = RouteMatch(route, _NO_PARAMS)
+        self.routes.append(route)
+        return route
+
+    def match(self, method: str, path: str) -> RouteMatch:
+        """Resolve a request; route is None for 404 (allowed empty) or 405 (allowed set)"""
+        static = self._static.get(path)
+        if static is None and len(path) > 1 and path.endswith("/"):
+            static = self._static.get(path.rstrip("/"))
+        if static is not None:
+            hit = static.get(method)
+            if hit is not None:
+                return hit
+
+        segments = path.strip("/").split("/")
+        if "" in segments:
+            segments = [segment for segment in segments if segment]
+
+        # Greedy static-first descent; only a dead end after passing over a parameter branch needs the
+        # backtracking walk, so most 404s are answered without a second pass
+        node: Optional[_Node] = self._root
+        params: Optional[Dict[str, Any]] = None
+        forked = False
+        for segment in segments:
+            child = node.static.get(segment)
+            if child is not None:
+                if node.param_child is not None:
+                    forked = True
+            else:
+                child = node.param_child
+                if child is None:
+                    node = None
+                    break
+                if params is None:
+                    params = {}
+                try:
+                    params[node.param_name] = segment if node.param_convert is str else node.param_convert(segment)
+                except ValueError:
+                    node = None
+                    break
+            node = child
+        if node is None or not node.methods:
+            if not forked:
+                return _NOT_FOUND
+            params = {}
+            node = self._walk(self._root, segments, 0, params)
+            if node is None:
+                return _NOT_FOUND
+
+        route = node.methods.get(method)
+        if route is None:
+            return RouteMatch(None, _NO_PARAMS, tuple(sorted(node.methods)))
+        return _new_match(RouteMatch, (route, params or _NO_PARAMS, ()))
+
+    def _walk(self, node: _Node, segments: List[str], index: int, params: Dict[str, Any]) -> Optional[_Node]:
+        if index == len(segments):
+            return node if node.methods else None
+        segment = segments[index]
+
+        child = node.static.get(segment)
+        if child is not None:
+            found = self._walk(child, segments, index + 1, params)
+            if found is not None:
+                return found
+
+        if node.param_child is not None:
+            try:
+                value = node.param_convert(segment)
+            except ValueError:
+                return None
+            found = self._walk(node.param_child, segments, index + 1, params)
+            if found is not None:
+                params[node.param_name] = value
+                return found
+        return None
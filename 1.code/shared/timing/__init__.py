@@ -0,0 +1,175 @@
+"""
+Server-Timing response header with a per-phase breakdown of handler latency
+
+    from shared import timing as server_timing
+
+    timing = server_timing.begin(event)
+    with timing.phase("claims"):
+        claims = extract_claims(event)
+    ...
+    return server_timing.end(timing, response)
+
+produces e.g.
+    Server-Timing: claims;dur=0.05, route;dur=0.01, ddb0;dur=6.2;desc="Query sync-hub-settings",
+                   serialize;dur=0.4, compress;dur=1.1, total;dur=8.3
+
+DynamoDB calls made through shared.aws are added automatically, as are the
+serialize/compress phases of shared.responses. When timing is off, begin()
+returns a shared null object whose methods allocate nothing.
+
+SERVER_TIMING controls it per environment:
+- off (default): never
+- on: every response
+- header: only requests sending `X-Server-Timing: 1` (or the value of
+  SERVER_TIMING_TOKEN when that is set)
+"""
+import contextvars
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+REQUEST_HEADER = "x-server-timing"
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullPhase":
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+
+class _NullTiming:
+    """Stand-in used when timing is off; every method is a no-op"""
+    __slots__ = ()
+    enabled = False
+
+    def phase(self, name: str, desc: Optional[str] = None) -> _NullPhase:
+        return _NULL_PHASE
+
+    def add(self, name: str, duration_ms: float, desc: Optional[str] = None) -> None:
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+NULL_TIMING = _NullTiming()
+
+
+class _Phase:
+    __slots__ = ("timing", "name", "desc", "started")
+
+    def __init__(self, timing: "Timing", name: str, desc: Optional[str]):
+        self.timing = timing
+        self.name = name
+        self.desc = desc
+
+    def __enter__(self) -> "_Phase":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        self.timing.add(self.name, (time.perf_counter() - self.started) * 1000, self.desc)
+        return False
+
+
+class Timing:
+    __slots__ = ("started", "entries", "ddb_calls")
+    enabled = True
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.entries: List[Tuple[str, float, Optional[str]]] = []
+        self.ddb_calls = 0
+
+    def phase(self, name: str, desc: Optional[str] = None) -> _Phase:
+        return _Phase(self, name, desc)
+
+    def add(self, name: str, duration_ms: float, desc: Optional[str] = None) -> None:
+        self.entries.append((name, duration_ms, desc))
+
+    def header(self) -> str:
+        parts = []
+        for name, duration_ms, desc in self.entries:
+            part = f"{name};dur={duration_ms:.2f}"
+            if desc:
+                part += ';desc="' + desc.replace("\\", "").replace('"', "'") + '"'
+            parts.append(part)
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_current: contextvars.ContextVar[Any] = contextvars.ContextVar("server_timing", default=NULL_TIMING)
+
+
+def _mode() -> str:
+    return os.getenv("SERVER_TIMING", "off").lower()
+
+
+def requested(event: Dict[str, Any]) -> bool:
+    """Whether this request gets a Server-Timing header under the current SERVER_TIMING mode"""
+    mode = _mode()
+    if mode == "on":
+        return True
+    if mode != "header":
+        return False
+    headers = event.get("headers") or {}
+    value = headers.get(REQUEST_HEADER)
+    if value is None:
+        value = next((v for k, v in headers.items() if k.lower() == REQUEST_HEADER), None)
+    if value is None:
+        return False
+    token = os.getenv("SERVER_TIMING_TOKEN")
+    return value == token if token else value.lower() in ("1", "true", "on")
+
+
+def begin(event: Dict[str, Any]):
+    timing = Timing() if requested(event) else NULL_TIMING
+    _current.set(timing)
+    return timing
+
+
+def current():
+    return _current.get()
+
+
+def end(timing, response: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach the header (when timing is on) and hand the response back"""
+    if timing.enabled:
+        _current.set(NULL_TIMING)
+        headers = response.setdefault("headers", {})
+        headers["Server-Timing"] = timing.header()
+        headers["Timing-Allow-Origin"] = "*"
+    return response
+
+
+# DynamoDB calls (botocore event hooks; state lives in the per-call request context)
+
+def _before_parameter_build(params: Dict[str, Any], context: Dict[str, Any], **kwargs: Any) -> None:
+    if _current.get().enabled:
+        context["server_timing_table"] = params.get("TableName")
+
+
+def _before_call(context: Dict[str, Any], **kwargs: Any) -> None:
+    if _current.get().enabled:
+        context["server_timing_started"] = time.perf_counter()
+
+
+def _after_call(model: Any, context: Dict[str, Any], **kwargs: Any) -> None:
+    timing = _current.get()
+    started = context.get("server_timing_started")
+    if not timing.enabled or started is None:
+        return
+    table = context.get("server_timing_table")
+    timing.add(f"ddb{timing.ddb_calls}", (time.perf_counter() - started) * 1000,
+               f"{model.name} {table}" if table else model.name)
+    timing.ddb_calls += 1
+
+
+def instrument_dynamodb(client: Any) -> Any:
+    events = client.meta.events
+    events.register("before-parameter-build.dynamodb", _before_parameter_build, unique_id="shared-timing-params")
+    events.register("before-call.dynamodb", _before_call, unique_id="shared-timing-before")
+    events.register("after-call.dynamodb", _after_call, unique_id="shared-timing-after")
+    return client
@@ -0,0 +1,261 @@
+"""
+Verified Cognito JWTs with a cached JWKS and a decoded-token LRU
+
+    from shared import tokens
+    claims = tokens.verify(tokens.bearer_token(event))   # raises tokens.TokenError
+
+Verification is RS256 against the user pool's JWKS, plus exp/nbf, issuer,
+token_use (required) and audience (id tokens) or client_id (access tokens) checks.
+
+- the JWKS is fetched on first use and kept for JWKS_TTL_SECONDS; a token whose
+  `kid` is not in it triggers a refetch (at most every JWKS_MIN_REFRESH_SECONDS),
+  so key rotation needs no redeploy
+- verified claims are memoized in a bounded LRU keyed by a hash of the token,
+  until the token's `exp`, so a warm container verifies each token's RSA
+  signature once
+- JWKS_URL may point anywhere urllib can read, including file:// (the local
+  stand-in tests and benchmarks use)
+
+Configuration: COGNITO_USER_POOL_ID (or USER_POOL_ID), AWS_REGION,
+COGNITO_CLIENT_IDS (comma-separated; USER_POOL_CLIENT_ID is used when it is unset),
+JWKS_URL and JWT_ISSUER overrides.
+
+The process-wide verifier() REQUIRES app client IDs: without them any token the
+pool signed for any client would be accepted, so verify() raises
+VerifierUnavailable instead. COGNITO_CLIENT_IDS=* turns the audience check off
+explicitly (and says so on stdout); only do that for a pool with a single client.
+A Verifier built directly with no client_ids does not check the audience.
+`cryptography` is imported on the first verification, not at module import; every
+function that verifies tokens must ship it (see the requirements in
+tools.lambda_artifacts.FUNCTIONS). Without it verify() raises VerifierUnavailable,
+which handlers turn into a 500 rather than a 401.
+"""
+import base64
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+JWKS_TTL_SECONDS = float(os.getenv("JWKS_TTL_SECONDS", "3600"))
+JWKS_MIN_REFRESH_SECONDS = float(os.getenv("JWKS_MIN_REFRESH_SECONDS", "30"))
+CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "1024"))
+LEEWAY_SECONDS = 30
+
+
+class TokenError(Exception):
+    """The token is missing, malformed, expired or not signed by the pool"""
+
+
+class VerifierUnavailable(RuntimeError):
+    """Tokens cannot be verified in this process (the deployment is missing `cryptography`)"""
+
+
+def _require_cryptography() -> None:
+    try:
+        import cryptography  # noqa: F401
+    except ImportError as e:
+        raise VerifierUnavailable(f"cryptography is required to verify tokens: {e}")
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _b64uint(segment: str) -> int:
+    return int.from_bytes(_b64decode(segment), "big")
+
+
+def fetch_json(url: str, timeout: float = 5.0) -> Dict[str, Any]:
+    from urllib.request import urlopen
+    with urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+class JWKSCache:
+    """Public keys by kid, refreshed on a TTL or when an unknown kid shows up"""
+
+    def __init__(self, url: str, fetch: Callable[[str], Dict[str, Any]] = fetch_json,
+                 ttl: float = JWKS_TTL_SECONDS, min_refresh: float = JWKS_MIN_REFRESH_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        self.url = url
+        self.fetch = fetch
+        self.ttl = ttl
+        self.min_refresh = min_refresh
+        self.clock = clock
+        self.keys: Dict[str, Any] = {}
+        self.fetched_at = 0.0
+        self.fetches = 0
+        self._lock = threading.Lock()
+
+    def get(self, kid: str) -> Any:
+        now = self.clock()
+        key = self.keys.get(kid)
+        if key is not None and now - self.fetched_at < self.ttl:
+            return key
+        with self._lock:
+            key = self.keys.get(kid)
+            stale = now - self.fetched_at >= self.ttl
+            if (key is None or stale) and (stale or now - self.fetched_at >= self.min_refresh):
+                self._refresh(now)
+                key = self.keys.get(kid)
+        if key is None:
+            raise TokenError("Unknown signing key")
+        return key
+
+    def _refresh(self, now: float) -> None:
+        _require_cryptography()
+        from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicNumbers
+        try:
+            document = self.fetch(self.url)
+        except Exception as e:
+            if self.keys:  # keep serving the keys we have
+                print(f"JWKS refresh failed: {e}")
+                self.fetched_at = now - self.ttl + self.min_refresh
+                return
+            raise TokenError(f"Unable to fetch JWKS: {e}")
+        keys = {}
+        for jwk in document.get("keys", []):
+            if jwk.get("kty") == "RSA" and jwk.get("use", "sig") == "sig":
+                keys[jwk["kid"]] = RSAPublicNumbers(_b64uint(jwk["e"]), _b64uint(jwk["n"])).public_key()
+        self.keys = keys
+        self.fetched_at = now
+        self.fetches += 1
+
+
+class Verifier:
+    def __init__(self, jwks: JWKSCache, issuer: Optional[str], client_ids: Iterable[str] = (),
+                 token_use: Tuple[str, ...] = ("access", "id"), cache_size: int = CACHE_SIZE,
+                 leeway: float = LEEWAY_SECONDS, clock: Callable[[], float] = time.time):
+        self.jwks = jwks
+        self.issuer = issuer
+        self.client_ids = frozenset(client_ids)
+        self.token_use = token_use
+        self.cache_size = cache_size
+        self.leeway = leeway
+        self.clock = clock
+        self._cache: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_user_pool(cls, user_pool_id: str, region: Optional[str] = None,
+                      client_ids: Iterable[str] = (), **kwargs: Any) -> "Verifier":
+        region = region or user_pool_id.split("_", 1)[0]
+        issuer = os.getenv("JWT_ISSUER") or f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
+        url = os.getenv("JWKS_URL") or f"{issuer}/.well-known/jwks.json"
+        fetch = kwargs.pop("fetch", fetch_json)
+        return cls(JWKSCache(url, fetch), issuer, client_ids, **kwargs)
+
+    def verify(self, token: Optional[str]) -> Dict[str, Any]:
+        """Claims of a valid token (memoized until it expires); raises TokenError otherwise"""
+        if not token:
+            raise TokenError("Missing token")
+        digest = blake2b(token.encode("utf-8"), digest_size=16).digest()
+        now = self.clock()
+        with self._lock:
+            cached = self._cache.get(digest)
+            if cached is not None:
+                if cached[0] > now:
+                    self._cache.move_to_end(digest)
+                    return cached[1]
+                del self._cache[digest]
+        claims = self._verify(token, now)
+        with self._lock:
+            self._cache[digest] = (float(claims["exp"]) + self.leeway, claims)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return claims
+
+    def _verify(self, token: str, now: float) -> Dict[str, Any]:
+        _require_cryptography()
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives.asymmetric import padding
+        from cryptography.hazmat.primitives.hashes import SHA256
+
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+            header = json.loads(_b64decode(header_segment))
+            claims = json.loads(_b64decode(payload_segment))
+            signature = _b64decode(signature_segment)
+        except ValueError:
+            raise TokenError("Malformed token")
+        if not isinstance(header, dict) or header.get("alg") != "RS256" or not isinstance(claims, dict):
+            raise TokenError("Unsupported token")
+        kid = header.get("kid", "")
+        if not isinstance(kid, str):
+            raise TokenError("Unsupported token")
+
+        key = self.jwks.get(kid)
+        try:
+            key.verify(signature, f"{header_segment}.{payload_segment}".encode("ascii"), padding.PKCS1v15(), SHA256())
+        except (InvalidSignature, ValueError):
+            raise TokenError("Invalid signature")
+
+        if not isinstance(claims.get("exp"), (int, float)) or claims["exp"] + self.leeway <= now:
+            raise TokenError("Token expired")
+        if isinstance(claims.get("nbf"), (int, float)) and claims["nbf"] - self.leeway > now:
+            raise TokenError("Token not yet valid")
+        if self.issuer and claims.get("iss") != self.issuer:
+            raise TokenError("Invalid issuer")
+        token_use = claims.get("token_use")
+        if token_use not in self.token_use:
+            raise TokenError("Invalid token_use")
+        if self.client_ids:
+            audience = claims.get("aud") if token_use == "id" else claims.get("client_id", claims.get("aud"))
+            if audience not in self.client_ids:
+                raise TokenError("Invalid audience")
+        return claims
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+def bearer_token(event: Dict[str, Any]) -> Optional[str]:
+    """The bearer token from an API Gateway event's Authorization header"""
+    headers = event.get("headers") or {}
+    value = headers.get("Authorization") or headers.get("authorization")
+    if value is None:
+        value = next((v for k, v in headers.items() if k.lower() == "authorization"), None)
+    if not value:
+        return None
+    scheme, _, token = value.partition(" ")
+    return token.strip() if scheme.lower() == "bearer" else value.strip()
+
+
+_verifier: Optional[Verifier] = None
+_verifier_lock = threading.Lock()
+
+
+def verifier(default_user_pool_id: Optional[str] = None) -> Verifier:
+    """The process-wide Verifier for the configured user pool (nothing is fetched until verify())"""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                pool = os.getenv("COGNITO_USER_POOL_ID") or os.getenv("USER_POOL_ID") or default_user_pool_id
+                if not pool and not os.getenv("JWKS_URL"):
+                    raise TokenError("No user pool configured")
+                client_ids = [c.strip() for c in os.getenv("COGNITO_CLIENT_IDS", "").split(",") if c.strip()]
+                if not client_ids and os.getenv("USER_POOL_CLIENT_ID"):
+                    client_ids = [os.environ["USER_POOL_CLIENT_ID"]]
+                if not client_ids:
+                    raise VerifierUnavailable("COGNITO_CLIENT_IDS is not set; refusing to skip the audience check")
+                if client_ids == ["*"]:
+                    print("⚠️  COGNITO_CLIENT_IDS=*: token audience is NOT checked")
+                    client_ids = []
+                _verifier = Verifier.for_user_pool(pool or "local_pool", os.getenv("AWS_REGION"), client_ids)
+    return _verifier
+
+
+def verify(token: Optional[str], default_user_pool_id: Optional[str] = None) -> Dict[str, Any]:
+    return verifier(default_user_pool_id).verify(token)
+
+
+def reset() -> None:
+    """Forget the process-wide verifier (tests that switch pools or JWKS)"""
+    global _verifier
+    with _verifier_lock:
+        _verifier = None
@@ -1,13 +1,12 @@
-import boto3
 from typing import Dict, List, Optional
 from datetime import datetime
 import uuid
 
-dynamodb = boto3.resource('dynamodb')
+from shared import aws
 
 class TenantRepository:
     def __init__(self, table_name: str):
-        self.table = dynamodb.Table(table_name)
+        self.table = aws.table(table_name)
     
     def create(self, name: str) -> Dict:
         tenant_id = str(uuid.uuid4())
@@ -26,7 +25,7 @@ class TenantRepository:
 
 class UserRepository:
     def __init__(self, table_name: str):
-        self.table = dynamodb.Table(table_name)
+        self.table = aws.table(table_name)
     
     def create(self, tenant_id: str, email: str, role: str) -> Dict:
         user_id = str(uuid.uuid4())
@@ -51,7 +50,7 @@ class UserRepository:
 
 class ItemRepository:
     def __init__(self, table_name: str):
-        self.table = dynamodb.Table(table_name)
+        self.table = aws.table(table_name)
     
     def create(self, tenant_id: str, name: str, description: str = None) -> Dict:
         item_id = str(uuid.uuid4())
@@ -0,0 +1 @@
+# Handlers package
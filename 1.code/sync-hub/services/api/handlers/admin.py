@@ -1,42 +1,39 @@
 import json
-import boto3
 import re
 from datetime import datetime, timedelta
-from decimal import Decimal
 from typing import Dict, Any, List, Optional
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-cognito = boto3.client('cognito-idp')
+from shared import aws, capacity, metrics, profiling, tokens, timing as server_timing
+from shared.responses import compress, error_response, json_response, make_headers
+from shared.routing import Router
 
-# Table references
-group_members_table = dynamodb.Table('sync-hub-group-members')
-settings_table = dynamodb.Table('sync-hub-settings')
-audit_table = dynamodb.Table('sync-hub-audit')
+# Table names (clients and tables are created on first use via shared.aws)
+GROUP_MEMBERS_TABLE = 'sync-hub-group-members'
+SETTINGS_TABLE = 'sync-hub-settings'
+AUDIT_TABLE = 'sync-hub-audit'
 
 USER_POOL_ID = 'us-east-1_ARkd0dYPj'
 
 def get_user_from_jwt(event):
-    """Extract user info from JWT token"""
-    # Mock implementation - in production, decode JWT
+    """Extract user info from the verified bearer token (raises tokens.TokenError)"""
+    claims = tokens.verify(tokens.bearer_token(event), USER_POOL_ID)
+    groups = claims.get('cognito:groups') or []
     return {
-        'user_id': 'user_123',
-        'tenant_id': 'tenant_456',
-        'email': 'admin@example.com',
-        'is_admin': True
+        'user_id': claims.get('sub', ''),
+        'tenant_id': claims.get('custom:tenant_id') or claims.get('tenant_id', ''),
+        'email': claims.get('email', ''),
+        'is_admin': 'admin' in groups or claims.get('is_admin') == 'true'
     }
 
-def cors_headers():
-    return {
-        'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Authorization, Content-Type',
-        'Access-Control-Allow-Methods': 'GET, POST, PATCH, DELETE, OPTIONS'
-    }
+CORS_HEADERS = make_headers(
+    allow_headers='Authorization, Content-Type',
+    allow_methods='GET, POST, PATCH, DELETE, OPTIONS'
+)
 
 def write_audit_event(user_id: str, tenant_id: str, action: str, resource: str, details: Dict):
     """Write audit event to audit table"""
     try:
-        audit_table.put_item(
+        aws.table(AUDIT_TABLE).put_item(
             Item={
                 'id': f"AUDIT#{datetime.utcnow().isoformat()}#{user_id}",
                 'tenant_id': tenant_id,
@@ -50,56 +47,56 @@ def write_audit_event(user_id: str, tenant_id: str, action: str, resource: str,
     except Exception as e:
         print(f"Failed to write audit event: {e}")
 
+SERVICE = 'admin-api'
+
+def route_name(event):
+    route = ROUTER.match(event.get('httpMethod'), event.get('path')).route
+    return route.name if route else metrics.UNMATCHED_ROUTE
+
+@profiling.profiled(SERVICE, route_of=route_name)
+@capacity.accounted(SERVICE)
 def lambda_handler(event, context):
+    request = metrics.begin(SERVICE, context)
+    timing = server_timing.begin(event)
+    return metrics.end(request, server_timing.end(timing, dispatch(event, timing)))
+
+def dispatch(event, timing=server_timing.NULL_TIMING):
     method = event['httpMethod']
     path = event['path']
     
     # Handle CORS preflight
     if method == 'OPTIONS':
-        return {
-            'statusCode': 200,
-            'headers': cors_headers(),
-            'body': ''
-        }
+        return json_response(200, headers=CORS_HEADERS)
     
     # Get user info and verify admin
-    user = get_user_from_jwt(event)
+    try:
+        with timing.phase('claims'):
+            user = get_user_from_jwt(event)
+    except tokens.TokenError as e:
+        return error_response(401, str(e), CORS_HEADERS)
+    except Exception as e:  # verifier unavailable (e.g. cryptography not packaged): a 500, not an unhandled 502
+        return error_response(500, 'Internal server error', CORS_HEADERS, detail=str(e))
+    capacity.set_tenant(user.get('tenant_id'))
     if not user.get('is_admin'):
-        return {
-            'statusCode': 403,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Admin privileges required'})
-        }
+        return error_response(403, 'Admin privileges required', CORS_HEADERS)
     
     try:
-        # Route to appropriate handler
-        if path == '/admin/users' and method == 'GET':
-            return handle_list_users(event, user)
-        elif path == '/admin/users/lookup' and method == 'POST':
-            return handle_lookup_user(event, user)
-        elif path.startswith('/admin/groups/') and path.endswith('/members') and method == 'POST':
-            return handle_add_member(event, user)
-        elif '/admin/groups/' in path and '/members/' in path and method == 'PATCH':
-            return handle_update_member(event, user)
-        elif '/admin/groups/' in path and '/members/' in path and method == 'DELETE':
-            return handle_remove_member(event, user)
-        elif path == '/admin/analytics' and method == 'GET':
-            return handle_analytics(event, user)
-        elif path == '/admin/analytics/timeseries' and method == 'GET':
-            return handle_analytics_timeseries(event, user)
-        else:
-            return {
-                'statusCode': 404,
-                'headers': cors_headers(),
-                'body': json.dumps({'error': 'Endpoint not found'})
-            }
+        with timing.phase('route'):
+            match = ROUTER.match(method, path)
+        if match.route is None:
+            if match.allowed:
+                return error_response(405, 'Method not allowed', CORS_HEADERS)
+            return error_response(404, 'Endpoint not found', CORS_HEADERS)
+        metrics.set_route(match.route.name)
+        capacity.set_route(match.route.name)
+        if match.params:
+            event['pathParameters'] = {**(event.get('pathParameters') or {}), **match.params}
+        with timing.phase('handler', match.route.name):
+            response = match.route.target(event, user)
+        return compress(event, response)
     
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Internal server error', 'detail': str(e)})
-        }
+        return error_response(500, 'Internal server error', CORS_HEADERS, detail=str(e))
 
 def handle_list_users(event, user):
     """List users with pagination and search"""
@@ -121,7 +118,7 @@ def handle_list_users(event, user):
         if query:
             params['Filter'] = f'email ^= "{query}"'
         
-        response = cognito.list_users(**params)
+        response = aws.client('cognito-idp').list_users(**params)
         
         users = []
         for cognito_user in response.get('Users', []):
@@ -134,22 +131,14 @@ def handle_list_users(event, user):
                 'enabled': cognito_user['Enabled']
             })
         
-        return {
-            'statusCode': 200,
-            'headers': cors_headers(),
-            'body': json.dumps({
-                'users': users,
-                'next_cursor': response.get('PaginationToken'),
-                'count': len(users)
-            }, default=str)
-        }
+        return json_response(200, {
+            'users': users,
+            'next_cursor': response.get('PaginationToken'),
+            'count': len(users)
+        }, CORS_HEADERS)
     
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Failed to list users', 'detail': str(e)})
-        }
+        return error_response(500, 'Failed to list users', CORS_HEADERS, detail=str(e))
 
 def handle_lookup_user(event, user):
     """Lookup user by email"""
@@ -158,25 +147,17 @@ def handle_lookup_user(event, user):
         email = body.get('email')
         
         if not email:
-            return {
-                'statusCode': 400,
-                'headers': cors_headers(),
-                'body': json.dumps({'error': 'Email required'})
-            }
+            return error_response(400, 'Email required', CORS_HEADERS)
         
         # Search Cognito by email
-        response = cognito.list_users(
+        response = aws.client('cognito-idp').list_users(
             UserPoolId=USER_POOL_ID,
             Filter=f'email = "{email}"',
             Limit=1
         )
         
         if not response.get('Users'):
-            return {
-                'statusCode': 404,
-                'headers': cors_headers(),
-                'body': json.dumps({'error': 'User not found'})
-            }
+            return error_response(404, 'User not found', CORS_HEADERS)
         
         cognito_user = response['Users'][0]
         user_attrs = {attr['Name']: attr['Value'] for attr in cognito_user.get('Attributes', [])}
@@ -189,18 +170,10 @@ def handle_lookup_user(event, user):
             'enabled': cognito_user['Enabled']
         }
         
-        return {
-            'statusCode': 200,
-            'headers': cors_headers(),
-            'body': json.dumps({'user': user_data}, default=str)
-        }
+        return json_response(200, {'user': user_data}, CORS_HEADERS)
     
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Failed to lookup user', 'detail': str(e)})
-        }
+        return error_response(500, 'Failed to lookup user', CORS_HEADERS, detail=str(e))
 
 def handle_add_member(event, user):
     """Add member to group"""
@@ -211,25 +184,17 @@ def handle_add_member(event, user):
         role = body.get('role', 'member')
         
         if not email or role not in ['member', 'admin']:
-            return {
-                'statusCode': 400,
-                'headers': cors_headers(),
-                'body': json.dumps({'error': 'Valid email and role required'})
-            }
+            return error_response(400, 'Valid email and role required', CORS_HEADERS)
         
         # Lookup user by email
-        cognito_response = cognito.list_users(
+        cognito_response = aws.client('cognito-idp').list_users(
             UserPoolId=USER_POOL_ID,
             Filter=f'email = "{email}"',
             Limit=1
         )
         
         if not cognito_response.get('Users'):
-            return {
-                'statusCode': 404,
-                'headers': cors_headers(),
-                'body': json.dumps({'error': 'User not found'})
-            }
+            return error_response(404, 'User not found', CORS_HEADERS)
         
         target_user_id = cognito_response['Users'][0]['Username']
         
@@ -250,7 +215,7 @@ def handle_add_member(event, user):
             'gsi2_sk': f"GROUP#{group_id}"
         }
         
-        group_members_table.put_item(Item=member_item)
+        aws.table(GROUP_MEMBERS_TABLE).put_item(Item=member_item)
         
         # Write audit event
         write_audit_event(
@@ -258,24 +223,16 @@ def handle_add_member(event, user):
             f"GROUP#{group_id}", {'target_user': target_user_id, 'role': role}
         )
         
-        return {
-            'statusCode': 200,
-            'headers': cors_headers(),
-            'body': json.dumps({
-                'user_id': target_user_id,
-                'email': email,
-                'role': role,
-                'status': 'active',
-                'joined_at': member_item['joined_at']
-            })
-        }
+        return json_response(200, {
+            'user_id': target_user_id,
+            'email': email,
+            'role': role,
+            'status': 'active',
+            'joined_at': member_item['joined_at']
+        }, CORS_HEADERS)
     
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Failed to add member', 'detail': str(e)})
-        }
+        return error_response(500, 'Failed to add member', CORS_HEADERS, detail=str(e))
 
 def handle_update_member(event, user):
     """Update group member"""
@@ -297,15 +254,11 @@ def handle_update_member(event, user):
             expr_values[':status'] = body['status']
         
         if not expr_values:
-            return {
-                'statusCode': 400,
-                'headers': cors_headers(),
-                'body': json.dumps({'error': 'No valid fields to update'})
-            }
+            return error_response(400, 'No valid fields to update', CORS_HEADERS)
         
         update_expr = update_expr.rstrip(', ')
         
-        response = group_members_table.update_item(
+        response = aws.table(GROUP_MEMBERS_TABLE).update_item(
             Key={
                 'pk': f"TENANT#{user['tenant_id']}#GROUP#{group_id}",
                 'sk': f"USER#{user_id}"
@@ -322,18 +275,10 @@ def handle_update_member(event, user):
             f"GROUP#{group_id}", {'target_user': user_id, 'changes': body}
         )
         
-        return {
-            'statusCode': 200,
-            'headers': cors_headers(),
-            'body': json.dumps(response['Attributes'], default=str)
-        }
+        return json_response(200, response['Attributes'], CORS_HEADERS)
     
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Failed to update member', 'detail': str(e)})
-        }
+        return error_response(500, 'Failed to update member', CORS_HEADERS, detail=str(e))
 
 def handle_remove_member(event, user):
     """Remove member from group"""
@@ -341,7 +286,7 @@ def handle_remove_member(event, user):
         group_id = event['pathParameters']['gid']
         user_id = event['pathParameters']['uid']
         
-        group_members_table.delete_item(
+        aws.table(GROUP_MEMBERS_TABLE).delete_item(
             Key={
                 'pk': f"TENANT#{user['tenant_id']}#GROUP#{group_id}",
                 'sk': f"USER#{user_id}"
@@ -354,18 +299,10 @@ def handle_remove_member(event, user):
             f"GROUP#{group_id}", {'target_user': user_id}
         )
         
-        return {
-            'statusCode': 204,
-            'headers': cors_headers(),
-            'body': ''
-        }
+        return json_response(204, headers=CORS_HEADERS)
     
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Failed to remove member', 'detail': str(e)})
-        }
+        return error_response(500, 'Failed to remove member', CORS_HEADERS, detail=str(e))
 
 def handle_analytics(event, user):
     """Get analytics overview"""
@@ -378,7 +315,7 @@ def handle_analytics(event, user):
         start_date = datetime.utcnow() - timedelta(days=days)
         
         # Get settings count
-        settings_response = settings_table.scan(
+        settings_response = aws.table(SETTINGS_TABLE).scan(
             FilterExpression='tenant_id = :tenant_id AND created_at >= :start_date',
             ExpressionAttributeValues={
                 ':tenant_id': user['tenant_id'],
@@ -390,7 +327,7 @@ def handle_analytics(event, user):
         public_settings = sum(1 for item in settings_response['Items'] if item.get('visibility') == 'public')
         
         # Get group members count
-        members_response = group_members_table.query(
+        members_response = aws.table(GROUP_MEMBERS_TABLE).query(
             IndexName='GSI2',
             KeyConditionExpression='gsi2_pk = :tenant_id',
             ExpressionAttributeValues={':tenant_id': f"TENANT#{user['tenant_id']}"}
@@ -410,18 +347,10 @@ def handle_analytics(event, user):
             'generated_at': datetime.utcnow().isoformat()
         }
         
-        return {
-            'statusCode': 200,
-            'headers': cors_headers(),
-            'body': json.dumps(analytics_data, default=str)
-        }
+        return json_response(200, analytics_data, CORS_HEADERS)
     
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Failed to get analytics', 'detail': str(e)})
-        }
+        return error_response(500, 'Failed to get analytics', CORS_HEADERS, detail=str(e))
 
 def handle_analytics_timeseries(event, user):
     """Get analytics timeseries data"""
@@ -445,20 +374,40 @@ def handle_analytics_timeseries(event, user):
                 'metric': metric
             })
         
-        return {
-            'statusCode': 200,
-            'headers': cors_headers(),
-            'body': json.dumps({
-                'metric': metric,
-                'range': range_param,
-                'interval': interval,
-                'data': timeseries
-            }, default=str)
-        }
+        return json_response(200, {
+            'metric': metric,
+            'range': range_param,
+            'interval': interval,
+            'data': timeseries
+        }, CORS_HEADERS)
     
     except Exception as e:
-        return {
-            'statusCode': 500,
-            'headers': cors_headers(),
-            'body': json.dumps({'error': 'Failed to get timeseries', 'detail': str(e)})
-        }
+        return error_response(500, 'Failed to get timeseries', CORS_HEADERS, detail=str(e))
+
+# Route table (compiled once per container)
+ROUTER = Router()
+ROUTER.add('GET', '/admin/users', handle_list_users, auth='admin')
+ROUTER.add('POST', '/admin/users/lookup', handle_lookup_user, auth='admin')
+ROUTER.add('POST', '/admin/groups/{gid}/members', handle_add_member, auth='admin')
+ROUTER.add('PATCH', '/admin/groups/{gid}/members/{uid}', handle_update_member, auth='admin')
+ROUTER.add('DELETE', '/admin/groups/{gid}/members/{uid}', handle_remove_member, auth='admin')
+ROUTER.add('GET', '/admin/analytics', handle_analytics, auth='admin')
+ROUTER.add('GET', '/admin/analytics/timeseries', handle_analytics_timeseries, auth='admin')
+
+class AdminHandler:
+    """Admin routes for the sync-hub API, where this module is bundled as handlers/admin.py"""
+    
+    def bind(self, target):
+        """Adapt a handle_* function to the sync-hub route signature (event, tenant_id, **params)"""
+        def call(event, tenant_id, **params):
+            claims = event.get('requestContext', {}).get('authorizer', {}).get('jwt', {}).get('claims', {})
+            user = {
+                'user_id': claims.get('sub', ''),
+                'tenant_id': tenant_id,
+                'email': claims.get('email', ''),
+                'is_admin': True
+            }
+            if params:
+                event = {**event, 'pathParameters': {**(event.get('pathParameters') or {}), **params}}
+            return target(event, user)
+        return call
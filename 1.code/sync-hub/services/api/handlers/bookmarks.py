@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+import uuid
+import time
+from typing import Dict, Any
+from boto3.dynamodb.conditions import Key
+from shared import aws
+from shared.responses import JSON_HEADERS, error_response, json_response
+
+logger = logging.getLogger(__name__)
+
+class BookmarksHandler:
+    def __init__(self):
+        self.bookmarks_table = aws.table(os.environ['BOOKMARKS_TABLE'])
+    
+    def list_bookmarks(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            response = self.bookmarks_table.query(
+                KeyConditionExpression=Key('tenant_id').eq(tenant_id)
+            )
+            
+            return json_response(200, {"bookmarks": response["Items"]}, JSON_HEADERS)
+        except Exception as e:
+            logger.exception("Error listing bookmarks")
+            return error_response(500, "Internal server error", JSON_HEADERS)
+    
+    def create_bookmark(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            bookmark_id = str(uuid.uuid4())
+            
+            bookmark = {
+                "tenant_id": tenant_id,
+                "bookmark_id": bookmark_id,
+                "title": body.get("title"),
+                "url": body.get("url"),
+                "tags": body.get("tags", []),
+                "created_at": int(time.time()),
+                "updated_at": int(time.time())
+            }
+            
+            self.bookmarks_table.put_item(Item=bookmark)
+            
+            return json_response(201, bookmark, JSON_HEADERS)
+        except Exception as e:
+            logger.exception("Error creating bookmark")
+            return error_response(500, "Internal server error", JSON_HEADERS)
+    
+    def get_bookmark(self, event: Dict[str, Any], tenant_id: str, bookmark_id: str) -> Dict[str, Any]:
+        try:
+            response = self.bookmarks_table.get_item(
+                Key={"tenant_id": tenant_id, "bookmark_id": bookmark_id}
+            )
+            
+            if "Item" not in response:
+                return error_response(404, "Bookmark not found", JSON_HEADERS)
+            
+            return json_response(200, response["Item"], JSON_HEADERS)
+        except Exception as e:
+            logger.exception("Error getting bookmark")
+            return error_response(500, "Internal server error", JSON_HEADERS)
+    
+    def update_bookmark(self, event: Dict[str, Any], tenant_id: str, bookmark_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            
+            update_expression = "SET updated_at = :updated"
+            expression_values = {":updated": int(time.time())}
+            
+            if "title" in body:
+                update_expression += ", title = :title"
+                expression_values[":title"] = body["title"]
+            
+            if "url" in body:
+                update_expression += ", #url = :url"
+                expression_values[":url"] = body["url"]
+            
+            if "tags" in body:
+                update_expression += ", tags = :tags"
+                expression_values[":tags"] = body["tags"]
+            
+            self.bookmarks_table.update_item(
+                Key={"tenant_id": tenant_id, "bookmark_id": bookmark_id},
+                UpdateExpression=update_expression,
+                ExpressionAttributeNames={"#url": "url"} if "url" in body else None,
+                ExpressionAttributeValues=expression_values,
+                ReturnValues="ALL_NEW"
+            )
+            
+            return json_response(200, {"message": "Bookmark updated"}, JSON_HEADERS)
+        except Exception as e:
+            logger.exception("Error updating bookmark")
+            return error_response(500, "Internal server error", JSON_HEADERS)
+    
+    def delete_bookmark(self, event: Dict[str, Any], tenant_id: str, bookmark_id: str) -> Dict[str, Any]:
+        try:
+            self.bookmarks_table.delete_item(
+                Key={"tenant_id": tenant_id, "bookmark_id": bookmark_id}
+            )
+            
+            return json_response(204, headers=JSON_HEADERS)
+        except Exception as e:
+            logger.exception("Error deleting bookmark")
+            return error_response(500, "Internal server error", JSON_HEADERS)
@@ -0,0 +1,109 @@
+import json
+import os
+import uuid
+import time
+from typing import Dict, Any
+from boto3.dynamodb.conditions import Key
+from shared import aws
+from shared.responses import error_response, json_response
+
+class GroupsHandler:
+    def __init__(self):
+        self.groups_table = aws.table(os.environ['GROUPS_TABLE'])
+        self.group_members_table = aws.table(os.environ['GROUP_MEMBERS_TABLE'])
+    
+    def list_groups(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            response = self.groups_table.query(
+                KeyConditionExpression=Key('tenant_id').eq(tenant_id)
+            )
+            
+            return json_response(200, {"groups": response["Items"]})
+        except Exception as e:
+            print(f"Error listing groups: {e}")
+            return error_response(500, "Internal server error")
+    
+    def create_group(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            group_id = str(uuid.uuid4())
+            
+            group = {
+                "tenant_id": tenant_id,
+                "group_id": group_id,
+                "name": body.get("name"),
+                "description": body.get("description", ""),
+                "owner_id": tenant_id,
+                "created_at": int(time.time()),
+                "updated_at": int(time.time())
+            }
+            
+            self.groups_table.put_item(Item=group)
+            
+            return json_response(201, group)
+        except Exception as e:
+            print(f"Error creating group: {e}")
+            return error_response(500, "Internal server error")
+    
+    def get_group(self, event: Dict[str, Any], tenant_id: str, group_id: str) -> Dict[str, Any]:
+        try:
+            response = self.groups_table.get_item(
+                Key={"tenant_id": tenant_id, "group_id": group_id}
+            )
+            
+            if "Item" not in response:
+                return error_response(404, "Group not found")
+            
+            return json_response(200, response["Item"])
+        except Exception as e:
+            print(f"Error getting group: {e}")
+            return error_response(500, "Internal server error")
+    
+    def update_group(self, event: Dict[str, Any], tenant_id: str, group_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            
+            update_expression = "SET updated_at = :updated"
+            expression_values = {":updated": int(time.time())}
+            
+            if "name" in body:
+                update_expression += ", #name = :name"
+                expression_values[":name"] = body["name"]
+            
+            if "description" in body:
+                update_expression += ", description = :description"
+                expression_values[":description"] = body["description"]
+            
+            self.groups_table.update_item(
+                Key={"tenant_id": tenant_id, "group_id": group_id},
+                UpdateExpression=update_expression,
+                ExpressionAttributeNames={"#name": "name"} if "name" in body else None,
+                ExpressionAttributeValues=expression_values
+            )
+            
+            return json_response(200, {"message": "Group updated"})
+        except Exception as e:
+            print(f"Error updating group: {e}")
+            return error_response(500, "Internal server error")
+    
+    def delete_group(self, event: Dict[str, Any], tenant_id: str, group_id: str) -> Dict[str, Any]:
+        try:
+            self.groups_table.delete_item(
+                Key={"tenant_id": tenant_id, "group_id": group_id}
+            )
+            
+            return json_response(204)
+        except Exception as e:
+            print(f"Error deleting group: {e}")
+            return error_response(500, "Internal server error")
+    
+    def list_group_members(self, event: Dict[str, Any], tenant_id: str, group_id: str) -> Dict[str, Any]:
+        try:
+            response = self.group_members_table.query(
+                KeyConditionExpression=Key('tenant_id').eq(tenant_id) & Key('group_id#user_id').begins_with(f"{group_id}#")
+            )
+            
+            return json_response(200, {"members": response["Items"]})
+        except Exception as e:
+            print(f"Error listing group members: {e}")
+            return error_response(500, "Internal server error")
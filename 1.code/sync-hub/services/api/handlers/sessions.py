@@ -0,0 +1,36 @@
+import json
+import logging
+import os
+import time
+from typing import Dict, Any
+from shared import aws
+from shared.responses import JSON_HEADERS, error_response, json_response
+
+logger = logging.getLogger(__name__)
+
+class SessionsHandler:
+    def __init__(self):
+        self.sessions_table = aws.table(os.environ['SESSIONS_TABLE'])
+    
+    def add_emoji_feedback(self, event: Dict[str, Any], tenant_id: str, session_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            emoji = body.get("emoji")
+            
+            if not emoji:
+                return error_response(400, "emoji required", JSON_HEADERS)
+            
+            # Update session with emoji feedback
+            self.sessions_table.update_item(
+                Key={"tenant_id": tenant_id, "session_id": session_id},
+                UpdateExpression="SET emoji_feedback = :emoji, feedback_at = :feedback_at",
+                ExpressionAttributeValues={
+                    ":emoji": emoji,
+                    ":feedback_at": int(time.time())
+                }
+            )
+            
+            return json_response(200, {"emoji": emoji, "session_id": session_id}, JSON_HEADERS)
+        except Exception as e:
+            logger.exception("Error adding emoji feedback")
+            return error_response(500, "Internal server error", JSON_HEADERS)
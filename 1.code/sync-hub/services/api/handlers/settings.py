@@ -0,0 +1,129 @@
+import json
+import os
+import uuid
+import time
+from typing import Dict, Any
+from boto3.dynamodb.conditions import Key
+from shared import aws
+from shared.responses import error_response, json_response
+
+class SettingsHandler:
+    def __init__(self):
+        self.settings_table = aws.table(os.environ['SETTINGS_TABLE'])
+    
+    def list_settings(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            response = self.settings_table.query(
+                KeyConditionExpression=Key('tenant_id').eq(tenant_id)
+            )
+            
+            return json_response(200, {"settings": response["Items"]})
+        except Exception as e:
+            print(f"Error listing settings: {e}")
+            return error_response(500, "Internal server error")
+    
+    def create_setting(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            setting_id = str(uuid.uuid4())
+            
+            setting = {
+                "tenant_id": tenant_id,
+                "setting_id": setting_id,
+                "name": body.get("name"),
+                "value": body.get("value"),
+                "is_public": body.get("is_public", False),
+                "version": 1,
+                "created_at": int(time.time()),
+                "updated_at": int(time.time())
+            }
+            
+            self.settings_table.put_item(Item=setting)
+            
+            return json_response(201, setting)
+        except Exception as e:
+            print(f"Error creating setting: {e}")
+            return error_response(500, "Internal server error")
+    
+    def get_setting(self, event: Dict[str, Any], tenant_id: str, setting_id: str) -> Dict[str, Any]:
+        try:
+            response = self.settings_table.get_item(
+                Key={"tenant_id": tenant_id, "setting_id": setting_id}
+            )
+            
+            if "Item" not in response:
+                return error_response(404, "Setting not found")
+            
+            return json_response(200, response["Item"])
+        except Exception as e:
+            print(f"Error getting setting: {e}")
+            return error_response(500, "Internal server error")
+    
+    def update_setting(self, event: Dict[str, Any], tenant_id: str, setting_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            
+            update_expression = "SET updated_at = :updated"
+            expression_values = {":updated": int(time.time())}
+            
+            if "name" in body:
+                update_expression += ", #name = :name"
+                expression_values[":name"] = body["name"]
+            
+            if "value" in body:
+                update_expression += ", #value = :value"
+                expression_values[":value"] = body["value"]
+            
+            self.settings_table.update_item(
+                Key={"tenant_id": tenant_id, "setting_id": setting_id},
+                UpdateExpression=update_expression,
+                ExpressionAttributeNames={"#name": "name", "#value": "value"} if "name" in body or "value" in body else None,
+                ExpressionAttributeValues=expression_values
+            )
+            
+            return json_response(200, {"message": "Setting updated"})
+        except Exception as e:
+            print(f"Error updating setting: {e}")
+            return error_response(500, "Internal server error")
+    
+    def delete_setting(self, event: Dict[str, Any], tenant_id: str, setting_id: str) -> Dict[str, Any]:
+        try:
+            self.settings_table.delete_item(
+                Key={"tenant_id": tenant_id, "setting_id": setting_id}
+            )
+            
+            return json_response(204)
+        except Exception as e:
+            print(f"Error deleting setting: {e}")
+            return error_response(500, "Internal server error")
+    
+    def update_visibility(self, event: Dict[str, Any], tenant_id: str, setting_id: str) -> Dict[str, Any]:
+        try:
+            body = json.loads(event.get("body", "{}"))
+            is_public = body.get("is_public", False)
+            
+            self.settings_table.update_item(
+                Key={"tenant_id": tenant_id, "setting_id": setting_id},
+                UpdateExpression="SET is_public = :public, updated_at = :updated",
+                ExpressionAttributeValues={
+                    ":public": is_public,
+                    ":updated": int(time.time())
+                }
+            )
+            
+            return json_response(200, {"is_public": is_public})
+        except Exception as e:
+            print(f"Error updating visibility: {e}")
+            return error_response(500, "Internal server error")
+    
+    def list_public_settings(self, event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        try:
+            response = self.settings_table.scan(
+                FilterExpression="is_public = :public",
+                ExpressionAttributeValues={":public": True}
+            )
+            
+            return json_response(200, {"settings": response["Items"]})
+        except Exception as e:
+            print(f"Error listing public settings: {e}")
+            return error_response(500, "Internal server error")
@@ -0,0 +1,110 @@
+from typing import Dict, Any
+from handlers.auth import extract_claims
+from handlers.admin import AdminHandler, ROUTER as ADMIN_ROUTER
+from shared import capacity, capture, metrics, profiling, ratelimit, timing as server_timing
+from shared.responses import compress, error_response, json_response
+from shared.routing import Router, lazy
+
+# Handlers (and boto3 behind them) are built on the first request that routes to them
+SETTINGS = "handlers.settings:SettingsHandler"
+GROUPS = "handlers.groups:GroupsHandler"
+BOOKMARKS = "handlers.bookmarks:BookmarksHandler"
+SESSIONS = "handlers.sessions:SessionsHandler"
+
+admin_handler = AdminHandler()
+
+def health(event: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+    return json_response(200, {"ok": True, "message": "Sync Hub API is running!"})
+
+# Route table (compiled once per container)
+router = Router()
+router.add("GET", "/_health", health, auth="public", cacheable=True)
+
+router.add("GET", "/settings", lazy(SETTINGS, "list_settings"))
+router.add("POST", "/settings", lazy(SETTINGS, "create_setting"))
+router.add("GET", "/settings/public", lazy(SETTINGS, "list_public_settings"), auth="public", cacheable=True)
+router.add("GET", "/settings/{setting_id}", lazy(SETTINGS, "get_setting"))
+router.add("PUT", "/settings/{setting_id}", lazy(SETTINGS, "update_setting"))
+router.add("DELETE", "/settings/{setting_id}", lazy(SETTINGS, "delete_setting"))
+router.add("PUT", "/settings/{setting_id}/visibility", lazy(SETTINGS, "update_visibility"))
+
+router.add("GET", "/groups", lazy(GROUPS, "list_groups"))
+router.add("POST", "/groups", lazy(GROUPS, "create_group"))
+router.add("GET", "/groups/{group_id}", lazy(GROUPS, "get_group"))
+router.add("PUT", "/groups/{group_id}", lazy(GROUPS, "update_group"))
+router.add("DELETE", "/groups/{group_id}", lazy(GROUPS, "delete_group"))
+router.add("GET", "/groups/{group_id}/members", lazy(GROUPS, "list_group_members"))
+
+router.add("GET", "/bookmarks", lazy(BOOKMARKS, "list_bookmarks"))
+router.add("POST", "/bookmarks", lazy(BOOKMARKS, "create_bookmark"))
+router.add("GET", "/bookmarks/{bookmark_id}", lazy(BOOKMARKS, "get_bookmark"))
+router.add("PUT", "/bookmarks/{bookmark_id}", lazy(BOOKMARKS, "update_bookmark"))
+router.add("DELETE", "/bookmarks/{bookmark_id}", lazy(BOOKMARKS, "delete_bookmark"))
+
+router.add("POST", "/sessions/{session_id}/emoji", lazy(SESSIONS, "add_emoji_feedback"))
+
+for admin_route in ADMIN_ROUTER.routes:
+    router.add(admin_route.method, admin_route.pattern, admin_handler.bind(admin_route.target), auth="admin")
+
+SERVICE = "sync-hub-api"
+
+def route_name(event: Dict[str, Any]) -> str:
+    http = event.get("requestContext", {}).get("http", {})
+    route = router.match(http.get("method"), http.get("path")).route
+    return route.name if route else metrics.UNMATCHED_ROUTE
+
+@capture.captured(SERVICE, route_of=route_name)
+@profiling.profiled(SERVICE, route_of=route_name)
+@capacity.accounted(SERVICE)
+def handler(event: Dict[str, Any], context) -> Dict[str, Any]:
+    request = metrics.begin(SERVICE, context)
+    timing = server_timing.begin(event)
+    return metrics.end(request, server_timing.end(timing, dispatch(event, timing)))
+
+def dispatch(event: Dict[str, Any], timing=server_timing.NULL_TIMING) -> Dict[str, Any]:
+    try:
+        method = event.get("requestContext", {}).get("http", {}).get("method")
+        path = event.get("requestContext", {}).get("http", {}).get("path")
+
+        print(f"Processing {method} {path}")
+
+        with timing.phase("route"):
+            match = router.match(method, path)
+        route = match.route
+        if route is None:
+            if match.allowed:
+                response = error_response(405, "Method not allowed")
+                response["headers"]["Allow"] = ", ".join(match.allowed)
+                return response
+            return error_response(404, "Not found")
+        metrics.set_route(route.name)
+        capacity.set_route(route.name)
+
+        if route.auth == "public":
+            with timing.phase("handler", route.name):
+                response = route.target(event, "default", **match.params)
+            return compress(event, response)
+
+        # Extract claims from JWT
+        with timing.phase("claims"):
+            claims = extract_claims(event)
+        tenant_id = claims.get("tenant_id", "default")
+        metrics.set_property("tenant_id", tenant_id)
+        capacity.set_tenant(tenant_id)
+        is_admin = claims.get("is_admin", "false") == "true"
+
+        if route.auth == "admin" and not is_admin:
+            return error_response(403, "Admin access required")
+
+        decision = ratelimit.admit(tenant_id, claims.get("tier"), ratelimit.route_class(method, route))
+        if not decision.allowed:
+            metrics.set_property("throttled", decision.scope)
+            return ratelimit.too_many_requests(decision)
+
+        with timing.phase("handler", route.name):
+            response = route.target(event, tenant_id, **match.params)
+        return compress(event, response)
+
+    except Exception as e:
+        print(f"Unhandled error: {str(e)}")
+        return error_response(500, "Internal server error")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Checks for tools.build_assets (runs offline against a temporary source tree)
+"""
+import gzip
+import os
+import re
+import tempfile
+
+from tools import build_assets
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <title>Test</title>
+    <style>
+        body { margin: 0; }   /* reset */
+    </style>
+</head>
+<body>
+    <!-- comment -->
+    <script>
+        // comment
+        const spec = "/docs/openapi.json";
+        const row = `
+            <td>${spec}</td>
+        `;
+    </script>
+</body>
+</html>
+"""
+
+
+def source_tree():
+    root = tempfile.mkdtemp(prefix="build-src-")
+    os.makedirs(os.path.join(root, "docs"))
+    with open(os.path.join(root, "admin_spa.html"), "w") as f:
+        f.write(PAGE)
+    with open(os.path.join(root, "docs", "openapi.json"), "w") as f:
+        f.write('{"openapi": "3.0.3"}')
+    return root
+
+
+def test_build_fingerprints_and_rewrites_references():
+    result = build_assets.build(source_tree())
+    html = result.files["admin/index.html"].decode()
+    assert "<style" not in html and "comment" not in html
+
+    referenced = re.findall(r'(?:href|src)="/([^"]+)"', html)
+    assert sorted(referenced) == sorted([result.manifest["admin.css"], result.manifest["admin.js"]])
+    for key in referenced:
+        assert key in result.files
+        assert build_assets.cache_control_for(key) == build_assets.IMMUTABLE_CACHE_CONTROL
+    assert build_assets.cache_control_for("admin/index.html.gz") == build_assets.HTML_CACHE_CONTROL
+    assert build_assets.cache_control_for("docs/openapi.json") == build_assets.STABLE_CACHE_CONTROL
+
+    js = result.files[result.manifest["admin.js"]].decode()
+    assert f'"/{result.manifest["docs/openapi.json"]}"' in js
+    assert "            <td>${spec}</td>" in js  # template literal untouched
+    assert result.files[result.manifest["admin.css"]] == b"body{margin:0}\n"
+
+
+def test_write_is_reproducible_with_sidecars():
+    root = source_tree()
+    first, second = tempfile.mkdtemp(), tempfile.mkdtemp()
+    build_assets.write(build_assets.build(root), first)
+    build_assets.write(build_assets.build(root), second)
+    for directory, _, names in os.walk(first):
+        for name in names:
+            path = os.path.join(directory, name)
+            with open(path, "rb") as a, open(os.path.join(second, os.path.relpath(path, first)), "rb") as b:
+                assert a.read() == b.read(), path
+
+    with open(os.path.join(first, "admin", "index.html"), "rb") as f:
+        plain = f.read()
+    with gzip.open(os.path.join(first, "admin", "index.html.gz")) as f:
+        assert f.read() == plain
+    encodings = {asset.key: asset.content_encoding for asset in build_assets.assets_for(first)}
+    assert encodings["admin/index.html.gz"] == "gzip" and encodings["admin/index.html"] is None
+
+
+def test_viewer_request_function_matches_the_built_sidecars(monkeypatch):
+    monkeypatch.setattr(build_assets, "brotli", None)
+    output = tempfile.mkdtemp()
+    build_assets.write(build_assets.build(source_tree()), output)
+    assert build_assets.built_suffixes(output) == [".gz"]
+    code = build_assets.viewer_request_function(build_assets.built_suffixes(output))
+    assert "'.gz'" in code and ".br" not in code
+    assert "'.br'" in build_assets.viewer_request_function([".br", ".gz"])
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Sanitization and round-trip checks for shared.capture (runs offline, writes to a temp directory)
+"""
+import json
+import tempfile
+
+from shared import capture
+
+
+def event():
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": "/settings",
+        "rawQueryString": "access_token=secret&limit=5",
+        "cookies": ["session=secret"],
+        "headers": {"authorization": "Bearer secret", "accept-encoding": "gzip", "x-forwarded-for": "203.0.113.9",
+                    "content-type": "application/json"},
+        "queryStringParameters": {"access_token": "secret", "limit": "5"},
+        "requestContext": {
+            "http": {"method": "POST", "path": "/settings", "protocol": "HTTP/1.1", "sourceIp": "203.0.113.9"},
+            "authorizer": {"jwt": {"claims": {"tenant_id": "acme", "sub": "user-1", "email": "a@acme.example",
+                                              "is_admin": "false", "tier": "pro"}}},
+        },
+        "body": json.dumps({"name": "settings.json", "value": "{\"theme\": \"dark\"}", "is_public": True}),
+    }
+
+
+def test_sanitize_event_strips_credentials_and_hashes_tenants():
+    sanitized = capture.sanitize_event(event(), salt="s")
+    text = json.dumps(sanitized)
+    for secret in ("secret", "203.0.113.9", "a@acme.example", "acme", "user-1"):
+        assert secret not in text, secret
+    claims = sanitized["requestContext"]["authorizer"]["jwt"]["claims"]
+    assert claims == {"tenant_id": capture.hash_id("acme", "s"), "sub": capture.hash_id("user-1", "s"),
+                      "is_admin": "false", "tier": "pro"}
+    assert capture.hash_id("acme", "s") != capture.hash_id("acme", "t")
+    assert sanitized["headers"] == {"accept-encoding": "gzip", "content-type": "application/json"}
+    assert sanitized["queryStringParameters"] == {"limit": "5"}
+    body = json.loads(sanitized["body"])
+    assert body == {"name": "x" * len("settings.json"), "value": "x" * len("{\"theme\": \"dark\"}"), "is_public": True}
+
+
+def test_captured_handler_round_trips_through_ndjson():
+    output = tempfile.mkdtemp(prefix="capture-")
+
+    def handler(event, context):
+        return {"statusCode": 201, "body": "{}"}
+
+    assert capture.captured("svc", sample_rate=0)(handler) is handler
+    assert capture.captured("svc", sample_rate=1.0, output=output, salt="")(handler) is handler  # no salt, no capture
+    wrapped = capture.captured("svc", route_of=lambda e: "POST /settings", sample_rate=1.0, output=output,
+                               salt="s")(handler)
+    assert wrapped(event(), None)["statusCode"] == 201
+    wrapped.recorder.flush()
+
+    records = list(capture.read_records([output]))
+    assert len(records) == 1
+    assert records[0]["route"] == "POST /settings"
+    assert records[0]["status"] == 201
+    assert records[0]["response_bytes"] == 2
+    assert "secret" not in json.dumps(records[0])
+
+
+def test_user_ids_in_admin_paths_are_hashed():
+    admin = event()
+    path = "/admin/groups/g-7/members/user-2"
+    admin["rawPath"] = admin["requestContext"]["http"]["path"] = path
+    admin["pathParameters"] = {"gid": "g-7", "uid": "user-2"}
+    self_path = dict(admin, rawPath="/admin/users/user-1")  # the caller's own sub, in another route's path
+
+    sanitized = capture.sanitize_event(admin, salt="s")
+    text = json.dumps(sanitized) + json.dumps(capture.sanitize_event(self_path, salt="s"))
+    for raw in ("user-1", "user-2", "acme", "secret"):
+        assert raw not in text, raw
+    hashed = f"/admin/groups/g-7/members/{capture.hash_id('user-2', 's')}"
+    assert sanitized["rawPath"] == sanitized["requestContext"]["http"]["path"] == hashed
+    assert sanitized["pathParameters"] == {"gid": "g-7", "uid": capture.hash_id("user-2", "s")}
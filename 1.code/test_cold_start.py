@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Cold-start regression check for the sync-hub API Lambda (runs offline, no AWS calls)
+
+Profiles `import main` the way the Lambda runtime does at init and writes the
+importtime summary to .artifacts/ (override with IMPORTTIME_REPORT_DIR) so CI can
+keep it. Fails when the AWS SDK is pulled into init again or when init exceeds
+COLD_START_BUDGET_MS.
+"""
+import json
+import os
+
+from tools.importtime import format_report, profile_import
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.join(ROOT, "sync-hub", "services", "api")
+REPORT_DIR = os.getenv("IMPORTTIME_REPORT_DIR", os.path.join(ROOT, ".artifacts"))
+BUDGET_MS = float(os.getenv("COLD_START_BUDGET_MS", "120"))
+
+# Only the first request that needs DynamoDB/Cognito may load these
+DEFERRED_PACKAGES = {"boto3", "botocore", "s3transfer", "aws_lambda_powertools"}
+
+
+def test_sync_hub_init():
+    report = profile_import("main", [API_DIR, ROOT], runs=5)
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    with open(os.path.join(REPORT_DIR, "importtime-sync-hub.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print(format_report(report))
+
+    eager = DEFERRED_PACKAGES.intersection(report["loaded"])
+    assert not eager, f"imported at init: {sorted(eager)}"
+    assert report["init_ms"] < BUDGET_MS, f"init took {report['init_ms']:.1f} ms (budget {BUDGET_MS:.0f} ms)"
+
+
+if __name__ == "__main__":
+    test_sync_hub_init()
+    print("✅ test_sync_hub_init")
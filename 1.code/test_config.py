@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Checks for shared.config's last-known-values cache (offline; fetch is a stub)
+"""
+import json
+import os
+import stat
+import tempfile
+
+from shared import config
+
+
+def test_secure_strings_are_not_persisted():
+    cache_dir = os.path.join(tempfile.mkdtemp(), "config")
+    values = {"api/url": "https://api.example.com", "db/password": config.Secret("hunter2")}
+    store = config.ParameterStore("/saas/dev", fetch=lambda path: values, cache_dir=cache_dir)
+    assert store.load() and store.get("db/password") == "hunter2"
+
+    with open(store.cache_file) as f:
+        assert json.load(f)["values"] == {"api/url": "https://api.example.com"}
+    assert stat.S_IMODE(os.stat(store.cache_file).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(cache_dir).st_mode) == 0o700
+
+    def unreachable(path):
+        raise ConnectionError("SSM unreachable")
+
+    restarted = config.ParameterStore("/saas/dev", fetch=unreachable, cache_dir=cache_dir)
+    assert not restarted.load()
+    assert restarted.get("api/url") == "https://api.example.com"
+    assert restarted.get("db/password", "default") == "default"
+
+
+def test_fetch_marks_secure_strings(monkeypatch):
+    from moto import mock_aws
+    from shared import aws
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        aws.reset()
+        ssm = aws.client("ssm")
+        ssm.put_parameter(Name="/saas/dev/api/url", Value="https://api.example.com", Type="String")
+        ssm.put_parameter(Name="/saas/dev/db/password", Value="hunter2", Type="SecureString")
+        values = config.fetch_parameters("/saas/dev")
+    aws.reset()
+    assert values == {"api/url": "https://api.example.com", "db/password": "hunter2"}
+    assert isinstance(values["db/password"], config.Secret) and not isinstance(values["api/url"], config.Secret)
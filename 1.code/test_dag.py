@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Scheduling, caching and resume checks for tools.dag (runs offline)
+"""
+import os
+import tempfile
+import threading
+import time
+
+from tools import dag
+
+
+def test_independent_steps_overlap_and_failures_block_dependents():
+    state = os.path.join(tempfile.mkdtemp(), "state.json")
+    barrier = threading.Barrier(2, timeout=5)
+    steps = [
+        # b only passes if a runs at the same time; the sleep keeps a/b -> c the longest chain
+        dag.Step("a", lambda outputs: (barrier.wait(), time.sleep(0.2), "a")[2]),
+        dag.Step("b", lambda outputs: (barrier.wait(), time.sleep(0.2), "b")[2]),
+        dag.Step("c", lambda outputs: sorted(outputs.items()), deps=["a", "b"]),
+        dag.Step("d", dag.command(["false"]), allow_failure=True),
+        dag.Step("e", lambda outputs: "after d", deps=["d"]),
+        dag.Step("f", dag.command(["false"])),
+        dag.Step("g", lambda outputs: "never", deps=["f"]),
+    ]
+    results = dag.run(steps, state, workers=4)
+    assert results["c"].output == [("a", "a"), ("b", "b")]
+    assert results["d"].status == "allowed" and results["e"].status == "ok"
+    assert results["f"].status == "failed" and results["g"].status == "blocked"
+    assert dag.critical_path(steps, results)[-1] == "c"
+
+
+def test_cache_keys_and_resume_skip_completed_steps():
+    state = os.path.join(tempfile.mkdtemp(), "state.json")
+    calls = []
+    broken = {"flag": True}
+
+    def step(name):
+        def run(outputs):
+            calls.append(name)
+            if name == "deploy" and broken["flag"]:
+                raise dag.StepFailed("boom")
+            return name
+        return run
+
+    steps = [
+        dag.Step("build", step("build"), cache_key="v1"),
+        dag.Step("upload", step("upload")),
+        dag.Step("deploy", step("deploy"), deps=["build", "upload"]),
+    ]
+    dag.run(steps, state)
+    assert sorted(calls) == ["build", "deploy", "upload"]
+
+    calls.clear()
+    broken["flag"] = False
+    results = dag.run(steps, state, resume=True)
+    assert calls == ["deploy"]
+    assert results["build"].status == "cached" and results["deploy"].output == "deploy"
+
+    calls.clear()
+    dag.run(steps, state, force=["build"])
+    assert sorted(calls) == ["build", "deploy", "upload"]
+
+    try:
+        dag.order([dag.Step("x", None, deps=["y"]), dag.Step("y", None, deps=["x"])])
+        assert False, "cycle not detected"
+    except ValueError as e:
+        assert "cycle" in str(e)
+
+
+def test_admin_tables_step_raises_and_is_keyed_on_the_tables(monkeypatch):
+    from moto import mock_aws
+    import boto3
+    import admin_dynamodb_tables
+    import deploy_admin_panel
+
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        missing = deploy_admin_panel.admin_tables_key({})
+        admin_dynamodb_tables.create_admin_tables()
+        created = deploy_admin_panel.admin_tables_key({})
+        assert created != missing and deploy_admin_panel.admin_tables_key({}) == created
+
+        client = boto3.client("dynamodb", region_name="us-east-1")
+        client.delete_table(TableName="sync-hub-audit")
+        assert deploy_admin_panel.admin_tables_key({}) not in (created, missing)
+
+        def denied(**kwargs):
+            raise RuntimeError("AccessDenied")
+
+        monkeypatch.setattr(client, "create_table", denied)
+        monkeypatch.setattr(admin_dynamodb_tables.boto3, "client", lambda *args, **kwargs: client)
+        try:
+            admin_dynamodb_tables.create_admin_tables()
+        except RuntimeError as e:
+            assert "sync-hub-audit" in str(e) and "AccessDenied" in str(e)
+        else:
+            raise AssertionError("expected RuntimeError")
+
+
+def test_callable_keys_are_stored_as_they_stand_after_the_run():
+    state = os.path.join(tempfile.mkdtemp(), "state.json")
+    stack = {"updated": 0}
+    calls = []
+
+    def deploy(outputs):
+        calls.append("deploy")
+        stack["updated"] += 1
+
+    steps = [dag.Step("deploy", deploy, cache_key=lambda outputs: f"updated={stack['updated']}")]
+    dag.run(steps, state)
+    assert dag.run(steps, state)["deploy"].status == "cached" and calls == ["deploy"]
+
+    stack["updated"] += 1  # changed outside the deploy
+    dag.run(steps, state)
+    assert calls == ["deploy", "deploy"]
+
+
+def test_cdk_steps_are_keyed_on_the_stacks(monkeypatch):
+    import botocore.exceptions
+    import deploy_admin_panel
+
+    stacks = {}
+
+    class FakeCloudFormation:
+        class exceptions:
+            ClientError = botocore.exceptions.ClientError
+
+        def describe_stacks(self, StackName):
+            if StackName not in stacks:
+                error = {"Code": "ValidationError", "Message": f"Stack with id {StackName} does not exist"}
+                raise botocore.exceptions.ClientError({"Error": error}, "DescribeStacks")
+            return {"Stacks": [stacks[StackName]]}
+
+    monkeypatch.setattr(deploy_admin_panel.boto3, "client", lambda *args, **kwargs: FakeCloudFormation())
+    monkeypatch.setattr(deploy_admin_panel, "CDK_DIR", tempfile.mkdtemp())
+    missing = deploy_admin_panel.synthesized_templates({})
+    bootstrap_missing = deploy_admin_panel.bootstrap_key({})
+
+    stacks["SyncHubApiStack"] = {"StackStatus": "UPDATE_COMPLETE", "LastUpdatedTime": "2026-10-19T10:00:00Z"}
+    stacks["CDKToolkit"] = {"StackStatus": "CREATE_COMPLETE", "CreationTime": "2026-01-01T00:00:00Z"}
+    deployed = deploy_admin_panel.synthesized_templates({})
+    assert deployed != missing and deploy_admin_panel.synthesized_templates({}) == deployed
+    assert deploy_admin_panel.bootstrap_key({}) != bootstrap_missing
+
+    stacks["SyncHubApiStack"] = {"StackStatus": "UPDATE_ROLLBACK_COMPLETE", "LastUpdatedTime": "2026-10-19T11:00:00Z"}
+    rolled_back = deploy_admin_panel.synthesized_templates({})
+    assert len({missing, deployed, rolled_back}) == 3
+    del stacks["SyncHubApiStack"]
+    assert deploy_admin_panel.synthesized_templates({}) == missing
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Checks for tools.lambda_artifacts (runs offline; layers are not built)
+"""
+import os
+import tempfile
+import zipfile
+
+from tools import lambda_artifacts
+
+
+def source_tree():
+    root = tempfile.mkdtemp(prefix="lambda-src-")
+    for path, body in {
+        "svc/main.py": "def handler(event, context): pass\n",
+        "svc/requirements.txt": "boto3\n",
+        "svc/__pycache__/main.cpython-311.pyc": "",
+        "shared/__init__.py": "",
+        "shared/tests/test_shared.py": "",
+    }.items():
+        os.makedirs(os.path.dirname(os.path.join(root, path)), exist_ok=True)
+        with open(os.path.join(root, path), "w") as f:
+            f.write(body)
+    return root
+
+
+def test_builds_are_reproducible_pruned_and_cached(monkeypatch):
+    artifacts = tempfile.mkdtemp(prefix="lambda-artifacts-")
+    monkeypatch.setattr(lambda_artifacts, "ARTIFACTS", artifacts)
+    monkeypatch.setattr(lambda_artifacts, "MANIFEST", os.path.join(artifacts, "manifest.json"))
+    monkeypatch.setitem(lambda_artifacts.FUNCTIONS, "svc", lambda_artifacts.Function(
+        "svc", [("svc", ""), ("shared", "shared")], "main.handler", "python3.12"))
+    root = source_tree()
+
+    first = lambda_artifacts.build_function(lambda_artifacts.FUNCTIONS["svc"], root)
+    assert not first.cached
+    assert zipfile.ZipFile(first.path).namelist() == ["main.py", "shared/__init__.py"]
+    assert {info.date_time for info in zipfile.ZipFile(first.path).infolist()} == {lambda_artifacts.FIXED_DATE}
+
+    with open(first.path, "rb") as f:
+        original = f.read()
+    os.remove(first.path)
+    os.utime(os.path.join(root, "svc", "main.py"), (0, 0))
+    rebuilt = lambda_artifacts.build_function(lambda_artifacts.FUNCTIONS["svc"], root)
+    with open(rebuilt.path, "rb") as f:
+        assert f.read() == original
+    assert lambda_artifacts.build_function(lambda_artifacts.FUNCTIONS["svc"], root).cached
+
+    with open(os.path.join(root, "svc", "main.py"), "a") as f:
+        f.write("# changed\n")
+    changed = lambda_artifacts.build_function(lambda_artifacts.FUNCTIONS["svc"], root)
+    assert not changed.cached and changed.code_sha256 != first.code_sha256
+
+
+def test_layer_requirements_leave_out_runtime_packages():
+    path = os.path.join(tempfile.mkdtemp(), "requirements.txt")
+    with open(path, "w") as f:
+        f.write("fastapi>=0.104.0\nboto3>=1.34.0  # runtime\n\nbotocore\npython-jose[cryptography]>=3.3.0\n")
+    assert lambda_artifacts.layer_requirements(path) == ["fastapi>=0.104.0", "python-jose[cryptography]>=3.3.0"]
+
+
+def test_functions_bundling_shared_declare_its_requirements():
+    for function in lambda_artifacts.FUNCTIONS.values():
+        lambda_artifacts.check_requirements(function)  # raises ValueError
+        assert function.requirements and os.path.exists(os.path.join(lambda_artifacts.ROOT, function.requirements))
+
+    bare = lambda_artifacts.Function("bare", [("shared", "shared")], "main.handler", "python3.12")
+    try:
+        lambda_artifacts.check_requirements(bare)
+    except ValueError as e:
+        assert "cryptography" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_current_entry_rejects_missing_and_stale_artifacts(monkeypatch):
+    artifacts = tempfile.mkdtemp(prefix="lambda-artifacts-")
+    monkeypatch.setattr(lambda_artifacts, "ARTIFACTS", artifacts)
+    monkeypatch.setattr(lambda_artifacts, "MANIFEST", os.path.join(artifacts, "manifest.json"))
+    monkeypatch.setitem(lambda_artifacts.FUNCTIONS, "svc", lambda_artifacts.Function(
+        "svc", [("svc", "")], "main.handler", "python3.12"))
+    root = source_tree()
+
+    def expect_stale(message):
+        try:
+            lambda_artifacts.current_entry("svc", root)
+        except ValueError as e:
+            assert message in str(e), str(e)
+        else:
+            raise AssertionError(f"expected ValueError({message!r})")
+
+    expect_stale("No svc artifact")
+    lambda_artifacts.build(["svc"], root)
+    assert lambda_artifacts.current_entry("svc", root)["handler"] == "main.handler"
+    with open(os.path.join(root, "svc", "main.py"), "a") as f:
+        f.write("# changed\n")
+    expect_stale("other sources")
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Checks for tools.local_gateway driven in-process over ASGI (in-memory DynamoDB, no tokens minted)
+"""
+import asyncio
+
+import httpx
+
+from shared import aws
+from tools.local_gateway import Gateway
+
+
+def test_public_routes_skip_the_authorizer():
+    async def go():
+        gateway = Gateway(threads=2, fake_dynamodb="5")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=gateway), base_url="http://gateway") as client:
+            public, private = await client.get("/settings/public"), await client.get("/settings")
+        gateway.shutdown()
+        return public, private
+
+    public, private = asyncio.run(go())
+    aws.reset()
+    assert public.status_code == 200 and len(public.json()["settings"]) > 0
+    assert private.status_code == 401
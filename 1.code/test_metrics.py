@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Checks for shared.metrics records, read back from the local file sink
+"""
+import base64
+import gzip
+import os
+import tempfile
+
+from bench.ddbfake import FakeDynamoDB, install_shared
+from shared import aws, capacity, metrics
+
+
+def test_response_bytes_count_decoded_base64_bodies(monkeypatch):
+    sink = os.path.join(tempfile.mkdtemp(), "emf.ndjson")
+    monkeypatch.setattr(metrics, "_config", {"enabled": None, "sink_path": None, "stdout": None})
+    metrics.configure(enabled=True, sink_path=sink, stdout=False)
+
+    compressed = gzip.compress(b'{"items": []}' * 50)
+    for size in range(len(compressed) - 2, len(compressed) + 1):  # every base64 padding length
+        request = metrics.begin("svc")
+        metrics.set_route("GET /settings")
+        body = base64.b64encode(compressed[:size]).decode()
+        metrics.end(request, {"statusCode": 200, "body": body, "isBase64Encoded": True})
+    request = metrics.begin("svc")
+    metrics.end(request, {"statusCode": 404, "body": "missing"})
+
+    records = metrics.read_records(sink)
+    assert [record["ResponseBytes"] for record in records] == [len(compressed) - 2, len(compressed) - 1,
+                                                               len(compressed), 7]
+    assert records[0]["Route"] == "GET /settings" and records[-1]["Route"] == metrics.UNMATCHED_ROUTE
+    assert records[-1]["StatusCode"] == 404
+
+
+def test_consumed_capacity_is_requested_for_either_reader(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setenv("HOTKEY_TRACKING", "false")
+    monkeypatch.setattr(metrics, "_config", {"enabled": False, "sink_path": None, "stdout": False})
+    aws.reset()
+    fake = install_shared(FakeDynamoDB())
+    fake.create_table("t", "pk")
+    fake.load("t", [{"pk": "a"}])
+
+    # Capacity accounting on its own still gets ConsumedCapacity back
+    monkeypatch.setenv("CAPACITY_ACCOUNTING", "true")
+    ledger = capacity.begin("svc")
+    aws.table("t").get_item(Key={"pk": "a"})
+    assert [entry["rcu"] for entry in ledger.records()] == [0.5]
+    capacity.flush(ledger)
+
+    # ...and so do metrics on their own
+    monkeypatch.setenv("CAPACITY_ACCOUNTING", "false")
+    metrics.configure(enabled=True)
+    request = metrics.begin("svc")
+    aws.table("t").get_item(Key={"pk": "a"})
+    assert request.rcu == 0.5 and request.ddb_calls == 1
+    metrics.end(request, {"statusCode": 200})
+    aws.reset()
+
+
+def test_hot_keys_use_the_table_key_schema_not_dict_order(monkeypatch):
+    from shared import hotkeys
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setattr(hotkeys, "_described_keys", {})
+    aws.reset()
+    fake = install_shared(FakeDynamoDB())
+    fake.create_table("settings", "tenant_id", "setting_id")
+
+    # A caller listing the sort key first must not change what counts as the partition key
+    assert hotkeys.partition_keys("GetItem", {"TableName": "settings",
+                                              "Key": {"setting_id": "s-1", "tenant_id": "t-1"}}) == [("settings", "t-1")]
+    assert hotkeys.partition_keys("Query", {
+        "TableName": "settings", "KeyConditionExpression": "setting_id = :s AND tenant_id = :t",
+        "ExpressionAttributeValues": {":s": "s-1", ":t": "t-2"}}) == [("settings", "t-2")]
+    assert hotkeys.partition_keys("GetItem", {"TableName": "missing", "Key": {"id": "x"}}) == []
+    assert fake.calls["DescribeTable"] == 2  # once per table, including the one that failed
+    aws.reset()
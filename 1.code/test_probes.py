@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Checks for tools.probes against an in-process transport, with EMF going to a file sink
+"""
+import asyncio
+import os
+import tempfile
+
+import httpx
+
+from bench.harness import Histogram
+from shared import metrics
+from tools import probes
+
+SLOW_PATHS = {"/settings": 0.05}
+
+
+async def handler(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(SLOW_PATHS.get(request.url.path, 0))
+    if request.url.path == "/groups":
+        return httpx.Response(503)
+    if request.url.path in ("/settings", "/groups") and request.headers.get("Authorization") != "Bearer t":
+        return httpx.Response(401)
+    return httpx.Response(200, json={})
+
+
+def run(runner, rounds, warmup=0):
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await runner.run(client, rounds, interval=0, warmup=warmup)
+    return asyncio.run(go())
+
+
+def test_rounds_report_slo_breaches_and_emit_emf(monkeypatch):
+    sink = os.path.join(tempfile.mkdtemp(), "probes.ndjson")
+    monkeypatch.setattr(metrics, "_config", {"enabled": None, "sink_path": None, "stdout": None})
+    metrics.configure(enabled=True, sink_path=sink, stdout=False)
+    selected = [probes.Probe("health", "api", "/_health", probes.SLO(40, 40)),
+                probes.Probe("settings", "api", "/settings", probes.SLO(40, 40), auth=True),
+                probes.Probe("groups", "api", "/groups", probes.SLO(1000, 1000), auth=True),
+                probes.Probe("web", "user-web", "/_health", probes.SLO(40, 40))]
+
+    assert [p.name for p in probes.Runner(selected, {"api": "http://api"}).probes] == ["health"]
+    runner = probes.Runner(selected, {"api": "http://api/"}, token=lambda: "t", samples=2, window=2)
+    statuses = {status["probe"]: status for status in run(runner, 3, warmup=1)}
+
+    assert statuses["health"]["breaches"] == [] and statuses["health"]["requests"] == 4
+    assert any(breach.startswith("p99") for breach in statuses["settings"]["breaches"])
+    assert statuses["groups"]["availability"] == 0.0 and statuses["groups"]["error_breakdown"] == {"HTTP 503": 4}
+    assert runner.windows["health"].baseline.count == 2  # the first round aged out (the warm-up never counted)
+    assert sorted(runner.baselines()) == ["health"]  # breached probes do not seed a baseline
+
+    records = metrics.read_records(sink)
+    assert len(records) == 9
+    record = records[-1]
+    assert record["_aws"]["CloudWatchMetrics"][0]["Dimensions"] == probes.EMF_DIMENSIONS
+    assert record["Probe"] == "groups" and record["Errors"] == 2 and record["SLOBreach"] == 1
+    assert len(record["Latency"]) == 2
+
+
+def test_tail_regression_is_flagged_against_the_baseline():
+    baseline = Histogram()
+    for _ in range(probes.MIN_BASELINE_SAMPLES):
+        baseline.record(2000)  # 2ms
+    probe = probes.Probe("settings", "api", "/settings", probes.SLO(1000, 1000), auth=True)
+    runner = probes.Runner([probe], {"api": "http://api"}, token=lambda: "t", samples=5,
+                           baselines={"settings": baseline})
+    status = run(runner, 1)[0]
+    assert status["breaches"] == [] and status["regression"]
+
+    state = os.path.join(tempfile.mkdtemp(), "baseline.json")
+    probes.save_baselines(state, runner.baselines())
+    assert probes.load_baselines(state)["settings"].count == probes.MIN_BASELINE_SAMPLES  # regressed: not merged
+
+    healthy = probes.Runner([probe], {"api": "http://api"}, token=lambda: "t", samples=5)
+    run(healthy, 1)
+    assert healthy.baselines()["settings"].count == 5
+
+
+def test_slo_parse():
+    slo = probes.SLO.parse("150:600:99.9")
+    assert (slo.p50_ms, slo.p99_ms, slo.availability) == (150, 600, 99.9)
+    assert probes.SLO.parse("150:600").availability == 99.0
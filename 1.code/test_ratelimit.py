@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Admission control checks for shared.ratelimit (offline; DynamoDB is bench.ddbfake)
+"""
+from bench.ddbfake import FakeDynamoDB, install_shared
+from shared import aws, capacity, metrics, ratelimit
+
+LIMITS = {
+    "standard": {"read": (2, 4), "write": (1, 2)},
+    "premium": {"read": (10, 20)},
+}
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_bucket_refills_at_the_tier_rate():
+    clock = Clock()
+    limiter = ratelimit.Limiter(LIMITS, clock=clock)
+    assert all(limiter.admit("t", "standard", "read").allowed for _ in range(4))  # burst
+    refused = limiter.admit("t", "standard", "read")
+    assert not refused.allowed and refused.retry_after == 0.5 and refused.scope == "local"
+
+    clock.now += 0.5
+    assert limiter.admit("t", "standard", "read").allowed
+    assert not limiter.admit("t", "standard", "read").allowed
+    clock.now += 60
+    assert sum(limiter.admit("t", "standard", "read").allowed for _ in range(10)) == 4  # capped at burst
+
+
+def test_tiers_and_classes_have_separate_limits():
+    limiter = ratelimit.Limiter(LIMITS, clock=Clock())
+    assert sum(limiter.admit("t", "premium", "read").allowed for _ in range(30)) == 20
+    assert sum(limiter.admit("t", "standard", "write").allowed for _ in range(5)) == 2
+    assert sum(limiter.admit("other", None, "write").allowed for _ in range(5)) == 2  # default tier
+    # A class the tier does not define falls back to the default tier's limit
+    assert limiter.limit_for("premium", "write") == (1, 2)
+
+
+def test_too_many_requests_response():
+    response = ratelimit.too_many_requests(ratelimit.Decision(False, retry_after=0.2, limit=2, remaining=0.7))
+    assert response["statusCode"] == 429
+    assert response["headers"]["Retry-After"] == "1"
+    assert response["headers"]["RateLimit-Limit"] == "2"
+    assert response["headers"]["RateLimit-Remaining"] == "0"
+
+
+def setup_fake(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setattr(ratelimit, "SYNC_SECONDS", 0)
+    aws.reset()
+    return install_shared(FakeDynamoDB())
+
+
+def test_global_budget_blocks_until_the_window_ends_without_being_accounted(monkeypatch):
+    fake = setup_fake(monkeypatch)
+    fake.create_table("rate-limits", "pk")
+    fake.load("rate-limits", [{"pk": "t#write#16666", "admitted": 200}])  # other containers' share
+    clock = Clock(16666 * 60 + 10)
+    limiter = ratelimit.Limiter(LIMITS, table_name="rate-limits", clock=clock)
+
+    monkeypatch.setenv("CAPACITY_ACCOUNTING", "true")
+    monkeypatch.setattr(metrics, "_config", {"enabled": True, "sink_path": None, "stdout": False})
+    request, ledger = metrics.begin("svc"), capacity.begin("svc")
+    assert limiter.admit("t", "standard", "write").allowed  # admitted locally, then found over budget
+    assert request.ddb_calls == 0 and ledger.records() == []
+    metrics.end(request, {"statusCode": 200})
+    capacity.flush(ledger)
+
+    blocked = limiter.admit("t", "standard", "write")
+    assert not blocked.allowed and blocked.scope == "global" and blocked.retry_after == 50
+    clock.now += 50
+    assert limiter.admit("t", "standard", "write").allowed
+    aws.reset()
+
+
+def test_fails_open_when_dynamodb_errors(monkeypatch):
+    setup_fake(monkeypatch)  # no table: every UpdateItem fails
+    limiter = ratelimit.Limiter(LIMITS, table_name="missing", clock=Clock())
+    assert [limiter.admit("t", "standard", "write").allowed for _ in range(3)] == [True, True, False]
+    aws.reset()
+
+
+def test_unsynced_counts_stay_in_their_minute(monkeypatch):
+    fake = setup_fake(monkeypatch)
+    fake.create_table("rate-limits", "pk")
+    monkeypatch.setattr(ratelimit, "SYNC_SECONDS", 30)
+    clock = Clock(100 * 60 + 50)
+    limiter = ratelimit.Limiter({"standard": {"read": (100, 100)}}, table_name="rate-limits", clock=clock)
+    for _ in range(5):
+        assert limiter.admit("t", "standard", "read").allowed  # pending, next sync at :80
+    clock.now = 101 * 60 + 30
+    assert limiter.admit("t", "standard", "read").allowed  # sync due, in the next minute
+
+    items = aws.client("dynamodb", instrumented=False).scan(TableName="rate-limits")["Items"]
+    assert [(item["pk"]["S"], item["admitted"]["N"]) for item in items] == [("t#read#101", "1")]
+    aws.reset()
+
+
+def test_budgets_are_bounded(monkeypatch):
+    setup_fake(monkeypatch).create_table("rate-limits", "pk")
+    monkeypatch.setattr(ratelimit, "MAX_BUCKETS", 3)
+    limiter = ratelimit.Limiter(LIMITS, table_name="rate-limits", clock=Clock())
+    for i in range(10):
+        assert limiter.admit(f"tenant-{i}", "standard", "read").allowed
+    assert len(limiter._budgets) <= 3 and len(limiter._buckets) <= 3
+    aws.reset()
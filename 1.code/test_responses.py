@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Encoding checks for shared.responses (orjson when installed, stdlib json otherwise)
+"""
+import json
+from decimal import Decimal
+
+from shared import responses
+
+
+def test_dynamodb_numbers_encode_at_any_size():
+    body = json.loads(responses.encode({
+        "count": Decimal("42"),
+        "ratio": Decimal("0.5"),
+        "max_u64": Decimal(2 ** 64 - 1),
+        "huge": Decimal("1" + "0" * 37),  # DynamoDB allows 38 digits
+        "negative": Decimal(-(2 ** 70)),
+    }))
+    assert body["count"] == 42 and isinstance(body["count"], int)
+    assert body["ratio"] == 0.5 and body["max_u64"] == 2 ** 64 - 1
+    assert body["huge"] == 1e37 and body["negative"] == float(-(2 ** 70))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Route table checks for shared.routing (runs offline, no AWS calls)
+"""
+from shared.routing import Router
+
+
+def build_router():
+    router = Router()
+    router.add("GET", "/settings", "list_settings")
+    router.add("GET", "/settings/public", "list_public_settings")
+    router.add("GET", "/settings/{setting_id}", "get_setting")
+    router.add("PUT", "/settings/{setting_id}", "update_setting")
+    router.add("PUT", "/settings/{setting_id}/visibility", "update_visibility")
+    router.add("GET", "/groups/{group_id}", "get_group")
+    router.add("GET", "/groups/{group_id}/members", "list_group_members")
+    router.add("GET", "/items/{n:int}", "get_item")
+    return router
+
+
+def test_static_and_parameter_routes():
+    router = build_router()
+    assert router.match("GET", "/settings").route.target == "list_settings"
+    assert router.match("GET", "/settings/").route.target == "list_settings"
+    assert router.match("GET", "/settings/public").route.target == "list_public_settings"
+
+    match = router.match("GET", "/settings/abc")
+    assert match.route.target == "get_setting"
+    assert match.params == {"setting_id": "abc"}
+
+
+def test_nested_routes_capture_the_right_segment():
+    router = build_router()
+    # The old split("/")[-1] dispatch passed "visibility" / "members" as the id
+    match = router.match("PUT", "/settings/x/visibility")
+    assert match.route.target == "update_visibility"
+    assert match.params == {"setting_id": "x"}
+
+    match = router.match("GET", "/groups/g/members")
+    assert match.route.target == "list_group_members"
+    assert match.params == {"group_id": "g"}
+
+
+def test_not_found_and_method_not_allowed():
+    router = build_router()
+    missing = router.match("GET", "/nope")
+    assert missing.route is None and missing.allowed == ()
+
+    wrong_method = router.match("DELETE", "/settings/abc")
+    assert wrong_method.route is None
+    assert wrong_method.allowed == ("GET", "PUT")
+
+    assert router.match("GET", "/settings/x/visibility/extra").route is None
+
+
+def test_dead_end_backtracks_to_parameter_branch():
+    router = Router()
+    router.add("GET", "/a/b/c", "static")
+    router.add("GET", "/a/{x}/d", "param")
+    assert router.match("GET", "/a/b/c").route.target == "static"
+    match = router.match("GET", "/a/b/d")
+    assert match.route.target == "param" and match.params == {"x": "b"}
+    assert router.match("GET", "/a/b/e").route is None
+
+
+def test_typed_parameters():
+    router = build_router()
+    assert router.match("GET", "/items/42").params == {"n": 42}
+    assert router.match("GET", "/items/forty-two").route is None
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
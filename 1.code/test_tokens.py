@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+JWT verification checks for shared.tokens against the local JWKS stand-in (runs offline, no AWS calls)
+"""
+import base64
+import sys
+import tempfile
+
+from shared import tokens
+from tools.local_jwks import LocalIssuer
+
+
+class CountingFetch:
+    def __init__(self, *issuers):
+        self.documents = [issuer.jwks() for issuer in issuers]
+        self.calls = 0
+
+    def __call__(self, url):
+        self.calls += 1
+        return {"keys": [key for document in self.documents for key in document["keys"]]}
+
+
+def expect_error(verifier, token, message):
+    try:
+        verifier.verify(token)
+    except tokens.TokenError as e:
+        assert message in str(e), str(e)
+    else:
+        raise AssertionError(f"expected TokenError({message!r})")
+
+
+def test_verifies_and_memoizes():
+    issuer = LocalIssuer()
+    url = issuer.write_jwks(tempfile.mkdtemp(prefix="jwks-"))
+    verifier = tokens.Verifier(tokens.JWKSCache(url), issuer.issuer)
+
+    token = issuer.token("tenant-1", groups=["admin"])
+    claims = verifier.verify(token)
+    assert claims["custom:tenant_id"] == "tenant-1"
+    assert verifier.verify(token) is claims
+    assert verifier.jwks.fetches == 1
+
+    expect_error(verifier, token[:-4] + ("AAAA" if not token.endswith("AAAA") else "BBBB"), "signature")
+    expect_error(verifier, issuer.token("tenant-1", ttl=-120), "expired")
+    expect_error(verifier, issuer.token("tenant-1", iss="https://elsewhere"), "issuer")
+    expect_error(verifier, "not-a-token", "Malformed")
+    expect_error(verifier, None, "Missing")
+
+
+def test_unknown_kid_refreshes_jwks():
+    old, new = LocalIssuer(), LocalIssuer()
+    fetch = CountingFetch(old)
+    now = [1000.0]
+    jwks = tokens.JWKSCache("memory://", fetch, min_refresh=30, clock=lambda: now[0])
+    verifier = tokens.Verifier(jwks, None)
+
+    verifier.verify(old.token())
+    assert fetch.calls == 1
+
+    fetch.documents.append(new.jwks())  # key rotation
+    now[0] += 31
+    verifier.verify(new.token())
+    assert fetch.calls == 2
+
+    now[0] += 1
+    expect_error(verifier, LocalIssuer().token(), "Unknown signing key")
+    assert fetch.calls == 2  # refetches are rate limited
+
+
+def test_lru_is_bounded():
+    issuer = LocalIssuer()
+    verifier = tokens.Verifier(tokens.JWKSCache("memory://", CountingFetch(issuer)), None, cache_size=2)
+    for i in range(5):
+        verifier.verify(issuer.token(f"tenant-{i}"))
+    assert len(verifier._cache) == 2
+
+
+def test_rejects_odd_headers_and_missing_token_use():
+    issuer = LocalIssuer()
+    verifier = tokens.Verifier(tokens.JWKSCache("memory://", CountingFetch(issuer)), None)
+    _, payload, signature = issuer.token().split(".")
+    expect_error(verifier, f"W10.{payload}.{signature}", "Unsupported")  # header is []
+    for kid in ("[1]", '{"a": 1}'):
+        header = base64.urlsafe_b64encode(f'{{"alg": "RS256", "kid": {kid}}}'.encode()).rstrip(b"=").decode()
+        expect_error(verifier, f"{header}.{payload}.{signature}", "Unsupported")
+    expect_error(verifier, issuer.sign({"sub": "x", "exp": 2 ** 40}), "token_use")
+
+
+def test_process_verifier_requires_client_ids(monkeypatch):
+    issuer = LocalIssuer()
+    monkeypatch.setenv("JWKS_URL", issuer.write_jwks(tempfile.mkdtemp(prefix="jwks-")))
+    monkeypatch.delenv("COGNITO_CLIENT_IDS", raising=False)
+    monkeypatch.delenv("USER_POOL_CLIENT_ID", raising=False)
+    tokens.reset()
+    try:
+        tokens.verify(issuer.token())
+    except tokens.VerifierUnavailable as e:
+        assert "COGNITO_CLIENT_IDS" in str(e)
+    else:
+        raise AssertionError("expected VerifierUnavailable")
+
+    monkeypatch.setenv("COGNITO_CLIENT_IDS", f"other, {issuer.client_id}")
+    tokens.reset()
+    assert tokens.verify(issuer.token())["aud"] == issuer.client_id
+    assert tokens.verify(issuer.token(token_use="access"))["client_id"] == issuer.client_id
+    foreign = LocalIssuer(kid=issuer.kid, client_id="someone-else")
+    foreign.private_key = issuer.private_key
+    expect_error(tokens.verifier(), foreign.token(), "audience")
+    tokens.reset()
+
+
+def test_missing_cryptography_is_not_a_token_error(monkeypatch):
+    issuer = LocalIssuer()
+    verifier = tokens.Verifier(tokens.JWKSCache("memory://", CountingFetch(issuer)), None)
+    monkeypatch.setitem(sys.modules, "cryptography", None)
+    try:
+        verifier.verify(issuer.token())
+    except tokens.TokenError:
+        raise AssertionError("a packaging fault must not look like a bad token")
+    except tokens.VerifierUnavailable as e:
+        assert "cryptography" in str(e)
+    else:
+        raise AssertionError("expected VerifierUnavailable")
+
+
+def test_bearer_token():
+    assert tokens.bearer_token({"headers": {"authorization": "Bearer abc"}}) == "abc"
+    assert tokens.bearer_token({"headers": {"Authorization": "abc"}}) == "abc"
+    assert tokens.bearer_token({"headers": None}) is None
+
+
+if __name__ == "__main__":
+    test_verifies_and_memoizes()
+    test_unknown_kid_refreshes_jwks()
+    test_lru_is_bounded()
+    test_bearer_token()
+    print("✅ test_tokens")
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Checks for services/webauth's id_token shortcut against the local JWKS stand-in (runs offline)
+"""
+import tempfile
+
+from services.webauth import main as webauth
+from tools.local_jwks import LocalIssuer
+
+
+def test_id_token_must_belong_to_the_access_tokens_session(monkeypatch):
+    issuer = LocalIssuer()
+    monkeypatch.setenv("JWKS_URL", issuer.write_jwks(tempfile.mkdtemp(prefix="jwks-")))
+    monkeypatch.setenv("JWT_ISSUER", issuer.issuer)
+    monkeypatch.setattr(webauth, "COGNITO_CLIENT_ID", issuer.client_id)
+    monkeypatch.setattr(webauth, "_id_token_verifier", None)
+
+    access = issuer.token(token_use="access", sub="user-1")
+    profile = webauth.profile_from_id_token(issuer.token(sub="user-1", email="a@example.com"), access)
+    assert profile["sub"] == "user-1" and profile["email"] == "a@example.com"
+
+    assert webauth.profile_from_id_token(issuer.token(sub="user-2"), access) is None  # another user's id_token
+    assert webauth.profile_from_id_token(issuer.token(sub="user-1"), issuer.token(sub="user-1")) is None
+    assert webauth.profile_from_id_token(access, access) is None
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Precompressed, fingerprinted static build for admin_spa.html, web/ and docs/
+
+build() turns the hand-written pages into a deployable tree under --output:
+- inline <style> and <script> blocks are moved into assets/<page>.<hash>.css|js
+  (minified, named by a sha256 prefix of their content) and the page references
+  them instead; docs/openapi.json is also published as docs/openapi.<hash>.json
+  and the Swagger page points at that copy
+- pages are minified (comments and indentation removed outside <pre>/<textarea>)
+- every text file gets a .gz sidecar (level 9, mtime 0 so rebuilds are
+  byte-identical) and a .br sidecar when the optional `brotli` module is
+  installed (pip install brotli). Tiny files get one too: the viewer-request
+  function rewrites by extension and cannot know which files have sidecars
+- manifest.json maps each logical name to its fingerprinted key
+
+cache_control_for() gives pages `no-cache` (always revalidated, so a deploy is
+visible at once), fingerprinted files `public, max-age=31536000, immutable` and
+the stable docs URLs (openapi.json/yaml, API.md) the previous max-age=300.
+Publishing goes through tools.publish: sidecars are uploaded with
+Content-Encoding set, unchanged files are skipped, and new fingerprinted keys are
+never invalidated because nothing can have cached them. Keys from earlier
+builds stay in the bucket for pages still cached in browsers.
+
+S3 does not negotiate encodings; viewer_request_function() (print it with
+--function-code) is a CloudFront Function for the distribution's viewer-request
+event that serves a sidecar when Accept-Encoding allows. It is generated from the
+sidecars the build in --output actually contains, so a build without brotli gets
+a gzip-only function instead of one that points browsers at missing .br keys.
+Redeploy the function whenever the set of encodings changes (build_site warns
+when .br is skipped). The cache policy must include Accept-Encoding
+(EnableAcceptEncodingGzip/Brotli).
+
+Usage:
+    python -m tools.build_assets [--output .artifacts/web]
+    python -m tools.build_assets --bucket sync-hub-web-1757132517 --distribution-id EPUT16LI6OAAI
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from tools.publish import Asset, content_type_for, publish, report  # noqa: E402
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised when brotli is not installed
+    brotli = None
+
+# (source relative to the repo, key in the bucket, asset name)
+PAGES = [
+    ("web/index.html", "index.html", "app"),
+    ("admin_spa.html", "admin/index.html", "admin"),
+    ("docs/index.html", "docs/index.html", "docs"),
+]
+# Files with stable, externally linked URLs: copied as-is, optionally also fingerprinted
+STATIC_FILES = [
+    ("docs/openapi.json", "docs/openapi.json", True),
+    ("docs/openapi.yaml", "docs/openapi.yaml", False),
+    ("docs/API.md", "docs/API.md", False),
+]
+HASH_LENGTH = 10
+COMPRESSIBLE = (".html", ".css", ".js", ".json", ".yaml", ".md", ".svg", ".txt")
+HTML_CACHE_CONTROL = "no-cache"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+STABLE_CACHE_CONTROL = "max-age=300"
+ENCODINGS = {".br": "br", ".gz": "gzip"}  # in order of preference
+BROTLI_MISSING = "⚠️ brotli not installed; emitting gzip variants only (pip install brotli)"
+
+VIEWER_REQUEST_TEMPLATE = """\
+function handler(event) {
+    var request = event.request;
+    var uri = request.uri;
+    if (uri.endsWith('/')) {
+        uri += 'index.html';
+    }
+    if (!/\\.(html|css|js|json|yaml|md|svg|txt)$/.test(uri)) {
+        return request;
+    }
+    var header = request.headers['accept-encoding'];
+    var accepted = header ? header.value : '';
+%s    return request;
+}
+"""
+
+STYLE_RE = re.compile(r"<style(?:\s[^>]*)?>(.*?)</style>", re.S | re.I)
+SCRIPT_RE = re.compile(r"<script(\s[^>]*)?>(.*?)</script>", re.S | re.I)
+HTML_COMMENT_RE = re.compile(r"<!--(?!\[).*?-->", re.S)
+JS_TYPES = ("", "text/javascript", "application/javascript", "module")
+
+
+def fingerprint(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def hashed_key(key: str, data: bytes) -> str:
+    """docs/openapi.json -> docs/openapi.<hash>.json"""
+    stem, ext = os.path.splitext(key)
+    return f"{stem}.{fingerprint(data)}{ext}"
+
+
+def minify_css(source: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", source, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip() + "\n"
+
+
+def _backticks(line: str) -> int:
+    return line.count("`") - line.count("\\`")
+
+
+def minify_js(source: str) -> str:
+    """Conservative: drops indentation, blank lines and whole-line // comments, never
+    touching the inside of multi-line template literals"""
+    lines = []
+    in_template = False
+    for line in source.splitlines():
+        if in_template:
+            lines.append(line)
+        else:
+            stripped = line.strip()
+            if stripped and not stripped.startswith("//"):
+                lines.append(stripped)
+        if _backticks(line) % 2:
+            in_template = not in_template
+    return "\n".join(lines) + "\n"
+
+
+def minify_html(source: str) -> str:
+    lines = []
+    preformatted = False
+    for line in HTML_COMMENT_RE.sub("", source).splitlines():
+        lower = line.lower()
+        if preformatted:
+            lines.append(line)
+        elif line.strip():
+            lines.append(line.strip())
+        if "<pre" in lower or "<textarea" in lower:
+            preformatted = True
+        if "</pre>" in lower or "</textarea>" in lower:
+            preformatted = False
+    return "\n".join(lines) + "\n"
+
+
+def _script_type(attributes: str) -> str:
+    match = re.search(r"""\btype\s*=\s*["']?([^"'\s>]+)""", attributes, re.I)
+    return match.group(1).lower() if match else ""
+
+
+class Build:
+    """Files of one build, keyed by their bucket key"""
+
+    def __init__(self):
+        self.files: Dict[str, bytes] = {}
+        self.manifest: Dict[str, str] = {}
+
+    def add(self, key: str, data: bytes, name: Optional[str] = None) -> str:
+        self.files[key] = data
+        if name:
+            self.manifest[name] = key
+        return key
+
+    def add_hashed(self, key: str, data: bytes, name: str) -> str:
+        return self.add(hashed_key(key, data), data, name)
+
+
+def extract_assets(build: Build, html: str, name: str, rewrites: Dict[str, str]) -> str:
+    """Move inline styles and scripts into fingerprinted files and reference them"""
+    styles: List[str] = []
+
+    def style(match: re.Match) -> str:
+        styles.append(match.group(1))
+        return ""
+
+    html = STYLE_RE.sub(style, html)
+    if styles:
+        css = minify_css("\n".join(styles)).encode("utf-8")
+        key = build.add_hashed(f"assets/{name}.css", css, f"{name}.css")
+        link = f'<link rel="stylesheet" href="/{key}">'
+        html = re.sub(r"</head>", link + "\n</head>", html, count=1, flags=re.I)
+
+    count = 0
+
+    def script(match: re.Match) -> str:
+        nonlocal count
+        attributes = match.group(1) or ""
+        if "src=" in attributes.lower() or _script_type(attributes) not in JS_TYPES:
+            return match.group(0)
+        source = match.group(2)
+        for old, new in rewrites.items():
+            source = source.replace(old, new)
+        count += 1
+        logical = name if count == 1 else f"{name}-{count}"
+        js = minify_js(source).encode("utf-8")
+        key = build.add_hashed(f"assets/{logical}.js", js, f"{logical}.js")
+        return f'<script{attributes} src="/{key}"></script>'
+
+    return SCRIPT_RE.sub(script, html)
+
+
+def build(root: str = ROOT) -> Build:
+    result = Build()
+    rewrites: Dict[str, str] = {}
+    for source, key, hashed in STATIC_FILES:
+        path = os.path.join(root, source)
+        if not os.path.exists(path):
+            print(f"⚠️ Skipping missing {source}")
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        result.add(key, data, key)
+        if hashed:
+            fingerprinted = result.add_hashed(key, data, key)
+            rewrites["/" + key] = "/" + fingerprinted
+
+    for source, key, name in PAGES:
+        path = os.path.join(root, source)
+        if not os.path.exists(path):
+            print(f"⚠️ Skipping missing {source}")
+            continue
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        html = minify_html(extract_assets(result, html, name, rewrites))
+        result.add(key, html.encode("utf-8"), key)
+    return result
+
+
+def sidecar_suffixes() -> List[str]:
+    """The sidecars this environment can produce, in order of preference"""
+    return [suffix for suffix in ENCODINGS if suffix != ".br" or brotli is not None]
+
+
+def built_suffixes(output: str) -> List[str]:
+    """The sidecars present in a build directory, in order of preference"""
+    found = set()
+    for _, _, names in os.walk(output):
+        found.update(os.path.splitext(name)[1] for name in names)
+    return [suffix for suffix in ENCODINGS if suffix in found]
+
+
+def viewer_request_function(suffixes: Iterable[str]) -> str:
+    """The viewer-request CloudFront Function serving only the given sidecars"""
+    branches = []
+    for suffix in suffixes:
+        keyword = "} else if" if branches else "if"
+        branches.append(f"    {keyword} (accepted.indexOf('{ENCODINGS[suffix]}') !== -1) {{\n"
+                        f"        request.uri = uri + '{suffix}';\n")
+    return VIEWER_REQUEST_TEMPLATE % ("".join(branches) + ("    }\n" if branches else ""))
+
+
+def compress(data: bytes) -> Dict[str, bytes]:
+    """Sidecar suffix -> compressed bytes"""
+    variants = {}
+    for suffix in sidecar_suffixes():
+        if suffix == ".br":
+            variants[suffix] = brotli.compress(data, quality=11)
+        else:
+            variants[suffix] = gzip.compress(data, compresslevel=9, mtime=0)
+    return variants
+
+
+def write(result: Build, output: str, clean: bool = True) -> List[Tuple[str, int, Dict[str, int]]]:
+    """Write files, sidecars and manifest.json under `output`; returns (key, size, sidecar sizes)"""
+    if clean and os.path.isdir(output):
+        shutil.rmtree(output)
+    rows = []
+    files = dict(result.files)
+    for key, data in sorted(result.files.items()):
+        sizes = {}
+        if key.endswith(COMPRESSIBLE):
+            for suffix, body in compress(data).items():
+                files[key + suffix] = body
+                sizes[suffix] = len(body)
+        rows.append((key, len(data), sizes))
+    files["manifest.json"] = (json.dumps(result.manifest, indent=2, sort_keys=True) + "\n").encode("utf-8")
+    for key, data in files.items():
+        path = os.path.join(output, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+    return rows
+
+
+def _is_hashed(key: str) -> bool:
+    return re.search(rf"\.[0-9a-f]{{{HASH_LENGTH}}}\.[a-z0-9]+$", key) is not None
+
+
+def cache_control_for(key: str) -> str:
+    for suffix in ENCODINGS:
+        key = key.removesuffix(suffix)
+    if key.endswith(".html"):
+        return HTML_CACHE_CONTROL
+    if _is_hashed(key):
+        return IMMUTABLE_CACHE_CONTROL
+    return STABLE_CACHE_CONTROL
+
+
+def assets_for(output: str) -> List[Asset]:
+    """tools.publish assets for a build directory, sidecars carrying their Content-Encoding"""
+    assets = []
+    for directory, _, names in os.walk(output):
+        for name in sorted(names):
+            path = os.path.join(directory, name)
+            key = os.path.relpath(path, output).replace(os.sep, "/")
+            if key == "manifest.json":
+                continue
+            encoding = ENCODINGS.get(os.path.splitext(key)[1])
+            assets.append(Asset(path, key, content_type_for(key), cache_control_for(key), encoding))
+    return assets
+
+
+def build_site(output: str = os.path.join(ROOT, ".artifacts", "web")) -> List[Asset]:
+    """Build into `output` and return the assets to publish; the deploy scripts' entry point"""
+    if brotli is None:
+        print(BROTLI_MISSING)
+        print("   The viewer-request function must be the gzip-only one: python -m tools.build_assets --function-code")
+    rows = write(build(), output)
+    print(f"📦 Built {len(rows)} file(s) into {output}")
+    return assets_for(output)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build fingerprinted, precompressed static assets")
+    parser.add_argument("--output", default=os.path.join(ROOT, ".artifacts", "web"), help="Build directory (replaced)")
+    parser.add_argument("--bucket", help="Publish the build to this bucket")
+    parser.add_argument("--distribution-id", help="CloudFront distribution to invalidate after publishing")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--dry-run", action="store_true", help="Report what publishing would change")
+    parser.add_argument("--function-code", action="store_true",
+                        help="Print the viewer-request CloudFront Function for the build in --output "
+                             "(or for this environment when there is none) and exit")
+    args = parser.parse_args(argv)
+
+    if args.function_code:
+        suffixes = built_suffixes(args.output) if os.path.isdir(args.output) else sidecar_suffixes()
+        print(viewer_request_function(suffixes), end="")
+        return 0
+
+    if brotli is None:
+        print(BROTLI_MISSING)
+    rows = write(build(), args.output)
+    print(f"📦 Built {len(rows)} file(s) into {args.output}")
+    for key, size, sizes in rows:
+        variants = ", ".join(f"{suffix} {n:,}" for suffix, n in sorted(sizes.items()))
+        print(f"   {key:<40} {size:>8,} B  {cache_control_for(key):<36} {variants}")
+
+    if args.bucket:
+        result = publish(assets_for(args.output), args.bucket, args.distribution_id, workers=args.workers,
+                         dry_run=args.dry_run)
+        report(result, args.bucket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Top tenants by consumed DynamoDB capacity, from shared.capacity records
+
+Reads `tenant_capacity` records from local NDJSON sink files (METRICS_SINK_FILE)
+or straight from CloudWatch Logs, sums RCU/WCU per tenant and prices them at
+on-demand rates, so noisy tenants show up before they throttle everyone else.
+
+Usage:
+    python -m tools.capacity_report --input metrics.ndjson [--input more.ndjson]
+    python -m tools.capacity_report --log-group /aws/lambda/sync-hub-api --hours 24 \\
+        [--top 20] [--by route|table] [--json report.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+RECORD_TYPE = "tenant_capacity"
+
+# On-demand prices per million request units (us-east-1)
+DEFAULT_READ_PRICE = 0.25
+DEFAULT_WRITE_PRICE = 1.25
+
+
+def read_files(paths: List[str], record_type: str = RECORD_TYPE) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("{"):
+                    record = json.loads(line)
+                    if record.get("type") == record_type:
+                        yield record
+
+
+def read_log_groups(log_groups: List[str], start_ms: int, end_ms: int,
+                    region: Optional[str] = None, record_type: str = RECORD_TYPE) -> Iterator[Dict[str, Any]]:
+    import boto3
+    logs = boto3.client("logs", region_name=region)
+    paginator = logs.get_paginator("filter_log_events")
+    for log_group in log_groups:
+        pages = paginator.paginate(logGroupName=log_group, startTime=start_ms, endTime=end_ms,
+                                   filterPattern=f'{{ $.type = "{record_type}" }}')
+        for page in pages:
+            for event in page.get("events", []):
+                message = event["message"]
+                start = message.find("{")  # tolerate runtime log prefixes
+                if start >= 0:
+                    yield json.loads(message[start:])
+
+
+def aggregate(records: Iterable[Dict[str, Any]], by: Optional[str] = None,
+              read_price: float = DEFAULT_READ_PRICE, write_price: float = DEFAULT_WRITE_PRICE) -> Dict[str, Any]:
+    """Sum capacity per tenant (and per `by` field inside each tenant)"""
+    tenants: Dict[str, Dict[str, Any]] = {}
+    total_rcu = total_wcu = 0.0
+    for record in records:
+        tenant = tenants.setdefault(record.get("tenant_id", "-"),
+                                    {"rcu": 0.0, "wcu": 0.0, "calls": 0, "breakdown": {}})
+        rcu, wcu, calls = float(record.get("rcu", 0)), float(record.get("wcu", 0)), int(record.get("calls", 0))
+        tenant["rcu"] += rcu
+        tenant["wcu"] += wcu
+        tenant["calls"] += calls
+        total_rcu += rcu
+        total_wcu += wcu
+        if by:
+            part = tenant["breakdown"].setdefault(record.get(by, "-"), {"rcu": 0.0, "wcu": 0.0, "calls": 0})
+            part["rcu"] += rcu
+            part["wcu"] += wcu
+            part["calls"] += calls
+
+    def cost(rcu: float, wcu: float) -> float:
+        return (rcu * read_price + wcu * write_price) / 1_000_000
+
+    total_cost = cost(total_rcu, total_wcu)
+    rows = []
+    for tenant_id, totals in tenants.items():
+        tenant_cost = cost(totals["rcu"], totals["wcu"])
+        rows.append({
+            "tenant_id": tenant_id,
+            "rcu": round(totals["rcu"], 2),
+            "wcu": round(totals["wcu"], 2),
+            "calls": totals["calls"],
+            "cost_usd": tenant_cost,
+            "share": tenant_cost / total_cost if total_cost else 0.0,
+            "breakdown": sorted(
+                ({by: key, **values, "cost_usd": cost(values["rcu"], values["wcu"])}
+                 for key, values in totals["breakdown"].items()),
+                key=lambda part: part["cost_usd"], reverse=True),
+        })
+    rows.sort(key=lambda row: row["cost_usd"], reverse=True)
+    return {"tenants": rows, "total_rcu": total_rcu, "total_wcu": total_wcu, "total_cost_usd": total_cost}
+
+
+def print_report(report: Dict[str, Any], top: int, by: Optional[str]) -> None:
+    print(f"{'tenant':<38} {'RCU':>12} {'WCU':>12} {'calls':>9} {'cost $':>10} {'share':>7}")
+    for row in report["tenants"][:top]:
+        print(f"{row['tenant_id']:<38} {row['rcu']:>12,.1f} {row['wcu']:>12,.1f} {row['calls']:>9,} "
+              f"{row['cost_usd']:>10.4f} {row['share']:>6.1%}")
+        for part in row["breakdown"][:5] if by else []:
+            print(f"    {str(part[by])[:34]:<34} {part['rcu']:>12,.1f} {part['wcu']:>12,.1f} {part['calls']:>9,} "
+                  f"{part['cost_usd']:>10.4f}")
+    print(f"\nTotal: {report['total_rcu']:,.1f} RCU, {report['total_wcu']:,.1f} WCU, "
+          f"${report['total_cost_usd']:.4f} across {len(report['tenants'])} tenants")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Top tenants by consumed DynamoDB capacity")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", action="append", help="NDJSON sink file (repeatable)")
+    source.add_argument("--log-group", action="append", help="CloudWatch log group (repeatable)")
+    parser.add_argument("--hours", type=float, default=24, help="Look-back window for --log-group")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--by", choices=["route", "table", "service"], help="Break each tenant down further")
+    parser.add_argument("--read-price", type=float, default=DEFAULT_READ_PRICE, help="USD per million RRU")
+    parser.add_argument("--write-price", type=float, default=DEFAULT_WRITE_PRICE, help="USD per million WRU")
+    parser.add_argument("--json", help="Write the full report to this JSON file")
+    parser.add_argument("--region", default=os.getenv("AWS_REGION", "us-east-1"))
+    args = parser.parse_args(argv)
+
+    if args.input:
+        records = read_files(args.input)
+    else:
+        end_ms = int(time.time() * 1000)
+        records = read_log_groups(args.log_group, end_ms - int(args.hours * 3600 * 1000), end_ms, args.region)
+
+    report = aggregate(records, args.by, args.read_price, args.write_price)
+    print("💰 DynamoDB capacity by tenant\n")
+    print_report(report, args.top, args.by)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
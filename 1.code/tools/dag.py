@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Dependency-graph deploy orchestrator
+
+A deploy is a set of Steps that name their dependencies. run() starts every step
+whose dependencies have finished on a thread pool, so independent work (asset
+publishing, table creation, stack deploys, smoke probes) overlaps and the wall
+time approaches the critical path. Steps are plain callables or argv commands
+(command(); no shell), and get the outputs of their dependencies.
+
+State (status, output, timing and cache key of every step) is written to a JSON
+file after each step finishes:
+- a step with a cache_key (a string, or a callable of the dependency outputs)
+  is skipped and its stored output reused while the key matches the last
+  successful run, e.g. a hash of the files it reads (files_key); a callable
+  key is computed again once the step succeeds and that value is stored, so a
+  key over state the step itself changes (stack update times, table ids)
+  matches on the next run
+- --resume also skips every step that succeeded in the previous run, so a
+  deploy restarts at the step that failed; --force NAME reruns a step anyway
+- a failed step blocks its dependents, unless it is allow_failure (imports that
+  may already exist, smoke probes), whose failure is reported but not fatal
+
+The summary lists per-step timings and the critical path, the chain of steps
+that bounded the wall time.
+
+    steps = [Step("build", command(["make"])), Step("upload", upload, deps=["build"])]
+    sys.exit(run_cli(steps, "deploy", parser("Deploy").parse_args()))
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+MAX_STORED_OUTPUT = 64 * 1024
+IGNORED_DIRS = {"__pycache__", ".git", ".terraform", "cdk.out", "node_modules", ".artifacts"}
+
+_print_lock = threading.Lock()
+
+
+class StepFailed(Exception):
+    pass
+
+
+class Step:
+    """One unit of work; `run(outputs)` gets {dependency name: output} and returns a JSON-able output"""
+
+    def __init__(self, name: str, run: Callable[[Dict[str, Any]], Any], deps: Sequence[str] = (),
+                 cache_key: Optional[Union[str, Callable[[Dict[str, Any]], str]]] = None,
+                 allow_failure: bool = False, description: Optional[str] = None):
+        self.name = name
+        self.run = run
+        self.deps = list(deps)
+        self.cache_key = cache_key
+        self.allow_failure = allow_failure
+        self.description = description or name
+
+
+class StepResult:
+    def __init__(self, name: str, status: str, output: Any = None, elapsed: float = 0.0, started: float = 0.0,
+                 key: Optional[str] = None, error: Optional[str] = None):
+        self.name = name
+        self.status = status  # ok | cached | failed | allowed | blocked
+        self.output = output
+        self.elapsed = elapsed
+        self.started = started
+        self.key = key
+        self.error = error
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status in ("ok", "cached")
+
+
+def say(message: str) -> None:
+    with _print_lock:
+        print(message, flush=True)
+
+
+def command(argv: List[str], cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None, echo: bool = False) -> Callable[[Dict[str, Any]], str]:
+    """Step body running `argv` (no shell); the output is stdout, a non-zero exit raises StepFailed"""
+
+    def run(outputs: Dict[str, Any]) -> str:
+        result = subprocess.run(argv, cwd=cwd, capture_output=True, text=True, timeout=timeout,
+                                env={**os.environ, **env} if env else None)
+        if result.returncode != 0:
+            raise StepFailed(f"{' '.join(argv)} exited {result.returncode}: "
+                             f"{(result.stderr or result.stdout).strip()[-2000:]}")
+        if echo and result.stdout.strip():
+            say(f"--- {' '.join(argv)}\n{result.stdout.rstrip()}")
+        return result.stdout
+
+    return run
+
+
+def files_key(paths: Iterable[str], extra: str = "") -> str:
+    """sha256 over the names and contents of files (directories walked, build output ignored)"""
+    digest = hashlib.sha256(extra.encode("utf-8"))
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, dirs, names in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS)
+                files.extend(os.path.join(directory, name) for name in names if not name.endswith(".pyc"))
+        elif os.path.exists(path):
+            files.append(path)
+    for path in sorted(files):
+        with open(path, "rb") as f:
+            digest.update(f"{path}\0{hashlib.sha256(f.read()).hexdigest()}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def order(steps: List[Step]) -> List[str]:
+    """Topological order; raises ValueError for unknown dependencies and cycles"""
+    by_name = {step.name: step for step in steps}
+    if len(by_name) != len(steps):
+        raise ValueError("duplicate step names")
+    for step in steps:
+        unknown = [dep for dep in step.deps if dep not in by_name]
+        if unknown:
+            raise ValueError(f"{step.name} depends on unknown step(s): {', '.join(unknown)}")
+    ordered: List[str] = []
+    visiting: set = set()
+
+    def visit(name: str, path: List[str]) -> None:
+        if name in ordered:
+            return
+        if name in visiting:
+            raise ValueError(f"dependency cycle: {' -> '.join(path + [name])}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep, path + [name])
+        visiting.discard(name)
+        ordered.append(name)
+
+    for step in steps:
+        visit(step.name, [])
+    return ordered
+
+
+def with_dependencies(steps: List[Step], names: Iterable[str]) -> set:
+    by_name = {step.name: step for step in steps}
+    selected: set = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name not in by_name:
+            raise ValueError(f"unknown step: {name}")
+        if name not in selected:
+            selected.add(name)
+            stack.extend(by_name[name].deps)
+    return selected
+
+
+def load_state(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get("steps", {})
+
+
+def save_state(path: str, results: Dict[str, StepResult], previous: Dict[str, Any]) -> None:
+    steps = dict(previous)
+    for name, result in results.items():
+        if result.status == "cached":
+            continue
+        output = result.output
+        if isinstance(output, str) and len(output) > MAX_STORED_OUTPUT:
+            output = output[-MAX_STORED_OUTPUT:]
+        steps[name] = {"status": result.status, "output": output, "elapsed": round(result.elapsed, 3),
+                       "key": result.key, "error": result.error,
+                       "finished_at": datetime.now(timezone.utc).isoformat()}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    partial = path + ".partial"
+    with open(partial, "w") as f:
+        json.dump({"steps": steps}, f, indent=2, sort_keys=True, default=str)
+        f.write("\n")
+    os.replace(partial, path)
+
+
+def _key(step: Step, outputs: Dict[str, Any]) -> Optional[str]:
+    if step.cache_key is None:
+        return None
+    return step.cache_key(outputs) if callable(step.cache_key) else step.cache_key
+
+
+def _reusable(step: Step, key: Optional[str], stored: Optional[Dict[str, Any]], resume: bool) -> bool:
+    if not stored or stored.get("status") != "ok":
+        return False
+    if key is not None:
+        return stored.get("key") == key
+    return resume
+
+
+def run(steps: List[Step], state_path: str, workers: int = 4, resume: bool = False, force: Iterable[str] = (),
+        only: Optional[Iterable[str]] = None) -> Dict[str, StepResult]:
+    """Run the graph and return every selected step's result (state is saved as steps finish)"""
+    ordered = order(steps)
+    by_name = {step.name: step for step in steps}
+    selected = with_dependencies(steps, only) if only else set(ordered)
+    force = set(force)
+    previous = load_state(state_path)
+    results: Dict[str, StepResult] = {}
+    pending = [name for name in ordered if name in selected]
+    running: Dict[Any, str] = {}
+    step_outputs: Dict[str, Dict[str, Any]] = {}
+    origin = time.perf_counter()
+
+    def outputs_for(step: Step) -> Dict[str, Any]:
+        return {dep: results[dep].output for dep in step.deps}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for name in list(pending):
+                step = by_name[name]
+                if any(dep not in results or results[dep].status == "running" for dep in step.deps):
+                    continue
+                pending.remove(name)
+                blocked = [dep for dep in step.deps
+                           if not results[dep].succeeded and results[dep].status != "allowed"]
+                if blocked:
+                    results[name] = StepResult(name, "blocked", error=f"blocked by {', '.join(blocked)}")
+                    say(f"⏭️  {name}: blocked by {', '.join(blocked)}")
+                    continue
+                outputs = outputs_for(step)
+                try:
+                    key = _key(step, outputs)
+                except Exception as e:
+                    key = None
+                    say(f"⚠️ {name}: cache key failed ({e}); running")
+                stored = previous.get(name)
+                if name not in force and _reusable(step, key, stored, resume):
+                    results[name] = StepResult(name, "cached", stored.get("output"), key=key,
+                                               started=time.perf_counter() - origin)
+                    say(f"♻️  {name}: reused ({'cache key matches' if key else 'resumed'})")
+                    continue
+                say(f"▶️  {name}: {step.description}")
+                results[name] = StepResult(name, "running", key=key, started=time.perf_counter() - origin)
+                running[pool.submit(step.run, outputs)] = name
+                step_outputs[name] = outputs
+
+            if not running:
+                continue
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                result = results[name]
+                result.elapsed = time.perf_counter() - origin - result.started
+                try:
+                    result.output = future.result()
+                    result.status = "ok"
+                    say(f"✅ {name} ({result.elapsed:.1f}s)")
+                    if callable(by_name[name].cache_key):
+                        try:
+                            result.key = _key(by_name[name], step_outputs[name])
+                        except Exception as e:
+                            result.key = None
+                            say(f"⚠️ {name}: cache key failed after the run ({e}); it will rerun")
+                except Exception as e:
+                    result.error = str(e)
+                    result.status = "allowed" if by_name[name].allow_failure else "failed"
+                    icon = "⚠️" if result.status == "allowed" else "❌"
+                    say(f"{icon} {name} ({result.elapsed:.1f}s): {e}")
+                save_state(state_path, {n: r for n, r in results.items() if r.status != "running"}, previous)
+    return results
+
+
+def critical_path(steps: List[Step], results: Dict[str, StepResult]) -> List[str]:
+    """The chain of dependencies with the largest summed run time"""
+    by_name = {step.name: step for step in steps}
+    finish: Dict[str, float] = {}
+    via: Dict[str, Optional[str]] = {}
+    for name in order(steps):
+        if name not in results:
+            continue
+        deps = [dep for dep in by_name[name].deps if dep in finish]
+        slowest = max(deps, key=lambda dep: finish[dep]) if deps else None
+        finish[name] = (finish[slowest] if slowest else 0.0) + results[name].elapsed
+        via[name] = slowest
+    if not finish:
+        return []
+    name: Optional[str] = max(finish, key=lambda n: finish[n])
+    path = []
+    while name:
+        path.append(name)
+        name = via[name]
+    return list(reversed(path))
+
+
+def summarize(steps: List[Step], results: Dict[str, StepResult], wall: float) -> None:
+    width = max([len("step")] + [len(name) for name in results]) + 2
+    print("\n" + "=" * 60)
+    print(f"{'step':<{width}}{'status':<9}{'start':>8} {'time':>8}")
+    for name in order(steps):
+        if name in results:
+            result = results[name]
+            print(f"{name:<{width}}{result.status:<9}{result.started:>7.1f}s {result.elapsed:>7.1f}s")
+    path = critical_path(steps, results)
+    total = sum(result.elapsed for result in results.values())
+    path_time = sum(results[name].elapsed for name in path)
+    print(f"\n⏱️ Wall {wall:.1f}s, steps {total:.1f}s summed, critical path {path_time:.1f}s: {' → '.join(path)}")
+    failed = [name for name, result in results.items() if result.status in ("failed", "blocked")]
+    if failed:
+        print(f"❌ Failed or blocked: {', '.join(failed)} (fix and rerun with --resume)")
+
+
+def parser(description: str) -> argparse.ArgumentParser:
+    """Argument parser with the orchestrator options; callers add their own"""
+    p = argparse.ArgumentParser(description=description)
+    p.add_argument("--resume", action="store_true", help="Skip steps that succeeded in the previous run")
+    p.add_argument("--force", action="append", default=[], metavar="STEP", help="Rerun STEP even if cached")
+    p.add_argument("--only", action="append", default=[], metavar="STEP", help="Run STEP and its dependencies")
+    p.add_argument("--workers", type=int, default=4, help="Steps run concurrently")
+    p.add_argument("--plan", action="store_true", help="Print the steps in dependency order and exit")
+    p.add_argument("--state", help="State file (default .artifacts/deploy/<name>.json)")
+    return p
+
+
+def state_path(name: str, args: argparse.Namespace, root: Optional[str] = None) -> str:
+    return args.state or os.path.join(root or os.getcwd(), ".artifacts", "deploy", f"{name}.json")
+
+
+def run_cli(steps: List[Step], name: str, args: argparse.Namespace, root: Optional[str] = None) -> int:
+    """Run the graph for parsed `parser()` arguments; returns the exit code"""
+    path = state_path(name, args, root)
+    if args.plan:
+        by_name = {step.name: step for step in steps}
+        width = max(len(step.name) for step in steps) + 2
+        for step_name in order(steps):
+            deps = by_name[step_name].deps
+            print(f"{step_name:<{width}}{'after ' + ', '.join(deps) if deps else ''}".rstrip())
+        return 0
+    started = time.perf_counter()
+    results = run(steps, path, args.workers, args.resume, args.force, args.only or None)
+    summarize(steps, results, time.perf_counter() - started)
+    return 1 if any(result.status in ("failed", "blocked") for result in results.values()) else 0
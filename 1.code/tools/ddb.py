@@ -0,0 +1,197 @@
+"""
+DynamoDB bulk I/O helpers shared by the data tools (parallel scans, batched writes, throttling)
+"""
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.config import Config
+
+BATCH_WRITE_LIMIT = 25
+BATCH_GET_LIMIT = 100
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def make_client(region_name: Optional[str] = None, endpoint_url: Optional[str] = None,
+                max_pool_connections: int = 10):
+    """Create a DynamoDB client that is safe to share between worker threads
+
+    `endpoint_url` points the client at DynamoDB Local (e.g. http://localhost:8000).
+    """
+    config = Config(
+        retries={"max_attempts": 10, "mode": "adaptive"},
+        max_pool_connections=max_pool_connections
+    )
+    return boto3.client("dynamodb", region_name=region_name, endpoint_url=endpoint_url, config=config)
+
+
+def serialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a plain item into DynamoDB attribute-value format"""
+    return {key: _serializer.serialize(value) for key, value in item.items()}
+
+
+def deserialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a DynamoDB attribute-value item into plain Python values"""
+    return {key: _deserializer.deserialize(value) for key, value in item.items()}
+
+
+def consumed_units(response: Dict[str, Any], default: float) -> float:
+    """Capacity units reported by a ReturnConsumedCapacity=TOTAL response"""
+    consumed = response.get("ConsumedCapacity")
+    if isinstance(consumed, list):
+        units = sum(entry.get("CapacityUnits", 0) for entry in consumed)
+    elif consumed:
+        units = consumed.get("CapacityUnits", 0)
+    else:
+        units = 0
+    return units or default
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every worker of a bulk job
+
+    A rate of None (or 0) disables throttling. Requests bigger than the bucket are
+    admitted once the bucket is full and leave it in debt, so they never block forever.
+    """
+
+    def __init__(self, rate_per_second: Optional[float], burst: Optional[float] = None):
+        self.rate = rate_per_second or 0
+        self.capacity = burst or max(self.rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, units: float = 1) -> None:
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= min(units, self.capacity):
+                    self.tokens -= units
+                    return
+                wait = (min(units, self.capacity) - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def key_attributes(client, table_name: str) -> List[str]:
+    """Primary key attribute names of a table (partition key first)"""
+    schema = client.describe_table(TableName=table_name)["Table"]["KeySchema"]
+    return [entry["AttributeName"] for entry in sorted(schema, key=lambda e: e["KeyType"] != "HASH")]
+
+
+def scan_pages(client, table_name: str, segment: Optional[int] = None, total_segments: Optional[int] = None,
+               start_key: Optional[Dict[str, Any]] = None, page_size: Optional[int] = None,
+               limiter: Optional[RateLimiter] = None, deserialize: bool = True,
+               **scan_kwargs) -> Iterator[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+    """Yield (items, last_evaluated_key) for each page of a (segmented) Scan
+
+    `last_evaluated_key` stays in wire format so it can be checkpointed as JSON and
+    handed back as `start_key` to resume the segment.
+    """
+    params = {"TableName": table_name, "ReturnConsumedCapacity": "TOTAL", **scan_kwargs}
+    if total_segments:
+        params["Segment"] = segment
+        params["TotalSegments"] = total_segments
+    if page_size:
+        params["Limit"] = page_size
+
+    while True:
+        if start_key:
+            params["ExclusiveStartKey"] = start_key
+        response = client.scan(**params)
+        raw_items = response.get("Items", [])
+        if limiter:
+            limiter.acquire(consumed_units(response, max(len(raw_items), 1)))
+        start_key = response.get("LastEvaluatedKey")
+        yield [deserialize_item(item) for item in raw_items] if deserialize else raw_items, start_key
+        if not start_key:
+            return
+
+
+def query_items(client, table_name: str, limiter: Optional[RateLimiter] = None, deserialize: bool = True,
+                **query_kwargs) -> Iterator[Dict[str, Any]]:
+    """Yield every item of a Query one page at a time (wire format if deserialize=False)"""
+    params = {"TableName": table_name, "ReturnConsumedCapacity": "TOTAL", **query_kwargs}
+    while True:
+        response = client.query(**params)
+        raw_items = response.get("Items", [])
+        if limiter:
+            limiter.acquire(consumed_units(response, max(len(raw_items), 1)))
+        for item in raw_items:
+            yield deserialize_item(item) if deserialize else item
+        if not response.get("LastEvaluatedKey"):
+            return
+        params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def _backoff(attempt: int, base: float = 0.05, cap: float = 5.0) -> None:
+    """Sleep with full jitter before retrying unprocessed batch entries"""
+    time.sleep(random.uniform(0, min(cap, base * (2 ** attempt))))
+
+
+def batch_write(client, writes: Iterable[Tuple[str, Dict[str, Any]]], limiter: Optional[RateLimiter] = None,
+                max_attempts: int = 10, serialized: bool = False) -> int:
+    """Put (table_name, item) pairs with BatchWriteItem, retrying unprocessed items
+
+    Items within one call must have distinct keys per table (a DynamoDB rule).
+    Pass serialized=True when the items are already in wire format.
+    Returns the number of items written; raises RuntimeError if DynamoDB keeps
+    returning unprocessed items after `max_attempts`.
+    """
+    written = 0
+    chunk: List[Tuple[str, Dict[str, Any]]] = []
+    for write in writes:
+        chunk.append(write)
+        if len(chunk) == BATCH_WRITE_LIMIT:
+            written += _write_chunk(client, chunk, limiter, max_attempts, serialized)
+            chunk = []
+    if chunk:
+        written += _write_chunk(client, chunk, limiter, max_attempts, serialized)
+    return written
+
+
+def _write_chunk(client, chunk: List[Tuple[str, Dict[str, Any]]], limiter: Optional[RateLimiter],
+                 max_attempts: int, serialized: bool) -> int:
+    request_items: Dict[str, List[Dict[str, Any]]] = {}
+    for table_name, item in chunk:
+        wire_item = item if serialized else serialize_item(item)
+        request_items.setdefault(table_name, []).append({"PutRequest": {"Item": wire_item}})
+
+    for attempt in range(max_attempts):
+        pending = sum(len(entries) for entries in request_items.values())
+        if limiter:
+            limiter.acquire(pending)
+        response = client.batch_write_item(RequestItems=request_items, ReturnConsumedCapacity="TOTAL")
+        request_items = response.get("UnprocessedItems") or {}
+        if not request_items:
+            return len(chunk)
+        _backoff(attempt)
+
+    remaining = sum(len(entries) for entries in request_items.values())
+    raise RuntimeError(f"{remaining} items still unprocessed after {max_attempts} BatchWriteItem attempts")
+
+
+def batch_get(client, table_name: str, keys: List[Dict[str, Any]],
+              max_attempts: int = 10) -> List[Dict[str, Any]]:
+    """Fetch items by key with BatchGetItem, retrying unprocessed keys"""
+    found: List[Dict[str, Any]] = []
+    for start in range(0, len(keys), BATCH_GET_LIMIT):
+        request_items = {table_name: {"Keys": [serialize_item(key) for key in keys[start:start + BATCH_GET_LIMIT]]}}
+        for attempt in range(max_attempts):
+            response = client.batch_get_item(RequestItems=request_items)
+            found.extend(deserialize_item(item) for item in response.get("Responses", {}).get(table_name, []))
+            request_items = response.get("UnprocessedKeys") or {}
+            if not request_items:
+                break
+            _backoff(attempt)
+        else:
+            raise RuntimeError(f"BatchGetItem on {table_name} left unprocessed keys after {max_attempts} attempts")
+    return found
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Merge hot-key sketches from every container and flag hot partition keys
+
+Reads the `hotkey_sketch` records shared.hotkeys emits (NDJSON sink files or
+CloudWatch Logs), merges them into one Count-Min Sketch and lists the heaviest
+(table, partition key) pairs with their share of the table's traffic. Keys at or
+above --threshold are flagged as hot.
+
+Usage:
+    python -m tools.hotkey_report --input metrics.ndjson [--threshold 0.05]
+    python -m tools.hotkey_report --log-group /aws/lambda/sync-hub-api --hours 6 \\
+        [--table sync-hub-settings] [--top 20] [--json report.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from shared import hotkeys
+from tools.capacity_report import read_files, read_log_groups
+
+RECORD_TYPE = "hotkey_sketch"
+
+
+def build_report(records, threshold: float, table: Optional[str] = None) -> Dict[str, Any]:
+    records = [record for record in records if table is None or table in record.get("tables", {})]
+    merged, tables = hotkeys.merge_records(records)
+    if merged is None:
+        return {"windows": 0, "total": 0, "tables": {}, "keys": [], "hot": []}
+    keys = hotkeys.hot_keys(merged, tables, 0.0)
+    if table is not None:
+        keys = [key for key in keys if key["table"] == table]
+    width = merged.sketch.width
+    return {
+        "windows": len(records),
+        "total": merged.total,
+        "tables": tables,
+        "error_bound": merged.total * 2.718281828 / width,  # Count-Min overestimate bound (per row, whp)
+        "keys": keys,
+        "hot": [key for key in keys if key["share"] >= threshold],
+    }
+
+
+def print_report(report: Dict[str, Any], top: int, threshold: float) -> None:
+    print(f"Merged {report['windows']} windows, {report['total']:,} key accesses "
+          f"(estimates may overcount by up to ~{report.get('error_bound', 0):,.0f})\n")
+    for name, count in sorted(report["tables"].items(), key=lambda item: item[1], reverse=True):
+        print(f"  {name:<40} {count:>12,}")
+    print(f"\n{'':2}{'table':<32} {'partition key':<38} {'estimate':>10} {'share':>7}")
+    for key in report["keys"][:top]:
+        marker = "🔥" if key["share"] >= threshold else "  "
+        print(f"{marker}{key['table'][:32]:<32} {key['partition_key'][:38]:<38} "
+              f"{key['estimate']:>10,} {key['share']:>6.1%}")
+    if report["hot"]:
+        print(f"\n🔥 {len(report['hot'])} key(s) at or above {threshold:.0%} of their table's traffic")
+    else:
+        print(f"\n✅ No key above {threshold:.0%} of its table's traffic")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Hot partition keys from merged hot-key sketches")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", action="append", help="NDJSON sink file (repeatable)")
+    source.add_argument("--log-group", action="append", help="CloudWatch log group (repeatable)")
+    parser.add_argument("--hours", type=float, default=24, help="Look-back window for --log-group")
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("HOTKEY_SHARE_THRESHOLD", "0.05")),
+                        help="Flag keys at or above this share of their table's traffic")
+    parser.add_argument("--table", help="Only report this table")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", help="Write the full report to this JSON file")
+    parser.add_argument("--region", default=os.getenv("AWS_REGION", "us-east-1"))
+    args = parser.parse_args(argv)
+
+    if args.input:
+        records = read_files(args.input, RECORD_TYPE)
+    else:
+        end_ms = int(time.time() * 1000)
+        records = read_log_groups(args.log_group, end_ms - int(args.hours * 3600 * 1000), end_ms,
+                                  args.region, RECORD_TYPE)
+
+    report = build_report(records, args.threshold, args.table)
+    print("🔑 Hot partition keys\n")
+    print_report(report, args.top, args.threshold)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report written to {args.json}")
+    return 1 if report["hot"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Deterministic, cached Lambda artifacts with a content-hashed dependency layer
+
+Each function in FUNCTIONS is built from its own sources plus shared/:
+- zips are reproducible: entries sorted, timestamps fixed at 1980-01-01,
+  permissions normalized, so the same inputs always give the same bytes (and the
+  same CodeSha256 and CDK asset hash)
+- __pycache__, *.pyc, tests and requirements files are pruned from the function
+  and from every installed package
+- third-party requirements go into a separate layer zip (under python/), built
+  with `pip install --platform ... --only-binary=:all:` for the Lambda runtime.
+  boto3/botocore come with the runtime and are left out. The layer is keyed
+  by the requirement lines, so pin versions for a cached layer to stay exact.
+  A function that bundles shared/ must list SHARED_REQUIREMENTS (shared.tokens
+  needs cryptography); build() refuses one that does not
+- builds are cached under .artifacts/lambda by input hash (the sha256 of every
+  source path and content, or of requirements + runtime + platform for a layer),
+  so an unchanged function or layer is not rebuilt
+- manifest.json records the latest artifact of each function; cdk/stacks/api_stack.py
+  deploys from it and fails the synth (current_entry) when the entry is missing or
+  was built from other sources or requirements than the tree now has
+
+`deploy` uploads only what changed: function code is skipped when the deployed
+CodeSha256 matches the zip, a layer version is reused when one already carries
+the layer's input hash in its description, and the function's layer list is
+updated only when it differs.
+
+Usage:
+    python -m tools.lambda_artifacts build [api sync-hub-api tags-api] [--no-layer]
+    python -m tools.lambda_artifacts deploy sync-hub-api [--s3-bucket BUCKET] [--dry-run]
+"""
+import argparse
+import base64
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ARTIFACTS = os.path.join(ROOT, ".artifacts", "lambda")
+MANIFEST = os.path.join(ARTIFACTS, "manifest.json")
+REGION = "us-east-1"
+
+FIXED_DATE = (1980, 1, 1, 0, 0, 0)
+PRUNED_DIRS = {"__pycache__", "tests", "test", "testing", ".pytest_cache"}
+PRUNED_FILES = ("*.pyc", "*.pyo", "test_*.py", "*_test.py", "conftest.py", "requirements*.txt")
+RUNTIME_PROVIDED = {"boto3", "botocore", "s3transfer", "jmespath"}
+PLATFORM = "manylinux2014_x86_64"
+INLINE_UPLOAD_LIMIT = 50 * 1024 * 1024  # larger zips must go through S3
+SHARED_REQUIREMENTS = ("cryptography",)  # third-party imports of shared/ (shared.tokens)
+
+
+class Function:
+    """A Lambda function: (source, path in zip) pairs, entry point and runtime"""
+
+    def __init__(self, name: str, sources: List[Tuple[str, str]], handler: str, runtime: str,
+                 function_name: Optional[str] = None, requirements: Optional[str] = None):
+        self.name = name
+        self.sources = sources
+        self.handler = handler
+        self.runtime = runtime
+        self.function_name = function_name
+        self.requirements = requirements
+
+    @property
+    def python_version(self) -> str:
+        return self.runtime.removeprefix("python")
+
+
+FUNCTIONS = {
+    "api": Function("api", [("services/api", ""), ("shared", "shared")], "main.handler", "python3.11",
+                    requirements="services/api/requirements.txt"),
+    "sync-hub-api": Function("sync-hub-api", [("sync-hub/services/api", ""), ("shared", "shared")], "main.handler",
+                             "python3.12", function_name="sync-hub-api",
+                             requirements="sync-hub/services/api/requirements.txt"),
+    "tags-api": Function("tags-api", [("lambda/tags_handler.py", "tags_handler.py"), ("shared", "shared")],
+                         "tags_handler.lambda_handler", "python3.12", function_name="sync-hub-tags",
+                         requirements="lambda/requirements.txt"),
+}
+
+
+class Artifact:
+    def __init__(self, name: str, path: str, input_hash: str, cached: bool):
+        self.name = name
+        self.path = path
+        self.input_hash = input_hash
+        self.cached = cached
+        self.size = os.path.getsize(path)
+        self.code_sha256 = code_sha256(path)
+
+
+def pruned(relative: str) -> bool:
+    parts = relative.replace(os.sep, "/").split("/")
+    if any(part in PRUNED_DIRS for part in parts[:-1]):
+        return True
+    return any(fnmatch.fnmatch(parts[-1], pattern) for pattern in PRUNED_FILES)
+
+
+def collect_files(directory: str, prefix: str = "") -> Dict[str, str]:
+    """Zip path -> file path for everything under `directory` that survives pruning"""
+    files = {}
+    if os.path.isfile(directory):
+        return {prefix or os.path.basename(directory): directory}
+    for current, dirs, names in os.walk(directory):
+        dirs[:] = [d for d in dirs if d not in PRUNED_DIRS]
+        for name in names:
+            path = os.path.join(current, name)
+            relative = os.path.relpath(path, directory).replace(os.sep, "/")
+            if not pruned(relative):
+                files[f"{prefix.rstrip('/')}/{relative}" if prefix else relative] = path
+    return files
+
+
+def function_files(function: Function, root: str = ROOT) -> Dict[str, str]:
+    files: Dict[str, str] = {}
+    for source, prefix in function.sources:
+        files.update(collect_files(os.path.join(root, source), prefix))
+    return files
+
+
+def input_hash(files: Dict[str, str], extra: str = "") -> str:
+    digest = hashlib.sha256(extra.encode("utf-8"))
+    for name in sorted(files):
+        with open(files[name], "rb") as f:
+            digest.update(f"{name}\0{hashlib.sha256(f.read()).hexdigest()}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def code_sha256(path: str) -> str:
+    """Base64 sha256, the form Lambda reports as CodeSha256"""
+    with open(path, "rb") as f:
+        return base64.b64encode(hashlib.sha256(f.read()).digest()).decode("ascii")
+
+
+def write_zip(path: str, entries: Dict[str, Union[str, bytes]]) -> str:
+    """Reproducible zip of zip path -> file path (or bytes): sorted, fixed timestamps and modes"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    partial = path + ".partial"
+    with zipfile.ZipFile(partial, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+        for name in sorted(entries):
+            value = entries[name]
+            if isinstance(value, bytes):
+                data, executable = value, False
+            else:
+                with open(value, "rb") as f:
+                    data = f.read()
+                executable = os.access(value, os.X_OK)
+            info = zipfile.ZipInfo(name, FIXED_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3
+            info.external_attr = (0o100755 if executable else 0o100644) << 16
+            archive.writestr(info, data)
+    os.replace(partial, path)
+    return path
+
+
+def layer_requirements(path: str) -> List[str]:
+    """Requirement lines minus the packages the Lambda runtime already provides"""
+    lines = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line and requirement_name(line) not in RUNTIME_PROVIDED:
+                lines.append(line)
+    return lines
+
+
+def requirement_name(line: str) -> str:
+    return re.split(r"[\s<>=!~;\[]", line, maxsplit=1)[0].lower()
+
+
+def check_requirements(function: Function, root: str = ROOT) -> None:
+    """Raise ValueError when a function bundling shared/ does not declare what shared/ imports"""
+    if not any(source == "shared" for source, _ in function.sources):
+        return
+    if not function.requirements:
+        raise ValueError(f"{function.name} bundles shared/ but declares no requirements "
+                         f"(needs {', '.join(SHARED_REQUIREMENTS)})")
+    declared = {requirement_name(line) for line in layer_requirements(os.path.join(root, function.requirements))}
+    missing = [name for name in SHARED_REQUIREMENTS if name not in declared]
+    if missing:
+        raise ValueError(f"{function.requirements} is missing {', '.join(missing)}, which shared/ imports")
+
+
+def layer_hash(function: Function, root: str = ROOT, platform: str = PLATFORM) -> Optional[str]:
+    """Input hash of the function's layer, or None when it has no third-party requirements"""
+    if not function.requirements:
+        return None
+    requirements = layer_requirements(os.path.join(root, function.requirements))
+    if not requirements:
+        return None
+    return input_hash({}, "\n".join(sorted(requirements)) + f"\n{function.runtime}\n{platform}")
+
+
+def build_layer(function: Function, root: str = ROOT, platform: str = PLATFORM) -> Optional[Artifact]:
+    key = layer_hash(function, root, platform)
+    if key is None:
+        return None
+    requirements = layer_requirements(os.path.join(root, function.requirements))
+    path = os.path.join(ARTIFACTS, f"{function.name}-layer-{key[:12]}.zip")
+    if os.path.exists(path):
+        return Artifact(f"{function.name}-layer", path, key, cached=True)
+
+    target = tempfile.mkdtemp(prefix="lambda-layer-")
+    try:
+        subprocess.run([sys.executable, "-m", "pip", "install", "--quiet", "--no-compile", "--target", target,
+                        "--platform", platform, "--implementation", "cp",
+                        "--python-version", function.python_version, "--only-binary=:all:", *requirements],
+                       check=True)
+        for name in os.listdir(target):
+            if name.split("-")[0].lower() in RUNTIME_PROVIDED:
+                shutil.rmtree(os.path.join(target, name), ignore_errors=True)
+        write_zip(path, collect_files(target, "python"))
+    finally:
+        shutil.rmtree(target, ignore_errors=True)
+    return Artifact(f"{function.name}-layer", path, key, cached=False)
+
+
+def build_function(function: Function, root: str = ROOT) -> Artifact:
+    files = function_files(function, root)
+    key = input_hash(files, function.handler)
+    path = os.path.join(ARTIFACTS, f"{function.name}-{key[:12]}.zip")
+    if os.path.exists(path):
+        return Artifact(function.name, path, key, cached=True)
+    write_zip(path, files)
+    return Artifact(function.name, path, key, cached=False)
+
+
+def read_manifest() -> Dict[str, Any]:
+    if not os.path.exists(MANIFEST):
+        return {}
+    with open(MANIFEST) as f:
+        return json.load(f)
+
+
+def build(names: List[str], root: str = ROOT, with_layer: bool = True,
+          platform: str = PLATFORM) -> Dict[str, Tuple[Artifact, Optional[Artifact]]]:
+    """Build (or reuse) each function and its layer and record them in manifest.json"""
+    for name in names:
+        check_requirements(FUNCTIONS[name], root)
+    manifest = read_manifest()
+    built = {}
+    for name in names:
+        function = FUNCTIONS[name]
+        artifact = build_function(function, root)
+        layer = build_layer(function, root, platform) if with_layer else None
+        built[name] = (artifact, layer)
+        manifest[name] = {
+            "zip": os.path.relpath(artifact.path, ROOT),
+            "layer": os.path.relpath(layer.path, ROOT) if layer else None,
+            "handler": function.handler,
+            "runtime": function.runtime,
+            "input_hash": artifact.input_hash,
+            "layer_hash": layer.input_hash if layer else None,
+            "platform": platform,
+        }
+    os.makedirs(ARTIFACTS, exist_ok=True)
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return built
+
+
+def current_entry(name: str, root: str = ROOT) -> Dict[str, Any]:
+    """The manifest entry for `name`, checked against the current tree; raises ValueError if missing or stale"""
+    function = FUNCTIONS[name]
+    entry = read_manifest().get(name)
+    rebuild = f"run `python -m tools.lambda_artifacts build {name}`"
+    if entry is None:
+        raise ValueError(f"No {name} artifact in {MANIFEST}; {rebuild}")
+    if entry["input_hash"] != input_hash(function_files(function, root), function.handler):
+        raise ValueError(f"The {name} artifact was built from other sources than the tree has now; {rebuild}")
+    expected_layer = layer_hash(function, root, entry.get("platform", PLATFORM))
+    if entry.get("layer_hash") != expected_layer:
+        raise ValueError(f"The {name} layer is missing or was built from other requirements; {rebuild}")
+    for key in ("zip", "layer"):
+        if entry.get(key) and not os.path.exists(os.path.join(ROOT, entry[key])):
+            raise ValueError(f"{entry[key]} is gone; {rebuild}")
+    return entry
+
+
+def _code(artifact: Artifact, s3, bucket: Optional[str]) -> Dict[str, Any]:
+    if artifact.size <= INLINE_UPLOAD_LIMIT or not bucket:
+        with open(artifact.path, "rb") as f:
+            return {"ZipFile": f.read()}
+    key = f"lambda/{os.path.basename(artifact.path)}"
+    s3.upload_file(artifact.path, bucket, key)
+    return {"S3Bucket": bucket, "S3Key": key}
+
+
+def deploy_layer(lambda_client, function: Function, layer: Artifact, s3=None, bucket: Optional[str] = None,
+                 dry_run: bool = False) -> Tuple[str, bool]:
+    """(LayerVersionArn, published) for the layer, reusing a version with the same input hash"""
+    layer_name = f"{function.function_name}-deps"
+    description = f"sha256:{layer.input_hash}"
+    for page in lambda_client.get_paginator("list_layer_versions").paginate(LayerName=layer_name):
+        for version in page.get("LayerVersions", []):
+            if version.get("Description") == description:
+                return version["LayerVersionArn"], False
+    if dry_run:
+        return f"{layer_name}:<new>", True
+    content = _code(layer, s3, bucket)
+    published = lambda_client.publish_layer_version(LayerName=layer_name, Description=description, Content=content,
+                                                    CompatibleRuntimes=[function.runtime])
+    return published["LayerVersionArn"], True
+
+
+def deploy(name: str, artifact: Artifact, layer: Optional[Artifact], lambda_client=None, s3=None,
+           bucket: Optional[str] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """Upload the function code and layer only where the deployed bytes differ"""
+    import boto3
+    function = FUNCTIONS[name]
+    if not function.function_name:
+        raise ValueError(f"{name} is deployed through CDK (cdk/stacks/api_stack.py), not directly")
+    lambda_client = lambda_client or boto3.client("lambda", region_name=REGION)
+    s3 = s3 or (boto3.client("s3", region_name=REGION) if bucket else None)
+    config = lambda_client.get_function_configuration(FunctionName=function.function_name)
+    actions = {"code": "unchanged", "layer": None, "layers": "unchanged"}
+
+    if config.get("CodeSha256") != artifact.code_sha256:
+        actions["code"] = "updated"
+        if not dry_run:
+            lambda_client.update_function_code(FunctionName=function.function_name, **_code(artifact, s3, bucket))
+            lambda_client.get_waiter("function_updated_v2").wait(FunctionName=function.function_name)
+
+    if layer:
+        arn, published = deploy_layer(lambda_client, function, layer, s3, bucket, dry_run)
+        actions["layer"] = f"{'published' if published else 'reused'} {arn}"
+        layer_name = f":layer:{function.function_name}-deps:"
+        current = [item["Arn"] for item in config.get("Layers", [])]
+        desired = [existing for existing in current if layer_name not in existing] + [arn]
+        if sorted(desired) != sorted(current):
+            actions["layers"] = "updated"
+            if not dry_run:
+                lambda_client.update_function_configuration(FunctionName=function.function_name, Layers=desired)
+                lambda_client.get_waiter("function_updated_v2").wait(FunctionName=function.function_name)
+    return actions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build and deploy reproducible Lambda artifacts")
+    parser.add_argument("command", choices=["build", "deploy"])
+    parser.add_argument("names", nargs="*", help=f"Functions (default: all of {', '.join(FUNCTIONS)})")
+    parser.add_argument("--no-layer", action="store_true", help="Skip the dependency layer")
+    parser.add_argument("--platform", default=PLATFORM, help="pip --platform for layer wheels")
+    parser.add_argument("--s3-bucket", help="Staging bucket for zips over the 50 MB inline limit")
+    parser.add_argument("--dry-run", action="store_true", help="Report what deploy would upload")
+    args = parser.parse_args(argv)
+
+    names = args.names or (list(FUNCTIONS) if args.command == "build"
+                           else [name for name, function in FUNCTIONS.items() if function.function_name])
+    unknown = [name for name in names if name not in FUNCTIONS]
+    if unknown:
+        parser.error(f"unknown function(s): {', '.join(unknown)}")
+
+    built = build(names, with_layer=not args.no_layer, platform=args.platform)
+    for name, (artifact, layer) in built.items():
+        for item in filter(None, (artifact, layer)):
+            state = "cached" if item.cached else "built"
+            print(f"📦 {item.name:<22} {item.size:>12,} B  {state:<6}  {os.path.relpath(item.path, ROOT)}")
+
+    if args.command == "deploy":
+        for name in names:
+            artifact, layer = built[name]
+            actions = deploy(name, artifact, layer, bucket=args.s3_bucket, dry_run=args.dry_run)
+            prefix = "🔎" if args.dry_run else "✅"
+            print(f"{prefix} {FUNCTIONS[name].function_name}: code {actions['code']}, layers {actions['layers']}"
+                  + (f" ({actions['layer']})" if actions["layer"] else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Traffic generator modelling the extension and admin dashboard workloads against the API
+
+Simulated editors behave like the extension (extension/src/apiService.ts):
+- login once and reuse the token until shortly before it expires
+- pullSettings: GET /settings, on average every --pull-interval seconds
+- push: four sequential POST /settings (settings.json, argv.json, mcp.json,
+  extensions.json), on average every --push-interval seconds
+Simulated admins load the dashboard (admin_spa.html): analytics, timeseries and
+the user list in parallel, on average every --dashboard-interval seconds.
+
+Editors join as a Poisson process (--arrival-rate per second, 0 = all at once)
+and are spread over --tenants tenants with Zipf weights (--tenant-skew, 0 =
+uniform), so a few large tenants carry most of the traffic as in production.
+Intervals are exponential, so requests arrive in bursts rather than in lockstep.
+
+All requests share one pooled httpx.AsyncClient. The report has one row per
+endpoint and per workflow: throughput, error breakdown and latency percentiles
+from HDR-style histograms (bench.harness.Histogram). It ends with the mean
+in-flight requests per function (Little's law), the number to size Lambda
+reserved or provisioned concurrency from. --json also writes the histogram
+buckets, so runs can be merged or compared.
+
+Tokens:
+- --jwks-dir DIR mints local tokens (tools.local_jwks) with custom:tenant_id and
+  tenant_id claims. Start tools.local_gateway with JWKS_URL=file://DIR/jwks.json,
+  JWT_ISSUER=https://cognito-idp.local.amazonaws.com/local_pool and
+  COGNITO_CLIENT_IDS=local-client.
+- --token TOKEN (or LOADGEN_TOKEN) uses one real token for every user. In that
+  case the login step is not exercised.
+
+Usage:
+    python -m tools.loadgen --base-url http://127.0.0.1:3002 --jwks-dir .artifacts/jwks \\
+        --editors 200 --admins 5 --duration 120 [--json results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.harness import Histogram, print_table, write_json
+
+SETTINGS_FILES = {  # name -> typical size in bytes of the pushed JSON
+    "settings.json": 3000,
+    "argv.json": 300,
+    "mcp.json": 1200,
+    "extensions.json": 2000,
+}
+RELOGIN_MARGIN_SECONDS = 60
+
+
+class Stats:
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = defaultdict(Histogram)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.busy_seconds: Counter = Counter()  # per function, for Little's law
+        self.logins = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def record(self, name: str, elapsed: float, error: Optional[str] = None) -> None:
+        self.histograms[name].record(elapsed * 1e6)
+        if error:
+            self.errors[name][error] += 1
+
+
+def function_of(path: str) -> str:
+    return "admin-api" if path.startswith("/admin") else "tags-api" if path.endswith("/tags") else "sync-hub-api"
+
+
+class Tokens:
+    """Per-user bearer tokens, minted locally and renewed before expiry, or one fixed token"""
+
+    def __init__(self, stats: Stats, jwks_dir: Optional[str], token: Optional[str], ttl: int):
+        self.stats = stats
+        self.fixed = token
+        self.ttl = ttl
+        self.issuer = None
+        self.cache: Dict[str, tuple] = {}
+        if jwks_dir:
+            from tools.local_jwks import LocalIssuer
+            self.issuer = LocalIssuer()
+            self.issuer.write_jwks(jwks_dir)
+
+    def get(self, user_id: str, tenant_id: str, admin: bool = False) -> str:
+        if self.fixed:
+            return self.fixed
+        cached = self.cache.get(user_id)
+        if cached is None or cached[1] - RELOGIN_MARGIN_SECONDS < time.time():
+            self.stats.logins += 1
+            now = int(time.time())
+            token = self.issuer.sign({
+                "sub": user_id,
+                "iss": self.issuer.issuer,
+                "token_use": "id",
+                "aud": self.issuer.client_id,
+                "iat": now,
+                "exp": now + self.ttl,
+                "email": f"{user_id}@{tenant_id}.example.com",
+                "custom:tenant_id": tenant_id,  # admin Lambdas
+                "tenant_id": tenant_id,  # sync-hub extract_claims
+                "cognito:groups": ["admin"] if admin else [],
+            })
+            cached = self.cache[user_id] = (token, time.time() + self.ttl)
+        return cached[0]
+
+
+async def call(client: httpx.AsyncClient, stats: Stats, name: str, method: str, path: str, token: str,
+               body: Optional[Dict[str, Any]] = None) -> bool:
+    stats.in_flight += 1
+    stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+    started = time.perf_counter()
+    error = None
+    try:
+        response = await client.request(method, path, json=body, headers={"Authorization": f"Bearer {token}"})
+        if response.status_code >= 400:
+            error = f"HTTP {response.status_code}"
+    except httpx.HTTPError as e:
+        error = type(e).__name__
+    finally:
+        stats.in_flight -= 1
+    elapsed = time.perf_counter() - started
+    stats.record(name, elapsed, error)
+    stats.busy_seconds[function_of(path)] += elapsed
+    return error is None
+
+
+def settings_payload(rng: random.Random, name: str) -> str:
+    size = int(SETTINGS_FILES[name] * rng.uniform(0.5, 1.5))
+    entries, length = {}, 2
+    while length < size:
+        key = f"editor.option{len(entries)}"
+        value = rng.choice([True, False, rng.randint(0, 100), "x" * rng.randint(4, 40)])
+        entries[key] = value
+        length += len(key) + len(json.dumps(value)) + 6
+    return json.dumps(entries)
+
+
+async def editor(client: httpx.AsyncClient, stats: Stats, tokens: Tokens, args: argparse.Namespace,
+                 user_id: str, tenant_id: str, deadline: float, rng: random.Random) -> None:
+    next_pull = time.monotonic() + rng.expovariate(1 / args.pull_interval)
+    next_push = time.monotonic() + rng.expovariate(1 / args.push_interval)
+    while True:
+        wake = min(next_pull, next_push)
+        if wake >= deadline:
+            return
+        await asyncio.sleep(max(0.0, wake - time.monotonic()))
+        token = tokens.get(user_id, tenant_id)
+        started = time.perf_counter()
+        if next_pull <= next_push:
+            ok = await call(client, stats, "GET /settings", "GET", "/settings", token)
+            stats.record("workflow: pull", time.perf_counter() - started, None if ok else "failed")
+            next_pull = time.monotonic() + rng.expovariate(1 / args.pull_interval)
+        else:
+            ok = True
+            is_public = rng.random() < args.public_ratio
+            for name in SETTINGS_FILES:  # sequential, as the extension uploads them
+                body = {"name": name, "value": settings_payload(rng, name), "is_public": is_public}
+                if not await call(client, stats, "POST /settings", "POST", "/settings", token, body):
+                    ok = False
+                    break
+            stats.record("workflow: push (4 files)", time.perf_counter() - started, None if ok else "failed")
+            next_push = time.monotonic() + rng.expovariate(1 / args.push_interval)
+
+
+async def admin(client: httpx.AsyncClient, stats: Stats, tokens: Tokens, args: argparse.Namespace,
+                user_id: str, tenant_id: str, deadline: float, rng: random.Random) -> None:
+    while True:
+        wake = time.monotonic() + rng.expovariate(1 / args.dashboard_interval)
+        if wake >= deadline:
+            return
+        await asyncio.sleep(max(0.0, wake - time.monotonic()))
+        token = tokens.get(user_id, tenant_id, admin=True)
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            call(client, stats, "GET /admin/analytics", "GET", "/admin/analytics?range=7d", token),
+            call(client, stats, "GET /admin/analytics/timeseries", "GET",
+                 "/admin/analytics/timeseries?metric=settings&range=7d&interval=day", token),
+            call(client, stats, "GET /admin/users", "GET", "/admin/users?limit=50", token),
+        )
+        stats.record("workflow: dashboard", time.perf_counter() - started, None if all(results) else "failed")
+
+
+def tenant_weights(tenants: int, skew: float) -> List[float]:
+    return [1 / (rank ** skew) for rank in range(1, tenants + 1)]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    stats = Stats()
+    tokens = Tokens(stats, args.jwks_dir, args.token, args.token_ttl)
+    rng = random.Random(args.seed)
+    tenant_ids = [f"{args.tenant_prefix}-{i}" for i in range(args.tenants)]
+    weights = tenant_weights(args.tenants, args.tenant_skew)
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    timeout = httpx.Timeout(args.timeout, connect=min(args.timeout, 5.0))
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+        started = time.monotonic()
+        deadline = started + args.duration
+        users = [("editor", f"editor-{i}") for i in range(args.editors)] + \
+                [("admin", f"admin-{i}") for i in range(args.admins)]
+        rng.shuffle(users)
+        tasks = []
+        for kind, user_id in users:
+            if args.arrival_rate > 0:
+                await asyncio.sleep(rng.expovariate(args.arrival_rate))
+                if time.monotonic() >= deadline:
+                    break
+            tenant_id = rng.choices(tenant_ids, weights)[0]
+            worker = editor if kind == "editor" else admin
+            tasks.append(asyncio.create_task(worker(client, stats, tokens, args, user_id, tenant_id, deadline,
+                                                    random.Random(rng.random()))))
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - started
+
+    rows = []
+    for name in sorted(stats.histograms, key=lambda n: (n.startswith("workflow"), n)):
+        histogram = stats.histograms[name]
+        errors = stats.errors.get(name, Counter())
+        rows.append({
+            "endpoint": name,
+            "requests": histogram.count,
+            "errors": sum(errors.values()),
+            "rps": histogram.count / elapsed,
+            **histogram.summary_ms(),
+            "error_breakdown": dict(errors),
+            "histogram": histogram.to_dict(),
+        })
+    concurrency = {function: busy / elapsed for function, busy in sorted(stats.busy_seconds.items())}
+    return {"rows": rows, "elapsed": elapsed, "logins": stats.logins, "peak_in_flight": stats.peak_in_flight,
+            "concurrency": concurrency}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Extension push/pull and admin dashboard traffic generator")
+    parser.add_argument("--base-url", default=os.getenv("API_BASE", "http://127.0.0.1:3002"))
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to run")
+    parser.add_argument("--editors", type=int, default=50, help="Simulated extension users")
+    parser.add_argument("--admins", type=int, default=2, help="Simulated admin dashboard users")
+    parser.add_argument("--arrival-rate", type=float, default=10.0, help="Users joining per second (0 = all at once)")
+    parser.add_argument("--pull-interval", type=float, default=30.0, help="Mean seconds between pulls per editor")
+    parser.add_argument("--push-interval", type=float, default=300.0, help="Mean seconds between pushes per editor")
+    parser.add_argument("--dashboard-interval", type=float, default=20.0, help="Mean seconds between dashboard loads")
+    parser.add_argument("--public-ratio", type=float, default=0.1, help="Share of pushes marked public")
+    parser.add_argument("--tenants", type=int, default=10)
+    parser.add_argument("--tenant-skew", type=float, default=1.1, help="Zipf exponent of users per tenant (0 = uniform)")
+    parser.add_argument("--tenant-prefix", default="loadgen-tenant")
+    parser.add_argument("--jwks-dir", help="Mint local tokens and write their JWKS here")
+    parser.add_argument("--token", default=os.getenv("LOADGEN_TOKEN"), help="One bearer token for every user")
+    parser.add_argument("--token-ttl", type=int, default=3600, help="Lifetime of minted tokens (re-login after)")
+    parser.add_argument("--max-connections", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1, help="Random seed, for repeatable schedules")
+    parser.add_argument("--json", help="Write results (with histogram buckets) to this JSON file")
+    args = parser.parse_args(argv)
+
+    if not args.jwks_dir and not args.token:
+        parser.error("either --jwks-dir (local tokens) or --token/LOADGEN_TOKEN is required")
+
+    print(f"🚦 {args.editors} editors + {args.admins} admins over {args.tenants} tenants "
+          f"against {args.base_url} for {args.duration:.0f}s")
+    result = asyncio.run(run(args))
+
+    print_table(result["rows"], ["endpoint", "requests", "errors", "rps", "p50_ms", "p90_ms", "p99_ms",
+                                 "p999_ms", "max_ms"])
+    for row in result["rows"]:
+        if row["error_breakdown"]:
+            breakdown = ", ".join(f"{error} x{count}" for error, count in row["error_breakdown"].items())
+            print(f"❌ {row['endpoint']}: {breakdown}")
+    total = sum(row["requests"] for row in result["rows"] if not row["endpoint"].startswith("workflow"))
+    print(f"\n📈 {total / result['elapsed']:.1f} req/s, {result['logins']} logins, "
+          f"peak {result['peak_in_flight']} in flight")
+    for function, concurrency in result["concurrency"].items():
+        print(f"   {function}: {concurrency:.2f} concurrent executions on average (Little's law)")
+    write_json(args.json, "loadgen", result["rows"], elapsed=result["elapsed"], logins=result["logins"],
+               peak_in_flight=result["peak_in_flight"], concurrency=result["concurrency"],
+               config={k: v for k, v in vars(args).items() if k not in ("token", "json")})
+    return 1 if any(row["errors"] for row in result["rows"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Local API Gateway stand-in: the sync-hub, admin and tags Lambda handlers behind one ASGI app
+
+Every HTTP request is turned into the event API Gateway would send and handed to
+the real handler code:
+- /settings/{id}/tags -> lambda/tags_handler.lambda_handler (REST API, v1 proxy event)
+- /admin/...          -> lambda/admin_handler.lambda_handler (REST API, v1 proxy event)
+- everything else     -> sync-hub main.handler (HTTP API, v2 event)
+
+For sync-hub the bearer token is verified with shared.tokens before the handler
+runs, as the HTTP API JWT authorizer does, and its claims are passed in
+requestContext.authorizer.jwt.claims (public routes skip the check). The Lambdas
+verify their own tokens. Export the JWKS_URL/JWT_ISSUER/COGNITO_CLIENT_IDS
+printed by tools.local_jwks to use locally minted tokens.
+
+Handlers run on a thread pool (--threads per worker; 1 gives Lambda's one request
+at a time per container). Each worker process keeps its own handler state, like a
+separate Lambda container. With --fake-dynamodb, each worker also has its own
+in-memory tables (bench.ddbfake, seeded like bench.bench_handlers). Writes are
+therefore not shared between workers.
+
+Usage:
+    python -m tools.local_gateway [--port 3002] [--workers 4] [--threads 8] [--fake-dynamodb 1000]
+    curl localhost:3002/_health
+"""
+import argparse
+import asyncio
+import base64
+import contextvars
+import functools
+import json
+import os
+import re
+import sys
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _path in (ROOT, os.path.join(ROOT, "sync-hub", "services", "api"), os.path.join(ROOT, "lambda")):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+THREADS = int(os.getenv("LOCAL_GATEWAY_THREADS", "8"))
+FAKE_DYNAMODB = os.getenv("LOCAL_GATEWAY_FAKE_DYNAMODB")  # tenant size to seed, unset = real DynamoDB
+TIMEOUT_SECONDS = float(os.getenv("LOCAL_GATEWAY_TIMEOUT", "29"))  # API Gateway's integration limit
+
+TAGS_PATH = re.compile(r"^/settings/(?P<id>[^/]+)/tags/?$")
+
+
+class LambdaContext:
+    """The parts of the Lambda context object the handlers and shared/ read"""
+
+    def __init__(self, function_name: str, timeout: float = TIMEOUT_SECONDS):
+        self.function_name = function_name
+        self.function_version = "$LATEST"
+        self.invoked_function_arn = f"arn:aws:lambda:local:000000000000:function:{function_name}"
+        self.memory_limit_in_mb = 1024
+        self.aws_request_id = str(uuid.uuid4())
+        self._deadline = time.monotonic() + timeout
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+class Request:
+    def __init__(self, scope: Dict[str, Any], body: bytes):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.raw_query = scope.get("query_string", b"").decode("latin-1")
+        self.query = parse_qsl(self.raw_query, keep_blank_values=True)
+        self.headers: List[Tuple[str, str]] = [(k.decode("latin-1").lower(), v.decode("latin-1"))
+                                               for k, v in scope.get("headers", [])]
+        self.source_ip = (scope.get("client") or ("127.0.0.1", 0))[0]
+        self.body = body
+        self.request_id = str(uuid.uuid4())
+        self.epoch_ms = int(time.time() * 1000)
+
+    def header(self, name: str) -> Optional[str]:
+        return next((v for k, v in self.headers if k == name), None)
+
+    def joined_headers(self) -> Dict[str, str]:
+        joined: Dict[str, str] = {}
+        for k, v in self.headers:
+            joined[k] = f"{joined[k]},{v}" if k in joined else v
+        return joined
+
+    def encoded_body(self) -> Tuple[Optional[str], bool]:
+        if not self.body:
+            return None, False
+        try:
+            return self.body.decode("utf-8"), False
+        except UnicodeDecodeError:
+            return base64.b64encode(self.body).decode(), True
+
+
+def v2_event(request: Request, claims: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """HTTP API payload format 2.0"""
+    headers = request.joined_headers()
+    body, is_base64 = request.encoded_body()
+    query: Dict[str, str] = {}
+    for k, v in request.query:
+        query[k] = f"{query[k]},{v}" if k in query else v
+    event: Dict[str, Any] = {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": request.path,
+        "rawQueryString": request.raw_query,
+        "headers": {k: v for k, v in headers.items() if k != "cookie"},
+        "requestContext": {
+            "accountId": "000000000000",
+            "apiId": "local",
+            "domainName": headers.get("host", "localhost"),
+            "http": {"method": request.method, "path": request.path, "protocol": "HTTP/1.1",
+                     "sourceIp": request.source_ip, "userAgent": headers.get("user-agent", "")},
+            "requestId": request.request_id,
+            "routeKey": "$default",
+            "stage": "$default",
+            "timeEpoch": request.epoch_ms,
+        },
+        "isBase64Encoded": is_base64,
+    }
+    if "cookie" in headers:
+        event["cookies"] = [c.strip() for c in headers["cookie"].replace(",", ";").split(";") if c.strip()]
+    if query:
+        event["queryStringParameters"] = query
+    if body is not None:
+        event["body"] = body
+    if claims is not None:
+        event["requestContext"]["authorizer"] = {"jwt": {"claims": claims, "scopes": None}}
+    return event
+
+
+def v1_event(request: Request, resource: str, path_parameters: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """REST API proxy integration payload (format 1.0)"""
+    headers: Dict[str, str] = {}
+    multi_headers: Dict[str, List[str]] = {}
+    for k, v in request.headers:
+        headers[k] = v
+        multi_headers.setdefault(k, []).append(v)
+    query: Dict[str, str] = {}
+    multi_query: Dict[str, List[str]] = {}
+    for k, v in request.query:
+        query[k] = v
+        multi_query.setdefault(k, []).append(v)
+    body, is_base64 = request.encoded_body()
+    return {
+        "resource": resource,
+        "path": request.path,
+        "httpMethod": request.method,
+        "headers": headers or None,
+        "multiValueHeaders": multi_headers or None,
+        "queryStringParameters": query or None,
+        "multiValueQueryStringParameters": multi_query or None,
+        "pathParameters": path_parameters,
+        "stageVariables": None,
+        "requestContext": {
+            "accountId": "000000000000",
+            "apiId": "local",
+            "resourcePath": resource,
+            "httpMethod": request.method,
+            "path": request.path,
+            "stage": "local",
+            "requestId": request.request_id,
+            "requestTimeEpoch": request.epoch_ms,
+            "identity": {"sourceIp": request.source_ip, "userAgent": request.header("user-agent")},
+        },
+        "body": body,
+        "isBase64Encoded": is_base64,
+    }
+
+
+def authorizer_claims(claims: Dict[str, Any]) -> Dict[str, str]:
+    """Claims as the HTTP API JWT authorizer passes them: every value a string, arrays as "[a b]" """
+    return {k: "[" + " ".join(map(str, v)) + "]" if isinstance(v, list) else str(v) for k, v in claims.items()}
+
+
+def to_response(result: Any, version: str) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    """(status, headers, body) from a handler's return value"""
+    if version == "2.0" and not (isinstance(result, dict) and "statusCode" in result):
+        result = {"statusCode": 200, "headers": {"content-type": "application/json"}, "body": json.dumps(result)}
+    body = result.get("body") or ""
+    payload = base64.b64decode(body) if result.get("isBase64Encoded") else body.encode("utf-8")
+    headers = [(k.lower().encode(), str(v).encode()) for k, v in (result.get("headers") or {}).items()
+               if k.lower() != "content-length"]
+    for k, values in (result.get("multiValueHeaders") or {}).items():
+        if k.lower() in (result.get("headers") or {}) or k.lower() == "content-length":
+            continue
+        headers.extend((k.lower().encode(), str(v).encode()) for v in values)
+    headers.extend((b"set-cookie", c.encode()) for c in result.get("cookies") or [])
+    headers.append((b"content-length", str(len(payload)).encode()))
+    return int(result.get("statusCode", 200)), headers, payload
+
+
+def gateway_error(status: int, message: str) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    """A response API Gateway itself produces (authorizer rejection, integration failure)"""
+    payload = json.dumps({"message": message}).encode()
+    return status, [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())], payload
+
+
+class Gateway:
+    """ASGI app routing requests to the three Lambda handlers"""
+
+    def __init__(self, threads: int = THREADS, fake_dynamodb: Optional[str] = FAKE_DYNAMODB):
+        self.threads = threads
+        self.fake_dynamodb = fake_dynamodb
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.handlers: Dict[str, Callable[[Dict[str, Any], Any], Any]] = {}
+        self.sync_router = None
+
+    def startup(self) -> None:
+        if self.fake_dynamodb is not None:
+            from bench import bench_handlers
+            from bench.ddbfake import FakeDynamoDB, install_shared
+            from shared import aws
+            bench_handlers.configure_environment()
+            aws.reset()
+            fake = install_shared(FakeDynamoDB())
+            bench_handlers.install_cognito_stub()
+            bench_handlers.seed(fake, int(self.fake_dynamodb or 0))
+            print(f"🌱 In-memory DynamoDB seeded with a {int(self.fake_dynamodb or 0):,}-item tenant "
+                  f"({bench_handlers.TENANT})")
+        import admin_handler
+        import main
+        import tags_handler
+        self.handlers = {"sync-hub-api": main.handler, "admin-api": admin_handler.lambda_handler,
+                         "tags-api": tags_handler.lambda_handler}
+        self.sync_router = main.router
+        self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="lambda")
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def build_event(self, request: Request) -> Tuple[str, str, Optional[Dict[str, Any]], Optional[Tuple[int, str]]]:
+        """(function, payload version, event, early error) for a request"""
+        from shared import tokens
+        tags = TAGS_PATH.match(request.path)
+        if tags:
+            return "tags-api", "1.0", v1_event(request, "/settings/{id}/tags", {"id": tags.group("id")}), None
+        if request.path == "/admin" or request.path.startswith("/admin/"):
+            proxy = {"proxy": request.path[len("/admin/"):]}
+            return "admin-api", "1.0", v1_event(request, "/admin/{proxy+}", proxy), None
+
+        route = self.sync_router.match(request.method, request.path).route
+        if route is not None and route.auth == "public":
+            return "sync-hub-api", "2.0", v2_event(request, None), None
+        try:
+            claims = tokens.verify(tokens.bearer_token({"headers": request.joined_headers()}))
+        except tokens.TokenError:
+            return "sync-hub-api", "2.0", None, (401, "Unauthorized")
+        except tokens.VerifierUnavailable as e:
+            return "sync-hub-api", "2.0", None, (500, str(e))
+        return "sync-hub-api", "2.0", v2_event(request, authorizer_claims(claims)), None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        if self.executor is None:  # servers that skip lifespan
+            self.startup()
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        request = Request(scope, body)
+
+        loop = asyncio.get_running_loop()
+        function, version, event, error = await loop.run_in_executor(
+            self.executor, self.build_event, request)
+        if error is not None:
+            status, headers, payload = gateway_error(*error)
+        else:
+            handler = self.handlers[function]
+            call = functools.partial(contextvars.copy_context().run, handler, event, LambdaContext(function))
+            try:
+                result = await asyncio.wait_for(loop.run_in_executor(self.executor, call), TIMEOUT_SECONDS)
+                status, headers, payload = to_response(result, version)
+            except asyncio.TimeoutError:
+                status, headers, payload = gateway_error(504, "Endpoint request timed out")
+            except Exception:
+                traceback.print_exc()
+                status, headers, payload = gateway_error(502, "Internal server error")
+        headers.append((b"x-amzn-requestid", request.request_id.encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": payload})
+
+    async def lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await asyncio.get_running_loop().run_in_executor(None, self.startup)
+                except Exception as e:
+                    traceback.print_exc()
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+app = Gateway()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the Lambda handlers locally behind an API Gateway stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3002)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (separate handler state each)")
+    parser.add_argument("--threads", type=int, default=THREADS, help="Concurrent handler calls per worker")
+    parser.add_argument("--fake-dynamodb", type=int, metavar="ITEMS",
+                        help="Use in-memory tables seeded with a tenant of this many items per collection")
+    parser.add_argument("--access-log", action="store_true", help="Log every request (off: it skews load tests)")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    # Workers are separate processes that import the app by name, so settings travel as environment
+    os.environ["LOCAL_GATEWAY_THREADS"] = str(args.threads)
+    if args.fake_dynamodb is not None:
+        os.environ["LOCAL_GATEWAY_FAKE_DYNAMODB"] = str(args.fake_dynamodb)
+    print(f"🚪 Local gateway on http://{args.host}:{args.port} "
+          f"({args.workers} worker(s) x {args.threads} thread(s))")
+    uvicorn.run("tools.local_gateway:app", host=args.host, port=args.port, workers=args.workers,
+                access_log=args.access_log, log_level="info" if args.access_log else "warning", app_dir=ROOT)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
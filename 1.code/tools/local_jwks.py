@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Cognito user pool's JWKS: an RSA key pair, a jwks.json and signed tokens
+
+Tests and benchmarks point JWKS_URL at the written file (file://...) so
+shared.tokens verifies real RS256 signatures without AWS. From the CLI it also
+mints tokens for calling the admin/tags Lambdas locally.
+
+Usage:
+    python -m tools.local_jwks --dir .artifacts/jwks --tenant-id tenant-1 [--admin] [--ttl 3600]
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+ISSUER = "https://cognito-idp.local.amazonaws.com/local_pool"
+CLIENT_ID = "local-client"
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64uint(value: int) -> str:
+    return _b64(value.to_bytes((value.bit_length() + 7) // 8, "big"))
+
+
+class LocalIssuer:
+    """Signs tokens like a user pool; jwks() is the document its JWKS endpoint would serve"""
+
+    def __init__(self, issuer: str = ISSUER, kid: Optional[str] = None, key_size: int = 2048,
+                 client_id: str = CLIENT_ID):
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        self.issuer = issuer
+        self.client_id = client_id
+        self.kid = kid or uuid.uuid4().hex[:16]
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=key_size)
+
+    def jwks(self) -> Dict[str, Any]:
+        numbers = self.private_key.public_key().public_numbers()
+        return {"keys": [{"kty": "RSA", "alg": "RS256", "use": "sig", "kid": self.kid,
+                          "e": _b64uint(numbers.e), "n": _b64uint(numbers.n)}]}
+
+    def write_jwks(self, directory: str) -> str:
+        """Write jwks.json and return its file:// URL"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.abspath(os.path.join(directory, "jwks.json"))
+        with open(path, "w") as f:
+            json.dump(self.jwks(), f)
+        return "file://" + path
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+        header = _b64(json.dumps({"alg": "RS256", "kid": self.kid, "typ": "JWT"}).encode())
+        payload = _b64(json.dumps(claims).encode())
+        signing_input = f"{header}.{payload}".encode("ascii")
+        signature = self.private_key.sign(signing_input, padding.PKCS1v15(), hashes.SHA256())
+        return f"{header}.{payload}.{_b64(signature)}"
+
+    def token(self, tenant_id: str = "tenant-1", ttl: int = 3600, groups: Optional[List[str]] = None,
+              token_use: str = "id", **claims: Any) -> str:
+        now = int(time.time())
+        return self.sign({
+            "sub": str(uuid.uuid4()),
+            "iss": self.issuer,
+            "token_use": token_use,
+            "aud" if token_use == "id" else "client_id": self.client_id,
+            "iat": now,
+            "exp": now + ttl,
+            "email": f"user@{tenant_id}.example.com",
+            "custom:tenant_id": tenant_id,
+            "cognito:groups": groups or [],
+            **claims,
+        })
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local JWKS stand-in and token minting")
+    parser.add_argument("--dir", default=".artifacts/jwks", help="Where jwks.json is written")
+    parser.add_argument("--tenant-id", default="tenant-1")
+    parser.add_argument("--admin", action="store_true", help="Put the user in the admin group")
+    parser.add_argument("--ttl", type=int, default=3600)
+    args = parser.parse_args(argv)
+
+    issuer = LocalIssuer()
+    url = issuer.write_jwks(args.dir)
+    token = issuer.token(args.tenant_id, args.ttl, ["admin"] if args.admin else [])
+    print(f"🔑 JWKS written; export these before running a handler locally:\n")
+    print(f"export JWKS_URL={url}")
+    print(f"export JWT_ISSUER={issuer.issuer}")
+    print(f"export COGNITO_CLIENT_IDS={issuer.client_id}")
+    print(f"\nAuthorization: Bearer {token}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Resumable parallel-scan migration between the two settings keyspaces
+
+The settings data lives under two incompatible schemas:
+  - `id` (admin_dynamodb_tables.py, lambda/tags_handler.py, lambda/admin_handler.py)
+  - (`tenant_id`, `setting_id`) (sync-hub handlers/settings.py)
+
+A migration scans the source table with a segmented parallel Scan, passes every
+item through a mapper and writes the results with BatchWriteItem. Each segment
+checkpoints its LastEvaluatedKey after every written page, so an interrupted run
+resumes where it stopped (pages are re-applied at most once, and puts are idempotent).
+
+Usage:
+    python -m tools.migrate_settings --source sync-hub-settings --target sync-hub-settings-v2 \\
+        --mapper id-to-tenant-key --mirror sync-hub-settings --segments 16 --workers 8 \\
+        --max-write-units 500 [--dry-run --diff-output diff.ndjson]
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from tools.ddb import RateLimiter, batch_get, batch_write, key_attributes, make_client, scan_pages
+
+Write = Tuple[str, Dict[str, Any]]
+Mapper = Callable[[Dict[str, Any]], Iterable[Write]]
+
+
+def _to_epoch(value: Any) -> Any:
+    """ISO-8601 timestamps (legacy schema) -> epoch seconds (sync-hub schema)"""
+    if not isinstance(value, str):
+        return value
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _to_iso(value: Any) -> Any:
+    """Epoch seconds (sync-hub schema) -> naive UTC ISO-8601 (legacy schema)"""
+    if isinstance(value, (int, Decimal)):
+        return datetime.fromtimestamp(int(value), tz=timezone.utc).replace(tzinfo=None).isoformat()
+    return value
+
+
+class IdToTenantKeyMapper:
+    """Re-key legacy `id` items into (`tenant_id`, `setting_id`) items
+
+    With a mirror table the unified item is also written back under its `id` key,
+    so readers of either keyspace see the same attributes during the cutover.
+    """
+
+    def __init__(self, target_table: str, mirror_table: Optional[str] = None):
+        self.target_table = target_table
+        self.mirror_table = mirror_table
+
+    def __call__(self, item: Dict[str, Any]) -> List[Write]:
+        if "id" not in item:
+            return []
+        unified = dict(item)
+        unified["tenant_id"] = item.get("tenant_id") or "default"
+        unified["setting_id"] = item["id"]
+        if "value" not in unified and "content" in unified:
+            unified["value"] = unified["content"]
+        if "is_public" not in unified:
+            unified["is_public"] = item.get("visibility") == "public"
+        unified.setdefault("version", 1)
+        for field in ("created_at", "updated_at"):
+            if field in unified:
+                unified[field] = _to_epoch(unified[field])
+
+        writes = [(self.target_table, unified)]
+        if self.mirror_table:
+            mirror = dict(unified)
+            for field in ("created_at", "updated_at"):
+                if field in item:
+                    mirror[field] = item[field]
+            writes.append((self.mirror_table, mirror))
+        return writes
+
+
+class TenantKeyToIdMapper:
+    """Re-key (`tenant_id`, `setting_id`) items into legacy `id` items"""
+
+    def __init__(self, target_table: str, mirror_table: Optional[str] = None):
+        self.target_table = target_table
+        self.mirror_table = mirror_table
+
+    def __call__(self, item: Dict[str, Any]) -> List[Write]:
+        if "setting_id" not in item:
+            return []
+        unified = dict(item)
+        unified["id"] = item.get("id") or item["setting_id"]
+        if "content" not in unified and "value" in unified:
+            unified["content"] = unified["value"]
+        if "visibility" not in unified:
+            unified["visibility"] = "public" if item.get("is_public") else "private"
+        for field in ("created_at", "updated_at"):
+            if field in unified:
+                unified[field] = _to_iso(unified[field])
+
+        writes = [(self.target_table, unified)]
+        if self.mirror_table:
+            mirror = dict(unified)
+            for field in ("created_at", "updated_at"):
+                if field in item:
+                    mirror[field] = item[field]
+            writes.append((self.mirror_table, mirror))
+        return writes
+
+
+MAPPERS = {
+    "id-to-tenant-key": IdToTenantKeyMapper,
+    "tenant-key-to-id": TenantKeyToIdMapper,
+}
+
+
+def load_mapper(spec: str, target_table: str, mirror_table: Optional[str] = None) -> Mapper:
+    """Resolve a built-in mapper name or a `package.module:factory` spec
+
+    Factories are called as factory(target_table, mirror_table) and must return a
+    callable mapping one source item to a list of (table_name, item) writes.
+    """
+    if spec in MAPPERS:
+        factory = MAPPERS[spec]
+    else:
+        module_name, _, attr = spec.partition(":")
+        if not attr:
+            raise ValueError(f"Unknown mapper '{spec}' (use one of {sorted(MAPPERS)} or module:factory)")
+        factory = getattr(importlib.import_module(module_name), attr)
+    return factory(target_table, mirror_table)
+
+
+class SegmentCheckpoint:
+    """Per-segment progress file: LastEvaluatedKey plus running counters"""
+
+    def __init__(self, directory: str, segment: int):
+        self.path = os.path.join(directory, f"segment-{segment:04d}.json")
+        self.state = {"segment": segment, "start_key": None, "done": False, "scanned": 0, "written": 0}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.state.update(json.load(f))
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+
+def _item_key(item: Dict[str, Any], key_names: List[str]) -> Tuple:
+    return tuple(str(item.get(name)) for name in key_names)
+
+
+class SettingsMigration:
+    """Segmented parallel Scan -> mapper -> BatchWriteItem, resumable per segment"""
+
+    def __init__(self, client, source_table: str, mapper: Mapper, name: str,
+                 total_segments: int = 8, workers: int = 8, page_size: int = 500,
+                 checkpoint_dir: str = ".migrations", read_limiter: Optional[RateLimiter] = None,
+                 write_limiter: Optional[RateLimiter] = None, dry_run: bool = False,
+                 diff_output: Optional[str] = None, diff_sample: int = 20):
+        self.client = client
+        self.source_table = source_table
+        self.mapper = mapper
+        self.total_segments = total_segments
+        self.workers = workers
+        self.page_size = page_size
+        self.checkpoint_dir = os.path.join(checkpoint_dir, name)
+        self.read_limiter = read_limiter
+        self.write_limiter = write_limiter
+        self.dry_run = dry_run
+        self.diff_output = diff_output
+        self.diff_sample = diff_sample
+
+        self.lock = threading.Lock()
+        self.totals = {"scanned": 0, "written": 0, "create": 0, "update": 0, "unchanged": 0}
+        self.samples: List[Dict[str, Any]] = []
+        self._key_names: Dict[str, List[str]] = {}
+        self._diff_file = None
+
+    def run(self) -> Dict[str, int]:
+        if not self.dry_run:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+        if self.diff_output:
+            self._diff_file = open(self.diff_output, "w")
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                # list() re-raises the first segment failure after all segments finish
+                list(pool.map(self._run_segment, range(self.total_segments)))
+        finally:
+            if self._diff_file:
+                self._diff_file.close()
+        return self.totals
+
+    def _run_segment(self, segment: int) -> None:
+        if self.dry_run:
+            checkpoint = None
+            start_key = None
+        else:
+            checkpoint = SegmentCheckpoint(self.checkpoint_dir, segment)
+            if checkpoint.state["done"]:
+                return
+            start_key = checkpoint.state["start_key"]
+
+        pages = scan_pages(
+            self.client, self.source_table,
+            segment=segment, total_segments=self.total_segments,
+            start_key=start_key, page_size=self.page_size, limiter=self.read_limiter
+        )
+        for items, last_key in pages:
+            writes = [write for item in items for write in self.mapper(item)]
+            if self.dry_run:
+                self._diff(writes)
+                written = 0
+            else:
+                written = batch_write(self.client, writes, limiter=self.write_limiter)
+
+            with self.lock:
+                self.totals["scanned"] += len(items)
+                self.totals["written"] += written
+
+            if checkpoint:
+                checkpoint.state["start_key"] = last_key
+                checkpoint.state["done"] = last_key is None
+                checkpoint.state["scanned"] += len(items)
+                checkpoint.state["written"] += written
+                checkpoint.save()
+
+    def _key_names_for(self, table_name: str) -> List[str]:
+        if table_name not in self._key_names:
+            self._key_names[table_name] = key_attributes(self.client, table_name)
+        return self._key_names[table_name]
+
+    def _diff(self, writes: List[Write]) -> None:
+        """Compare mapped items with what the target tables hold right now"""
+        by_table: Dict[str, List[Dict[str, Any]]] = {}
+        for table_name, item in writes:
+            by_table.setdefault(table_name, []).append(item)
+
+        for table_name, items in by_table.items():
+            key_names = self._key_names_for(table_name)
+            keys = {_item_key(item, key_names): {name: item[name] for name in key_names} for item in items}
+            existing = {
+                _item_key(item, key_names): item
+                for item in batch_get(self.client, table_name, list(keys.values()))
+            }
+            for item in items:
+                current = existing.get(_item_key(item, key_names))
+                if current is None:
+                    action, changes = "create", {name: [None, value] for name, value in item.items()}
+                else:
+                    changes = {
+                        name: [current.get(name), item.get(name)]
+                        for name in set(current) | set(item)
+                        if current.get(name) != item.get(name)
+                    }
+                    action = "update" if changes else "unchanged"
+                record = {"table": table_name, "key": keys[_item_key(item, key_names)],
+                          "action": action, "changes": changes}
+                with self.lock:
+                    self.totals[action] += 1
+                    if action != "unchanged" and len(self.samples) < self.diff_sample:
+                        self.samples.append(record)
+                    if self._diff_file and action != "unchanged":
+                        self._diff_file.write(json.dumps(record, default=str) + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Migrate settings items between keyspaces")
+    parser.add_argument("--source", required=True, help="Table to scan")
+    parser.add_argument("--target", required=True, help="Table receiving mapped items")
+    parser.add_argument("--mirror", help="Optional second table for dual writes")
+    parser.add_argument("--mapper", default="id-to-tenant-key",
+                        help=f"Built-in mapper ({', '.join(sorted(MAPPERS))}) or module:factory")
+    parser.add_argument("--name", help="Migration name used for checkpoints (default: source-to-target)")
+    parser.add_argument("--segments", type=int, default=8, help="Scan TotalSegments")
+    parser.add_argument("--workers", type=int, default=8, help="Worker threads")
+    parser.add_argument("--page-size", type=int, default=500, help="Scan page Limit")
+    parser.add_argument("--max-read-units", type=float, help="Read capacity units per second (all workers)")
+    parser.add_argument("--max-write-units", type=float, help="Items written per second (all workers)")
+    parser.add_argument("--checkpoint-dir", default=".migrations")
+    parser.add_argument("--reset", action="store_true", help="Discard existing checkpoints first")
+    parser.add_argument("--dry-run", action="store_true", help="Diff against the target without writing")
+    parser.add_argument("--diff-output", help="NDJSON file receiving every dry-run difference")
+    parser.add_argument("--endpoint-url", default=os.getenv("DYNAMODB_ENDPOINT"), help="e.g. DynamoDB Local")
+    parser.add_argument("--region", default=os.getenv("AWS_REGION", "us-east-1"))
+    args = parser.parse_args(argv)
+
+    name = args.name or f"{args.source}-to-{args.target}"
+    if args.reset:
+        checkpoint_path = os.path.join(args.checkpoint_dir, name)
+        if os.path.isdir(checkpoint_path):
+            for filename in os.listdir(checkpoint_path):
+                os.remove(os.path.join(checkpoint_path, filename))
+
+    client = make_client(args.region, args.endpoint_url, max_pool_connections=args.workers * 2)
+    migration = SettingsMigration(
+        client, args.source,
+        mapper=load_mapper(args.mapper, args.target, args.mirror),
+        name=name,
+        total_segments=args.segments,
+        workers=args.workers,
+        page_size=args.page_size,
+        checkpoint_dir=args.checkpoint_dir,
+        read_limiter=RateLimiter(args.max_read_units),
+        write_limiter=RateLimiter(args.max_write_units),
+        dry_run=args.dry_run,
+        diff_output=args.diff_output
+    )
+
+    mode = "dry run" if args.dry_run else "migration"
+    print(f"🔄 Starting {mode} '{name}': {args.source} -> {args.target}"
+          + (f" (+ mirror {args.mirror})" if args.mirror else ""))
+    started = time.perf_counter()
+    totals = migration.run()
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ Scanned {totals['scanned']} items in {elapsed:.1f}s")
+    if args.dry_run:
+        print(f"   create: {totals['create']}  update: {totals['update']}  unchanged: {totals['unchanged']}")
+        for sample in migration.samples:
+            print(f"   {sample['action']:>6} {sample['table']} {sample['key']}: {sorted(sample['changes'])}")
+    else:
+        print(f"   Written: {totals['written']} items")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Synthetic latency probes: every service's health check, the public settings
+listing and the authenticated read paths, fired concurrently on a schedule
+
+Each round sends --samples requests per probe at once. Latencies go into
+per-round HDR-style histograms (bench.harness.Histogram); the last --window
+rounds are merged into the rolling window that is checked against the probe's
+SLO (p50, p99 and availability). Rounds that age out of the window are merged
+into the baseline, which is also kept across runs in --state. A window p99
+more than --regression-factor times the baseline p99 is reported as a tail
+regression, so a slow deploy shows up before anything actually fails. Only
+probes that end the run within SLO and without a regression update the saved
+baseline; the others keep the one they started with, so a bad deploy does not
+become the reference the next one is compared to.
+
+--warmup rounds are sent first and discarded (no window, baseline or EMF), so
+the cold starts of freshly deployed functions do not decide a short smoke run.
+
+Every round emits one CloudWatch EMF record per probe through shared.metrics
+(dimensions Service/Probe and Service): the raw latencies, requests, errors,
+the window p50/p99 and availability, SLOBreach and TailRegression. Inside
+Lambda or with --emf-stdout the records go to stdout; --metrics-file appends
+them to a local NDJSON file instead.
+
+Endpoints come from SSM (one GetParameters call for --stage) unless given with
+--url SERVICE=URL. Authenticated probes need --token (or PROBE_TOKEN), or
+--jwks-dir to mint local tokens (tools.local_jwks); without either they are
+skipped.
+
+Usage:
+    python -m tools.probes --stage dev --warmup 1 --rounds 5 --interval 1   # deploy smoke test
+    python -m tools.probes --stage dev --interval 60 --window 15      # continuous
+    python -m tools.probes --url sync-hub=http://127.0.0.1:3002 --jwks-dir .artifacts/jwks \\
+        --slo settings=150:600 --metrics-file .artifacts/probes.ndjson
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from bench.harness import Histogram, print_table  # noqa: E402
+from shared import metrics  # noqa: E402
+
+ENDPOINT_PARAMETERS = {
+    "api": "/saas/{stage}/api/url",
+    "user-web": "/saas/{stage}/web/user-url",
+    "admin-web": "/saas/{stage}/web/admin-url",
+    "sync-hub": "/synchub/api/base_url",
+}
+EMF_DIMENSIONS = [["Service", "Probe"], ["Service"]]
+EMF_METRICS = [
+    ("Latency", "Milliseconds"),
+    ("Requests", "Count"),
+    ("Errors", "Count"),
+    ("WindowP50", "Milliseconds"),
+    ("WindowP99", "Milliseconds"),
+    ("Availability", "Percent"),
+    ("SLOBreach", "Count"),
+    ("TailRegression", "Count"),
+]
+MIN_BASELINE_SAMPLES = 50
+MIN_WINDOW_SAMPLES = 5
+REGRESSION_FLOOR_MS = 20.0  # ignore regressions smaller than this, whatever the ratio
+TOKEN_TTL = 3600
+
+
+class SLO:
+    def __init__(self, p50_ms: float, p99_ms: float, availability: float = 99.0):
+        self.p50_ms = p50_ms
+        self.p99_ms = p99_ms
+        self.availability = availability  # percent of requests answered without an error
+
+    @classmethod
+    def parse(cls, text: str) -> "SLO":
+        """P50:P99[:AVAILABILITY], e.g. 150:600 or 150:600:99.9"""
+        parts = [float(part) for part in text.split(":")]
+        if len(parts) not in (2, 3):
+            raise ValueError(f"expected P50:P99[:AVAILABILITY], got {text!r}")
+        return cls(*parts)
+
+    def __str__(self) -> str:
+        return f"p50≤{self.p50_ms:g}ms p99≤{self.p99_ms:g}ms avail≥{self.availability:g}%"
+
+
+class Probe:
+    def __init__(self, name: str, service: str, path: str, slo: SLO, auth: bool = False):
+        self.name = name
+        self.service = service
+        self.path = path
+        self.slo = slo
+        self.auth = auth
+
+
+PROBES = [
+    Probe("api_health", "api", "/_health", SLO(100, 500)),
+    Probe("user_web_health", "user-web", "/_health", SLO(100, 500)),
+    Probe("admin_web_health", "admin-web", "/_health", SLO(100, 500)),
+    Probe("sync_hub_health", "sync-hub", "/_health", SLO(100, 500)),
+    Probe("settings_public", "sync-hub", "/settings/public", SLO(200, 1000)),
+    Probe("settings", "sync-hub", "/settings", SLO(300, 1500), auth=True),
+    Probe("bookmarks", "sync-hub", "/bookmarks", SLO(300, 1500), auth=True),
+    Probe("groups", "sync-hub", "/groups", SLO(300, 1500), auth=True),
+]
+
+
+class Window:
+    """One probe's last `rounds` rounds, plus the baseline the older rounds were merged into"""
+
+    def __init__(self, rounds: int, baseline: Optional[Histogram] = None):
+        self.rounds: deque = deque(maxlen=max(1, rounds))
+        self.baseline = baseline or Histogram()
+
+    def add(self, histogram: Histogram, errors: Counter) -> None:
+        if len(self.rounds) == self.rounds.maxlen:
+            self.baseline.merge(self.rounds[0][0])
+        self.rounds.append((histogram, errors))
+
+    def histogram(self) -> Histogram:
+        merged = Histogram()
+        for histogram, _ in self.rounds:
+            merged.merge(histogram)
+        return merged
+
+    def errors(self) -> Counter:
+        return sum((errors for _, errors in self.rounds), Counter())
+
+
+def evaluate(probe: Probe, window: Window, regression_factor: float) -> Dict[str, Any]:
+    """Window latency and availability against the probe's SLO and the baseline"""
+    histogram = window.histogram()
+    errors = window.errors()
+    requests = histogram.count
+    failed = sum(errors.values())
+    availability = 100.0 * (requests - failed) / requests if requests else 0.0
+    p50_ms, p99_ms = histogram.percentile(50) / 1000, histogram.percentile(99) / 1000
+    baseline_p99_ms = window.baseline.percentile(99) / 1000 if window.baseline.count >= MIN_BASELINE_SAMPLES else None
+
+    breaches = []
+    if not requests or availability < probe.slo.availability:
+        breaches.append(f"availability {availability:.1f}% < {probe.slo.availability:g}%")
+    if requests and p50_ms > probe.slo.p50_ms:
+        breaches.append(f"p50 {p50_ms:.0f}ms > {probe.slo.p50_ms:g}ms")
+    if requests and p99_ms > probe.slo.p99_ms:
+        breaches.append(f"p99 {p99_ms:.0f}ms > {probe.slo.p99_ms:g}ms")
+    regression = (baseline_p99_ms is not None and requests >= MIN_WINDOW_SAMPLES
+                  and p99_ms > baseline_p99_ms * regression_factor
+                  and p99_ms - baseline_p99_ms > REGRESSION_FLOOR_MS)
+    return {
+        "probe": probe.name,
+        "service": probe.service,
+        "requests": requests,
+        "errors": failed,
+        "availability": availability,
+        "p50_ms": p50_ms,
+        "p99_ms": p99_ms,
+        "baseline_p99_ms": baseline_p99_ms,
+        "slo": str(probe.slo),
+        "breaches": breaches,
+        "regression": regression,
+        "error_breakdown": dict(errors),
+    }
+
+
+def to_emf(probe: Probe, status: Dict[str, Any], latencies_ms: List[float], round_errors: int) -> Dict[str, Any]:
+    return {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": metrics.NAMESPACE,
+                "Dimensions": EMF_DIMENSIONS,
+                "Metrics": [{"Name": name, "Unit": unit} for name, unit in EMF_METRICS],
+            }],
+        },
+        "Service": probe.service,
+        "Probe": probe.name,
+        "Path": probe.path,
+        "Latency": [round(value, 3) for value in latencies_ms],
+        "Requests": len(latencies_ms),
+        "Errors": round_errors,
+        "WindowP50": round(status["p50_ms"], 3),
+        "WindowP99": round(status["p99_ms"], 3),
+        "Availability": round(status["availability"], 3),
+        "SLOBreach": int(bool(status["breaches"])),
+        "TailRegression": int(status["regression"]),
+    }
+
+
+async def probe_once(client: httpx.AsyncClient, url: str, headers: Dict[str, str]) -> tuple:
+    """(elapsed seconds, error or None) for one GET"""
+    started = time.perf_counter()
+    error = None
+    try:
+        response = await client.get(url, headers=headers)
+        if response.status_code >= 400:
+            error = f"HTTP {response.status_code}"
+    except httpx.HTTPError as e:
+        error = type(e).__name__
+    return time.perf_counter() - started, error
+
+
+class Runner:
+    """Fires the probes in rounds and keeps a Window per probe"""
+
+    def __init__(self, probes: List[Probe], endpoints: Dict[str, str], token: Optional[Callable[[], str]] = None,
+                 samples: int = 1, window: int = 10, regression_factor: float = 2.0,
+                 baselines: Optional[Dict[str, Histogram]] = None):
+        self.probes = [probe for probe in probes if probe.service in endpoints and (token or not probe.auth)]
+        self.endpoints = {service: url.rstrip("/") for service, url in endpoints.items()}
+        self.token = token
+        self.samples = samples
+        self.regression_factor = regression_factor
+        baselines = baselines or {}
+        self.initial = {name: Histogram().merge(histogram) for name, histogram in baselines.items()}
+        self.windows = {probe.name: Window(window, baselines.get(probe.name)) for probe in self.probes}
+        self.latest: Dict[str, Dict[str, Any]] = {}
+
+    async def round(self, client: httpx.AsyncClient, record: bool = True) -> List[Dict[str, Any]]:
+        """Send every probe's samples at once, emit a record per probe and return the window statuses
+
+        With record=False (a warm-up round) the results are discarded and nothing is returned.
+        """
+        token = self.token() if self.token and any(probe.auth for probe in self.probes) else None
+        calls = []
+        for probe in self.probes:
+            headers = {"Authorization": f"Bearer {token}"} if probe.auth else {}
+            url = self.endpoints[probe.service] + probe.path
+            calls += [(probe, probe_once(client, url, headers)) for _ in range(self.samples)]
+        results = await asyncio.gather(*(call for _, call in calls))
+        if not record:
+            return []
+
+        collected: Dict[str, tuple] = {probe.name: ([], Counter()) for probe in self.probes}
+        for (probe, _), (elapsed, error) in zip(calls, results):
+            latencies, errors = collected[probe.name]
+            latencies.append(elapsed * 1000)
+            if error:
+                errors[error] += 1
+
+        statuses = []
+        for probe in self.probes:
+            latencies, errors = collected[probe.name]
+            histogram = Histogram()
+            for value in latencies:
+                histogram.record(value * 1000)
+            window = self.windows[probe.name]
+            window.add(histogram, errors)
+            status = evaluate(probe, window, self.regression_factor)
+            metrics.emit(to_emf(probe, status, latencies, sum(errors.values())))
+            self.latest[probe.name] = status
+            statuses.append(status)
+        return statuses
+
+    async def run(self, client: httpx.AsyncClient, rounds: int, interval: float,
+                  on_round: Optional[Callable[[int, List[Dict[str, Any]]], None]] = None,
+                  warmup: int = 0) -> List[Dict[str, Any]]:
+        """`warmup` discarded rounds, then `rounds` rounds (0 = until cancelled) started every `interval`
+        seconds; returns the last statuses"""
+        for _ in range(warmup):
+            await self.round(client, record=False)
+        statuses: List[Dict[str, Any]] = []
+        started = time.monotonic()
+        number = 0
+        while not rounds or number < rounds:
+            statuses = await self.round(client)
+            number += 1
+            if on_round:
+                on_round(number, statuses)
+            if rounds and number >= rounds:
+                break
+            # Keep to the schedule even when a round is slow, so the request rate stays constant
+            delay = started + number * interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        return statuses
+
+    def baselines(self) -> Dict[str, Histogram]:
+        """Baseline plus the current window, to compare the next run against
+
+        A probe whose latest status breached its SLO or regressed keeps the baseline it was loaded with.
+        """
+        baselines = dict(self.initial)
+        for name, window in self.windows.items():
+            status = self.latest.get(name)
+            if status is not None and not status["breaches"] and not status["regression"]:
+                baselines[name] = Histogram().merge(window.baseline).merge(window.histogram())
+        return baselines
+
+
+def load_baselines(path: Optional[str]) -> Dict[str, Histogram]:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {name: Histogram.from_dict(data) for name, data in json.load(f).get("baselines", {}).items()}
+
+
+def save_baselines(path: Optional[str], baselines: Dict[str, Histogram]) -> None:
+    if not path:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"updated_at": time.time(),
+                   "baselines": {name: histogram.to_dict() for name, histogram in sorted(baselines.items())}}, f)
+
+
+def resolve_endpoints(stage: str, services: List[str], overrides: Dict[str, str], region: str) -> tuple:
+    """({service: url}, [services without an endpoint]) for the services not given in overrides"""
+    names = {service: ENDPOINT_PARAMETERS[service].format(stage=stage) for service in services
+             if service not in overrides}
+    endpoints = dict(overrides)
+    if not names:
+        return endpoints, []
+    import boto3
+    from botocore.exceptions import BotoCoreError, ClientError
+    try:
+        response = boto3.client("ssm", region_name=region).get_parameters(Names=list(names.values()))
+    except (BotoCoreError, ClientError) as e:
+        print(f"Error getting endpoints: {e}")
+        return endpoints, list(names)
+    values = {parameter["Name"]: parameter["Value"] for parameter in response.get("Parameters", [])}
+    missing = []
+    for service, name in names.items():
+        if name in values:
+            endpoints[service] = values[name]
+        else:
+            missing.append(service)
+    return endpoints, missing
+
+
+def token_source(args: argparse.Namespace) -> Optional[Callable[[], str]]:
+    """Callable returning a bearer token (renewed before it expires), or None without credentials"""
+    if args.token:
+        return lambda: args.token
+    if not args.jwks_dir:
+        return None
+    from tools.local_jwks import LocalIssuer
+    issuer = LocalIssuer()
+    issuer.write_jwks(args.jwks_dir)
+    cached: Dict[str, Any] = {}
+
+    def token() -> str:
+        now = int(time.time())
+        if cached.get("exp", 0) - 60 < now:
+            cached.update(exp=now + TOKEN_TTL, token=issuer.sign({
+                "sub": "synthetic-probe",
+                "iss": issuer.issuer,
+                "token_use": "id",
+                "aud": issuer.client_id,
+                "iat": now,
+                "exp": now + TOKEN_TTL,
+                "email": f"synthetic-probe@{args.tenant_id}.example.com",
+                "custom:tenant_id": args.tenant_id,  # admin Lambdas
+                "tenant_id": args.tenant_id,  # sync-hub extract_claims
+                "cognito:groups": [],
+            }))
+        return cached["token"]
+
+    return token
+
+
+def report_round(number: int, statuses: List[Dict[str, Any]]) -> None:
+    requests = sum(status["requests"] for status in statuses)
+    print(f"⏱️  Round {number}: {len(statuses)} probes, {requests} requests in window")
+    for status in statuses:
+        if status["breaches"]:
+            print(f"🚨 {status['probe']}: SLO breach ({'; '.join(status['breaches'])})")
+        if status["regression"]:
+            print(f"📈 {status['probe']}: tail regression, p99 {status['p99_ms']:.0f}ms "
+                  f"vs baseline {status['baseline_p99_ms']:.0f}ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Synthetic latency probes with SLO reporting")
+    parser.add_argument("--stage", default=os.getenv("STAGE", "dev"))
+    parser.add_argument("--region", default=os.getenv("AWS_REGION", "us-east-1"))
+    parser.add_argument("--url", action="append", default=[], metavar="SERVICE=URL",
+                        help=f"Endpoint instead of SSM ({', '.join(ENDPOINT_PARAMETERS)})")
+    parser.add_argument("--rounds", type=int, default=0, help="Rounds to run (0 = until interrupted)")
+    parser.add_argument("--interval", type=float, default=60.0, help="Seconds between round starts")
+    parser.add_argument("--warmup", type=int, default=0,
+                        help="Discarded rounds sent first (cold starts after a deploy)")
+    parser.add_argument("--samples", type=int, default=3, help="Concurrent requests per probe per round")
+    parser.add_argument("--window", type=int, default=10, help="Rounds in the rolling SLO window")
+    parser.add_argument("--regression-factor", type=float, default=2.0,
+                        help="Flag a window p99 this many times the baseline p99")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero on a tail regression too")
+    parser.add_argument("--slo", action="append", default=[], metavar="PROBE=P50:P99[:AVAIL]",
+                        help="Override a probe's SLO (milliseconds, percent)")
+    parser.add_argument("--only", action="append", default=[], metavar="PROBE", help="Run only these probes")
+    parser.add_argument("--token", default=os.getenv("PROBE_TOKEN"), help="Bearer token for authenticated probes")
+    parser.add_argument("--jwks-dir", help="Mint local tokens and write their JWKS here")
+    parser.add_argument("--tenant-id", default="synthetic-probes", help="Tenant of minted tokens")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--state", default=os.path.join(ROOT, ".artifacts", "probes", "baseline.json"),
+                        help="Baseline histograms kept across runs ('' to disable)")
+    parser.add_argument("--metrics-file", help="Append EMF records to this NDJSON file")
+    parser.add_argument("--emf-stdout", action="store_true", help="Print EMF records (for CloudWatch Logs)")
+    args = parser.parse_args(argv)
+
+    probes = {probe.name: Probe(probe.name, probe.service, probe.path, probe.slo, probe.auth) for probe in PROBES}
+    for override in args.slo:
+        name, _, slo = override.partition("=")
+        if name not in probes:
+            parser.error(f"unknown probe {name!r} (known: {', '.join(probes)})")
+        probes[name].slo = SLO.parse(slo)
+    unknown = [name for name in args.only if name not in probes]
+    if unknown:
+        parser.error(f"unknown probe(s) {', '.join(unknown)}")
+    selected = [probes[name] for name in args.only] or list(probes.values())
+
+    overrides = dict(item.split("=", 1) for item in args.url if "=" in item)
+    if len(overrides) != len(args.url) or set(overrides) - set(ENDPOINT_PARAMETERS):
+        parser.error(f"--url takes SERVICE=URL with SERVICE one of {', '.join(ENDPOINT_PARAMETERS)}")
+    services = sorted({probe.service for probe in selected})
+    endpoints, missing = resolve_endpoints(args.stage, services, overrides, args.region)
+    for service in missing:
+        print(f"❌ No endpoint for {service} (SSM parameter {ENDPOINT_PARAMETERS[service].format(stage=args.stage)})")
+
+    token = token_source(args)
+    if not token and any(probe.auth for probe in selected):
+        print("⚠️  No --token/PROBE_TOKEN or --jwks-dir: authenticated probes skipped")
+
+    metrics.configure(enabled=True, sink_path=args.metrics_file or "",
+                      stdout=args.emf_stdout or bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME")))
+    state = args.state or None
+    runner = Runner(selected, endpoints, token, samples=args.samples, window=args.window,
+                    regression_factor=args.regression_factor, baselines=load_baselines(state))
+    if not runner.probes:
+        print("❌ Nothing to probe")
+        return 1
+
+    print(f"🔭 {len(runner.probes)} probes x {args.samples} every {args.interval:g}s "
+          f"({'until interrupted' if not args.rounds else f'{args.rounds} rounds'}), window {args.window} rounds")
+
+    async def run() -> List[Dict[str, Any]]:
+        limits = httpx.Limits(max_connections=len(runner.probes) * args.samples)
+        async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+            return await runner.run(client, args.rounds, args.interval, report_round, warmup=args.warmup)
+
+    try:
+        statuses = asyncio.run(run())
+    except KeyboardInterrupt:
+        statuses = [evaluate(probe, runner.windows[probe.name], args.regression_factor) for probe in runner.probes]
+    save_baselines(state, runner.baselines())
+
+    print()
+    print_table(statuses, ["probe", "requests", "errors", "availability", "p50_ms", "p99_ms", "baseline_p99_ms",
+                           "slo"])
+    breached = [status for status in statuses if status["breaches"]]
+    regressed = [status for status in statuses if status["regression"]]
+    if breached or missing:
+        print(f"\n✗ SLO breached by {', '.join(status['probe'] for status in breached) or 'missing endpoints'}")
+        return 1
+    if regressed:
+        print(f"\n⚠️  Tail regression in {', '.join(status['probe'] for status in regressed)}")
+        return 1 if args.fail_on_regression else 0
+    print("\n✓ All probes within SLO")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Incremental, parallel static-asset publisher for the S3 + CloudFront web bucket
+
+publish() compares every local file with its object in the bucket and uploads only
+what differs:
+- one ListObjectsV2 pass finds which keys exist; existing ones are HEADed in
+  parallel and count as unchanged when the content hash (the sha256 metadata this
+  publisher writes, or an MD5 ETag) and Content-Type/Cache-Control/Content-Encoding
+  all match
+- changed files are uploaded concurrently with their Content-Type and Cache-Control
+- one CloudFront invalidation covers exactly the changed paths (plus the directory
+  path of a changed index.html); past --max-paths they collapse into one prefix
+  wildcard. The invalidation is then polled with the invalidation_completed waiter.
+  Assets cached as `immutable` are content-addressed new keys and are never
+  invalidated (see tools/build_assets.py)
+
+A deploy that changes nothing makes no uploads and no invalidation.
+
+Usage:
+    python -m tools.publish docs --bucket sync-hub-web-1757132517 --prefix docs/ \\
+        --distribution-id EPUT16LI6OAAI [--cache-control max-age=300] [--dry-run] [--no-wait]
+"""
+import argparse
+import hashlib
+import mimetypes
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import boto3
+from botocore.exceptions import WaiterError
+
+REGION = "us-east-1"
+DEFAULT_CACHE_CONTROL = "max-age=300"
+MAX_INVALIDATION_PATHS = 100
+CONTENT_TYPES = {
+    ".html": "text/html",
+    ".js": "application/javascript",
+    ".mjs": "application/javascript",
+    ".css": "text/css",
+    ".json": "application/json",
+    ".map": "application/json",
+    ".yaml": "application/x-yaml",
+    ".yml": "application/x-yaml",
+    ".md": "text/markdown",
+    ".svg": "image/svg+xml",
+    ".ico": "image/x-icon",
+    ".woff2": "font/woff2",
+    ".txt": "text/plain",
+}
+WAITER_CONFIG = {"Delay": 5, "MaxAttempts": 180}  # up to 15 minutes
+
+
+class Asset:
+    """One local file and the object it becomes"""
+
+    def __init__(self, path: str, key: str, content_type: Optional[str] = None,
+                 cache_control: Optional[str] = DEFAULT_CACHE_CONTROL, content_encoding: Optional[str] = None):
+        self.path = path
+        self.key = key
+        self.content_type = content_type or content_type_for(key)
+        self.cache_control = cache_control
+        self.content_encoding = content_encoding
+        with open(path, "rb") as f:
+            data = f.read()
+        self.size = len(data)
+        self.md5 = hashlib.md5(data).hexdigest()
+        self.sha256 = hashlib.sha256(data).hexdigest()
+
+    def put_args(self) -> Dict[str, Any]:
+        args = {"ContentType": self.content_type, "Metadata": {"sha256": self.sha256}}
+        if self.cache_control:
+            args["CacheControl"] = self.cache_control
+        if self.content_encoding:
+            args["ContentEncoding"] = self.content_encoding
+        return args
+
+
+class PublishResult:
+    def __init__(self):
+        self.uploaded: List[str] = []
+        self.unchanged: List[str] = []
+        self.invalidation_id: Optional[str] = None
+        self.invalidated_paths: List[str] = []
+        self.elapsed = 0.0
+
+
+def content_type_for(key: str) -> str:
+    ext = os.path.splitext(key.removesuffix(".gz").removesuffix(".br"))[1].lower()
+    return CONTENT_TYPES.get(ext) or mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+def collect(directory: str, prefix: str = "", cache_control: Optional[str] = DEFAULT_CACHE_CONTROL,
+            cache_control_for: Optional[Callable[[str], Optional[str]]] = None) -> List[Asset]:
+    """Assets for every file under `directory`, keyed `prefix + relative path`"""
+    assets = []
+    for root, _, names in os.walk(directory):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            key = prefix + os.path.relpath(path, directory).replace(os.sep, "/")
+            assets.append(Asset(path, key, cache_control=cache_control_for(key) if cache_control_for
+                                else cache_control))
+    return assets
+
+
+def _unchanged(s3, bucket: str, asset: Asset) -> bool:
+    head = s3.head_object(Bucket=bucket, Key=asset.key)
+    remote_hash = head.get("Metadata", {}).get("sha256")
+    same_bytes = remote_hash == asset.sha256 if remote_hash else head.get("ETag", "").strip('"') == asset.md5
+    return (same_bytes and head.get("ContentType") == asset.content_type
+            and head.get("CacheControl") == asset.cache_control
+            and head.get("ContentEncoding") == asset.content_encoding)
+
+
+def _existing_keys(s3, bucket: str, assets: List[Asset]) -> set:
+    prefix = os.path.commonprefix([asset.key for asset in assets])
+    keys = set()
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+        keys.update(obj["Key"] for obj in page.get("Contents", []))
+    return keys
+
+
+def invalidation_paths(keys: List[str], max_paths: int = MAX_INVALIDATION_PATHS) -> List[str]:
+    """CloudFront paths for changed keys; index.html also invalidates its directory URL"""
+    paths = set()
+    for key in keys:
+        paths.add("/" + key)
+        if key == "index.html" or key.endswith("/index.html"):
+            paths.add("/" + key[:-len("index.html")])
+    if len(paths) > max_paths:
+        common = os.path.commonprefix(sorted(paths))
+        return [common + "*"]
+    return sorted(paths)
+
+
+def invalidate(cloudfront, distribution_id: str, paths: List[str], wait: bool = True) -> str:
+    """Create one invalidation for `paths` and, if asked, wait until CloudFront reports it complete"""
+    invalidation = cloudfront.create_invalidation(
+        DistributionId=distribution_id,
+        InvalidationBatch={
+            "Paths": {"Quantity": len(paths), "Items": paths},
+            "CallerReference": f"publish-{time.time_ns()}",
+        },
+    )
+    invalidation_id = invalidation["Invalidation"]["Id"]
+    if wait:
+        try:
+            cloudfront.get_waiter("invalidation_completed").wait(
+                DistributionId=distribution_id, Id=invalidation_id, WaiterConfig=WAITER_CONFIG)
+        except WaiterError as e:
+            print(f"⚠️ Invalidation {invalidation_id} not complete yet: {e}")
+    return invalidation_id
+
+
+def publish(assets: List[Asset], bucket: str, distribution_id: Optional[str] = None, s3=None, cloudfront=None,
+            workers: int = 8, wait: bool = True, dry_run: bool = False,
+            max_paths: int = MAX_INVALIDATION_PATHS) -> PublishResult:
+    """Upload the assets that differ from the bucket and invalidate only their paths"""
+    result = PublishResult()
+    started = time.perf_counter()
+    if not assets:
+        return result
+    s3 = s3 or boto3.client("s3", region_name=REGION)
+    existing = _existing_keys(s3, bucket, assets)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        candidates = [asset for asset in assets if asset.key in existing]
+        same = dict(zip((asset.key for asset in candidates),
+                        pool.map(lambda asset: _unchanged(s3, bucket, asset), candidates)))
+        changed = [asset for asset in assets if not same.get(asset.key)]
+        result.unchanged = [asset.key for asset in assets if same.get(asset.key)]
+        if not dry_run:
+            list(pool.map(lambda asset: s3.upload_file(asset.path, bucket, asset.key, ExtraArgs=asset.put_args()),
+                          changed))
+        result.uploaded = [asset.key for asset in changed]
+
+    stale = [asset.key for asset in changed if "immutable" not in (asset.cache_control or "")]
+    if stale and distribution_id:
+        result.invalidated_paths = invalidation_paths(stale, max_paths)
+        if not dry_run:
+            cloudfront = cloudfront or boto3.client("cloudfront", region_name=REGION)
+            result.invalidation_id = invalidate(cloudfront, distribution_id, result.invalidated_paths, wait)
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def report(result: PublishResult, bucket: str) -> None:
+    print(f"✅ Uploaded {len(result.uploaded)} changed file(s) to s3://{bucket}, "
+          f"{len(result.unchanged)} unchanged ({result.elapsed:.1f}s)")
+    for key in result.uploaded:
+        print(f"   ⬆️ {key}")
+    if result.invalidation_id:
+        print(f"✅ Invalidated {', '.join(result.invalidated_paths)} ({result.invalidation_id})")
+    elif result.invalidated_paths:
+        print(f"   Would invalidate {', '.join(result.invalidated_paths)}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Publish changed static files to S3 and invalidate CloudFront")
+    parser.add_argument("directory", help="Local directory to publish")
+    parser.add_argument("--bucket", required=True)
+    parser.add_argument("--prefix", default="", help="Key prefix, e.g. docs/")
+    parser.add_argument("--distribution-id", help="CloudFront distribution to invalidate")
+    parser.add_argument("--cache-control", default=DEFAULT_CACHE_CONTROL)
+    parser.add_argument("--workers", type=int, default=8, help="Parallel HEADs and uploads")
+    parser.add_argument("--max-paths", type=int, default=MAX_INVALIDATION_PATHS,
+                        help="Collapse into one wildcard beyond this many invalidation paths")
+    parser.add_argument("--no-wait", action="store_true", help="Do not wait for the invalidation to complete")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    parser.add_argument("--region", default=REGION)
+    args = parser.parse_args(argv)
+
+    assets = collect(args.directory, args.prefix, args.cache_control)
+    s3 = boto3.client("s3", region_name=args.region)
+    cloudfront = boto3.client("cloudfront", region_name=args.region) if args.distribution_id else None
+    print(f"📤 Publishing {len(assets)} file(s) from {args.directory} to s3://{args.bucket}/{args.prefix}")
+    result = publish(assets, args.bucket, args.distribution_id, s3, cloudfront, args.workers,
+                     wait=not args.no_wait, dry_run=args.dry_run, max_paths=args.max_paths)
+    report(result, args.bucket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
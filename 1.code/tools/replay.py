@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Replay captured sync-hub API Gateway events (shared.capture) against the local handler
+
+Records written by the capture hook in sync-hub main.py are fed to main.handler
+in-process, against an in-memory DynamoDB (bench.ddbfake), so production-shaped
+traffic can validate a performance change offline:
+- --mode timing (default) keeps the captured inter-arrival times, scaled by
+  --speed, on --concurrency threads; late starts are reported as schedule lag
+- --mode max sends every event as soon as a thread is free
+
+Before the replay every captured (hashed) tenant is seeded with --seed-items items
+per collection, and every setting, group and bookmark a successful captured
+request referred to by id is created, so replayed statuses can match the captured
+ones. Captured bodies are usually shaped (strings blanked), so a handler that
+validates string contents may answer differently from production.
+
+Report per route: replayed requests, errors, latency percentiles (HDR-style
+histograms) next to the captured production p50, and status mismatches against
+the capture (e.g. "200->404"). --save writes each request's status and a digest
+of its response body; --baseline compares a run against such a file, request by
+request, so the same capture can be replayed before and after a change and the
+results diffed. Fields that differ between runs anyway (timestamps, generated
+ids; see --ignore-field) are left out of the digest and lists are compared
+regardless of order. Concurrent requests interleave differently from run to
+run, so compare runs made with --mode max --concurrency 1 for an exact diff.
+
+Usage:
+    python -m tools.replay /tmp/captures/sync-hub-api [--mode max] [--speed 2] [--concurrency 4]
+                           [--save after.ndjson.gz] [--baseline before.ndjson.gz] [--json report.json]
+"""
+import argparse
+import base64
+import contextlib
+import copy
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _path in (ROOT, os.path.join(ROOT, "sync-hub", "services", "api")):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from bench.harness import Histogram, print_table, write_json
+
+VOLATILE_FIELDS = ["created_at", "updated_at", "joined_at", "feedback_at", "timestamp", "request_id",
+                   "setting_id", "group_id", "bookmark_id"]
+MAX_EXAMPLES = 5
+
+# route parameter -> (table env var, key attribute, extra attributes) of the item it refers to
+REFERENCED = {
+    "setting_id": ("SETTINGS_TABLE", "setting_id", {"name": "replayed setting", "value": "{}", "is_public": False,
+                                                     "version": 1}),
+    "group_id": ("GROUPS_TABLE", "group_id", {"name": "replayed group", "description": ""}),
+    "bookmark_id": ("BOOKMARKS_TABLE", "bookmark_id", {"title": "replayed bookmark", "url": "https://example.com",
+                                                       "tags": []}),
+}
+
+
+def _strip(value: Any, ignored: frozenset) -> Any:
+    if isinstance(value, dict):
+        return {k: _strip(v, ignored) for k, v in value.items() if k not in ignored}
+    if isinstance(value, list):  # order-insensitive: items keyed by generated ids come back in a new order
+        return sorted((_strip(v, ignored) for v in value), key=lambda v: json.dumps(v, sort_keys=True))
+    return value
+
+
+def digest(response: Dict[str, Any], ignored: frozenset) -> str:
+    """Hash of a response body with gzip undone and ignored JSON fields removed"""
+    body = response.get("body") or ""
+    if response.get("isBase64Encoded"):
+        raw = base64.b64decode(body)
+        headers = {k.lower(): v for k, v in (response.get("headers") or {}).items()}
+        if headers.get("content-encoding") == "gzip":
+            raw = gzip.decompress(raw)
+        body = raw.decode("utf-8", "replace")
+    try:
+        body = json.dumps(_strip(json.loads(body), ignored), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        pass
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()[:16]
+
+
+def tenant_of(record: Dict[str, Any]) -> str:
+    claims = record["event"].get("requestContext", {}).get("authorizer", {}).get("jwt", {}).get("claims", {})
+    return claims.get("tenant_id", "default")
+
+
+def prepare(fake: Any, records: List[Dict[str, Any]], seed_items: int) -> int:
+    """Seed every captured tenant and create the items successful requests referred to; returns items primed"""
+    from bench import bench_handlers
+    import main
+
+    for table, hash_key, range_key, indexes in bench_handlers.SYNC_HUB_TABLES.values():
+        fake.create_table(table, hash_key, range_key, indexes=indexes)
+    for tenant in sorted({tenant_of(record) for record in records}):
+        bench_handlers.seed_sync_hub(fake, seed_items, tenant)
+
+    now = int(time.time())
+    primed = set()
+    for record in records:
+        if not 200 <= (record.get("status") or 0) < 300:
+            continue
+        http = record["event"]["requestContext"]["http"]
+        params = main.router.match(http["method"], http["path"]).params
+        for param, value in params.items():
+            if param not in REFERENCED or (param, tenant_of(record), value) in primed:
+                continue
+            env, key, extra = REFERENCED[param]
+            fake.load(os.environ[env], [{"tenant_id": tenant_of(record), key: value, "created_at": now,
+                                         "updated_at": now, **extra}])
+            primed.add((param, tenant_of(record), value))
+    return len(primed)
+
+
+class Replayer:
+    def __init__(self, handler: Any, ignored: frozenset):
+        self.handler = handler
+        self.ignored = ignored
+        self.results: List[Optional[Dict[str, Any]]] = []
+        self.lag = Histogram()
+        self._lock = threading.Lock()
+
+    def invoke(self, index: int, record: Dict[str, Any], scheduled: Optional[float] = None) -> None:
+        from tools.local_gateway import LambdaContext
+
+        if scheduled is not None:
+            with self._lock:
+                self.lag.record(max(0.0, time.perf_counter() - scheduled) * 1e6)
+        event = copy.deepcopy(record["event"])
+        started = time.perf_counter()
+        try:
+            response = self.handler(event, LambdaContext("sync-hub-api"))
+        except Exception as e:
+            response = {"statusCode": None, "body": type(e).__name__}
+        latency_ms = (time.perf_counter() - started) * 1000
+        status, body_digest = response.get("statusCode"), digest(response, self.ignored)
+        self.results[index] = {"index": index, "route": record.get("route"), "status": status,
+                               "captured_status": record.get("status"), "digest": body_digest,
+                               "latency_ms": round(latency_ms, 3)}
+
+    def run(self, records: List[Dict[str, Any]], mode: str, speed: float, concurrency: int) -> float:
+        self.results = [None] * len(records)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as executor:
+            if mode == "max":
+                for index, record in enumerate(records):
+                    executor.submit(self.invoke, index, record)
+            else:
+                first = records[0]["ts"] if records else 0.0
+                for index, record in enumerate(records):
+                    scheduled = started + (record["ts"] - first) / speed
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    executor.submit(self.invoke, index, record, scheduled)
+        return time.perf_counter() - started
+
+
+def report(records: List[Dict[str, Any]], results: List[Dict[str, Any]], elapsed: float,
+           baseline: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    histograms: Dict[str, Histogram] = defaultdict(Histogram)
+    captured: Dict[str, Histogram] = defaultdict(Histogram)
+    errors: Counter = Counter()
+    mismatches: Dict[str, Counter] = defaultdict(Counter)
+    diffs: Dict[str, Counter] = defaultdict(Counter)
+    for record, result in zip(records, results):
+        route = result["route"]
+        histograms[route].record(result["latency_ms"] * 1000)
+        if record.get("duration_ms") is not None:
+            captured[route].record(record["duration_ms"] * 1000)
+        if result["status"] is None or result["status"] >= 400:
+            errors[route] += 1
+        if result["status"] != result["captured_status"]:
+            mismatches[route][f"{result['captured_status']}->{result['status']}"] += 1
+        if baseline is not None:
+            before = baseline[result["index"]] if result["index"] < len(baseline) else None
+            if before is None or before["status"] != result["status"]:
+                diffs[route]["status"] += 1
+            elif before["digest"] != result["digest"]:
+                diffs[route]["body"] += 1
+
+    rows = []
+    for route in sorted(histograms):
+        summary = histograms[route].summary_ms()
+        rows.append({
+            "route": route,
+            "requests": histograms[route].count,
+            "errors": errors[route],
+            "rps": histograms[route].count / elapsed if elapsed else 0.0,
+            "p50_ms": summary["p50_ms"],
+            "p90_ms": summary["p90_ms"],
+            "p99_ms": summary["p99_ms"],
+            "max_ms": summary["max_ms"],
+            "captured_p50_ms": captured[route].summary_ms()["p50_ms"] if captured[route].count else None,
+            "status_mismatches": sum(mismatches[route].values()),
+            "mismatch_breakdown": dict(mismatches[route]),
+            "baseline_diffs": sum(diffs[route].values()) if baseline is not None else None,
+            "diff_breakdown": dict(diffs[route]),
+            "histogram": histograms[route].to_dict(),
+        })
+    return rows
+
+
+def save_results(path: str, results: Iterable[Dict[str, Any]]) -> None:
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result, separators=(",", ":")) + "\n")
+
+
+def load_results(path: str) -> List[Dict[str, Any]]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay captured API Gateway events against the local handler")
+    parser.add_argument("paths", nargs="+", help="Capture files (.ndjson.gz) or directories of them")
+    parser.add_argument("--mode", choices=["timing", "max"], default="timing",
+                        help="Keep captured inter-arrival times, or replay as fast as possible")
+    parser.add_argument("--speed", type=float, default=1.0, help="Time compression in timing mode (2 = twice as fast)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Replay threads (default: 16 in timing mode, 1 in max mode)")
+    parser.add_argument("--seed-items", type=int, default=100, help="Items per collection seeded for each tenant")
+    parser.add_argument("--route", help="Only replay routes whose name contains this text")
+    parser.add_argument("--limit", type=int, help="Replay at most this many events")
+    parser.add_argument("--ignore-field", action="append", default=None,
+                        help=f"JSON field left out of response digests (default: {', '.join(VOLATILE_FIELDS)})")
+    parser.add_argument("--save", help="Write per-request statuses and digests here (.ndjson.gz)")
+    parser.add_argument("--baseline", help="Compare against results saved by an earlier --save")
+    parser.add_argument("--json", help="Write the report (with histogram buckets) to this JSON file")
+    args = parser.parse_args(argv)
+
+    from shared.capture import read_records
+    records = sorted((r for r in read_records(args.paths) if not args.route or args.route in (r.get("route") or "")),
+                     key=lambda r: r["ts"])
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        print("❌ No captured events found")
+        return 1
+    concurrency = args.concurrency or (1 if args.mode == "max" else 16)
+    ignored = frozenset(args.ignore_field if args.ignore_field is not None else VOLATILE_FIELDS)
+
+    from bench import bench_handlers
+    from bench.ddbfake import FakeDynamoDB, install_shared
+    bench_handlers.configure_environment()
+    os.environ["RATE_LIMIT_ENABLED"] = "false"  # max mode would otherwise replay mostly 429s
+    from shared import aws, metrics
+    aws.reset()
+    fake = install_shared(FakeDynamoDB())
+    metrics.configure(enabled=True, stdout=True)
+    import main as sync_hub
+
+    tenants = len({tenant_of(record) for record in records})
+    primed = prepare(fake, records, args.seed_items)
+    span = records[-1]["ts"] - records[0]["ts"]
+    print(f"🎞️  Replaying {len(records):,} events from {tenants} tenant(s), captured over {span:.0f}s "
+          f"({args.mode} mode, {concurrency} thread(s)); primed {primed} referenced items")
+
+    replayer = Replayer(sync_hub.handler, ignored)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        elapsed = replayer.run(records, args.mode, args.speed, concurrency)
+    results = replayer.results
+    baseline = load_results(args.baseline) if args.baseline else None
+
+    rows = report(records, results, elapsed, baseline)
+    columns = ["route", "requests", "errors", "rps", "p50_ms", "p90_ms", "p99_ms", "max_ms", "captured_p50_ms",
+               "status_mismatches"]
+    print_table(rows, columns + (["baseline_diffs"] if baseline is not None else []))
+    for row in rows:
+        if row["mismatch_breakdown"]:
+            breakdown = ", ".join(f"{change} x{count}" for change, count in row["mismatch_breakdown"].items())
+            print(f"⚠️  {row['route']}: status vs capture {breakdown}")
+        if row["diff_breakdown"]:
+            breakdown = ", ".join(f"{kind} x{count}" for kind, count in row["diff_breakdown"].items())
+            print(f"🔀 {row['route']}: differs from baseline in {breakdown}")
+    if baseline is not None:
+        changed = [r for r in results if r["index"] >= len(baseline) or
+                   (baseline[r["index"]]["status"], baseline[r["index"]]["digest"]) != (r["status"], r["digest"])]
+        for result in changed[:MAX_EXAMPLES]:
+            event = records[result["index"]]["event"]["requestContext"]["http"]
+            print(f"   #{result['index']} {event['method']} {event['path']}: status {result['status']}, "
+                  f"digest {result['digest']}")
+
+    summary = f"\n📈 {len(results) / elapsed:.1f} req/s over {elapsed:.1f}s"
+    if replayer.lag.count:
+        summary += f", schedule lag p99 {replayer.lag.percentile(99) / 1000:.1f} ms"
+    print(summary)
+    if args.save:
+        save_results(args.save, results)
+        print(f"💾 Per-request results written to {args.save}")
+    write_json(args.json, "replay", rows, mode=args.mode, speed=args.speed, concurrency=concurrency,
+               elapsed=elapsed, events=len(records), tenants=tenants,
+               schedule_lag=replayer.lag.summary_ms() if replayer.lag.count else None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""
+Generate a reproducible synthetic dataset of tenants for benchmarks and migrations
+
+Tenant sizes follow a Zipf law: the tenant of rank r has max_users / r^skew users,
+so a handful of large tenants sit next to a long tail of small ones. Each user gets:
+- settings files (settings.json, keybindings.json, extensions.json, mcp.json,
+  argv.json, each with its own probability) with realistic JSON bodies whose sizes
+  are log-normal, i.e. most are a few KB and a few are hundreds of KB
+- tags and visibility on those settings (the admin/tags Lambdas' settings table)
+- bookmarks, editor sessions (some with emoji feedback) and audit history
+- memberships in the tenant's groups, popular groups drawing most members, in
+  both the sync-hub and the admin panel (pk/sk + GSIs) member layouts
+
+Every random choice comes from a generator seeded with (--seed, tenant, user,
+purpose), and timestamps count back from --epoch, so the same arguments always
+produce the same items, byte for byte, whatever --jobs or --tenants is.
+
+Output:
+- --output DIR: one <tenant>.ndjson.gz per tenant in the tools/tenant_export
+  format (wire-format items, per-section hashes), loadable with tools.tenant_import,
+  plus dataset.json describing the model and the counts
+- --endpoint-url URL: parallel BatchWriteItem writers straight into DynamoDB Local
+  or a moto server (--create-tables creates the tables first)
+
+The sync-hub sections (settings, groups, group_members, bookmarks, sessions) go to
+the tables named by the SETTINGS_TABLE/... variables; setting_tags, admin_members
+and audit go to the tables the admin and tags Lambdas use. The default names of
+settings/setting_tags and group_members/admin_members coincide with different
+key schemas, so when writing to DynamoDB map one of each pair elsewhere
+(--table-map setting_tags=admin-settings) or leave it out (--sections).
+
+Usage:
+    python -m tools.seed_data --tenants 50 --max-users 2000 --seed 7 --output .artifacts/dataset
+    python -m tools.seed_data --tenants 5 --endpoint-url http://localhost:8000 --create-tables \\
+        --sections settings groups group_members bookmarks sessions audit
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.ddb import BATCH_WRITE_LIMIT, RateLimiter, make_client, serialize_item
+from tools.tenant_export import EXPORT_FORMAT, EXPORT_VERSION, canonical_line
+
+# section -> (table name, hash key, range key, {index: (hash key, range key)}); every key attribute is a string
+SECTIONS = {
+    "settings": (os.getenv("SETTINGS_TABLE", "sync-hub-settings"), "tenant_id", "setting_id", {}),
+    "groups": (os.getenv("GROUPS_TABLE", "sync-hub-groups"), "tenant_id", "group_id", {}),
+    "group_members": (os.getenv("GROUP_MEMBERS_TABLE", "sync-hub-group-members"), "tenant_id", "group_id#user_id",
+                      {}),
+    "bookmarks": (os.getenv("BOOKMARKS_TABLE", "sync-hub-bookmarks"), "tenant_id", "bookmark_id", {}),
+    "sessions": (os.getenv("SESSIONS_TABLE", "sync-hub-sessions"), "tenant_id", "session_id", {}),
+    "setting_tags": ("sync-hub-settings", "id", None, {"TenantCreatedIndex": ("tenant_id", "created_at")}),
+    "admin_members": ("sync-hub-group-members", "pk", "sk",
+                      {"GSI1": ("gsi1_pk", "gsi1_sk"), "GSI2": ("gsi2_pk", "gsi2_sk")}),
+    "audit": ("sync-hub-audit", "id", None, {"TenantTimestampIndex": ("tenant_id", "timestamp")}),
+}
+
+# file name -> (probability a user has it, median size in bytes, log-normal sigma)
+SETTINGS_FILES = {
+    "settings.json": (1.0, 2500, 1.1),
+    "keybindings.json": (0.45, 900, 0.9),
+    "extensions.json": (0.8, 1200, 0.8),
+    "mcp.json": (0.35, 700, 0.9),
+    "argv.json": (0.3, 250, 0.4),
+}
+MAX_BODY_BYTES = 300_000  # well inside DynamoDB's 400 KB item limit
+TAG_VOCABULARY = ["work", "personal", "python", "typescript", "rust", "go", "dark", "light", "minimal", "team",
+                  "laptop", "desktop", "remote", "vim", "emacs", "presentation", "accessibility", "experimental"]
+EMOJI = ["👍", "👎", "🎉", "😕", "🚀", "❤️"]
+AUDIT_ACTIONS = [("ADD_MEMBER", "group"), ("UPDATE_MEMBER", "group"), ("REMOVE_MEMBER", "group"),
+                 ("UPDATE_SETTING", "setting"), ("ADD_TAGS", "setting"), ("REMOVE_TAGS", "setting"),
+                 ("LOGIN", "user")]
+EDITOR_SETTINGS: Dict[str, Callable[[random.Random], Any]] = {
+    "editor.fontSize": lambda r: r.choice([12, 13, 14, 15, 16, 18]),
+    "editor.fontFamily": lambda r: r.choice(["Fira Code", "JetBrains Mono", "Menlo, Monaco, 'Courier New'"]),
+    "editor.tabSize": lambda r: r.choice([2, 4]),
+    "editor.formatOnSave": lambda r: r.random() < 0.6,
+    "editor.minimap.enabled": lambda r: r.random() < 0.4,
+    "editor.rulers": lambda r: [r.choice([80, 100, 120])],
+    "editor.wordWrap": lambda r: r.choice(["off", "on", "bounded"]),
+    "editor.renderWhitespace": lambda r: r.choice(["none", "boundary", "all"]),
+    "editor.cursorBlinking": lambda r: r.choice(["blink", "smooth", "solid"]),
+    "editor.fontLigatures": lambda r: r.random() < 0.5,
+    "workbench.colorTheme": lambda r: r.choice(["Default Dark Modern", "One Dark Pro", "Solarized Light",
+                                                "GitHub Dark", "Dracula"]),
+    "workbench.iconTheme": lambda r: r.choice(["vs-seti", "material-icon-theme"]),
+    "workbench.startupEditor": lambda r: r.choice(["none", "welcomePage"]),
+    "files.autoSave": lambda r: r.choice(["off", "afterDelay", "onFocusChange"]),
+    "files.trimTrailingWhitespace": lambda r: r.random() < 0.7,
+    "files.insertFinalNewline": lambda r: r.random() < 0.7,
+    "terminal.integrated.fontSize": lambda r: r.choice([12, 13, 14]),
+    "terminal.integrated.defaultProfile.osx": lambda r: r.choice(["zsh", "bash", "fish"]),
+    "git.autofetch": lambda r: r.random() < 0.5,
+    "git.confirmSync": lambda r: r.random() < 0.3,
+    "telemetry.telemetryLevel": lambda r: r.choice(["off", "error", "all"]),
+    "python.analysis.typeCheckingMode": lambda r: r.choice(["off", "basic", "strict"]),
+    "typescript.updateImportsOnFileMove.enabled": lambda r: r.choice(["always", "prompt", "never"]),
+    "security.workspace.trust.enabled": lambda r: r.random() < 0.8,
+}
+LANGUAGES = ["python", "typescript", "javascript", "json", "markdown", "rust", "go", "yaml", "html", "css"]
+EXTENSIONS = ["ms-python.python", "esbenp.prettier-vscode", "dbaeumer.vscode-eslint", "rust-lang.rust-analyzer",
+              "golang.go", "eamodio.gitlens", "github.copilot", "ms-azuretools.vscode-docker", "redhat.vscode-yaml",
+              "streetsidesoftware.code-spell-checker", "vscodevim.vim", "ms-vscode-remote.remote-ssh"]
+COMMANDS = ["workbench.action.files.save", "editor.action.formatDocument", "workbench.action.quickOpen",
+            "editor.action.commentLine", "workbench.action.terminal.toggleTerminal", "editor.action.rename"]
+
+
+def rng_for(seed: int, *path: Any) -> random.Random:
+    """Independent generator for one purpose; str seeds hash the same in every process"""
+    return random.Random("/".join(str(part) for part in (seed,) + path))
+
+
+def uuid_from(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def zipf_weights(count: int, skew: float) -> List[float]:
+    return [1 / (rank ** skew) for rank in range(1, count + 1)]
+
+
+def iso(epoch_seconds: float) -> str:
+    return datetime.fromtimestamp(epoch_seconds, tz=timezone.utc).replace(tzinfo=None).isoformat(timespec="microseconds")
+
+
+def _fill(document: Any, target: int, add: Callable[[int], int]) -> Any:
+    """Call add(n) (returning the bytes it added) until roughly `target` bytes are in the document"""
+    size = len(json.dumps(document))
+    n = 0
+    while size < target:
+        size += add(n)
+        n += 1
+    return document
+
+
+def settings_body(name: str, size: int, rng: random.Random) -> str:
+    """A plausible file of about `size` bytes"""
+    if name == "settings.json":
+        document: Dict[str, Any] = {k: make(rng) for k, make in EDITOR_SETTINGS.items() if rng.random() < 0.5}
+
+        def add(n: int) -> int:
+            choice = n % 3
+            if choice == 0:
+                key, value = f"[{LANGUAGES[n // 3 % len(LANGUAGES)]}]", {
+                    "editor.defaultFormatter": rng.choice(EXTENSIONS), "editor.tabSize": rng.choice([2, 4])}
+                if key in document:
+                    key = f"{key[:-1]}-{n}]"
+            elif choice == 1:
+                colors = document.setdefault("workbench.colorCustomizations", {})
+                key, value = f"editorBracketHighlight.foreground{n}", f"#{rng.getrandbits(24):06x}"
+                colors[key] = value
+                return len(key) + len(value) + 6
+            else:
+                excludes = document.setdefault("files.exclude", {})
+                key = f"**/{rng.choice(['node_modules', 'dist', 'build', '.cache', 'target'])}_{n}"
+                excludes[key] = True
+                return len(key) + 10
+            document[key] = value
+            return len(json.dumps(value)) + len(key) + 6
+        return json.dumps(_fill(document, size, add), indent=4)
+    if name == "keybindings.json":
+        bindings: List[Dict[str, str]] = []
+
+        def add(n: int) -> int:
+            binding = {"key": f"{rng.choice(['ctrl', 'cmd', 'alt'])}+{rng.choice(['shift+', ''])}{chr(97 + n % 26)}",
+                       "command": rng.choice(COMMANDS), "when": rng.choice(["editorTextFocus", "terminalFocus"])}
+            bindings.append(binding)
+            return len(json.dumps(binding)) + 10
+        return json.dumps(_fill(bindings, size, add), indent=4)
+    if name == "extensions.json":
+        recommendations = rng.sample(EXTENSIONS, rng.randint(1, len(EXTENSIONS)))
+        document = {"recommendations": recommendations}
+
+        def add(n: int) -> int:
+            extension = f"publisher{n}.extension-{rng.getrandbits(16):04x}"
+            recommendations.append(extension)
+            return len(extension) + 8
+        return json.dumps(_fill(document, size, add), indent=4)
+    if name == "mcp.json":
+        servers: Dict[str, Any] = {}
+
+        def add(n: int) -> int:
+            server = {"command": rng.choice(["npx", "uvx", "docker"]),
+                      "args": ["-y", f"@modelcontextprotocol/server-{rng.choice(['github', 'filesystem', 'fetch'])}"],
+                      "env": {f"TOKEN_{n}": "${input:token}"}}
+            servers[f"server-{n}"] = server
+            return len(json.dumps(server)) + 20
+        return json.dumps(_fill({"servers": servers}, size, add), indent=4)
+    document = {"enable-crash-reporter": rng.random() < 0.5, "locale": rng.choice(["en", "de", "fr", "ja"])}
+
+    def add(n: int) -> int:
+        document[f"js-flags-{n}"] = "--max-old-space-size=4096"
+        return 40
+    return json.dumps(_fill(document, size, add), indent=4)
+
+
+class Model:
+    """Parameters of the synthetic population"""
+
+    def __init__(self, seed: int = 42, tenants: int = 20, max_users: int = 2000, skew: float = 1.1,
+                 epoch: float = datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp(), history_days: int = 365,
+                 members_per_group: float = 12.0, bookmarks_per_user: float = 5.0, sessions_per_user: float = 2.0,
+                 audit_per_user: float = 3.0, tenant_prefix: str = "seed-tenant"):
+        self.seed = seed
+        self.tenants = tenants
+        self.max_users = max_users
+        self.skew = skew
+        self.epoch = epoch
+        self.history_days = history_days
+        self.members_per_group = members_per_group
+        self.bookmarks_per_user = bookmarks_per_user
+        self.sessions_per_user = sessions_per_user
+        self.audit_per_user = audit_per_user
+        self.tenant_prefix = tenant_prefix
+
+    def tenant_id(self, rank: int) -> str:
+        return f"{self.tenant_prefix}-{rank:04d}"
+
+    def users(self, rank: int) -> int:
+        return max(1, round(self.max_users / rank ** self.skew))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+class Tenant:
+    """One tenant's items, section by section; items are generated lazily from per-user generators"""
+
+    def __init__(self, model: Model, rank: int):
+        self.model = model
+        self.rank = rank
+        self.tenant_id = model.tenant_id(rank)
+        self.user_count = model.users(rank)
+        self.start = model.epoch - model.history_days * 86400
+        rng = rng_for(model.seed, rank, "tenant")
+        self.users = [(uuid_from(rng), f"user{u}@{self.tenant_id}.example.com",
+                       self.start + rng.random() * (model.epoch - self.start)) for u in range(self.user_count)]
+        self.groups = [(uuid_from(rng), f"{rng.choice(['Backend', 'Frontend', 'Data', 'Platform', 'Design'])} "
+                                        f"team {g}") for g in range(max(1, round(self.user_count / model.members_per_group)))]
+        weights = zipf_weights(len(self.groups), 1.0)
+        self.memberships: List[Tuple[int, int, str, float]] = []  # (user index, group index, role, joined)
+        for u, (_, _, joined) in enumerate(self.users):
+            picked = set(rng.choices(range(len(self.groups)), weights, k=1 + min(2, int(rng.expovariate(1.5)))))
+            for g in sorted(picked):
+                role = "admin" if rng.random() < 0.05 else "member"
+                self.memberships.append((u, g, role, joined + rng.random() * (model.epoch - joined)))
+
+    def _when(self, rng: random.Random, after: float) -> float:
+        return after + rng.random() * (self.model.epoch - after)
+
+    def user_settings(self, u: int) -> Iterator[Dict[str, Any]]:
+        """Settings metadata of one user (bodies are built separately from the setting id)"""
+        user_id, _, joined = self.users[u]
+        rng = rng_for(self.model.seed, self.rank, u, "settings")
+        for name, (probability, median, sigma) in SETTINGS_FILES.items():
+            if rng.random() >= probability:
+                continue
+            created = self._when(rng, joined)
+            yield {
+                "setting_id": uuid_from(rng),
+                "name": name,
+                "size": min(MAX_BODY_BYTES, int(rng.lognormvariate(0, sigma) * median)),
+                "is_public": rng.random() < 0.1,
+                "version": 1 + int(rng.expovariate(0.3)),
+                "created_at": created,
+                "updated_at": self._when(rng, created),
+                "tags": rng.sample(TAG_VOCABULARY, min(len(TAG_VOCABULARY), int(rng.expovariate(0.7)))),
+                "user_id": user_id,
+            }
+
+    def settings(self) -> Iterator[Dict[str, Any]]:
+        for u in range(self.user_count):
+            for setting in self.user_settings(u):
+                body_rng = rng_for(self.model.seed, self.rank, setting["setting_id"])
+                yield {
+                    "tenant_id": self.tenant_id, "setting_id": setting["setting_id"], "name": setting["name"],
+                    "value": settings_body(setting["name"], setting["size"], body_rng),
+                    "is_public": setting["is_public"], "version": setting["version"],
+                    "created_at": int(setting["created_at"]), "updated_at": int(setting["updated_at"]),
+                }
+
+    def setting_tags(self) -> Iterator[Dict[str, Any]]:
+        for u in range(self.user_count):
+            for setting in self.user_settings(u):
+                yield {
+                    "id": setting["setting_id"], "tenant_id": self.tenant_id, "user_id": setting["user_id"],
+                    "name": setting["name"], "tags": setting["tags"],
+                    "visibility": "public" if setting["is_public"] else "private",
+                    "created_at": iso(setting["created_at"]),
+                }
+
+    def groups_items(self) -> Iterator[Dict[str, Any]]:
+        rng = rng_for(self.model.seed, self.rank, "groups")
+        for group_id, name in self.groups:
+            created = int(self._when(rng, self.start))
+            yield {"tenant_id": self.tenant_id, "group_id": group_id, "name": name,
+                   "description": rng.choice(["", f"Shared settings for {name}"]), "owner_id": self.tenant_id,
+                   "created_at": created, "updated_at": created}
+
+    def group_members(self) -> Iterator[Dict[str, Any]]:
+        for u, g, role, joined in self.memberships:
+            user_id, group_id = self.users[u][0], self.groups[g][0]
+            yield {"tenant_id": self.tenant_id, "group_id#user_id": f"{group_id}#{user_id}", "group_id": group_id,
+                   "user_id": user_id, "role": role, "joined_at": int(joined)}
+
+    def admin_members(self) -> Iterator[Dict[str, Any]]:
+        rng = rng_for(self.model.seed, self.rank, "admin_members")
+        for u, g, role, joined in self.memberships:
+            user_id, email, _ = self.users[u]
+            group_id = self.groups[g][0]
+            yield {
+                "pk": f"TENANT#{self.tenant_id}#GROUP#{group_id}", "sk": f"USER#{user_id}",
+                "tenant_id": self.tenant_id, "group_id": group_id, "user_id": user_id, "email": email,
+                "role": role, "status": "active" if rng.random() < 0.9 else "inactive", "joined_at": iso(joined),
+                "gsi1_pk": email, "gsi1_sk": f"TENANT#{self.tenant_id}",
+                "gsi2_pk": f"TENANT#{self.tenant_id}", "gsi2_sk": f"GROUP#{group_id}",
+            }
+
+    def bookmarks(self) -> Iterator[Dict[str, Any]]:
+        for u, (_, _, joined) in enumerate(self.users):
+            rng = rng_for(self.model.seed, self.rank, u, "bookmarks")
+            for b in range(int(rng.expovariate(1 / self.model.bookmarks_per_user))):
+                created = int(self._when(rng, joined))
+                repo = f"{rng.choice(['acme', 'platform', 'infra', 'web'])}/{rng.choice(['api', 'app', 'docs'])}"
+                yield {"tenant_id": self.tenant_id, "bookmark_id": uuid_from(rng), "title": f"{repo} #{b}",
+                       "url": f"https://github.com/{repo}/blob/main/src/file{b}.py#L{rng.randint(1, 500)}",
+                       "tags": rng.sample(TAG_VOCABULARY, rng.randint(0, 3)), "created_at": created,
+                       "updated_at": int(self._when(rng, created))}
+
+    def sessions(self) -> Iterator[Dict[str, Any]]:
+        for u, (user_id, _, joined) in enumerate(self.users):
+            rng = rng_for(self.model.seed, self.rank, u, "sessions")
+            for _ in range(int(rng.expovariate(1 / self.model.sessions_per_user))):
+                started = int(self._when(rng, joined))
+                session = {"tenant_id": self.tenant_id, "session_id": uuid_from(rng), "user_id": user_id,
+                           "started_at": started, "ended_at": started + int(rng.expovariate(1 / 3600))}
+                if rng.random() < 0.3:
+                    session["emoji_feedback"] = rng.choice(EMOJI)
+                    session["feedback_at"] = session["ended_at"]
+                yield session
+
+    def audit(self) -> Iterator[Dict[str, Any]]:
+        for u, (user_id, email, joined) in enumerate(self.users):
+            rng = rng_for(self.model.seed, self.rank, u, "audit")
+            for _ in range(int(rng.expovariate(1 / self.model.audit_per_user))):
+                action, resource = rng.choice(AUDIT_ACTIONS)
+                timestamp = iso(self._when(rng, joined))
+                target = self.groups[rng.randrange(len(self.groups))][0] if resource == "group" else uuid_from(rng)
+                yield {"id": f"AUDIT#{timestamp}#{user_id}", "tenant_id": self.tenant_id, "user_id": user_id,
+                       "action": action, "resource": f"{resource}/{target}", "details": {"email": email},
+                       "timestamp": timestamp}
+
+    def items(self, section: str) -> Iterator[Dict[str, Any]]:
+        return self.groups_items() if section == "groups" else getattr(self, section)()
+
+
+def check_tables(sections: List[str], tables: Dict[str, str]) -> List[str]:
+    """Sections sharing a table name while needing different key schemas"""
+    problems = []
+    for i, first in enumerate(sections):
+        for second in sections[i + 1:]:
+            if tables[first] == tables[second] and SECTIONS[first][1:3] != SECTIONS[second][1:3]:
+                problems.append(f"{first} and {second} both map to {tables[first]}")
+    return problems
+
+
+def create_table(client, section: str, table_name: str) -> None:
+    _, hash_key, range_key, indexes = SECTIONS[section]
+    attributes = {hash_key, range_key} | {name for keys in indexes.values() for name in keys}
+    params: Dict[str, Any] = {
+        "TableName": table_name,
+        "KeySchema": [{"AttributeName": hash_key, "KeyType": "HASH"}] +
+                     ([{"AttributeName": range_key, "KeyType": "RANGE"}] if range_key else []),
+        "AttributeDefinitions": [{"AttributeName": name, "AttributeType": "S"} for name in sorted(attributes - {None})],
+        "BillingMode": "PAY_PER_REQUEST",
+    }
+    if indexes:
+        params["GlobalSecondaryIndexes"] = [{
+            "IndexName": index,
+            "KeySchema": [{"AttributeName": h, "KeyType": "HASH"}, {"AttributeName": r, "KeyType": "RANGE"}],
+            "Projection": {"ProjectionType": "ALL"},
+        } for index, (h, r) in indexes.items()]
+    try:
+        client.create_table(**params)
+        client.get_waiter("table_exists").wait(TableName=table_name)
+        print(f"  🗄️ Created {table_name}")
+    except client.exceptions.ResourceInUseException:
+        pass
+
+
+def write_tenant_file(model: Model, rank: int, sections: List[str], tables: Dict[str, str],
+                      output: str) -> Dict[str, Any]:
+    """One tenant as a tools/tenant_export file; returns its manifest"""
+    tenant = Tenant(model, rank)
+    path = os.path.join(output, f"{tenant.tenant_id}.ndjson.gz")
+    manifest: Dict[str, Any] = {"type": "manifest", "tenant_id": tenant.tenant_id, "tables": {}}
+    with gzip.open(path, "wb", compresslevel=6) as out:
+        header = {"type": "header", "format": EXPORT_FORMAT, "version": EXPORT_VERSION,
+                  "tenant_id": tenant.tenant_id, "exported_at": iso(model.epoch), "generator": "tools.seed_data"}
+        out.write(json.dumps(header).encode("utf-8") + b"\n")
+        for section in sections:
+            out.write(json.dumps({"type": "section", "table": section, "table_name": tables[section]}).encode() + b"\n")
+            digest, count = hashlib.sha256(), 0
+            for item in tenant.items(section):
+                wire = serialize_item(item)
+                digest.update(canonical_line(wire))
+                out.write(json.dumps({"type": "item", "table": section, "item": wire},
+                                     separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n")
+                count += 1
+            summary = {"count": count, "sha256": digest.hexdigest()}
+            manifest["tables"][section] = summary
+            out.write(json.dumps({"type": "end_section", "table": section, **summary}).encode("utf-8") + b"\n")
+        out.write(json.dumps(manifest).encode("utf-8") + b"\n")
+    with open(path + ".manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+    return {"tenant_id": tenant.tenant_id, "users": tenant.user_count, "file": path,
+            **{section: summary["count"] for section, summary in manifest["tables"].items()}}
+
+
+def write_tenant_dynamodb(writer: Any, model: Model, rank: int, sections: List[str],
+                          tables: Dict[str, str]) -> Dict[str, Any]:
+    tenant = Tenant(model, rank)
+    counts: Dict[str, Any] = {"tenant_id": tenant.tenant_id, "users": tenant.user_count}
+    for section in sections:
+        batch: List[Tuple[str, Dict[str, Any]]] = []
+        counts[section] = 0
+        for item in tenant.items(section):
+            batch.append((tables[section], serialize_item(item)))
+            counts[section] += 1
+            if len(batch) == BATCH_WRITE_LIMIT:
+                writer.submit(batch)
+                batch = []
+        if batch:
+            writer.submit(batch)
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a reproducible synthetic multi-tenant dataset")
+    parser.add_argument("--seed", type=int, default=42, help="Same seed and model -> same items")
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--max-users", type=int, default=2000, help="Users in the largest tenant")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of tenant sizes (0 = all equal)")
+    parser.add_argument("--epoch", default="2026-01-01", help="Date the history ends (ISO, UTC)")
+    parser.add_argument("--history-days", type=int, default=365)
+    parser.add_argument("--members-per-group", type=float, default=12.0)
+    parser.add_argument("--bookmarks-per-user", type=float, default=5.0, help="Mean (exponential)")
+    parser.add_argument("--sessions-per-user", type=float, default=2.0, help="Mean (exponential)")
+    parser.add_argument("--audit-per-user", type=float, default=3.0, help="Mean (exponential)")
+    parser.add_argument("--tenant-prefix", default="seed-tenant")
+    parser.add_argument("--sections", nargs="+", choices=list(SECTIONS), default=list(SECTIONS))
+    parser.add_argument("--table-map", action="append", default=[], metavar="SECTION=TABLE",
+                        help="Override the table of a section (repeatable)")
+    parser.add_argument("--output", help="Directory for per-tenant NDJSON files (tools.tenant_import format)")
+    parser.add_argument("--jobs", type=int, default=1, help="Tenants generated in parallel processes (--output)")
+    parser.add_argument("--endpoint-url", default=os.getenv("DYNAMODB_ENDPOINT"),
+                        help="Write to DynamoDB Local / moto server instead")
+    parser.add_argument("--create-tables", action="store_true", help="Create missing tables first (--endpoint-url)")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel batch writers (--endpoint-url)")
+    parser.add_argument("--max-write-units", type=float, help="Items written per second (--endpoint-url)")
+    parser.add_argument("--region", default=os.getenv("AWS_REGION", "us-east-1"))
+    args = parser.parse_args(argv)
+
+    if bool(args.output) == bool(args.endpoint_url):
+        parser.error("choose exactly one of --output and --endpoint-url")
+    tables = {section: SECTIONS[section][0] for section in SECTIONS}
+    tables.update(dict(entry.split("=", 1) for entry in args.table_map))
+    if args.endpoint_url:
+        problems = check_tables(args.sections, tables)
+        if problems:
+            parser.error("; ".join(problems) + " with different key schemas: use --table-map or --sections")
+
+    epoch = datetime.fromisoformat(args.epoch).replace(tzinfo=timezone.utc).timestamp()
+    model = Model(args.seed, args.tenants, args.max_users, args.skew, epoch, args.history_days,
+                  args.members_per_group, args.bookmarks_per_user, args.sessions_per_user, args.audit_per_user,
+                  args.tenant_prefix)
+    total_users = sum(model.users(rank) for rank in range(1, args.tenants + 1))
+    print(f"🌱 {args.tenants} tenants, {total_users:,} users (largest {model.users(1):,}), seed {args.seed}")
+    started = time.perf_counter()
+    ranks = range(1, args.tenants + 1)
+
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        if args.jobs > 1:
+            with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+                rows = list(pool.map(write_tenant_file, [model] * len(ranks), ranks, [args.sections] * len(ranks),
+                                     [tables] * len(ranks), [args.output] * len(ranks)))
+        else:
+            rows = [write_tenant_file(model, rank, args.sections, tables, args.output) for rank in ranks]
+        with open(os.path.join(args.output, "dataset.json"), "w") as f:
+            json.dump({"generator": "tools.seed_data", "model": model.to_dict(), "sections": args.sections,
+                       "tables": {s: tables[s] for s in args.sections}, "tenants": rows}, f, indent=2)
+    else:
+        from tools.tenant_import import ImportWriter
+        client = make_client(args.region, args.endpoint_url, max_pool_connections=args.workers * 2)
+        if args.create_tables:
+            for section in args.sections:
+                create_table(client, section, tables[section])
+        writer = ImportWriter(client, args.workers, RateLimiter(args.max_write_units))
+        try:
+            rows = [write_tenant_dynamodb(writer, model, rank, args.sections, tables) for rank in ranks]
+        finally:
+            writer.close()
+        if writer.errors:
+            print(f"❌ {len(writer.errors)} batches failed; first error: {writer.errors[0]}")
+            return 1
+
+    totals = {section: sum(row[section] for row in rows) for section in args.sections}
+    print(f"✅ {sum(totals.values()):,} items in {time.perf_counter() - started:.1f}s "
+          f"-> {args.output or args.endpoint_url}")
+    for section, count in totals.items():
+        print(f"   {section} ({tables[section]}): {count:,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
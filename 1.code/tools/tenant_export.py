@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Stream every item of one tenant across the sync-hub tables into gzip NDJSON
+
+File layout (one JSON object per line, items kept in DynamoDB wire format so sets,
+binaries and numbers round-trip exactly):
+    {"type": "header", "format": "sync-hub-tenant-export", "version": 1, "tenant_id": ...}
+    {"type": "section", "table": "settings", "table_name": "sync-hub-settings"}
+    {"type": "item", "table": "settings", "item": {...}}
+    {"type": "end_section", "table": "settings", "count": 42, "sha256": "..."}
+    ...
+    {"type": "manifest", "tenant_id": ..., "tables": {"settings": {"count": 42, "sha256": "..."}}}
+
+The manifest is also written next to the export as `<file>.manifest.json`.
+Items are pulled page by page through generators, so memory use does not grow
+with the tenant size.
+
+Usage:
+    python -m tools.tenant_export --tenant-id t-123 --output t-123.ndjson.gz \\
+        [--tables settings,groups] [--endpoint-url http://localhost:8000]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from tools.ddb import RateLimiter, make_client, query_items, scan_pages
+
+EXPORT_FORMAT = "sync-hub-tenant-export"
+EXPORT_VERSION = 1
+
+# Logical section name -> (table name, candidate tenant key attributes with their value format)
+TENANT_TABLES = {
+    "settings": (os.getenv("SETTINGS_TABLE", "sync-hub-settings"), [("tenant_id", "{tenant}")]),
+    "groups": (os.getenv("GROUPS_TABLE", "sync-hub-groups"), [("tenant_id", "{tenant}")]),
+    "group_members": (os.getenv("GROUP_MEMBERS_TABLE", "sync-hub-group-members"),
+                      [("tenant_id", "{tenant}"), ("gsi2_pk", "TENANT#{tenant}")]),
+    "bookmarks": (os.getenv("BOOKMARKS_TABLE", "sync-hub-bookmarks"), [("tenant_id", "{tenant}")]),
+    "sessions": (os.getenv("SESSIONS_TABLE", "sync-hub-sessions"), [("tenant_id", "{tenant}")]),
+    "audit": (os.getenv("AUDIT_TABLE", "sync-hub-audit"), [("tenant_id", "{tenant}")]),
+}
+
+
+def canonical_line(item: Dict[str, Any]) -> bytes:
+    """Stable serialization of a wire-format item used for section hashes"""
+    return json.dumps(item, sort_keys=True, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _resolve_access(client, table_name: str, candidates: List[Tuple[str, str]],
+                    tenant_id: str) -> Tuple[str, Optional[str], str, str]:
+    """Pick the cheapest way to read one tenant: base-table Query, GSI Query or filtered Scan
+
+    Returns (mode, index_name, attribute, value).
+    """
+    table = client.describe_table(TableName=table_name)["Table"]
+    hash_key = next(k["AttributeName"] for k in table["KeySchema"] if k["KeyType"] == "HASH")
+    indexes = {
+        next(k["AttributeName"] for k in index["KeySchema"] if k["KeyType"] == "HASH"): index["IndexName"]
+        for index in table.get("GlobalSecondaryIndexes", [])
+    }
+    for attribute, value_format in candidates:
+        value = value_format.format(tenant=tenant_id)
+        if hash_key == attribute:
+            return "query", None, attribute, value
+        if attribute in indexes:
+            return "query", indexes[attribute], attribute, value
+    attribute, value_format = candidates[0]
+    return "scan", None, attribute, value_format.format(tenant=tenant_id)
+
+
+def iter_tenant_items(client, table_name: str, candidates: List[Tuple[str, str]], tenant_id: str,
+                      limiter: Optional[RateLimiter] = None) -> Iterator[Dict[str, Any]]:
+    """Yield a tenant's items from one table in wire format"""
+    mode, index_name, attribute, value = _resolve_access(client, table_name, candidates, tenant_id)
+    params = {
+        "ExpressionAttributeNames": {"#tenant": attribute},
+        "ExpressionAttributeValues": {":tenant": {"S": value}},
+    }
+    if mode == "query":
+        if index_name:
+            params["IndexName"] = index_name
+        yield from query_items(client, table_name, limiter=limiter, deserialize=False,
+                               KeyConditionExpression="#tenant = :tenant", **params)
+    else:
+        print(f"⚠️ {table_name} has no tenant key or index - falling back to a filtered Scan")
+        for items, _ in scan_pages(client, table_name, limiter=limiter, deserialize=False,
+                                   FilterExpression="#tenant = :tenant", **params):
+            yield from items
+
+
+def export_tenant(client, tenant_id: str, output_path: str, sections: List[str],
+                  limiter: Optional[RateLimiter] = None) -> Dict[str, Any]:
+    """Write the export file and return its manifest"""
+    manifest: Dict[str, Any] = {
+        "type": "manifest",
+        "format": EXPORT_FORMAT,
+        "version": EXPORT_VERSION,
+        "tenant_id": tenant_id,
+        "exported_at": datetime.utcnow().isoformat(),
+        "tables": {},
+    }
+
+    with gzip.open(output_path, "wb", compresslevel=6) as out:
+        header = {"type": "header", "format": EXPORT_FORMAT, "version": EXPORT_VERSION,
+                  "tenant_id": tenant_id, "exported_at": manifest["exported_at"]}
+        out.write(canonical_line(header))
+
+        for section in sections:
+            table_name, candidates = TENANT_TABLES[section]
+            out.write(canonical_line({"type": "section", "table": section, "table_name": table_name}))
+            digest = hashlib.sha256()
+            count = 0
+            try:
+                for item in iter_tenant_items(client, table_name, candidates, tenant_id, limiter):
+                    digest.update(canonical_line(item))
+                    out.write(canonical_line({"type": "item", "table": section, "item": item}))
+                    count += 1
+            except client.exceptions.ResourceNotFoundException:
+                print(f"⚠️ Table {table_name} not found - exporting empty section '{section}'")
+            summary = {"table_name": table_name, "count": count, "sha256": digest.hexdigest()}
+            out.write(canonical_line({"type": "end_section", "table": section,
+                                      "count": count, "sha256": summary["sha256"]}))
+            manifest["tables"][section] = summary
+            print(f"  ✅ {section}: {count} items")
+
+        out.write(canonical_line(manifest))
+
+    with open(f"{output_path}.manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export one tenant's sync-hub data to gzip NDJSON")
+    parser.add_argument("--tenant-id", required=True)
+    parser.add_argument("--output", help="Output file (default: <tenant>.ndjson.gz)")
+    parser.add_argument("--tables", default=",".join(TENANT_TABLES),
+                        help=f"Comma-separated sections (default: {','.join(TENANT_TABLES)})")
+    parser.add_argument("--max-read-units", type=float, help="Read capacity units per second")
+    parser.add_argument("--endpoint-url", default=os.getenv("DYNAMODB_ENDPOINT"), help="e.g. DynamoDB Local")
+    parser.add_argument("--region", default=os.getenv("AWS_REGION", "us-east-1"))
+    args = parser.parse_args(argv)
+
+    sections = [name.strip() for name in args.tables.split(",") if name.strip()]
+    unknown = [name for name in sections if name not in TENANT_TABLES]
+    if unknown:
+        parser.error(f"Unknown tables: {', '.join(unknown)}")
+
+    output_path = args.output or f"{args.tenant_id}.ndjson.gz"
+    client = make_client(args.region, args.endpoint_url)
+
+    print(f"📦 Exporting tenant {args.tenant_id} -> {output_path}")
+    started = time.perf_counter()
+    manifest = export_tenant(client, args.tenant_id, output_path, sections, RateLimiter(args.max_read_units))
+    total = sum(entry["count"] for entry in manifest["tables"].values())
+    print(f"✅ Exported {total} items in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
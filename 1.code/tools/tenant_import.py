@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Load a tools/tenant_export file back into DynamoDB
+
+The export is read line by line and written with parallel BatchWriteItem calls
+(unprocessed items are retried). At most `workers * 2` batches are in flight, so
+memory use stays flat whatever the tenant size. Section counts and hashes are
+checked against the export as the file is consumed.
+
+Usage:
+    python -m tools.tenant_import --input t-123.ndjson.gz \\
+        [--as-tenant t-456] [--table-map settings=sync-hub-settings-v2] [--verify-only]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.ddb import BATCH_WRITE_LIMIT, RateLimiter, batch_write, key_attributes, make_client
+from tools.tenant_export import EXPORT_FORMAT, canonical_line
+
+
+def retarget_item(item: Dict[str, Any], source_tenant: str, target_tenant: str) -> Dict[str, Any]:
+    """Rewrite tenant references (tenant_id and TENANT#<id> key prefixes) for clones and moves"""
+    marker = f"TENANT#{source_tenant}"
+    rewritten = {}
+    for name, value in item.items():
+        text = value.get("S")
+        if text is not None:
+            if name == "tenant_id" and text == source_tenant:
+                value = {"S": target_tenant}
+            elif marker in text:
+                value = {"S": text.replace(marker, f"TENANT#{target_tenant}")}
+        rewritten[name] = value
+    return rewritten
+
+
+class ImportWriter:
+    """Bounded pool of batch writers; submit() blocks when too many batches are in flight"""
+
+    def __init__(self, client, workers: int, limiter: Optional[RateLimiter] = None):
+        self.client = client
+        self.limiter = limiter
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(workers * 2)
+        self.lock = threading.Lock()
+        self.written = 0
+        self.errors: List[BaseException] = []
+
+    def submit(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        self.slots.acquire()
+        future = self.pool.submit(batch_write, self.client, batch, self.limiter, serialized=True)
+        future.add_done_callback(self._done)
+
+    def _done(self, future) -> None:
+        with self.lock:
+            if future.exception():
+                self.errors.append(future.exception())
+            else:
+                self.written += future.result()
+        self.slots.release()
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+
+
+def import_tenant(client, input_path: str, table_map: Dict[str, str], target_tenant: Optional[str] = None,
+                  workers: int = 8, limiter: Optional[RateLimiter] = None,
+                  verify_only: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Stream the export into DynamoDB; returns per-section counts and verification results
+
+    When retargeting, items whose primary key carries no tenant reference (e.g. audit
+    rows keyed by `id`) are skipped: writing them would overwrite the source tenant's rows.
+    """
+    writer = None if verify_only else ImportWriter(client, workers, limiter)
+    results: Dict[str, Dict[str, Any]] = {}
+    source_tenant = None
+    batch: List[Tuple[str, Dict[str, Any]]] = []
+    digest = None
+    count = skipped = 0
+    table_name = None
+    retarget = False
+    key_names: Optional[List[str]] = None
+
+    try:
+        with gzip.open(input_path, "rb") as stream:
+            for line in stream:
+                record = json.loads(line)
+                kind = record["type"]
+                if kind == "header":
+                    if record.get("format") != EXPORT_FORMAT:
+                        raise ValueError(f"{input_path} is not a {EXPORT_FORMAT} file")
+                    source_tenant = record["tenant_id"]
+                elif kind == "section":
+                    table_name = table_map.get(record["table"], record["table_name"])
+                    digest, count, skipped = hashlib.sha256(), 0, 0
+                    retarget = bool(writer and target_tenant and target_tenant != source_tenant)
+                    key_names = None
+                elif kind == "item":
+                    item = record["item"]
+                    digest.update(canonical_line(item))
+                    count += 1
+                    if writer:
+                        if retarget:
+                            if key_names is None:
+                                key_names = key_attributes(client, table_name)
+                            moved = retarget_item(item, source_tenant, target_tenant)
+                            if all(moved.get(name) == item.get(name) for name in key_names):
+                                skipped += 1
+                                continue
+                            item = moved
+                        batch.append((table_name, item))
+                        if len(batch) == BATCH_WRITE_LIMIT:
+                            writer.submit(batch)
+                            batch = []
+                elif kind == "end_section":
+                    if writer and batch:
+                        writer.submit(batch)
+                        batch = []
+                    results[record["table"]] = {
+                        "table_name": table_name,
+                        "count": count,
+                        "skipped": skipped,
+                        "verified": count == record["count"] and digest.hexdigest() == record["sha256"],
+                    }
+    finally:
+        if writer:
+            writer.close()
+
+    if writer and writer.errors:
+        raise RuntimeError(f"{len(writer.errors)} batches failed; first error: {writer.errors[0]}")
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import a tenant export into DynamoDB")
+    parser.add_argument("--input", required=True, help="File produced by tools.tenant_export")
+    parser.add_argument("--as-tenant", help="Write the data under another tenant id (clone/move)")
+    parser.add_argument("--table-map", action="append", default=[], metavar="SECTION=TABLE",
+                        help="Override the destination table of a section (repeatable)")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel batch writers")
+    parser.add_argument("--max-write-units", type=float, help="Items written per second")
+    parser.add_argument("--verify-only", action="store_true", help="Check counts and hashes without writing")
+    parser.add_argument("--endpoint-url", default=os.getenv("DYNAMODB_ENDPOINT"), help="e.g. DynamoDB Local")
+    parser.add_argument("--region", default=os.getenv("AWS_REGION", "us-east-1"))
+    args = parser.parse_args(argv)
+
+    table_map = dict(entry.split("=", 1) for entry in args.table_map)
+    client = make_client(args.region, args.endpoint_url, max_pool_connections=args.workers * 2)
+
+    print(f"📥 {'Verifying' if args.verify_only else 'Importing'} {args.input}")
+    started = time.perf_counter()
+    results = import_tenant(client, args.input, table_map, args.as_tenant, args.workers,
+                            RateLimiter(args.max_write_units), args.verify_only)
+
+    ok = True
+    for section, result in results.items():
+        status = "✅" if result["verified"] else "❌ hash/count mismatch"
+        ok = ok and result["verified"]
+        print(f"  {status} {section} -> {result['table_name']}: {result['count']} items")
+        if result["skipped"]:
+            print(f"     ⚠️ skipped {result['skipped']} items whose key has no tenant reference")
+    print(f"{'✅' if ok else '⚠️'} Done in {time.perf_counter() - started:.1f}s")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,9 @@ Update OpenAPI specification with admin endpoints and redeploy
 import yaml
 import json
 import boto3
-import time
+
+from tools.build_assets import build_site
+from tools.publish import publish, report
 
 def update_openapi_with_admin():
     """Update OpenAPI spec with admin endpoints"""
@@ -214,47 +216,16 @@ def update_openapi_with_admin():
     
     print("✅ Updated OpenAPI specification with admin endpoints")
     
-    # Upload to S3
-    print("\n📤 Uploading updated OpenAPI files to S3...")
+    # Upload changed files to S3 and invalidate only their paths
+    print("\n📤 Publishing updated OpenAPI files...")
     
     s3 = boto3.client('s3', region_name='us-east-1')
     bucket_name = 'sync-hub-web-1757132517'
-    
-    files_to_upload = [
-        ('docs/openapi.yaml', 'application/x-yaml'),
-        ('docs/openapi.json', 'application/json')
-    ]
-    
-    for file_path, content_type in files_to_upload:
-        s3.upload_file(
-            file_path, bucket_name, file_path,
-            ExtraArgs={
-                'ContentType': content_type,
-                'CacheControl': 'max-age=300'
-            }
-        )
-    
-    print("✅ Uploaded updated OpenAPI files")
-    
-    # Create CloudFront invalidation
-    print("\n🔄 Creating CloudFront invalidation...")
-    
     cloudfront = boto3.client('cloudfront', region_name='us-east-1')
     distribution_id = 'EPUT16LI6OAAI'
     
-    invalidation = cloudfront.create_invalidation(
-        DistributionId=distribution_id,
-        InvalidationBatch={
-            'Paths': {
-                'Quantity': 1,
-                'Items': ['/docs/*']
-            },
-            'CallerReference': str(int(time.time()))
-        }
-    )
-    
-    invalidation_id = invalidation['Invalidation']['Id']
-    print(f"✅ Created invalidation: {invalidation_id}")
+    result = publish(build_site(), bucket_name, distribution_id, s3, cloudfront, wait=False)
+    report(result, bucket_name)
     
     print(f"\n📊 OpenAPI Summary:")
     total_paths = len(openapi_data['paths'])
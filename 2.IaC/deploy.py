@@ -1,102 +1,109 @@
 #!/usr/bin/env python3
 """
 Terraform deployment script for Sync Hub infrastructure
+
+The workflow runs as a dependency graph (1.code/tools/dag.py). Terraform holds
+the state lock for init, import, plan and apply, so those stay in sequence;
+validate runs alongside the imports. Completed work is remembered in
+.artifacts/deploy/terraform.json:
+- the backend bootstrap and each import run once
+- init and validate rerun only when the configuration changes
+- --resume restarts after the step that failed
 """
-import subprocess
-import sys
+import glob
+import json
 import os
+import sys
+
+TF_DIR = os.path.dirname(os.path.abspath(__file__))
+# The orchestrator lives with the rest of the deploy tooling in 1.code/tools
+sys.path.insert(0, os.path.join(TF_DIR, "..", "1.code"))
+
+from tools import dag  # noqa: E402
+
+VAR_FILE = "envs/dev.tfvars"
+PLAN_FILE = "tfplan"
+
+IMPORTS = [
+    ("module.identity_cognito.aws_cognito_user_pool.main", "us-east-1_ARkd0dYPj"),
+    ("module.identity_cognito.aws_cognito_user_pool_client.web", "us-east-1_ARkd0dYPj/7n568rmtbtp2tt8m0av2hl0f2n"),
+    ("module.identity_cognito.aws_cognito_user_pool_domain.domain", "us-east-1_ARkd0dYPj/sync-hub-851725240440"),
+    ("module.edge_cloudfront.aws_cloudfront_distribution.web", "EPUT16LI6OAAI"),
+    ("module.web_s3.aws_s3_bucket.web", "sync-hub-web-1757132517"),
+    ("module.api_http.aws_apigatewayv2_api.http", "l7ycatge3j"),
+]
+
+
+def terraform(*argv, **kwargs):
+    return dag.command(["terraform", *argv], cwd=TF_DIR, **kwargs)
+
+
+def configuration_key(outputs):
+    """Changes whenever a .tf file, a module or the var file changes, or .terraform is gone"""
+    paths = glob.glob(os.path.join(TF_DIR, "*.tf")) + [os.path.join(TF_DIR, "modules"), os.path.join(TF_DIR, "envs")]
+    return dag.files_key(paths, extra=str(os.path.isdir(os.path.join(TF_DIR, ".terraform"))))
+
 
-def run_command(cmd, description):
-    """Run a command and handle errors"""
-    print(f"\n🔧 {description}")
-    print(f"Running: {cmd}")
-    
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    
-    if result.returncode == 0:
-        print("✅ Success")
-        if result.stdout:
-            print(result.stdout)
-        return True
-    else:
-        print("❌ Failed")
-        if result.stderr:
-            print(result.stderr)
-        return False
-
-def main():
+def apply(auto_approve):
+    def run(outputs):
+        # Ask for confirmation before apply
+        if not auto_approve:
+            response = input("Do you want to apply the changes? (yes/no): ")
+            if response.lower() not in ['yes', 'y']:
+                raise dag.StepFailed("Deployment cancelled by user")
+        return terraform("apply", "-auto-approve", PLAN_FILE, echo=True)(outputs)
+    return run
+
+
+def steps(auto_approve=False):
+    graph = [
+        dag.Step("bootstrap", dag.command([sys.executable, "bootstrap.py"], cwd=TF_DIR), cache_key="backend",
+                 description="Creating backend resources"),
+        dag.Step("init", terraform("init", "-input=false"), deps=["bootstrap"], cache_key=configuration_key,
+                 description="Initializing Terraform"),
+        dag.Step("validate", terraform("validate"), deps=["init"], cache_key=configuration_key,
+                 description="Validating Terraform configuration"),
+    ]
+    previous = "init"
+    for resource_address, resource_id in IMPORTS:
+        # Imports share the state lock, so each waits for the previous one; a failed import may already exist
+        name = f"import {resource_address.split('.', 1)[1]}"
+        graph.append(dag.Step(name, terraform("import", f"-var-file={VAR_FILE}", resource_address, resource_id),
+                              deps=[previous], cache_key=f"{resource_address}={resource_id}", allow_failure=True,
+                              description=f"Importing {resource_address}"))
+        previous = name
+    graph += [
+        dag.Step("plan", terraform("plan", f"-var-file={VAR_FILE}", f"-out={PLAN_FILE}", "-input=false", echo=True),
+                 deps=["validate", previous], description="Post-import Terraform plan"),
+        dag.Step("apply", apply(auto_approve), deps=["plan"], description="Applying Terraform changes"),
+        dag.Step("outputs", lambda outputs: json.loads(terraform("output", "-json")(outputs) or "{}"),
+                 deps=["apply"], description="Displaying outputs"),
+    ]
+    return graph
+
+
+def main(argv=None):
     """Main deployment workflow"""
+    parser = dag.parser("Terraform deployment for Sync Hub")
+    parser.add_argument("--auto-approve", action="store_true", help="Apply without asking for confirmation")
+    args = parser.parse_args(argv)
+
     print("🚀 Sync Hub Terraform Deployment")
     print("=" * 50)
-    
-    # Change to terraform directory
-    if not os.path.exists('terraform'):
-        print("❌ terraform directory not found. Run from project root.")
-        sys.exit(1)
-    
-    os.chdir('terraform')
-    
-    # Step 1: Bootstrap backend (if needed)
-    print("\n1️⃣ Checking backend resources...")
-    if not run_command("python3 bootstrap.py", "Creating backend resources"):
-        print("❌ Backend bootstrap failed")
-        sys.exit(1)
-    
-    # Step 2: Initialize Terraform
-    if not run_command("terraform init", "Initializing Terraform"):
-        print("❌ Terraform init failed")
-        sys.exit(1)
-    
-    # Step 3: Validate configuration
-    if not run_command("terraform validate", "Validating Terraform configuration"):
-        print("❌ Terraform validation failed")
-        sys.exit(1)
-    
-    # Step 4: Plan (before imports)
-    print("\n4️⃣ Running initial plan (expect many resources to be created)...")
-    run_command("terraform plan -var-file=envs/dev.tfvars", "Initial Terraform plan")
-    
-    # Step 5: Import existing resources
-    print("\n5️⃣ Importing existing resources...")
-    
-    import_commands = [
-        ("module.identity_cognito.aws_cognito_user_pool.main", "us-east-1_ARkd0dYPj"),
-        ("module.identity_cognito.aws_cognito_user_pool_client.web", "us-east-1_ARkd0dYPj/7n568rmtbtp2tt8m0av2hl0f2n"),
-        ("module.identity_cognito.aws_cognito_user_pool_domain.domain", "us-east-1_ARkd0dYPj/sync-hub-851725240440"),
-        ("module.edge_cloudfront.aws_cloudfront_distribution.web", "EPUT16LI6OAAI"),
-        ("module.web_s3.aws_s3_bucket.web", "sync-hub-web-1757132517"),
-        ("module.api_http.aws_apigatewayv2_api.http", "l7ycatge3j"),
-    ]
-    
-    for resource_address, resource_id in import_commands:
-        cmd = f"terraform import {resource_address} {resource_id}"
-        if not run_command(cmd, f"Importing {resource_address}"):
-            print(f"⚠️ Import failed for {resource_address} - may already be imported or not exist")
-    
-    # Step 6: Plan after imports
-    print("\n6️⃣ Running plan after imports...")
-    if not run_command("terraform plan -var-file=envs/dev.tfvars", "Post-import Terraform plan"):
-        print("❌ Post-import plan failed")
-        sys.exit(1)
-    
-    # Step 7: Ask for confirmation before apply
-    print("\n7️⃣ Ready to apply changes...")
-    response = input("Do you want to apply the changes? (yes/no): ")
-    
-    if response.lower() in ['yes', 'y']:
-        if run_command("terraform apply -var-file=envs/dev.tfvars -auto-approve", "Applying Terraform changes"):
-            print("\n🎉 Deployment completed successfully!")
-            
-            # Show outputs
-            print("\n📋 Terraform Outputs:")
-            run_command("terraform output", "Displaying outputs")
-        else:
-            print("❌ Terraform apply failed")
-            sys.exit(1)
-    else:
-        print("⏹️ Deployment cancelled by user")
-    
-    print("\n✅ Terraform deployment workflow completed!")
+
+    # apply is last in the chain, so its confirmation prompt never interleaves with other steps
+    code = dag.run_cli(steps(args.auto_approve), "terraform", args, root=TF_DIR)
+    if code != 0 or args.plan:
+        return code
+
+    # Show outputs
+    print("\n📋 Terraform Outputs:")
+    outputs = dag.load_state(dag.state_path("terraform", args, TF_DIR)).get("outputs", {}).get("output") or {}
+    for name, output in sorted(outputs.items()):
+        print(f"  {name} = {output.get('value')}")
+
+    print("\n🎉 Deployment completed successfully!")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())